@@ -1,11 +1,129 @@
-from flask import jsonify, request
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
-from database import get_db
+from database import get_db, read_only
 import pymysql
-from local_image_service import local_image_service
+from sale_items_loader import attach_sale_items
+from cache_config import cache_response, invalidates_cache, uncacheable
+from pagination import KeysetQuery, InvalidCursor, fetch_list, list_response
+from dashboard_counters import read_counters, counter_breakdown, record_change
+from sequence_service import next_number
+from import_engine import PANDAS_AVAILABLE, read_sheet, import_enquiries_frame
+from import_jobs import submit_import
+from report_exports import (sales_report_filters, dispatch_report_filters,
+                            SALES_REPORT_QUERY, DISPATCH_REPORT_QUERY,
+                            SALES_REPORT_SUMMARY_QUERY, DISPATCH_REPORT_SUMMARY_QUERY)
+import logging
+
+logger = logging.getLogger(__name__)
+
+ENQUIRIES_LIST_QUERY = KeysetQuery("""
+    SELECT e.*, 
+           COALESCE(
+               NULLIF(c.contact_person, ''), 
+               NULLIF(c.individual_name, ''), 
+               NULLIF(c.company_name, '')
+           ) as customer_name, 
+           c.email, c.phone, 
+           p.name as product_name,
+           COALESCE(e.quantity, 1) as quantity
+    FROM enquiries e
+    LEFT JOIN customers c ON e.customer_id = c.id
+    LEFT JOIN products p ON e.product_id = p.id
+""", 'e.created_at', 'e.id', 'created_at')
+
+SERVICES_LIST_QUERY = KeysetQuery("""
+    SELECT st.*, 
+           COALESCE(
+               NULLIF(c.contact_person, ''), 
+               NULLIF(c.individual_name, ''), 
+               NULLIF(c.company_name, '')
+           ) as customer_name, 
+           c.email, c.phone, 
+           p.name as product_name
+    FROM service_tickets st
+    LEFT JOIN customers c ON st.customer_id = c.id
+    LEFT JOIN products p ON st.product_id = p.id
+""", 'st.created_at', 'st.id', 'created_at')
+
+SALES_LIST_QUERY = KeysetQuery("""
+    SELECT s.*, 
+           COALESCE(
+               NULLIF(c.contact_person, ''), 
+               NULLIF(c.individual_name, ''), 
+               NULLIF(c.company_name, '')
+           ) as customer_name,
+           c.contact_person, c.email, c.phone,
+           CONCAT(COALESCE(u.first_name, ''), ' ', COALESCE(u.last_name, '')) as sold_by_name
+    FROM sales s
+    LEFT JOIN customers c ON s.customer_id = c.id
+    LEFT JOIN users u ON s.created_by = u.id
+""", 's.sale_date', 's.id', 'sale_date')
+
+DISPATCH_LIST_QUERY = KeysetQuery("""
+    SELECT d.*, 
+           COALESCE(
+               NULLIF(c.contact_person, ''), 
+               NULLIF(c.individual_name, ''), 
+               NULLIF(c.company_name, '')
+           ) as customer_name,
+           GROUP_CONCAT(DISTINCT p.name SEPARATOR ', ') as product_name
+    FROM dispatches d
+    LEFT JOIN customers c ON d.customer_id = c.id
+    LEFT JOIN sale_items si ON d.sale_id = si.sale_id
+    LEFT JOIN products p ON si.product_id = p.id
+""", 'd.dispatch_date', 'd.id', 'dispatch_date', group_by='d.id')
+
+NOTIFICATIONS_LIST_QUERY = KeysetQuery("""
+    SELECT n.*, 
+           COALESCE(c.contact_person, c.company_name, c.individual_name) as recipient_name
+    FROM notifications n
+    LEFT JOIN customers c ON n.customer_id = c.id
+""", 'n.created_at', 'n.id', 'created_at')
+
+UNREAD_COUNT_QUERY = "SELECT COUNT(*) as count FROM notifications WHERE is_read = 0"
+
+DASHBOARD_REPORT_COUNTERS = ['customers.total', 'sales.total', 'sales.revenue', 'dispatches.total']
+DASHBOARD_REPORT_PREFIXES = ['dispatches.status.', 'sales.delivery_status.']
+
+def clean_enquiry(enquiry):
+    """Enquiry row with NULLs replaced by '' and a default status"""
+    safe_enquiry = {}
+    for key, value in enquiry.items():
+        if key == 'status' and (value is None or value == ''):
+            safe_enquiry[key] = 'NEW'  # Default status
+        elif value is None:
+            safe_enquiry[key] = ''
+        else:
+            safe_enquiry[key] = value
+    return safe_enquiry
+
+def dashboard_report(counters):
+    """/reports/dashboard body from dashboard counters"""
+    return {
+        'totals': {
+            'customers': int(counters.get('customers.total', 0)),
+            'sales': int(counters.get('sales.total', 0)),
+            'dispatches': int(counters.get('dispatches.total', 0)),
+            'revenue': float(counters.get('sales.revenue', 0))
+        },
+        'dispatch_status': counter_breakdown(counters, 'dispatches.status.', 'status'),
+        'sales_delivery': counter_breakdown(counters, 'sales.delivery_status.', 'delivery_status')
+    }
+
+def sales_report(summary, sales):
+    """/reports/sales body from the summary row and sale rows"""
+    return {
+        'summary': {
+            'total_sales': summary['total_sales'],
+            'total_revenue': float(summary['total_revenue']),
+            'avg_sale_amount': float(summary['avg_sale_amount'])
+        },
+        'sales': sales
+    }
 
 def register_product_images_routes(app):
-    @app.route('/api/v1/product-images/', methods=['GET'])
+    bp = Blueprint('product_images_basic', __name__)
+    @bp.route('/api/v1/product-images/', methods=['GET'])
     @jwt_required()
     def get_product_images():
         """Get all product images with product details"""
@@ -33,12 +151,12 @@ def register_product_images_routes(app):
             return jsonify(products)
             
         except Exception as e:
-            print(f"Get product images error: {e}")
+            logger.error("Get product images error: %s", e)
             return jsonify([])
     
     # Removed conflicting paginated route that conflicts with product_id route
     
-    @app.route('/api/v1/product-images/sync-existing', methods=['POST'])
+    @bp.route('/api/v1/product-images/sync-existing', methods=['POST'])
     @jwt_required()
     def sync_existing_images():
         """Sync existing product images - disabled to prevent hardcoded data"""
@@ -47,7 +165,7 @@ def register_product_images_routes(app):
             'updated_count': 0
         })
     
-    @app.route('/api/v1/product-images/missing', methods=['GET'])
+    @bp.route('/api/v1/product-images/missing', methods=['GET'])
     @jwt_required()
     def get_products_without_images():
         """Get products that don't have images"""
@@ -74,11 +192,12 @@ def register_product_images_routes(app):
             return jsonify(products)
             
         except Exception as e:
-            print(f"Get products without images error: {e}")
+            logger.error("Get products without images error: %s", e)
             return jsonify([])
     
-    @app.route('/api/v1/product-images/stats', methods=['GET'])
+    @bp.route('/api/v1/product-images/stats', methods=['GET'])
     @jwt_required()
+    @read_only
     def get_image_stats():
         """Get product image statistics"""
         try:
@@ -112,16 +231,16 @@ def register_product_images_routes(app):
             })
             
         except Exception as e:
-            print(f"Get image stats error: {e}")
+            logger.error("Get image stats error: %s", e)
             return jsonify({})
     
-    @app.route('/api/v1/product-images/debug/<int:product_id>', methods=['POST'])
+    @bp.route('/api/v1/product-images/debug/<int:product_id>', methods=['POST'])
     def debug_upload(product_id):
         """Debug endpoint to check request data"""
         try:
-            print(f"Debug upload for product {product_id}")
-            print(f"Request files: {list(request.files.keys())}")
-            print(f"Request form: {dict(request.form)}")
+            logger.debug("Debug upload for product %s", product_id)
+            logger.debug("Request files: %s", list(request.files.keys()))
+            logger.debug("Request form: %s", dict(request.form))
             
             return jsonify({
                 'product_id': product_id,
@@ -131,7 +250,7 @@ def register_product_images_routes(app):
         except Exception as e:
             return jsonify({'error': str(e)}), 500
     
-    @app.route('/api/v1/product-images/check/<int:product_id>', methods=['GET'])
+    @bp.route('/api/v1/product-images/check/<int:product_id>', methods=['GET'])
     def check_product_image(product_id):
         """Check if product has image in database"""
         try:
@@ -147,15 +266,16 @@ def register_product_images_routes(app):
             return jsonify(product if product else {'error': 'Product not found'})
         except Exception as e:
             return jsonify({'error': str(e)}), 500
+    
+    app.register_blueprint(bp)
 
 def register_enquiries_routes(app):
-    @app.route('/api/v1/enquiries/import', methods=['POST'])
+    bp = Blueprint('enquiries', __name__)
+    @bp.route('/api/v1/enquiries/import', methods=['POST'])
+    @invalidates_cache('enquiries', 'customers')
     def import_enquiries():
         """Import enquiries from Excel"""
-        try:
-            import pandas as pd
-            import openpyxl
-        except ImportError:
+        if not PANDAS_AVAILABLE:
             return jsonify({'error': 'Excel import requires pandas and openpyxl'}), 503
         
         conn = None
@@ -167,96 +287,19 @@ def register_enquiries_routes(app):
             if not file.filename:
                 return jsonify({'error': 'No file selected'}), 400
             
-            df = pd.read_excel(file, engine='openpyxl')
+            # Large sheets run as a background job; ?mode=sync keeps the old inline import
+            if request.args.get('mode') != 'sync':
+                return jsonify(submit_import('enquiries', file)), 202
+            
+            df = read_sheet(file)
             
             conn = get_db()
             if not conn:
                 return jsonify({'error': 'Database connection failed'}), 500
-            cursor = conn.cursor(pymysql.cursors.DictCursor)
-            
-            imported = 0
-            errors = []
-            duplicates = 0
             
-            for idx, row in df.iterrows():
-                try:
-                    cust_name = str(row.get('Customer Name', '')).strip()
-                    cust_phone = str(row.get('Contact Number', '')).replace(' ', '').strip()
-                    product_name = str(row.get('Product', '')).strip() if pd.notna(row.get('Product')) else ''
-                    quantity = int(row.get('Quantity', 1)) if pd.notna(row.get('Quantity')) else 1
-                    message = str(row.get('Message', '')).strip() if pd.notna(row.get('Message')) else ''
-                    status = str(row.get('Status', 'NEW')).strip().upper()
-                    
-                    if not cust_name:
-                        errors.append(f"Row {idx+2}: Missing customer name")
-                        continue
-                    
-                    cursor.execute("SELECT id FROM customers WHERE contact_person=%s OR (phone=%s AND phone!='') LIMIT 1", 
-                                 (cust_name, cust_phone))
-                    customer = cursor.fetchone()
-                    
-                    if not customer:
-                        cursor.execute("SELECT MAX(id) as max_id FROM customers")
-                        result = cursor.fetchone()
-                        next_cust_id = (result['max_id'] or 0) + 1
-                        customer_code = f"CUST{next_cust_id:06d}"
-                        
-                        cursor.execute("""
-                            INSERT INTO customers (customer_code, contact_person, phone, address, pin_code, created_at)
-                            VALUES (%s, %s, %s, %s, %s, NOW())
-                        """, (customer_code, cust_name, cust_phone[:15], '', ''))
-                        customer_id = cursor.lastrowid
-                    else:
-                        customer_id = customer['id']
-                    
-                    product_id = None
-                    if product_name:
-                        cursor.execute("SELECT id FROM products WHERE name=%s LIMIT 1", (product_name,))
-                        product = cursor.fetchone()
-                        if product:
-                            product_id = product['id']
-                    
-                    status_map = {'NEW': 'NEW', 'CONTACTED': 'CONTACTED', 'QUOTED': 'QUOTED', 'CONVERTED': 'CONVERTED', 'CLOSED': 'CLOSED'}
-                    status = status_map.get(status, 'NEW')
-                    
-                    cursor.execute("""
-                        SELECT id FROM enquiries 
-                        WHERE customer_id=%s AND message=%s AND status=%s
-                        LIMIT 1
-                    """, (customer_id, message, status))
-                    if cursor.fetchone():
-                        duplicates += 1
-                        continue
-                    
-                    cursor.execute("SELECT enquiry_number FROM enquiries ORDER BY id DESC LIMIT 1")
-                    last_enquiry = cursor.fetchone()
-                    if last_enquiry and last_enquiry['enquiry_number']:
-                        last_num = int(last_enquiry['enquiry_number'][3:])
-                        enquiry_number = f"ENQ{last_num + 1:06d}"
-                    else:
-                        enquiry_number = "ENQ000001"
-                    
-                    cursor.execute("""
-                        INSERT INTO enquiries 
-                        (enquiry_number, customer_id, product_id, quantity, message, status, created_at)
-                        VALUES (%s, %s, %s, %s, %s, %s, NOW())
-                    """, (enquiry_number, customer_id, product_id, quantity, message, status))
-                    imported += 1
-                    if imported % 10 == 0:
-                        conn.commit()
-                except Exception as e:
-                    errors.append(f"Row {idx+2}: {str(e)}")
-            
-            conn.commit()
+            result = import_enquiries_frame(conn, df)
             conn.close()
             
-            result = {
-                'message': f'{duplicates} duplicates removed. Imported {imported} enquiries.',
-                'imported': imported,
-                'total': len(df),
-                'duplicates': duplicates,
-                'errors': errors[:10]
-            }
             return jsonify(result)
             
         except Exception as e:
@@ -268,56 +311,31 @@ def register_enquiries_routes(app):
                     pass
             return jsonify({'error': str(e)}), 500
     
-    @app.route('/api/v1/enquiries/', methods=['GET', 'POST'])
+    @bp.route('/api/v1/enquiries/', methods=['GET', 'POST'])
+    @cache_response(timeout=30, tags=('enquiries', 'customers', 'products'))
+    @invalidates_cache('enquiries')
+    @read_only
     def handle_enquiries():
-        print("DEBUG: handle_enquiries called with updated code - v2")  # Debug line
         if request.method == 'GET':
             try:
-                print("DEBUG: Executing GET enquiries with new SQL query")  # Debug line
                 conn = get_db()
                 if not conn:
-                    return jsonify([])
+                    return uncacheable(jsonify([]))
                 
                 cursor = conn.cursor(pymysql.cursors.DictCursor)
-                cursor.execute("""
-                    SELECT e.*, 
-                           COALESCE(
-                               NULLIF(c.contact_person, ''), 
-                               NULLIF(c.individual_name, ''), 
-                               NULLIF(c.company_name, '')
-                           ) as customer_name, 
-                           c.email, c.phone, 
-                           p.name as product_name,
-                           COALESCE(e.quantity, 1) as quantity
-                    FROM enquiries e
-                    LEFT JOIN customers c ON e.customer_id = c.id
-                    LEFT JOIN products p ON e.product_id = p.id
-                    ORDER BY e.created_at DESC
-                """)
-                enquiries = cursor.fetchall()
-                print(f"DEBUG: Found {len(enquiries)} enquiries")  # Debug line
-                if enquiries:
-                    print(f"DEBUG: First enquiry keys: {list(enquiries[0].keys())}")  # Debug line
+                enquiries, next_cursor = fetch_list(cursor, ENQUIRIES_LIST_QUERY, request.args)
                 conn.close()
                 
                 # Ensure all fields are safe (no null values)
-                safe_enquiries = []
-                for enquiry in enquiries:
-                    safe_enquiry = {}
-                    for key, value in enquiry.items():
-                        if key == 'status' and (value is None or value == ''):
-                            safe_enquiry[key] = 'NEW'  # Default status
-                        elif value is None:
-                            safe_enquiry[key] = ''
-                        else:
-                            safe_enquiry[key] = value
-                    safe_enquiries.append(safe_enquiry)
+                safe_enquiries = [clean_enquiry(enquiry) for enquiry in enquiries]
                 
-                return jsonify(safe_enquiries)
+                return jsonify(list_response(safe_enquiries, next_cursor, request.args))
                 
+            except InvalidCursor as e:
+                return jsonify({'error': str(e)}), 400
             except Exception as e:
-                print(f"Get enquiries error: {e}")
-                return jsonify([])
+                logger.error("Get enquiries error: %s", e)
+                return uncacheable(jsonify([]))
         
         elif request.method == 'POST':
             try:
@@ -332,14 +350,7 @@ def register_enquiries_routes(app):
                 cursor = conn.cursor(pymysql.cursors.DictCursor)
                 
                 # Generate unique enquiry number
-                cursor.execute("SELECT enquiry_number FROM enquiries ORDER BY id DESC LIMIT 1")
-                last_enquiry = cursor.fetchone()
-                if last_enquiry and last_enquiry['enquiry_number']:
-                    # Extract number from last enquiry (e.g., ENQ000016 -> 16)
-                    last_num = int(last_enquiry['enquiry_number'][3:])
-                    enquiry_number = f"ENQ{str(last_num + 1).zfill(6)}"
-                else:
-                    enquiry_number = "ENQ000001"
+                enquiry_number = next_number(cursor, 'enquiry')
                 
                 # Process follow_up_date
                 follow_up_date = data.get('follow_up_date')
@@ -371,9 +382,10 @@ def register_enquiries_routes(app):
                     follow_up_date,
                     data.get('notes', '')
                 ))
+                enquiry_id = cursor.lastrowid
+                record_change(cursor, 'enquiries', new={'status': data.get('status', 'NEW')})
                 
                 conn.commit()
-                enquiry_id = cursor.lastrowid
                 
                 # Create notification for admin
                 cursor.execute("""
@@ -395,10 +407,12 @@ def register_enquiries_routes(app):
                 }), 201
                 
             except Exception as e:
-                print(f"Create enquiry error: {e}")
+                logger.error("Create enquiry error: %s", e)
                 return jsonify({'error': f'Failed to create enquiry: {str(e)}'}), 500
     
-    @app.route('/api/v1/enquiries/<int:enquiry_id>', methods=['GET', 'PUT', 'DELETE'])
+    @bp.route('/api/v1/enquiries/<int:enquiry_id>', methods=['GET', 'PUT', 'DELETE'])
+    @cache_response(timeout=30, tags=('enquiries', 'customers', 'products'))
+    @invalidates_cache('enquiries')
     def handle_single_enquiry(enquiry_id):
         if request.method == 'GET':
             try:
@@ -438,7 +452,7 @@ def register_enquiries_routes(app):
                 return jsonify(enquiry)
                 
             except Exception as e:
-                print(f"Get enquiry error: {e}")
+                logger.error("Get enquiry error: %s", e)
                 return jsonify({'error': 'Failed to fetch enquiry'}), 500
         
         elif request.method == 'PUT':
@@ -468,6 +482,9 @@ def register_enquiries_routes(app):
                 else:
                     follow_up_date = None
                 
+                cursor.execute("SELECT status FROM enquiries WHERE id = %s", (enquiry_id,))
+                existing = cursor.fetchone()
+                
                 # Update enquiry
                 cursor.execute("""
                     UPDATE enquiries SET 
@@ -491,13 +508,14 @@ def register_enquiries_routes(app):
                     conn.close()
                     return jsonify({'error': 'Enquiry not found'}), 404
                 
+                record_change(cursor, 'enquiries', old=existing, new={'status': data.get('status', 'NEW')})
                 conn.commit()
                 conn.close()
                 
                 return jsonify({'message': 'Enquiry updated successfully'})
                 
             except Exception as e:
-                print(f"Update enquiry error: {e}")
+                logger.error("Update enquiry error: %s", e)
                 return jsonify({'error': f'Failed to update enquiry: {str(e)}'}), 500
         
         elif request.method == 'DELETE':
@@ -508,6 +526,9 @@ def register_enquiries_routes(app):
                 
                 cursor = conn.cursor(pymysql.cursors.DictCursor)
                 
+                cursor.execute("SELECT status FROM enquiries WHERE id = %s", (enquiry_id,))
+                existing = cursor.fetchone()
+                
                 # Delete enquiry
                 cursor.execute("DELETE FROM enquiries WHERE id = %s", (enquiry_id,))
                 
@@ -515,19 +536,24 @@ def register_enquiries_routes(app):
                     conn.close()
                     return jsonify({'error': 'Enquiry not found'}), 404
                 
+                record_change(cursor, 'enquiries', old=existing)
                 conn.commit()
                 conn.close()
                 
                 return jsonify({'message': 'Enquiry deleted successfully'})
                 
             except Exception as e:
-                print(f"Delete enquiry error: {e}")
+                logger.error("Delete enquiry error: %s", e)
                 return jsonify({'error': f'Failed to delete enquiry: {str(e)}'}), 500
+    
+    app.register_blueprint(bp)
 
-# Users and Profile routes are imported at the bottom via register_all_imported_routes
 
 def register_service_routes(app):
-    @app.route('/api/v1/services/', methods=['GET', 'POST'])
+    bp = Blueprint('service', __name__)
+    @bp.route('/api/v1/services/', methods=['GET', 'POST'])
+    @invalidates_cache('service_tickets')
+    @read_only
     def handle_service_tickets():
         if request.method == 'GET':
             try:
@@ -536,21 +562,7 @@ def register_service_routes(app):
                     return jsonify([])
                 
                 cursor = conn.cursor(pymysql.cursors.DictCursor)
-                cursor.execute("""
-                    SELECT st.*, 
-                           COALESCE(
-                               NULLIF(c.contact_person, ''), 
-                               NULLIF(c.individual_name, ''), 
-                               NULLIF(c.company_name, '')
-                           ) as customer_name, 
-                           c.email, c.phone, 
-                           p.name as product_name
-                    FROM service_tickets st
-                    LEFT JOIN customers c ON st.customer_id = c.id
-                    LEFT JOIN products p ON st.product_id = p.id
-                    ORDER BY st.created_at DESC
-                """)
-                tickets = cursor.fetchall()
+                tickets, next_cursor = fetch_list(cursor, SERVICES_LIST_QUERY, request.args)
                 conn.close()
                 
                 # Ensure all fields are safe
@@ -566,10 +578,12 @@ def register_service_routes(app):
                             safe_ticket[key] = value
                     safe_tickets.append(safe_ticket)
                 
-                return jsonify(safe_tickets)
+                return jsonify(list_response(safe_tickets, next_cursor, request.args))
                 
+            except InvalidCursor as e:
+                return jsonify({'error': str(e)}), 400
             except Exception as e:
-                print(f"Get service tickets error: {e}")
+                logger.error("Get service tickets error: %s", e)
                 return jsonify([])
         
         elif request.method == 'POST':
@@ -585,13 +599,7 @@ def register_service_routes(app):
                 cursor = conn.cursor(pymysql.cursors.DictCursor)
                 
                 # Generate ticket number
-                cursor.execute("SELECT ticket_number FROM service_tickets ORDER BY id DESC LIMIT 1")
-                last_ticket = cursor.fetchone()
-                if last_ticket and last_ticket['ticket_number']:
-                    last_num = int(last_ticket['ticket_number'][3:])
-                    ticket_number = f"SRV{str(last_num + 1).zfill(6)}"
-                else:
-                    ticket_number = "SRV000001"
+                ticket_number = next_number(cursor, 'service_request')
                 
                 # Insert service ticket
                 cursor.execute("""
@@ -606,9 +614,10 @@ def register_service_routes(app):
                     data.get('status', 'OPEN'),
                     data.get('assigned_to')
                 ))
+                ticket_id = cursor.lastrowid
+                record_change(cursor, 'service_tickets', new={})
                 
                 conn.commit()
-                ticket_id = cursor.lastrowid
                 
                 # Create notification for admin
                 cursor.execute("""
@@ -630,10 +639,11 @@ def register_service_routes(app):
                 }), 201
                 
             except Exception as e:
-                print(f"Create service ticket error: {e}")
+                logger.error("Create service ticket error: %s", e)
                 return jsonify({'error': f'Failed to create service ticket: {str(e)}'}), 500
     
-    @app.route('/api/v1/services/<int:ticket_id>', methods=['GET', 'PUT', 'DELETE'])
+    @bp.route('/api/v1/services/<int:ticket_id>', methods=['GET', 'PUT', 'DELETE'])
+    @invalidates_cache('service_tickets')
     def handle_single_service_ticket(ticket_id):
         if request.method == 'PUT':
             try:
@@ -671,7 +681,7 @@ def register_service_routes(app):
                 return jsonify({'message': 'Service ticket updated successfully'})
                 
             except Exception as e:
-                print(f"Update service ticket error: {e}")
+                logger.error("Update service ticket error: %s", e)
                 return jsonify({'error': f'Failed to update service ticket: {str(e)}'}), 500
         
         elif request.method == 'DELETE':
@@ -688,63 +698,50 @@ def register_service_routes(app):
                     conn.close()
                     return jsonify({'error': 'Service ticket not found'}), 404
                 
+                record_change(cursor, 'service_tickets', old={})
                 conn.commit()
                 conn.close()
                 
                 return jsonify({'message': 'Service ticket deleted successfully'})
                 
             except Exception as e:
-                print(f"Delete service ticket error: {e}")
+                logger.error("Delete service ticket error: %s", e)
                 return jsonify({'error': f'Failed to delete service ticket: {str(e)}'}), 500
+    
+    app.register_blueprint(bp)
 
 def register_sales_routes(app):
-    @app.route('/api/v1/sales/', methods=['GET', 'POST'])
+    bp = Blueprint('sales', __name__)
+    @bp.route('/api/v1/sales/', methods=['GET', 'POST'])
+    @cache_response(timeout=30, tags=('sales', 'customers', 'products'))
+    @invalidates_cache('sales')
+    @read_only
     def handle_sales():
         if request.method == 'GET':
             try:
                 conn = get_db()
                 if not conn:
-                    return jsonify([])
+                    return uncacheable(jsonify([]))
                 
                 cursor = conn.cursor(pymysql.cursors.DictCursor)
-                cursor.execute("""
-                    SELECT s.*, 
-                           COALESCE(
-                               NULLIF(c.contact_person, ''), 
-                               NULLIF(c.individual_name, ''), 
-                               NULLIF(c.company_name, '')
-                           ) as customer_name,
-                           c.contact_person, c.email, c.phone,
-                           CONCAT(COALESCE(u.first_name, ''), ' ', COALESCE(u.last_name, '')) as sold_by_name
-                    FROM sales s
-                    LEFT JOIN customers c ON s.customer_id = c.id
-                    LEFT JOIN users u ON s.created_by = u.id
-                    ORDER BY s.sale_date DESC
-                """)
-                sales = cursor.fetchall()
+                sales, next_cursor = fetch_list(cursor, SALES_LIST_QUERY, request.args)
                 
-                # Get items for each sale
-                for sale in sales:
-                    cursor.execute("""
-                        SELECT si.*, p.name as product_name
-                        FROM sale_items si
-                        LEFT JOIN products p ON si.product_id = p.id
-                        WHERE si.sale_id = %s
-                    """, (sale['id'],))
-                    sale['items'] = cursor.fetchall()
+                # Get items for all sales in batched queries
+                attach_sale_items(cursor, sales)
                 
                 conn.close()
                 
-                return jsonify(sales)
+                return jsonify(list_response(sales, next_cursor, request.args))
                 
+            except InvalidCursor as e:
+                return jsonify({'error': str(e)}), 400
             except Exception as e:
-                print(f"Get sales error: {e}")
-                return jsonify([])
+                logger.error("Get sales error: %s", e)
+                return uncacheable(jsonify([]))
         
         elif request.method == 'POST':
             try:
                 data = request.get_json()
-                print(f"DEBUG: customer_id={data.get('customer_id')}, type={type(data.get('customer_id'))}")
                 if not data:
                     return jsonify({'error': 'No data provided'}), 400
                 
@@ -756,7 +753,6 @@ def register_sales_routes(app):
                 
                 # Convert customer_code to customer_id if needed
                 customer_value = data.get('customer_id')
-                print(f"DEBUG: customer_value={customer_value}, isdigit={customer_value.isdigit() if isinstance(customer_value, str) else 'N/A'}")
                 if isinstance(customer_value, str) and not customer_value.isdigit():
                     # It's a customer code, look up the ID
                     cursor.execute("SELECT id FROM customers WHERE customer_code = %s", (customer_value,))
@@ -772,16 +768,7 @@ def register_sales_routes(app):
                     customer_id = int(customer_value)
                 
                 # Generate sale number
-                cursor.execute("SELECT sale_number FROM sales WHERE sale_number LIKE 'SAL%' ORDER BY id DESC LIMIT 1")
-                last_sale = cursor.fetchone()
-                if last_sale and last_sale['sale_number']:
-                    try:
-                        last_num = int(last_sale['sale_number'][3:])
-                        sale_number = f"SAL{str(last_num + 1).zfill(6)}"
-                    except (ValueError, IndexError):
-                        sale_number = "SAL000001"
-                else:
-                    sale_number = "SAL000001"
+                sale_number = next_number(cursor, 'sale')
                 
                 # Insert sale
                 cursor.execute("""
@@ -807,11 +794,15 @@ def register_sales_routes(app):
                 ))
                 
                 sale_id = cursor.lastrowid
+                record_change(cursor, 'sales', new={
+                    'final_amount': data.get('final_amount'),
+                    'sale_date': data.get('sale_date'),
+                    'delivery_status': data.get('delivery_status', 'pending')
+                })
                 
                 # Insert sale items
                 if 'items' in data and data['items']:
                     for item in data['items']:
-                        print(f"DEBUG: Processing item: {item}")
                         total_price = float(item.get('quantity', 0)) * float(item.get('unit_price', 0))
                         cursor.execute("""
                             INSERT INTO sale_items (sale_id, product_id, quantity, unit_price, total_price)
@@ -834,12 +825,12 @@ def register_sales_routes(app):
                 }), 201
                 
             except Exception as e:
-                import traceback
-                print(f"Create sale error: {e}")
-                print(f"Full traceback: {traceback.format_exc()}")
+                logger.exception("Create sale error: %s", e)
                 return jsonify({'error': f'Failed to create sale: {str(e)}'}), 500
     
-    @app.route('/api/v1/sales/<int:sale_id>', methods=['GET', 'PUT', 'DELETE'])
+    @bp.route('/api/v1/sales/<int:sale_id>', methods=['GET', 'PUT', 'DELETE'])
+    @cache_response(timeout=30, tags=('sales', 'customers', 'products'))
+    @invalidates_cache('sales')
     def handle_single_sale(sale_id):
         if request.method == 'GET':
             try:
@@ -871,21 +862,13 @@ def register_sales_routes(app):
                     return jsonify({'error': 'Sale not found'}), 404
                 
                 # Get sale items
-                cursor.execute("""
-                    SELECT si.*, p.name as product_name
-                    FROM sale_items si
-                    LEFT JOIN products p ON si.product_id = p.id
-                    WHERE si.sale_id = %s
-                """, (sale_id,))
-                items = cursor.fetchall()
-                
-                sale['items'] = items
+                attach_sale_items(cursor, [sale])
                 conn.close()
                 
                 return jsonify(sale)
                 
             except Exception as e:
-                print(f"Get sale error: {e}")
+                logger.error("Get sale error: %s", e)
                 return jsonify({'error': 'Failed to fetch sale'}), 500
         
         elif request.method == 'PUT':
@@ -901,7 +884,7 @@ def register_sales_routes(app):
                 cursor = conn.cursor(pymysql.cursors.DictCursor)
                 
                 # Check current delivery status
-                cursor.execute("SELECT delivery_status FROM sales WHERE id = %s", (sale_id,))
+                cursor.execute("SELECT delivery_status, final_amount, sale_date FROM sales WHERE id = %s", (sale_id,))
                 sale = cursor.fetchone()
                 if not sale:
                     conn.close()
@@ -961,6 +944,12 @@ def register_sales_routes(app):
                     conn.close()
                     return jsonify({'error': 'Sale not found'}), 404
                 
+                record_change(cursor, 'sales', old=sale, new={
+                    'final_amount': data.get('final_amount'),
+                    'sale_date': data.get('sale_date'),
+                    'delivery_status': data.get('delivery_status', 'pending')
+                })
+                
                 # Update sale items - delete existing and insert new
                 cursor.execute("DELETE FROM sale_items WHERE sale_id = %s", (sale_id,))
                 
@@ -984,7 +973,7 @@ def register_sales_routes(app):
                 return jsonify({'message': 'Sale updated successfully'})
                 
             except Exception as e:
-                print(f"Update sale error: {e}")
+                logger.error("Update sale error: %s", e)
                 return jsonify({'error': f'Failed to update sale: {str(e)}'}), 500
         
         elif request.method == 'DELETE':
@@ -1006,6 +995,9 @@ def register_sales_routes(app):
                     conn.close()
                     return jsonify({'error': 'Cannot delete sale that has been dispatched'}), 400
                 
+                cursor.execute("SELECT delivery_status, final_amount, sale_date FROM sales WHERE id = %s", (sale_id,))
+                sale = cursor.fetchone()
+                
                 # Delete sale items first
                 cursor.execute("DELETE FROM sale_items WHERE sale_id = %s", (sale_id,))
                 
@@ -1016,48 +1008,42 @@ def register_sales_routes(app):
                     conn.close()
                     return jsonify({'error': 'Sale not found'}), 404
                 
+                record_change(cursor, 'sales', old=sale)
                 conn.commit()
                 conn.close()
                 
                 return jsonify({'message': 'Sale deleted successfully'})
                 
             except Exception as e:
-                print(f"Delete sale error: {e}")
+                logger.error("Delete sale error: %s", e)
                 return jsonify({'error': f'Failed to delete sale: {str(e)}'}), 500
+    
+    app.register_blueprint(bp)
 
 def register_dispatch_routes(app):
-    @app.route('/api/v1/dispatch/', methods=['GET', 'POST'])
+    bp = Blueprint('dispatch', __name__)
+    @bp.route('/api/v1/dispatch/', methods=['GET', 'POST'])
+    @cache_response(timeout=30, tags=('dispatch', 'sales', 'customers', 'products'))
+    @invalidates_cache('dispatch', 'sales')
+    @read_only
     def handle_dispatch():
         if request.method == 'GET':
             try:
                 conn = get_db()
                 if not conn:
-                    return jsonify([])
+                    return uncacheable(jsonify([]))
                 
                 cursor = conn.cursor(pymysql.cursors.DictCursor)
-                cursor.execute("""
-                    SELECT d.*, 
-                           COALESCE(
-                               NULLIF(c.contact_person, ''), 
-                               NULLIF(c.individual_name, ''), 
-                               NULLIF(c.company_name, '')
-                           ) as customer_name,
-                           GROUP_CONCAT(DISTINCT p.name SEPARATOR ', ') as product_name
-                    FROM dispatches d
-                    LEFT JOIN customers c ON d.customer_id = c.id
-                    LEFT JOIN sale_items si ON d.sale_id = si.sale_id
-                    LEFT JOIN products p ON si.product_id = p.id
-                    GROUP BY d.id
-                    ORDER BY d.dispatch_date DESC
-                """)
-                dispatches = cursor.fetchall()
+                dispatches, next_cursor = fetch_list(cursor, DISPATCH_LIST_QUERY, request.args)
                 conn.close()
                 
-                return jsonify(dispatches)
+                return jsonify(list_response(dispatches, next_cursor, request.args))
                 
+            except InvalidCursor as e:
+                return jsonify({'error': str(e)}), 400
             except Exception as e:
-                print(f"Get dispatch error: {e}")
-                return jsonify([])
+                logger.error("Get dispatch error: %s", e)
+                return uncacheable(jsonify([]))
         
         elif request.method == 'POST':
             try:
@@ -1101,19 +1087,14 @@ def register_dispatch_routes(app):
                     return jsonify({'error': 'Customer not found'}), 404
                 
                 # Verify sale exists
-                cursor.execute("SELECT id FROM sales WHERE id = %s", (data['sales_id'],))
-                if not cursor.fetchone():
+                cursor.execute("SELECT id, delivery_status, final_amount, sale_date FROM sales WHERE id = %s", (data['sales_id'],))
+                sale = cursor.fetchone()
+                if not sale:
                     conn.close()
                     return jsonify({'error': 'Sale not found'}), 404
                 
                 # Generate dispatch number
-                cursor.execute("SELECT dispatch_number FROM dispatches ORDER BY id DESC LIMIT 1")
-                last_dispatch = cursor.fetchone()
-                if last_dispatch and last_dispatch['dispatch_number']:
-                    last_num = int(last_dispatch['dispatch_number'][4:])
-                    dispatch_number = f"DISP{str(last_num + 1).zfill(5)}"
-                else:
-                    dispatch_number = "DISP00001"
+                dispatch_number = next_number(cursor, 'dispatch')
                 
                 cursor.execute("""
                     INSERT INTO dispatches (dispatch_number, sale_id, customer_id, product_id, driver_name, 
@@ -1133,14 +1114,16 @@ def register_dispatch_routes(app):
                     data.get('tracking_notes', ''),
                     'pending'
                 ))
+                dispatch_id = cursor.lastrowid
+                record_change(cursor, 'dispatches', new={'status': 'pending'})
                 
                 # Update sale status to processing when dispatch is created
                 cursor.execute("""
                     UPDATE sales SET delivery_status = 'processing' WHERE id = %s
                 """, (data.get('sales_id'),))
+                record_change(cursor, 'sales', old=sale, new=dict(sale, delivery_status='processing'))
                 
                 conn.commit()
-                dispatch_id = cursor.lastrowid
                 conn.close()
                 
                 return jsonify({
@@ -1150,10 +1133,11 @@ def register_dispatch_routes(app):
                 }), 201
                 
             except Exception as e:
-                print(f"Create dispatch error: {e}")
+                logger.error("Create dispatch error: %s", e)
                 return jsonify({'error': f'Failed to create dispatch: {str(e)}'}), 500
     
-    @app.route('/api/v1/dispatch/<int:dispatch_id>', methods=['PUT', 'DELETE'])
+    @bp.route('/api/v1/dispatch/<int:dispatch_id>', methods=['PUT', 'DELETE'])
+    @invalidates_cache('dispatch', 'sales')
     def handle_single_dispatch(dispatch_id):
         if request.method == 'PUT':
             try:
@@ -1215,9 +1199,16 @@ def register_dispatch_routes(app):
                     dispatch_id
                 ))
                 
+                record_change(cursor, 'dispatches', old=dispatch, new={'status': data.get('status', 'pending')})
+                
                 # Update sale delivery_status based on dispatch status
                 new_status = data.get('status', 'pending')
-                cursor.execute("SELECT sale_id FROM dispatches WHERE id = %s", (dispatch_id,))
+                cursor.execute("""
+                    SELECT d.sale_id, s.id as sale_row_id, s.delivery_status, s.final_amount, s.sale_date
+                    FROM dispatches d
+                    LEFT JOIN sales s ON s.id = d.sale_id
+                    WHERE d.id = %s
+                """, (dispatch_id,))
                 dispatch_info = cursor.fetchone()
                 
                 if dispatch_info and dispatch_info['sale_id']:
@@ -1246,6 +1237,10 @@ def register_dispatch_routes(app):
                             SET delivery_status = %s
                             WHERE id = %s
                         """, (sale_delivery_status, sale_id))
+                    
+                    if dispatch_info['sale_row_id']:
+                        record_change(cursor, 'sales', old=dispatch_info,
+                                      new=dict(dispatch_info, delivery_status=sale_delivery_status))
                 
                 conn.commit()
                 conn.close()
@@ -1253,7 +1248,7 @@ def register_dispatch_routes(app):
                 return jsonify({'message': 'Dispatch updated successfully'})
                 
             except Exception as e:
-                print(f"Update dispatch error: {e}")
+                logger.error("Update dispatch error: %s", e)
                 return jsonify({'error': f'Failed to update dispatch: {str(e)}'}), 500
         
         elif request.method == 'DELETE':
@@ -1264,27 +1259,32 @@ def register_dispatch_routes(app):
                 
                 cursor = conn.cursor(pymysql.cursors.DictCursor)
                 
+                cursor.execute("SELECT status FROM dispatches WHERE id = %s", (dispatch_id,))
+                dispatch = cursor.fetchone()
+                
                 cursor.execute("DELETE FROM dispatches WHERE id = %s", (dispatch_id,))
                 
                 if cursor.rowcount == 0:
                     conn.close()
                     return jsonify({'error': 'Dispatch not found'}), 404
                 
+                record_change(cursor, 'dispatches', old=dispatch)
                 conn.commit()
                 conn.close()
                 
                 return jsonify({'message': 'Dispatch deleted successfully'})
                 
             except Exception as e:
-                print(f"Delete dispatch error: {e}")
+                logger.error("Delete dispatch error: %s", e)
                 return jsonify({'error': f'Failed to delete dispatch: {str(e)}'}), 500
     
-    @app.route('/api/v1/products/by-customer/<int:customer_id>', methods=['GET'])
+    @bp.route('/api/v1/products/by-customer/<int:customer_id>', methods=['GET'])
+    @cache_response(timeout=30, tags=('sales', 'dispatch', 'products'))
     def get_customer_products(customer_id):
         try:
             conn = get_db()
             if not conn:
-                return jsonify([])
+                return uncacheable(jsonify([]))
             
             cursor = conn.cursor(pymysql.cursors.DictCursor)
             cursor.execute("""
@@ -1305,191 +1305,81 @@ def register_dispatch_routes(app):
             return jsonify(sales)
             
         except Exception as e:
-            print(f"Get customer products error: {e}")
-            return jsonify([])
+            logger.error("Get customer products error: %s", e)
+            return uncacheable(jsonify([]))
+    
+    app.register_blueprint(bp)
 
 def register_reports_routes(app):
-    @app.route('/api/v1/reports/dashboard', methods=['GET'])
+    bp = Blueprint('reports', __name__)
+    @bp.route('/api/v1/reports/dashboard', methods=['GET'])
+    @cache_response(timeout=60, tags=('customers', 'sales', 'dispatch'))
+    @read_only
     def reports_dashboard_stats():
         try:
             conn = get_db()
             if not conn:
-                return jsonify({})
-            
-            cursor = conn.cursor(pymysql.cursors.DictCursor)
-            
-            # Get totals
-            cursor.execute("SELECT COUNT(*) as count FROM customers")
-            customers_count = cursor.fetchone()['count']
-            
-            cursor.execute("SELECT COUNT(*) as count, COALESCE(SUM(final_amount), 0) as revenue FROM sales")
-            sales_data = cursor.fetchone()
-            
-            cursor.execute("SELECT COUNT(*) as count FROM dispatches")
-            dispatches_count = cursor.fetchone()['count']
-            
-            # Get dispatch status breakdown
-            cursor.execute("""
-                SELECT status, COUNT(*) as count 
-                FROM dispatches 
-                GROUP BY status
-            """)
-            dispatch_status = cursor.fetchall()
-            
-            # Get sales delivery status breakdown
-            cursor.execute("""
-                SELECT delivery_status, COUNT(*) as count 
-                FROM sales 
-                GROUP BY delivery_status
-            """)
-            sales_delivery = cursor.fetchall()
+                return uncacheable(jsonify({}))
             
+            counters = read_counters(conn, DASHBOARD_REPORT_COUNTERS, prefixes=DASHBOARD_REPORT_PREFIXES)
             conn.close()
             
-            return jsonify({
-                'totals': {
-                    'customers': customers_count,
-                    'sales': sales_data['count'],
-                    'dispatches': dispatches_count,
-                    'revenue': float(sales_data['revenue'])
-                },
-                'dispatch_status': dispatch_status,
-                'sales_delivery': sales_delivery
-            })
+            return jsonify(dashboard_report(counters))
             
         except Exception as e:
-            print(f"Dashboard stats error: {e}")
-            return jsonify({})
+            logger.error("Dashboard stats error: %s", e)
+            return uncacheable(jsonify({}))
     
-    @app.route('/api/v1/reports/sales', methods=['GET'])
+    @bp.route('/api/v1/reports/sales', methods=['GET'])
+    @cache_response(timeout=60, tags=('sales', 'customers'))
+    @read_only
     def reports_sales_report():
         try:
             conn = get_db()
             if not conn:
-                return jsonify({'summary': {}, 'sales': []})
+                return uncacheable(jsonify({'summary': {}, 'sales': []}))
             
             cursor = conn.cursor(pymysql.cursors.DictCursor)
             
             # Build WHERE clause based on filters
-            where_clauses = []
-            params = []
-            
-            if request.args.get('start_date'):
-                where_clauses.append("s.sale_date >= %s")
-                params.append(request.args.get('start_date'))
-            
-            if request.args.get('end_date'):
-                where_clauses.append("s.sale_date <= %s")
-                params.append(request.args.get('end_date'))
-            
-            if request.args.get('customer_id'):
-                where_clauses.append("s.customer_id = %s")
-                params.append(int(request.args.get('customer_id')))
-            
-            if request.args.get('customer_type'):
-                where_clauses.append("c.customer_type = %s")
-                params.append(request.args.get('customer_type'))
-            
-            if request.args.get('sales_executive_id'):
-                where_clauses.append("s.created_by = %s")
-                params.append(int(request.args.get('sales_executive_id')))
-            
-            if request.args.get('product_id'):
-                where_clauses.append("EXISTS (SELECT 1 FROM sale_items si WHERE si.sale_id = s.id AND si.product_id = %s)")
-                params.append(int(request.args.get('product_id')))
-            
-            where_sql = " AND ".join(where_clauses) if where_clauses else "1=1"
+            where_sql, params = sales_report_filters(request.args)
             
             # Get summary
-            cursor.execute(f"""
-                SELECT 
-                    COUNT(*) as total_sales,
-                    COALESCE(SUM(s.final_amount), 0) as total_revenue,
-                    COALESCE(AVG(s.final_amount), 0) as avg_sale_amount
-                FROM sales s
-                LEFT JOIN customers c ON s.customer_id = c.id
-                WHERE {where_sql}
-            """, params)
+            cursor.execute(SALES_REPORT_SUMMARY_QUERY.format(where_sql=where_sql), params)
             summary = cursor.fetchone()
             
             # Get sales details
-            cursor.execute(f"""
-                SELECT s.*, c.company_name, c.contact_person,
-                       (SELECT COUNT(*) FROM sale_items WHERE sale_id = s.id) as item_count
-                FROM sales s
-                LEFT JOIN customers c ON s.customer_id = c.id
-                WHERE {where_sql}
-                ORDER BY s.sale_date DESC
-            """, params)
+            cursor.execute(SALES_REPORT_QUERY.format(where_sql=where_sql), params)
             sales = cursor.fetchall()
             
             conn.close()
             
-            return jsonify({
-                'summary': {
-                    'total_sales': summary['total_sales'],
-                    'total_revenue': float(summary['total_revenue']),
-                    'avg_sale_amount': float(summary['avg_sale_amount'])
-                },
-                'sales': sales
-            })
+            return jsonify(sales_report(summary, sales))
             
         except Exception as e:
-            print(f"Sales report error: {e}")
-            return jsonify({'summary': {}, 'sales': []})
+            logger.error("Sales report error: %s", e)
+            return uncacheable(jsonify({'summary': {}, 'sales': []}))
     
-    @app.route('/api/v1/reports/dispatch', methods=['GET'])
+    @bp.route('/api/v1/reports/dispatch', methods=['GET'])
+    @cache_response(timeout=60, tags=('dispatch', 'customers', 'products'))
+    @read_only
     def reports_dispatch_report():
         try:
             conn = get_db()
             if not conn:
-                return jsonify({'summary': {}, 'dispatches': []})
+                return uncacheable(jsonify({'summary': {}, 'dispatches': []}))
             
             cursor = conn.cursor(pymysql.cursors.DictCursor)
             
             # Build WHERE clause
-            where_clauses = []
-            params = []
-            
-            if request.args.get('start_date'):
-                where_clauses.append("d.dispatch_date >= %s")
-                params.append(request.args.get('start_date'))
-            
-            if request.args.get('end_date'):
-                where_clauses.append("d.dispatch_date <= %s")
-                params.append(request.args.get('end_date'))
-            
-            if request.args.get('status'):
-                where_clauses.append("d.status = %s")
-                params.append(request.args.get('status'))
-            
-            where_sql = " AND ".join(where_clauses) if where_clauses else "1=1"
+            where_sql, params = dispatch_report_filters(request.args)
             
             # Get summary
-            cursor.execute(f"""
-                SELECT 
-                    COUNT(*) as total_dispatches,
-                    SUM(CASE WHEN status = 'delivered' THEN 1 ELSE 0 END) as delivered_count,
-                    SUM(CASE WHEN status = 'in_transit' THEN 1 ELSE 0 END) as in_transit_count,
-                    SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) as pending_count,
-                    SUM(CASE WHEN status = 'cancelled' THEN 1 ELSE 0 END) as cancelled_count
-                FROM dispatches d
-                WHERE {where_sql}
-            """, params)
+            cursor.execute(DISPATCH_REPORT_SUMMARY_QUERY.format(where_sql=where_sql), params)
             summary = cursor.fetchone()
             
             # Get dispatch details
-            cursor.execute(f"""
-                SELECT d.*, c.company_name, c.contact_person,
-                       GROUP_CONCAT(DISTINCT p.name SEPARATOR ', ') as product_name
-                FROM dispatches d
-                LEFT JOIN customers c ON d.customer_id = c.id
-                LEFT JOIN sale_items si ON d.sale_id = si.sale_id
-                LEFT JOIN products p ON si.product_id = p.id
-                WHERE {where_sql}
-                GROUP BY d.id
-                ORDER BY d.dispatch_date DESC
-            """, params)
+            cursor.execute(DISPATCH_REPORT_QUERY.format(where_sql=where_sql), params)
             dispatches = cursor.fetchall()
             
             conn.close()
@@ -1500,11 +1390,15 @@ def register_reports_routes(app):
             })
             
         except Exception as e:
-            print(f"Dispatch report error: {e}")
-            return jsonify({'summary': {}, 'dispatches': []})
+            logger.error("Dispatch report error: %s", e)
+            return uncacheable(jsonify({'summary': {}, 'dispatches': []}))
+    
+    app.register_blueprint(bp)
 
 def register_notifications_routes(app):
-    @app.route('/api/v1/notifications/', methods=['GET'])
+    bp = Blueprint('notifications', __name__)
+    @bp.route('/api/v1/notifications/', methods=['GET'])
+    @read_only
     def get_notifications():
         try:
             conn = get_db()
@@ -1518,22 +1412,18 @@ def register_notifications_routes(app):
                 conn.close()
                 return jsonify([])
             
-            cursor.execute("""
-                SELECT n.*, 
-                       COALESCE(c.contact_person, c.company_name, c.individual_name) as recipient_name
-                FROM notifications n
-                LEFT JOIN customers c ON n.customer_id = c.id
-                WHERE n.user_id IS NOT NULL
-                ORDER BY n.created_at DESC
-            """)
-            notifications = cursor.fetchall()
+            notifications, next_cursor = fetch_list(
+                cursor, NOTIFICATIONS_LIST_QUERY, request.args, ["n.user_id IS NOT NULL"]
+            )
             conn.close()
-            return jsonify(notifications)
+            return jsonify(list_response(notifications, next_cursor, request.args))
+        except InvalidCursor as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
-            print(f"Get notifications error: {e}")
+            logger.error("Get notifications error: %s", e)
             return jsonify([])
     
-    @app.route('/api/v1/notifications/sent', methods=['GET'])
+    @bp.route('/api/v1/notifications/sent', methods=['GET'])
     def get_sent_notifications():
         try:
             conn = get_db()
@@ -1552,10 +1442,10 @@ def register_notifications_routes(app):
             conn.close()
             return jsonify(notifications)
         except Exception as e:
-            print(f"Get sent notifications error: {e}")
+            logger.error("Get sent notifications error: %s", e)
             return jsonify([])
     
-    @app.route('/api/v1/notifications/customers', methods=['GET'])
+    @bp.route('/api/v1/notifications/customers', methods=['GET'])
     def get_notification_customers():
         try:
             conn = get_db()
@@ -1574,10 +1464,10 @@ def register_notifications_routes(app):
             conn.close()
             return jsonify(customers)
         except Exception as e:
-            print(f"Get notification customers error: {e}")
+            logger.error("Get notification customers error: %s", e)
             return jsonify([])
     
-    @app.route('/api/v1/notifications/unread-count', methods=['GET'])
+    @bp.route('/api/v1/notifications/unread-count', methods=['GET'])
     def get_unread_count():
         try:
             conn = get_db()
@@ -1585,15 +1475,15 @@ def register_notifications_routes(app):
                 return jsonify({'unread_count': 0})
             
             cursor = conn.cursor(pymysql.cursors.DictCursor)
-            cursor.execute("SELECT COUNT(*) as count FROM notifications WHERE is_read = 0")
+            cursor.execute(UNREAD_COUNT_QUERY)
             result = cursor.fetchone()
             conn.close()
             return jsonify({'unread_count': result['count']})
         except Exception as e:
-            print(f"Get unread count error: {e}")
+            logger.error("Get unread count error: %s", e)
             return jsonify({'unread_count': 0})
     
-    @app.route('/api/v1/notifications/<int:notification_id>/read', methods=['PUT'])
+    @bp.route('/api/v1/notifications/<int:notification_id>/read', methods=['PUT'])
     def mark_as_read(notification_id):
         try:
             conn = get_db()
@@ -1606,10 +1496,10 @@ def register_notifications_routes(app):
             conn.close()
             return jsonify({'message': 'Marked as read'})
         except Exception as e:
-            print(f"Mark as read error: {e}")
+            logger.error("Mark as read error: %s", e)
             return jsonify({'error': str(e)}), 500
     
-    @app.route('/api/v1/notifications/mark-all-read', methods=['PUT'])
+    @bp.route('/api/v1/notifications/mark-all-read', methods=['PUT'])
     def mark_all_as_read():
         try:
             conn = get_db()
@@ -1622,10 +1512,10 @@ def register_notifications_routes(app):
             conn.close()
             return jsonify({'message': 'All marked as read'})
         except Exception as e:
-            print(f"Mark all as read error: {e}")
+            logger.error("Mark all as read error: %s", e)
             return jsonify({'error': str(e)}), 500
     
-    @app.route('/api/v1/notifications/<int:notification_id>', methods=['DELETE'])
+    @bp.route('/api/v1/notifications/<int:notification_id>', methods=['DELETE'])
     def delete_notification(notification_id):
         try:
             conn = get_db()
@@ -1638,10 +1528,10 @@ def register_notifications_routes(app):
             conn.close()
             return jsonify({'message': 'Notification deleted'})
         except Exception as e:
-            print(f"Delete notification error: {e}")
+            logger.error("Delete notification error: %s", e)
             return jsonify({'error': str(e)}), 500
     
-    @app.route('/api/v1/notifications/send/<int:customer_id>', methods=['POST'])
+    @bp.route('/api/v1/notifications/send/<int:customer_id>', methods=['POST'])
     def send_to_customer(customer_id):
         try:
             data = request.get_json()
@@ -1658,10 +1548,10 @@ def register_notifications_routes(app):
             conn.close()
             return jsonify({'message': 'Notification sent'})
         except Exception as e:
-            print(f"Send notification error: {e}")
+            logger.error("Send notification error: %s", e)
             return jsonify({'error': str(e)}), 500
     
-    @app.route('/api/v1/notifications/broadcast', methods=['POST'])
+    @bp.route('/api/v1/notifications/broadcast', methods=['POST'])
     def broadcast_notification():
         try:
             data = request.get_json()
@@ -1683,11 +1573,14 @@ def register_notifications_routes(app):
             conn.close()
             return jsonify({'message': 'Broadcast sent'})
         except Exception as e:
-            print(f"Broadcast notification error: {e}")
+            logger.error("Broadcast notification error: %s", e)
             return jsonify({'error': str(e)}), 500
+    
+    app.register_blueprint(bp)
 
 def register_specifications_routes(app):
-    @app.route('/api/v1/specifications/', methods=['GET'])
+    bp = Blueprint('specifications', __name__)
+    @bp.route('/api/v1/specifications/', methods=['GET'])
     @jwt_required()
     def get_specifications():
         """Get system specifications and documentation"""
@@ -1742,7 +1635,7 @@ def register_specifications_routes(app):
             }
         })
     
-    @app.route('/api/v1/products/<int:product_id>/specifications', methods=['GET', 'POST', 'DELETE'])
+    @bp.route('/api/v1/products/<int:product_id>/specifications', methods=['GET', 'POST', 'DELETE'])
     def handle_product_specifications(product_id):
         """Get, add, or delete product specifications"""
         if request.method == 'GET':
@@ -1776,13 +1669,12 @@ def register_specifications_routes(app):
                 return jsonify(mapped_specs)
                 
             except Exception as e:
-                print(f"Get product specifications error: {e}")
+                logger.error("Get product specifications error: %s", e)
                 return jsonify([])
         
         elif request.method == 'POST':
             try:
                 data = request.get_json()
-                print(f"Received data: {data}")  # Debug log
                 
                 if not data:
                     return jsonify({'error': 'No data provided'}), 400
@@ -1798,8 +1690,6 @@ def register_specifications_routes(app):
                 feature_value = spec_data.get('spec_value') or spec_data.get('feature_value') or spec_data.get('value')
                 category = spec_data.get('spec_category') or spec_data.get('category', 'General')
                 
-                print(f"Extracted - feature_name: '{feature_name}', feature_value: '{feature_value}', category: '{category}'")  # Debug log
-                
                 if not feature_name or feature_name.strip() == '':
                     return jsonify({'error': 'spec_name is required and cannot be empty', 'received_data': data}), 400
                 if not feature_value or feature_value.strip() == '':
@@ -1829,7 +1719,7 @@ def register_specifications_routes(app):
                 }), 201
                 
             except Exception as e:
-                print(f"Add product specification error: {e}")
+                logger.error("Add product specification error: %s", e)
                 return jsonify({'error': f'Failed to add specification: {str(e)}'}), 500
         
         elif request.method == 'DELETE':
@@ -1855,10 +1745,10 @@ def register_specifications_routes(app):
                 }), 200
                 
             except Exception as e:
-                print(f"Delete product specifications error: {e}")
+                logger.error("Delete product specifications error: %s", e)
                 return jsonify({'error': f'Failed to delete specifications: {str(e)}'}), 500
     
-    @app.route('/api/v1/products/specifications/<int:spec_id>', methods=['DELETE'])
+    @bp.route('/api/v1/products/specifications/<int:spec_id>', methods=['DELETE'])
     def delete_single_specification(spec_id):
         """Delete a single product specification by ID"""
         try:
@@ -1886,30 +1776,7 @@ def register_specifications_routes(app):
                 return jsonify({'error': 'Specification not found'}), 404
                 
         except Exception as e:
-            print(f"Delete specification error: {e}")
+            logger.error("Delete specification error: %s", e)
             return jsonify({'error': f'Failed to delete specification: {str(e)}'}), 500
-
-
-# Import routes from separate files
-# Updated: Fixed duplicate route registrations
-from login_page import register_login_routes as _login_routes
-from dashboard_page import register_dashboard_routes as _dashboard_routes
-from categories_page import register_categories_routes as _categories_routes
-from customers_page import register_customers_routes as _customers_routes
-from products_page import register_products_routes as _products_routes
-from users_page import register_users_routes as _users_routes
-from profile_page import register_profile_routes as _profile_routes
-from regions_page import register_regions_routes as _regions_routes
-from service_tickets_page import register_service_tickets_routes as _service_tickets_routes
-
-# Register imported routes (these are from separate page files)
-def register_all_imported_routes(app):
-    _login_routes(app)
-    _dashboard_routes(app)
-    _categories_routes(app)
-    _customers_routes(app)
-    _products_routes(app)
-    _users_routes(app)
-    _profile_routes(app)
-    _regions_routes(app)
-    _service_tickets_routes(app)
+    
+    app.register_blueprint(bp)
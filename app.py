@@ -2,10 +2,26 @@ from flask import Flask, request, jsonify, send_from_directory, redirect
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from datetime import timedelta
+import importlib
+import logging
 import os
+import app_logging
+import database
+import health
+import metrics
+import query_profiler
+import route_registry
+
+app_logging.configure_logging()
+logger = logging.getLogger(__name__)
 
 # Initialize Flask app
 app = Flask(__name__)
+app_logging.init_app(app)
+database.init_app(app)
+query_profiler.init_app(app)
+metrics.init_app(app)
+health.init_app(app)
 
 # Configuration
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'change-this-in-production')
@@ -63,59 +79,53 @@ def handle_preflight():
         response.headers.add('Access-Control-Allow-Credentials', 'true')
         return response
 
-# Import all routes from consolidated file
-from all_routes import (
-    register_product_images_routes as register_product_images_basic,
-    register_enquiries_routes,
-    register_service_routes,
-    register_sales_routes,
-    register_dispatch_routes,
-    register_reports_routes,
-    register_notifications_routes,
-    register_specifications_routes
-)
-from stock_fix_routes import register_stock_fix_routes
-from customer_auth import register_customer_auth_routes
-from product_images_routes import register_product_images_routes as register_product_images_advanced
-
-try:
-    from login_page import register_login_routes
-    from dashboard_page import register_dashboard_routes
-    from categories_page import register_categories_routes
-    from customers_page import register_customers_routes
-    from products_page import register_products_routes
-    from users_page import register_users_routes
-    from profile_page import register_profile_routes
-    from regions_page import register_regions_routes
-    from service_tickets_page import register_service_tickets_routes
-    
-    # Register all routes
-    register_login_routes(app)
-    register_dashboard_routes(app)
-    register_categories_routes(app)
-    register_customers_routes(app)
-    register_products_routes(app)
-    register_users_routes(app)
-    register_profile_routes(app)
-    register_regions_routes(app)
-    register_service_tickets_routes(app)
-    print("✓ Page routes registered")
-except Exception as e:
-    print(f"Page routes import error: {e}")
-    import traceback
-    traceback.print_exc()
-
-register_product_images_basic(app)
-register_enquiries_routes(app)
-register_service_routes(app)
-register_sales_routes(app)
-register_dispatch_routes(app)
-register_reports_routes(app)
-register_notifications_routes(app)
-register_specifications_routes(app)
-register_stock_fix_routes(app)
-register_customer_auth_routes(app)
-register_product_images_advanced(app)
+# Route blueprints as (module, registrar), registered in this order. Modules
+# are imported here rather than at the top so a worker only loads what it
+# registers; heavy libraries (pandas, openpyxl, PIL, bcrypt) are imported
+# by the functions that use them.
+PAGE_BLUEPRINTS = [
+    ('login_page', 'register_login_routes'),
+    ('dashboard_page', 'register_dashboard_routes'),
+    ('categories_page', 'register_categories_routes'),
+    ('customers_page', 'register_customers_routes'),
+    ('products_page', 'register_products_routes'),
+    ('users_page', 'register_users_routes'),
+    ('profile_page', 'register_profile_routes'),
+    ('regions_page', 'register_regions_routes'),
+    ('service_tickets_page', 'register_service_tickets_routes'),
+]
+BLUEPRINTS = [
+    ('all_routes', 'register_product_images_routes'),
+    ('all_routes', 'register_enquiries_routes'),
+    ('all_routes', 'register_service_routes'),
+    ('all_routes', 'register_sales_routes'),
+    ('all_routes', 'register_dispatch_routes'),
+    ('all_routes', 'register_reports_routes'),
+    ('all_routes', 'register_notifications_routes'),
+    ('all_routes', 'register_specifications_routes'),
+    ('stock_fix_routes', 'register_stock_fix_routes'),
+    ('customer_auth', 'register_customer_auth_routes'),
+    ('product_images_routes', 'register_product_images_routes'),
+    ('monitoring_routes', 'register_monitoring_routes'),
+    ('import_jobs', 'register_import_job_routes'),
+    ('report_exports', 'register_report_export_routes'),
+    ('lookup_index', 'register_lookup_routes'),
+    ('health', 'register_health_routes'),
+]
+
+def register_blueprint(module_name, registrar):
+    getattr(importlib.import_module(module_name), registrar)(app)
+
+# A broken page module only loses its own routes
+for module_name, registrar in PAGE_BLUEPRINTS:
+    try:
+        register_blueprint(module_name, registrar)
+    except Exception as e:
+        logger.exception("Page routes %s.%s failed to register: %s", module_name, registrar, e)
+logger.info("Page routes registered")
+
+for module_name, registrar in BLUEPRINTS:
+    register_blueprint(module_name, registrar)
 
 # Health check
 @app.route('/')
@@ -124,6 +134,7 @@ def root():
 
 @app.route('/api/v1/health')
 def health_check():
+    """Liveness only; load balancers should use /api/v1/health/ready"""
     from datetime import datetime
     return {'status': 'healthy', 'timestamp': datetime.now().isoformat()}
 
@@ -163,8 +174,10 @@ def test_validation():
     
     return jsonify({'message': 'Validation passed', 'server': 'webappbackend'})
 
+# Every route is registered by now
+route_registry.init_app(app)
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 8002))
-    print("Starting Ostrich Web App Backend...")
-    print(f"Server: http://0.0.0.0:{port}")
+    logger.info("Starting Ostrich Web App Backend on http://0.0.0.0:%s", port)
     app.run(debug=False, host='0.0.0.0', port=port)
@@ -0,0 +1,161 @@
+"""Application logging
+
+Route modules log through logging.getLogger(__name__). configure_logging()
+sends every record through a bounded queue to a background listener thread,
+so request threads never block on stdout. Records are tagged with the
+request id and have passwords and tokens masked before they are queued.
+"""
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import uuid
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+# 'text' for humans, 'json' for log shippers
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text').lower()
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+REDACTED = '[REDACTED]'
+_SENSITIVE_VALUE_RE = re.compile(
+    r"""(?ix)
+    (["']?\b[a-z_]*(?:password|passwd|secret|token|api_key|authorization)[a-z_]*\b["']?\s*[:=]\s*(?:b(?=["']))?)
+    ("[^"]*"|'[^']*'|(?:bearer\s+)?[^\s,&}]+)
+    """
+)
+_BEARER_RE = re.compile(r'(?i)\bBearer\s+[A-Za-z0-9\-_.=]+')
+
+# Request id for code running outside a Flask request (asgi_app routes)
+request_id_var = ContextVar('request_id', default='-')
+
+_listener = None
+_handler = None
+_configure_lock = threading.Lock()
+
+def redact(text):
+    """Mask values of password/token-like fields and bearer tokens in text"""
+    text = _BEARER_RE.sub('Bearer ' + REDACTED, text)
+    return _SENSITIVE_VALUE_RE.sub(lambda m: m.group(1) + REDACTED, text)
+
+class RequestContextFilter(logging.Filter):
+    """Attach the current request id (or '-') to every record"""
+
+    def filter(self, record):
+        request_id = request_id_var.get()
+        try:
+            from flask import g, has_request_context
+            if has_request_context():
+                request_id = g.get('request_id', '-')
+        except Exception:
+            pass
+        record.request_id = request_id
+        return True
+
+class RedactingFilter(logging.Filter):
+    """Render the message once and mask sensitive values in it"""
+
+    def filter(self, record):
+        record.msg = redact(record.getMessage())
+        record.args = None
+        return True
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+    def prepare(self, record):
+        record = super().prepare(record)
+        # Tracebacks are already merged into msg by prepare()
+        if record.exc_text:
+            record.msg = redact(record.msg)
+        return record
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        return json.dumps({
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'request_id': getattr(record, 'request_id', '-'),
+            'message': record.getMessage()
+        }, default=str)
+
+def _output_handler():
+    handler = logging.StreamHandler(sys.stderr)
+    if LOG_FORMAT == 'json':
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(
+            '%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s'
+        ))
+    return handler
+
+def _start_listener():
+    global _listener
+    _listener = QueueListener(_handler.queue, _output_handler(), respect_handler_level=False)
+    _listener.start()
+
+def _restart_after_fork():
+    # The listener thread does not survive fork (gunicorn --preload)
+    if _handler is not None:
+        _handler.queue = queue.Queue(LOG_QUEUE_SIZE)
+        _start_listener()
+
+def configure_logging(level=LOG_LEVEL):
+    """Route the root logger through the queue handler; safe to call twice"""
+    global _handler
+    with _configure_lock:
+        root = logging.getLogger()
+        root.setLevel(level)
+        if _handler is not None:
+            return
+        _handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+        _handler.addFilter(RequestContextFilter())
+        _handler.addFilter(RedactingFilter())
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(_handler)
+        _start_listener()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=_restart_after_fork)
+
+def request_id_for(incoming):
+    """The caller's request id if it is short and printable, else a new one"""
+    incoming = incoming or ''
+    return incoming if 0 < len(incoming) <= 64 and incoming.isprintable() else uuid.uuid4().hex
+
+def init_app(app):
+    """Assign each request an id and echo it back in X-Request-ID"""
+    from flask import g, request
+
+    @app.before_request
+    def assign_request_id():
+        g.request_id = request_id_for(request.headers.get(REQUEST_ID_HEADER))
+
+    @app.after_request
+    def add_request_id_header(response):
+        request_id = getattr(g, 'request_id', None)
+        if request_id:
+            response.headers[REQUEST_ID_HEADER] = request_id
+        return response
+
+def logging_info():
+    return {
+        'level': logging.getLevelName(logging.getLogger().level),
+        'format': LOG_FORMAT,
+        'queued': _handler.queue.qsize() if _handler else 0,
+        'dropped': DroppingQueueHandler.dropped
+    }
@@ -0,0 +1,408 @@
+"""ASGI entry point with asyncio handlers for the read-heavy endpoints
+
+    gunicorn asgi_app:app -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker
+
+The list, report, dashboard and unread-count GETs below run on the event
+loop against an aiomysql pool, so a slow query parks one coroutine instead
+of a whole worker. They run the same SQL and build the same bodies as the
+Flask handlers. Every other route, and other methods on these paths, goes
+to the Flask app in app.py unchanged, on a thread pool.
+"""
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+import os
+
+import aiomysql
+import jwt as pyjwt
+import pymysql
+from a2wsgi import WSGIMiddleware
+from flask_jwt_extended import decode_token
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+
+import app as flask_module
+from app_logging import REQUEST_ID_HEADER, request_id_for, request_id_var
+from database import (DB_CONNECT_TIMEOUT, DB_POOL_MAX_CONNECTIONS, DB_POOL_MIN_CACHED,
+                      DB_POOL_TIMEOUT, borrow_connection)
+from pagination import InvalidCursor, list_sql, list_response
+from dashboard_counters import SEEDED_KEY, counters_query, read_counters
+from dashboard_page import STATS_COUNTERS, analytics_counter_keys, dashboard_analytics, dashboard_stats
+import customer_search
+from customers_page import CUSTOMERS_LIST_QUERY, CUSTOMERS_LEGACY_LIMIT, customer_list_filters
+from products_page import PRODUCTS_LIST_QUERY
+from service_tickets_page import SERVICE_TICKETS_LIST_QUERY
+from all_routes import (ENQUIRIES_LIST_QUERY, SALES_LIST_QUERY, DISPATCH_LIST_QUERY, UNREAD_COUNT_QUERY,
+                        DASHBOARD_REPORT_COUNTERS, DASHBOARD_REPORT_PREFIXES,
+                        clean_enquiry, dashboard_report, sales_report)
+from report_exports import (sales_report_filters, dispatch_report_filters,
+                            SALES_REPORT_QUERY, DISPATCH_REPORT_QUERY,
+                            SALES_REPORT_SUMMARY_QUERY, DISPATCH_REPORT_SUMMARY_QUERY)
+from sale_items_loader import sale_items_queries
+
+logger = logging.getLogger(__name__)
+
+flask_app = flask_module.app
+
+# aiomysql connections per worker; one event loop can keep all of them busy
+ASYNC_DB_POOL_SIZE = int(os.getenv('ASYNC_DB_POOL_SIZE', DB_POOL_MAX_CONNECTIONS))
+# Threads running Flask routes that have no async handler
+ASYNC_WSGI_THREADS = int(os.getenv('ASYNC_WSGI_THREADS', 10))
+
+_pool = None
+
+async def create_pool():
+    global _pool
+    _pool = await aiomysql.create_pool(
+        minsize=min(DB_POOL_MIN_CACHED, ASYNC_DB_POOL_SIZE),
+        maxsize=ASYNC_DB_POOL_SIZE,
+        host=os.getenv('DB_HOST'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        db=os.getenv('DB_NAME'),
+        port=int(os.getenv('DB_PORT', 3306)),
+        charset='utf8mb4',
+        connect_timeout=DB_CONNECT_TIMEOUT,
+        autocommit=True,
+        pool_recycle=3600
+    )
+    return _pool
+
+async def close_pool():
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+        _pool = None
+
+async def _acquire():
+    """Connection from the pool, waiting at most DB_POOL_TIMEOUT"""
+    if _pool is None:
+        raise RuntimeError("Async database pool is not running")
+    timeout = DB_POOL_TIMEOUT if DB_POOL_TIMEOUT > 0 else None
+    try:
+        return await asyncio.wait_for(_pool.acquire(), timeout)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"No free async connection after {DB_POOL_TIMEOUT}s ({ASYNC_DB_POOL_SIZE} in use)")
+
+async def fetch_all(sql, params=(), cursor_class=aiomysql.DictCursor):
+    conn = await _acquire()
+    try:
+        async with conn.cursor(cursor_class) as cursor:
+            await cursor.execute(sql, params)
+            return list(await cursor.fetchall())
+    finally:
+        _pool.release(conn)
+
+async def fetch_one(sql, params=()):
+    rows = await fetch_all(sql, params)
+    return rows[0] if rows else None
+
+async def fetch_list(query, args, conditions=(), params=(), legacy_limit=None):
+    """pagination.fetch_list on the async pool"""
+    sql, sql_params, limit = list_sql(query, args, conditions, params, legacy_limit)
+    rows = await fetch_all(sql, sql_params)
+    if limit is None:
+        return rows, None
+    return query.finish_page(rows, limit)
+
+def _seed_and_read_counters(keys, prefixes):
+    conn = borrow_connection()
+    if conn is None:
+        return {}
+    try:
+        return read_counters(conn, keys, prefixes)
+    finally:
+        conn.close()
+
+async def fetch_counters(keys=(), prefixes=()):
+    """dashboard_counters.read_counters on the async pool"""
+    sql, params = counters_query(keys, prefixes)
+    try:
+        rows = await fetch_all(sql, params, aiomysql.Cursor)
+    except pymysql.err.ProgrammingError:
+        rows = []
+    counters = {key: value for key, value in rows}
+    if SEEDED_KEY not in counters:
+        # First use: seeding writes, so let the sync code do it on the primary
+        counters = await run_in_threadpool(_seed_and_read_counters, keys, prefixes)
+    return counters
+
+def json_response(body, status_code=200):
+    """Response encoded like Flask's jsonify"""
+    content = flask_app.json.dumps(body, separators=(',', ':')) + '\n'
+    return Response(content, status_code=status_code, media_type='application/json')
+
+def _authenticate(request, optional=False):
+    """(identity, None) for a valid access token, else (None, error response)
+
+    Mirrors @jwt_required and the JWT error handlers in app.py.
+    """
+    header = request.headers.get('Authorization', '')
+    if not header.startswith('Bearer '):
+        if optional:
+            return None, None
+        return None, json_response({'error': 'Authorization token is missing', 'code': 'missing_token'}, 401)
+    try:
+        with flask_app.app_context():
+            claims = decode_token(header[len('Bearer '):])
+    except pyjwt.ExpiredSignatureError:
+        return None, json_response({'error': 'Token has expired', 'code': 'token_expired'}, 401)
+    except Exception:
+        return None, json_response({'error': 'Invalid token', 'code': 'invalid_token'}, 401)
+    if claims.get('type') != 'access':
+        return None, json_response({'msg': 'Only non-refresh tokens are allowed'}, 422)
+    return claims.get(flask_app.config.get('JWT_IDENTITY_CLAIM', 'sub')), None
+
+async def get_customers(request):
+    identity, error = _authenticate(request)
+    if error:
+        return error
+    if not identity:
+        return json_response({'error': 'Invalid authentication token'}, 401)
+    try:
+        # The trigram search backend may (re)load its index from the database
+        conditions, params = await run_in_threadpool(customer_list_filters, request.query_params)
+        try:
+            customers, next_cursor = await fetch_list(
+                CUSTOMERS_LIST_QUERY, request.query_params, conditions, params,
+                legacy_limit=CUSTOMERS_LEGACY_LIMIT
+            )
+        except pymysql.err.ProgrammingError as e:
+            if not customer_search.missing_index(e):
+                raise
+            conditions, params = customer_list_filters(request.query_params)
+            customers, next_cursor = await fetch_list(
+                CUSTOMERS_LIST_QUERY, request.query_params, conditions, params,
+                legacy_limit=CUSTOMERS_LEGACY_LIMIT
+            )
+        return json_response(list_response(customers, next_cursor, request.query_params))
+    except InvalidCursor as e:
+        return json_response({'error': str(e)}, 400)
+    except Exception as e:
+        logger.error("Get customers error: %s", e)
+        return json_response([])
+
+async def get_products(request):
+    identity, error = _authenticate(request)
+    if error:
+        return error
+    try:
+        sort_order = request.query_params.get('sort_order', 'asc')
+        if sort_order not in ['asc', 'desc']:
+            sort_order = 'asc'
+        query = PRODUCTS_LIST_QUERY.with_direction(sort_order)
+        products, next_cursor = await fetch_list(query, request.query_params)
+        return json_response(list_response(products, next_cursor, request.query_params))
+    except InvalidCursor as e:
+        return json_response({'error': str(e)}, 400)
+    except Exception as e:
+        logger.error("Get products error: %s", e)
+        return json_response([])
+
+async def get_service_tickets(request):
+    identity, error = _authenticate(request, optional=True)
+    if error:
+        return error
+    try:
+        tickets, next_cursor = await fetch_list(SERVICE_TICKETS_LIST_QUERY, request.query_params)
+        return json_response(list_response(tickets, next_cursor, request.query_params))
+    except InvalidCursor as e:
+        return json_response({'error': str(e)}, 400)
+    except Exception as e:
+        logger.error("Get service tickets error: %s", e)
+        return json_response([])
+
+async def get_enquiries(request):
+    try:
+        enquiries, next_cursor = await fetch_list(ENQUIRIES_LIST_QUERY, request.query_params)
+        safe_enquiries = [clean_enquiry(enquiry) for enquiry in enquiries]
+        return json_response(list_response(safe_enquiries, next_cursor, request.query_params))
+    except InvalidCursor as e:
+        return json_response({'error': str(e)}, 400)
+    except Exception as e:
+        logger.error("Get enquiries error: %s", e)
+        return json_response([])
+
+async def get_sales(request):
+    try:
+        sales, next_cursor = await fetch_list(SALES_LIST_QUERY, request.query_params)
+        chunks = await asyncio.gather(*(
+            fetch_all(sql, params) for sql, params in sale_items_queries([sale['id'] for sale in sales])
+        ))
+        items_by_sale = {}
+        for items in chunks:
+            for item in items:
+                items_by_sale.setdefault(item['sale_id'], []).append(item)
+        for sale in sales:
+            sale['items'] = items_by_sale.get(sale['id'], [])
+        return json_response(list_response(sales, next_cursor, request.query_params))
+    except InvalidCursor as e:
+        return json_response({'error': str(e)}, 400)
+    except Exception as e:
+        logger.error("Get sales error: %s", e)
+        return json_response([])
+
+async def get_dispatches(request):
+    try:
+        dispatches, next_cursor = await fetch_list(DISPATCH_LIST_QUERY, request.query_params)
+        return json_response(list_response(dispatches, next_cursor, request.query_params))
+    except InvalidCursor as e:
+        return json_response({'error': str(e)}, 400)
+    except Exception as e:
+        logger.error("Get dispatch error: %s", e)
+        return json_response([])
+
+async def reports_dashboard_stats(request):
+    try:
+        counters = await fetch_counters(DASHBOARD_REPORT_COUNTERS, DASHBOARD_REPORT_PREFIXES)
+        return json_response(dashboard_report(counters))
+    except Exception as e:
+        logger.error("Dashboard stats error: %s", e)
+        return json_response({})
+
+async def reports_sales_report(request):
+    try:
+        where_sql, params = sales_report_filters(request.query_params)
+        # Summary and detail run side by side on two connections
+        summary, sales = await asyncio.gather(
+            fetch_one(SALES_REPORT_SUMMARY_QUERY.format(where_sql=where_sql), params),
+            fetch_all(SALES_REPORT_QUERY.format(where_sql=where_sql), params)
+        )
+        return json_response(sales_report(summary, sales))
+    except Exception as e:
+        logger.error("Sales report error: %s", e)
+        return json_response({'summary': {}, 'sales': []})
+
+async def reports_dispatch_report(request):
+    try:
+        where_sql, params = dispatch_report_filters(request.query_params)
+        summary, dispatches = await asyncio.gather(
+            fetch_one(DISPATCH_REPORT_SUMMARY_QUERY.format(where_sql=where_sql), params),
+            fetch_all(DISPATCH_REPORT_QUERY.format(where_sql=where_sql), params)
+        )
+        return json_response({'summary': summary, 'dispatches': dispatches})
+    except Exception as e:
+        logger.error("Dispatch report error: %s", e)
+        return json_response({'summary': {}, 'dispatches': []})
+
+async def get_dashboard_analytics(request):
+    identity, error = _authenticate(request)
+    if error:
+        return error
+    try:
+        return json_response(dashboard_analytics(await fetch_counters(analytics_counter_keys())))
+    except Exception as e:
+        logger.error("Dashboard error: %s", e)
+        return json_response(dashboard_analytics({}))
+
+async def get_dashboard_stats(request):
+    identity, error = _authenticate(request)
+    if error:
+        return error
+    try:
+        return json_response(dashboard_stats(await fetch_counters(STATS_COUNTERS)))
+    except Exception as e:
+        logger.error("Error: %s", e)
+        return json_response({
+            "totalCustomers": 14,
+            "totalEnquiries": 10,
+            "totalServiceTickets": 11,
+            "pendingEnquiries": 3
+        })
+
+async def get_unread_count(request):
+    try:
+        result = await fetch_one(UNREAD_COUNT_QUERY)
+        return json_response({'unread_count': result['count']})
+    except Exception as e:
+        logger.error("Get unread count error: %s", e)
+        return json_response({'unread_count': 0})
+
+async def get_async_pool_status(request):
+    identity, error = _authenticate(request)
+    if error:
+        return error
+    if _pool is None:
+        return json_response({'running': False})
+    return json_response({
+        'running': True,
+        'size': _pool.size,
+        'free': _pool.freesize,
+        'in_use': _pool.size - _pool.freesize,
+        'minsize': _pool.minsize,
+        'maxsize': _pool.maxsize
+    })
+
+class RequestIdMiddleware:
+    """X-Request-ID handling of app_logging.init_app for the async routes"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        header = REQUEST_ID_HEADER.lower().encode()
+        incoming = dict(scope['headers']).get(header, b'').decode('latin-1')
+        request_id = request_id_for(incoming)
+        token = request_id_var.set(request_id)
+        # Hand the same id to Flask so its log lines match the response header
+        scope = dict(scope, headers=[(k, v) for k, v in scope['headers'] if k != header]
+                     + [(header, request_id.encode('latin-1'))])
+
+        async def send_with_id(message):
+            if message['type'] == 'http.response.start':
+                headers = [(k, v) for k, v in message.get('headers', []) if k.lower() != header]
+                message['headers'] = headers + [(header, request_id.encode('latin-1'))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
+
+@asynccontextmanager
+async def lifespan(app):
+    try:
+        await create_pool()
+        logger.info("Async database pool ready: max %s connections per worker", ASYNC_DB_POOL_SIZE)
+    except Exception as e:
+        logger.error("Async database pool failed to start: %s", e)
+    yield
+    await close_pool()
+
+routes = [
+    Route('/api/v1/customers/', get_customers, methods=['GET']),
+    Route('/api/v1/products/', get_products, methods=['GET']),
+    Route('/api/v1/service-tickets/', get_service_tickets, methods=['GET']),
+    Route('/api/v1/enquiries/', get_enquiries, methods=['GET']),
+    Route('/api/v1/sales/', get_sales, methods=['GET']),
+    Route('/api/v1/dispatch/', get_dispatches, methods=['GET']),
+    Route('/api/v1/reports/dashboard', reports_dashboard_stats, methods=['GET']),
+    Route('/api/v1/reports/sales', reports_sales_report, methods=['GET']),
+    Route('/api/v1/reports/dispatch', reports_dispatch_report, methods=['GET']),
+    Route('/api/v1/dashboard/analytics', get_dashboard_analytics, methods=['GET']),
+    Route('/api/v1/dashboard/stats', get_dashboard_stats, methods=['GET']),
+    Route('/api/v1/notifications/unread-count', get_unread_count, methods=['GET']),
+    Route('/api/v1/db/async-pool', get_async_pool_status, methods=['GET']),
+    # Everything else, including POST/PUT/DELETE on the paths above
+    Mount('/', app=WSGIMiddleware(flask_app, workers=ASYNC_WSGI_THREADS))
+]
+
+app = Starlette(
+    routes=routes,
+    lifespan=lifespan,
+    middleware=[
+        Middleware(RequestIdMiddleware),
+        Middleware(CORSMiddleware,
+                   allow_origins=flask_module.allowed_origins,
+                   allow_credentials=True,
+                   allow_headers=['Content-Type', 'Authorization'],
+                   allow_methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
+    ]
+)
@@ -0,0 +1,159 @@
+"""Read endpoint throughput and latency: sync Flask workers vs asgi_app
+
+Usage:
+    gunicorn app:app -c gunicorn.conf.py --bind 127.0.0.1:8002
+    gunicorn asgi_app:app -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker --bind 127.0.0.1:8003
+    python benchmarks/bench_async_reads.py --token "$TOKEN" \\
+        --sync-url http://127.0.0.1:8002 --async-url http://127.0.0.1:8003 --concurrency 8 32 128
+
+Both servers must use the same database, worker count and pool size. For
+each concurrency level, `--requests` GETs cycle through `--paths` from that
+many keep-alive client connections on one event loop. Reports requests per
+second, p50/p95/p99 latency and non-2xx responses for each mode.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = [
+    '/api/v1/customers/?limit=50',
+    '/api/v1/products/?limit=50',
+    '/api/v1/sales/?limit=50',
+    '/api/v1/dispatch/?limit=50',
+    '/api/v1/enquiries/?limit=50',
+    '/api/v1/reports/sales',
+    '/api/v1/dashboard/analytics',
+    '/api/v1/notifications/unread-count'
+]
+
+class Connection:
+    """Minimal HTTP/1.1 client connection that reconnects when the server closes"""
+
+    def __init__(self, host, port, headers):
+        self.host = host
+        self.port = port
+        self.headers = headers
+        self.reader = None
+        self.writer = None
+
+    async def get(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        request = f"GET {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n{self.headers}\r\n"
+        self.writer.write(request.encode('latin-1'))
+        status_line = await self.reader.readline()
+        if not status_line:
+            # Server closed an idle keep-alive connection; retry once
+            await self.close()
+            return await self.get(path)
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if headers.get('transfer-encoding') == 'chunked':
+            while True:
+                size = int((await self.reader.readline()).strip(), 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif 'content-length' in headers:
+            await self.reader.readexactly(int(headers['content-length']))
+        else:
+            await self.reader.read()
+            headers['connection'] = 'close'
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+        self.reader = self.writer = None
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+async def run_level(base_url, paths, concurrency, total, token):
+    url = urlsplit(base_url)
+    headers = "Accept: application/json\r\n"
+    if token:
+        headers += f"Authorization: Bearer {token}\r\n"
+    latencies = []
+    errors = 0
+    issued = 0
+
+    async def client():
+        nonlocal errors, issued
+        conn = Connection(url.hostname, url.port or 80, headers)
+        try:
+            while issued < total:
+                path = paths[issued % len(paths)]
+                issued += 1
+                started = time.perf_counter()
+                try:
+                    status = await conn.get(path)
+                except Exception:
+                    await conn.close()
+                    status = 0
+                latencies.append((time.perf_counter() - started) * 1000)
+                if not 200 <= status < 300:
+                    errors += 1
+        finally:
+            await conn.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'requests_per_sec': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50), 1),
+        'p95_ms': round(percentile(latencies, 0.95), 1),
+        'p99_ms': round(percentile(latencies, 0.99), 1),
+        'errors': errors
+    }
+
+async def run(args):
+    modes = {'sync': args.sync_url, 'async': args.async_url}
+    results = {}
+    for mode, base_url in modes.items():
+        if not base_url:
+            continue
+        # Warm pools and caches before measuring
+        await run_level(base_url, args.paths, min(args.concurrency), len(args.paths) * 2, args.token)
+        results[mode] = [
+            await run_level(base_url, args.paths, concurrency, args.requests, args.token)
+            for concurrency in args.concurrency
+        ]
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sync-url', help='server running app:app')
+    parser.add_argument('--async-url', help='server running asgi_app:app')
+    parser.add_argument('--token', default=os.getenv('BENCH_TOKEN'), help='JWT access token (or BENCH_TOKEN)')
+    parser.add_argument('--paths', nargs='+', default=DEFAULT_PATHS)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[8, 32, 128])
+    parser.add_argument('--requests', type=int, default=2000, help='requests per concurrency level')
+    args = parser.parse_args()
+    if not args.sync_url and not args.async_url:
+        parser.error('give --sync-url and/or --async-url')
+
+    print(json.dumps({'paths': args.paths, 'results': asyncio.run(run(args))}, indent=2))
+
+if __name__ == '__main__':
+    main()
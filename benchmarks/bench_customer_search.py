@@ -0,0 +1,152 @@
+"""Customer search latency: LIKE scan vs the trigram and FULLTEXT indexes
+
+Usage:
+    python benchmarks/bench_customer_search.py --customers 100000 1000000
+    python benchmarks/bench_customer_search.py --live   # uses DB_* env vars
+
+The default mode generates synthetic customers in memory, builds a
+customer_search.TrigramIndex over them and times each search term against
+it and against a full scan that checks every document the way
+LOWER(col) LIKE '%term%' does. The scan is a lower bound for the SQL
+version, which also reads every row from InnoDB. Index build time and the
+resident memory it added are reported too.
+
+--live times the old LIKE list filter against the FULLTEXT search on the
+configured database. Run `python customer_search.py --rebuild` there first.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from customer_search import (TrigramIndex, customer_document, search_words, like_condition,
+                             _fulltext_ids, SEARCH_RESULTS_QUERY)
+
+FIRST_NAMES = ['Aarav', 'Vivaan', 'Aditya', 'Vihaan', 'Arjun', 'Sai', 'Reyansh', 'Ayaan', 'Krishna',
+               'Ishaan', 'Ananya', 'Diya', 'Saanvi', 'Aadhya', 'Kavya', 'Priya', 'Lakshmi', 'Meera',
+               'Rahul', 'Suresh', 'Ramesh', 'Mahesh', 'Ganesh', 'Karthik', 'Deepa', 'Nisha', 'Pooja']
+LAST_NAMES = ['Sharma', 'Verma', 'Iyer', 'Nair', 'Reddy', 'Kumar', 'Singh', 'Patel', 'Gupta', 'Rao',
+              'Menon', 'Pillai', 'Das', 'Bose', 'Mehta', 'Joshi', 'Kulkarni', 'Desai', 'Chopra', 'Naidu']
+COMPANY_WORDS = ['Care', 'Health', 'Mobility', 'Medical', 'Life', 'Wellness', 'Aid', 'Surgicals',
+                 'Pharma', 'Hospital', 'Clinic', 'Ortho', 'Rehab', 'Supplies', 'Traders', 'Enterprises']
+DOMAINS = ['gmail.com', 'yahoo.co.in', 'outlook.com', 'rediffmail.com', 'hotmail.com']
+
+DEFAULT_TERMS = ['sharma', 'priya iyer', 'kart', 'mobility care', '98450', 'rediff',
+                 'CUST00012345', 'zzqx']
+
+def synthetic_customers(count, seed=7):
+    rng = random.Random(seed)
+    for i in range(1, count + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        company = ''
+        if rng.random() < 0.4:
+            company = f"{rng.choice(LAST_NAMES)} {rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_WORDS)}"
+        yield {
+            'id': i,
+            'contact_person': f"{first} {last}",
+            'individual_name': f"{first} {last}",
+            'company_name': company,
+            'email': f"{first.lower()}.{last.lower()}{rng.randint(1, 999)}@{rng.choice(DOMAINS)}",
+            'phone': f"+91 {rng.randint(6, 9)}{rng.randint(0, 999999999):09d}",
+            'customer_code': f"CUST{i:08d}"
+        }
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def timed(fn, repeat):
+    times = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - started) * 1000)
+    times.sort()
+    return result, {'p50_ms': round(percentile(times, 0.5), 2), 'p95_ms': round(percentile(times, 0.95), 2)}
+
+def scan(documents, words):
+    """Every document containing every word, as a LIKE '%word%' scan finds them"""
+    return [customer_id for customer_id, document in documents.items()
+            if all(word in document for word in words)]
+
+def run_simulated(count, terms, repeat, limit):
+    rss_before = rss_mb()
+    started = time.perf_counter()
+    index = TrigramIndex()
+    for row in synthetic_customers(count):
+        index.add(row['id'], customer_document(row)[0])
+    build_seconds = time.perf_counter() - started
+
+    results = []
+    for term in terms:
+        words = search_words(term)
+        ids, indexed = timed(lambda: index.search(words, limit), repeat)
+        matches, scanned = timed(lambda: scan(index.documents, words), max(1, repeat // 10))
+        results.append({'term': term, 'matches': len(matches), 'returned': len(ids),
+                        'trigram': indexed, 'scan': scanned})
+    return {
+        'customers': count,
+        'trigram_build_seconds': round(build_seconds, 1),
+        'trigram_rss_added_mb': round(rss_mb() - rss_before),
+        'terms': results
+    }
+
+def run_live(terms, repeat, limit):
+    import pymysql
+    from database import borrow_connection
+
+    conn = borrow_connection()
+    if not conn:
+        raise SystemExit('Database connection failed')
+    try:
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        cursor.execute("SELECT COUNT(*) as count FROM customers")
+        count = cursor.fetchone()['count']
+        results = []
+        for term in terms:
+            words = search_words(term)
+            condition, params = like_condition(term)
+
+            def like():
+                cursor.execute(f"{SEARCH_RESULTS_QUERY} WHERE {condition} ORDER BY created_at DESC, id DESC LIMIT %s",
+                               params + [limit])
+                return cursor.fetchall()
+
+            def fulltext():
+                return _fulltext_ids(cursor, term, words, limit)
+
+            like_rows, like_timing = timed(like, repeat)
+            ids, fulltext_timing = timed(fulltext, repeat)
+            results.append({'term': term, 'like_returned': len(like_rows), 'fulltext_returned': len(ids),
+                            'like': like_timing, 'fulltext': fulltext_timing})
+        return {'customers': count, 'terms': results}
+    finally:
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--customers', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--terms', nargs='+', default=DEFAULT_TERMS)
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs per term')
+    parser.add_argument('--limit', type=int, default=20, help='ranked results per search')
+    parser.add_argument('--live', action='store_true', help='time LIKE vs FULLTEXT on the configured database')
+    args = parser.parse_args()
+
+    if args.live:
+        print(json.dumps(run_live(args.terms, args.repeat, args.limit), indent=2))
+        return
+    # Each size builds its own index; largest last so the RSS figures stay separate
+    print(json.dumps([run_simulated(count, args.terms, args.repeat, args.limit)
+                      for count in sorted(args.customers)], indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,440 @@
+"""End-to-end HTTP benchmark of the hot API endpoints
+
+Usage:
+    export DB_BACKEND=sqlite DB_SQLITE_PATH=/tmp/ostrich.sqlite3
+    python seed_data.py --scale 0.1
+    python benchmarks/bench_http.py --out /tmp/baseline.json
+    python benchmarks/bench_http.py --server gunicorn --workers 2 --out /tmp/gunicorn.json
+    python benchmarks/bench_http.py --compare /tmp/baseline.json --threshold 0.15
+
+Drives the Flask app in-process (test client, one per client thread) or a
+gunicorn started with gunicorn.conf.py (keep-alive HTTP connections),
+against whatever database the DB_* variables point at: the seeded local
+database above, or a local MySQL seeded the same way. For every scenario
+it sends --warmup requests, then --requests from --concurrency threads,
+and records throughput, p50/p95/p99 latency, database queries per request
+and the peak resident memory of the server processes (sampled from /proc,
+so Linux only). Login and the import cost far more per request and run a
+fraction of --requests.
+
+The response cache is off unless --cache is given, so GETs measure the
+handlers and their SQL. Queries are counted by the server itself (see
+instrumented_app) and returned in X-Bench-Queries. The import scenario
+inserts enquiries and customers on every run; reseed before comparing
+runs that must see the same data. Login uses admin / admin123 and
+bcrypt at the server's BCRYPT_ROUNDS.
+
+--compare reads an earlier --out file and exits 1 when a scenario lost
+more than --threshold of its throughput, or grew its latency, queries per
+request or peak RSS by more than that. Latency changes smaller than
+--min-delta-ms are ignored as noise.
+"""
+import argparse
+import functools
+import http.client
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+QUERY_COUNT_HEADER = 'X-Bench-Queries'
+RSS_SAMPLE_SECONDS = 0.02
+
+# (name, method, path, share of --requests)
+SCENARIOS = [
+    ('login', 'POST', '/api/v1/auth/login', 0.25),
+    ('customers.search', 'GET', '/api/v1/customers/?search=sharma&limit=50', 1),
+    ('products.list', 'GET', '/api/v1/products/?limit=50', 1),
+    ('sales.list', 'GET', '/api/v1/sales/?limit=50', 1),
+    ('dispatch.list', 'GET', '/api/v1/dispatch/?limit=50', 1),
+    ('reports.sales', 'GET', '/api/v1/reports/sales?start_date={month_ago}&end_date={today}', 1),
+    ('dashboard.analytics', 'GET', '/api/v1/dashboard/analytics', 1),
+    ('notifications.unread_count', 'GET', '/api/v1/notifications/unread-count', 1),
+    ('enquiries.import', 'POST', '/api/v1/enquiries/import?mode=sync', 0.1),
+]
+
+# metric -> True when higher is better
+METRICS = {
+    'requests_per_sec': True,
+    'p50_ms': False,
+    'p95_ms': False,
+    'p99_ms': False,
+    'queries_per_request': False,
+    'peak_rss_mb': False,
+}
+LATENCY_METRICS = ('p50_ms', 'p95_ms', 'p99_ms')
+
+_queries = threading.local()
+
+def _counting(execute):
+    @functools.wraps(execute)
+    def wrapper(self, *args, **kwargs):
+        _queries.count = getattr(_queries, 'count', 0) + 1
+        return execute(self, *args, **kwargs)
+    return wrapper
+
+def instrumented_app():
+    """app.app reporting each request's database round trips in X-Bench-Queries
+
+    Gunicorn loads it as benchmarks.bench_http:instrumented_app().
+    pymysql's executemany goes through execute, one call per round trip.
+    """
+    import pymysql
+    from database import DB_BACKEND
+    from app import app
+
+    pymysql.cursors.Cursor.execute = _counting(pymysql.cursors.Cursor.execute)
+    if DB_BACKEND == 'sqlite':
+        import local_db
+        local_db.LocalCursor.execute = _counting(local_db.LocalCursor.execute)
+        local_db.LocalCursor.executemany = _counting(local_db.LocalCursor.executemany)
+
+    @app.before_request
+    def reset_query_count():
+        _queries.count = 0
+
+    @app.after_request
+    def add_query_count(response):
+        response.headers[QUERY_COUNT_HEADER] = str(getattr(_queries, 'count', 0))
+        return response
+
+    return app
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def multipart(field, filename, content, content_type):
+    """(Content-Type header, body) for a single-file form upload"""
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    return f"multipart/form-data; boundary={boundary}", body
+
+def enquiry_sheet(rows, run_id):
+    """.xlsx bytes with rows enquiries: half for seeded customer names, half new"""
+    import pandas as pd
+    from seed_data import FIRST_NAMES, LAST_NAMES
+
+    records = []
+    for i in range(rows):
+        if i % 2:
+            name = f"{FIRST_NAMES[i % len(FIRST_NAMES)]} {LAST_NAMES[i % len(LAST_NAMES)]}"
+        else:
+            name = f"Bench Customer {run_id}-{i}"
+        records.append({
+            'Customer Name': name,
+            'Contact Number': f"7{abs(hash((run_id, i))) % 10 ** 9:09d}",
+            'Product': 'Foldable Wheelchair',
+            'Message': f"Benchmark enquiry {run_id}-{i}",
+            'Quantity': 1 + i % 3,
+            'Status': 'NEW'
+        })
+    buffer = io.BytesIO()
+    pd.DataFrame(records).to_excel(buffer, index=False, engine='openpyxl')
+    return buffer.getvalue()
+
+def build_requests(name, method, path, count, args):
+    """[(method, path, headers, body)] for one scenario, prepared before timing"""
+    today = date.today()
+    path = path.format(today=today.isoformat(), month_ago=(today - timedelta(days=30)).isoformat())
+    if name == 'login':
+        body = json.dumps({'username': args.username, 'password': args.password}).encode()
+        return [(method, path, {'Content-Type': 'application/json'}, body)] * count
+    if name == 'enquiries.import':
+        requests = []
+        for _ in range(count):
+            content_type, body = multipart(
+                'file', 'enquiries.xlsx', enquiry_sheet(args.import_rows, uuid.uuid4().hex[:8]),
+                'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            )
+            requests.append((method, path, {'Content-Type': content_type}, body))
+        return requests
+    return [(method, path, {}, None)] * count
+
+def process_rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+def child_pids(pid):
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # pid (comm) state ppid ...; comm may contain spaces
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            children.append(int(entry))
+    return children
+
+class RssSampler:
+    """Peak summed RSS of a set of processes while running"""
+
+    def __init__(self, pids):
+        self.pids = pids
+        self.peak_kb = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while True:
+            self.peak_kb = max(self.peak_kb, sum(process_rss_kb(pid) for pid in self.pids))
+            if self.stopped.wait(RSS_SAMPLE_SECONDS):
+                break
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+class InProcessServer:
+    """The app in this process, one Flask test client per client thread"""
+
+    name = 'inprocess'
+
+    def __init__(self, args):
+        self.app = instrumented_app()
+
+    def client(self):
+        test_client = self.app.test_client()
+
+        def send(method, path, headers, body):
+            response = test_client.open(path, method=method, headers=headers, data=body)
+            return response.status_code, response.headers.get(QUERY_COUNT_HEADER), response.get_data()
+        return send
+
+    def pids(self):
+        return [os.getpid()]
+
+    def close(self):
+        pass
+
+class GunicornServer:
+    """gunicorn with gunicorn.conf.py on a local port, keep-alive connections per client thread"""
+
+    name = 'gunicorn'
+
+    def __init__(self, args):
+        self.port = args.port
+        command = [
+            sys.executable, '-m', 'gunicorn', 'benchmarks.bench_http:instrumented_app()',
+            '-c', 'gunicorn.conf.py', '--bind', f"127.0.0.1:{self.port}", '--workers', str(args.workers),
+            '--log-level', 'warning'
+        ]
+        self.process = subprocess.Popen(command, cwd=ROOT, env=os.environ.copy())
+        deadline = time.monotonic() + args.startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise SystemExit(f"gunicorn exited with code {self.process.returncode}")
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=2)
+                conn.request('GET', '/api/v1/health')
+                if conn.getresponse().status == 200:
+                    conn.close()
+                    return
+            except OSError:
+                time.sleep(0.2)
+        self.close()
+        raise SystemExit(f"gunicorn did not answer on port {self.port} within {args.startup_timeout}s")
+
+    def client(self):
+        conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=120)
+
+        def send(method, path, headers, body):
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                content = response.read()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                return 0, None, b''
+            return response.status, response.getheader(QUERY_COUNT_HEADER), content
+        return send
+
+    def pids(self):
+        return [self.process.pid] + child_pids(self.process.pid)
+
+    def close(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+def login(server, args):
+    body = json.dumps({'username': args.username, 'password': args.password}).encode()
+    status, _, content = server.client()('POST', '/api/v1/auth/login', {'Content-Type': 'application/json'}, body)
+    if status != 200:
+        raise SystemExit(f"Login as {args.username} failed with HTTP {status}; seed the database first")
+    return json.loads(content)['access_token']
+
+def run_scenario(server, requests, concurrency, token):
+    """Send requests from concurrency client threads; returns the scenario result"""
+    auth = {'Authorization': f"Bearer {token}", 'Accept': 'application/json'}
+    latencies = []
+    query_counts = []
+    errors = 0
+    next_index = 0
+    lock = threading.Lock()
+
+    def client():
+        nonlocal errors, next_index
+        send = server.client()
+        while True:
+            with lock:
+                if next_index >= len(requests):
+                    return
+                method, path, headers, body = requests[next_index]
+                next_index += 1
+            started = time.perf_counter()
+            status, queries, _ = send(method, path, {**auth, **headers}, body)
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies.append(elapsed)
+                if queries is not None:
+                    query_counts.append(int(queries))
+                if not 200 <= status < 300:
+                    errors += 1
+
+    threads = [threading.Thread(target=client) for _ in range(min(concurrency, len(requests)))]
+    with RssSampler(server.pids()) as rss:
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'requests_per_sec': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50), 1),
+        'p95_ms': round(percentile(latencies, 0.95), 1),
+        'p99_ms': round(percentile(latencies, 0.99), 1),
+        'queries_per_request': round(sum(query_counts) / len(query_counts), 1) if query_counts else None,
+        'peak_rss_mb': round(rss.peak_kb / 1024, 1)
+    }
+
+def run(args):
+    os.environ['RESPONSE_CACHE_ENABLED'] = 'true' if args.cache else 'false'
+    from database import DB_BACKEND
+
+    server = (GunicornServer if args.server == 'gunicorn' else InProcessServer)(args)
+    try:
+        token = login(server, args)
+        scenarios = {}
+        for name, method, path, share in SCENARIOS:
+            if args.scenario and not any(name.startswith(prefix) for prefix in args.scenario):
+                continue
+            count = max(1, int(args.requests * share))
+            warmup = build_requests(name, method, path, min(args.warmup, count), args)
+            run_scenario(server, warmup, args.concurrency, token)
+            scenarios[name] = run_scenario(server, build_requests(name, method, path, count, args),
+                                           args.concurrency, token)
+    finally:
+        server.close()
+    return {
+        'server': server.name,
+        'backend': DB_BACKEND,
+        'concurrency': args.concurrency,
+        'workers': args.workers if args.server == 'gunicorn' else None,
+        'response_cache': args.cache,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'scenarios': scenarios
+    }
+
+def compare(baseline, current, threshold, min_delta_ms):
+    """[regression dict, ...] of current against baseline"""
+    regressions = []
+    for name, result in current['scenarios'].items():
+        before = baseline['scenarios'].get(name)
+        if not before:
+            continue
+        if result['errors'] and not before['errors']:
+            regressions.append({'scenario': name, 'metric': 'errors', 'baseline': 0, 'current': result['errors']})
+        for metric, higher_is_better in METRICS.items():
+            old, new = before.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            change = (old - new if higher_is_better else new - old)
+            if metric in LATENCY_METRICS and change < min_delta_ms:
+                continue
+            if change > 0 and (old == 0 or change / old > threshold):
+                regressions.append({
+                    'scenario': name,
+                    'metric': metric,
+                    'baseline': old,
+                    'current': new,
+                    'change': f"{(new - old) / old:+.0%}" if old else None
+                })
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--server', choices=['inprocess', 'gunicorn'], default='inprocess')
+    parser.add_argument('--workers', type=int, default=int(os.getenv('WEB_CONCURRENCY', 2)),
+                        help='gunicorn workers')
+    parser.add_argument('--port', type=int, default=8099, help='gunicorn port')
+    parser.add_argument('--startup-timeout', type=int, default=60)
+    parser.add_argument('--concurrency', type=int, default=4, help='client threads')
+    parser.add_argument('--requests', type=int, default=400, help='requests per scenario')
+    parser.add_argument('--warmup', type=int, default=10, help='unmeasured requests per scenario')
+    parser.add_argument('--scenario', action='append', help='only scenarios starting with this (repeatable)')
+    parser.add_argument('--import-rows', type=int, default=100, help='rows per uploaded enquiries sheet')
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin123')
+    parser.add_argument('--cache', action='store_true', help='keep the response cache on')
+    parser.add_argument('--out', help='write the results here (the baseline for --compare)')
+    parser.add_argument('--compare', help='baseline JSON from an earlier --out')
+    parser.add_argument('--threshold', type=float, default=0.10, help='allowed regression, 0.10 = 10%%')
+    parser.add_argument('--min-delta-ms', type=float, default=2.0, help='ignore smaller latency changes')
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+    if not args.compare:
+        print(json.dumps(results, indent=2))
+        return
+
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    regressions = compare(baseline, results, args.threshold, args.min_delta_ms)
+    warnings = [
+        f"{key} differs: baseline {baseline.get(key)!r}, current {results.get(key)!r}"
+        for key in ('server', 'backend', 'concurrency', 'workers', 'response_cache')
+        if baseline.get(key) != results.get(key)
+    ]
+    print(json.dumps({'results': results, 'threshold': args.threshold, 'warnings': warnings,
+                      'regressions': regressions}, indent=2))
+    raise SystemExit(1 if regressions else 0)
+
+if __name__ == '__main__':
+    main()
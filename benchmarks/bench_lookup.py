@@ -0,0 +1,88 @@
+"""Typeahead lookup latency against the in-memory prefix index
+
+Usage:
+    python benchmarks/bench_lookup.py --customers 100000 1000000
+
+Builds a lookup_index.PrefixIndex over synthetic customers (the same
+generator as bench_customer_search.py) and times lookups for partial
+terms as a picker sends them keystroke by keystroke. For comparison it
+also times serializing the whole table to JSON, which is what pickers
+fetching full list endpoints made the server do on every open.
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_customer_search import synthetic_customers, percentile
+from lookup_index import PrefixIndex
+
+DEFAULT_TERMS = ['s', 'sh', 'sharma', 'priya sh', 'CUST0001234', '98450', 'zzq']
+
+def lookup_rows(count):
+    for row in synthetic_customers(count):
+        yield {
+            'id': row['id'],
+            'code': row['customer_code'],
+            'name': row['contact_person'],
+            'company_name': row['company_name'],
+            'phone': row['phone']
+        }
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def run(count, terms, repeat, limit):
+    rows = list(lookup_rows(count))
+    rss_before = rss_mb()
+    started = time.perf_counter()
+    index = PrefixIndex('customers')
+    index.load(rows)
+    load_seconds = time.perf_counter() - started
+
+    results = []
+    for term in terms:
+        times = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            matches = index.lookup(term, limit)
+            times.append((time.perf_counter() - started) * 1000)
+        times.sort()
+        results.append({
+            'q': term,
+            'returned': len(matches),
+            'first': matches[0]['name'] if matches else None,
+            'p50_ms': round(percentile(times, 0.5), 3),
+            'p95_ms': round(percentile(times, 0.95), 3)
+        })
+
+    started = time.perf_counter()
+    body = json.dumps(rows)
+    full_list_ms = (time.perf_counter() - started) * 1000
+    return {
+        'customers': count,
+        'index_load_seconds': round(load_seconds, 1),
+        'index_keys': len(index.keys),
+        'index_rss_added_mb': round(rss_mb() - rss_before),
+        'full_list_json_ms': round(full_list_ms),
+        'full_list_json_mb': round(len(body) / 1e6, 1),
+        'lookups': results
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--customers', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--terms', nargs='+', default=DEFAULT_TERMS)
+    parser.add_argument('--repeat', type=int, default=200, help='timed lookups per term')
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    print(json.dumps([run(count, args.terms, args.repeat, args.limit)
+                      for count in sorted(args.customers)], indent=2))
+
+if __name__ == '__main__':
+    main()
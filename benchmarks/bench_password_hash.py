@@ -0,0 +1,71 @@
+"""Login verification throughput at several bcrypt cost factors
+
+Usage:
+    python benchmarks/bench_password_hash.py --rounds 10 11 12 13 --logins 64 --threads 8
+
+For each cost factor, times a single verification, then `--logins`
+verifications issued from `--threads` request threads, first one after
+another on the calling thread (the old inline checks) and then through
+password_service's pool. Pool size comes from PASSWORD_HASH_WORKERS.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bcrypt
+import password_service
+from password_service import PASSWORD_HASH_WORKERS, verify_password
+
+PASSWORD = 'correct horse battery staple'
+
+def inline_verify(stored_hash):
+    return bcrypt.checkpw(PASSWORD.encode('utf-8'), stored_hash.encode('utf-8'))
+
+def run(rounds, logins, threads):
+    stored_hash = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+    started = time.perf_counter()
+    assert inline_verify(stored_hash)
+    single_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    for _ in range(logins):
+        inline_verify(stored_hash)
+    serial = time.perf_counter() - started
+
+    password_service._get_executor()  # exclude pool start-up
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as requests:
+        results = list(requests.map(lambda _: verify_password(PASSWORD, stored_hash), range(logins)))
+    pooled = time.perf_counter() - started
+    assert all(results)
+
+    return {
+        'rounds': rounds,
+        'single_verify_ms': round(single_ms, 1),
+        'serial_logins_per_sec': round(logins / serial, 1),
+        'pooled_logins_per_sec': round(logins / pooled, 1),
+        'speedup': round(serial / pooled, 2)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, nargs='+', default=[10, 11, 12, 13])
+    parser.add_argument('--logins', type=int, default=32)
+    parser.add_argument('--threads', type=int, default=8, help='concurrent request threads')
+    args = parser.parse_args()
+
+    results = [run(rounds, args.logins, args.threads) for rounds in args.rounds]
+    print(json.dumps({
+        'cpu_count': os.cpu_count(),
+        'hash_workers': PASSWORD_HASH_WORKERS,
+        'results': results
+    }, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""Peak memory of buffered report JSON vs streamed exports
+
+Usage:
+    python benchmarks/bench_report_export.py --rows 10000 50000 200000
+    python benchmarks/bench_report_export.py --live --report sales   # uses DB_* env vars
+
+The default mode generates sales-like rows lazily from a simulated
+server-side cursor. Peak memory is measured with tracemalloc; the buffered
+strategy mirrors reports_sales_report (fetchall + one JSON document).
+tracemalloc slows everything down several times; use --timing-only for
+wall-clock numbers. XLSX is CPU-bound in openpyxl (faster with lxml).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report_exports import (EXPORT_FORMATS, EXPORT_REPORTS, iter_batches, _json_default)
+
+COLUMNS = [
+    'id', 'sale_number', 'customer_id', 'created_by', 'sale_date', 'total_amount',
+    'discount_percentage', 'discount_amount', 'final_amount', 'payment_status',
+    'delivery_status', 'delivery_date', 'delivery_address', 'notes', 'created_at',
+    'company_name', 'contact_person', 'item_count'
+]
+
+class SimulatedServerCursor:
+    """SSDictCursor stand-in that builds each row only when it is fetched"""
+
+    def __init__(self, total_rows):
+        self.total_rows = total_rows
+        self.position = 0
+        self.description = [(column,) for column in COLUMNS]
+        self.started = datetime(2020, 1, 1)
+
+    def _row(self, i):
+        return {
+            'id': i,
+            'sale_number': f'SAL{i:06d}',
+            'customer_id': i % 5000,
+            'created_by': 1,
+            'sale_date': (self.started + timedelta(hours=i)).date(),
+            'total_amount': Decimal('125000.00'),
+            'discount_percentage': Decimal('5.00'),
+            'discount_amount': Decimal('6250.00'),
+            'final_amount': Decimal('118750.00'),
+            'payment_status': 'paid',
+            'delivery_status': 'delivered',
+            'delivery_date': self.started + timedelta(hours=i + 48),
+            'delivery_address': f'{i} Industrial Estate, Phase II, Chennai 600032',
+            'notes': 'Delivered with installation and demo',
+            'created_at': self.started + timedelta(hours=i),
+            'company_name': f'Customer Company {i % 5000}',
+            'contact_person': f'Contact {i % 5000}',
+            'item_count': 3
+        }
+
+    def fetchall(self):
+        return self.fetchmany(self.total_rows - self.position)
+
+    def fetchmany(self, size):
+        end = min(self.position + size, self.total_rows)
+        rows = [self._row(i) for i in range(self.position, end)]
+        self.position = end
+        return rows
+
+def buffered_json(cursor):
+    """Current reports behaviour: load every row, serialize one document"""
+    rows = cursor.fetchall()
+    body = json.dumps({'sales': rows}, default=_json_default)
+    return len(body.encode())
+
+def streamed(export_format):
+    def run(cursor):
+        writer, _ = EXPORT_FORMATS[export_format]
+        columns = [column[0] for column in cursor.description]
+        size = 0
+        for chunk in writer(columns, iter_batches(cursor)):
+            size += len(chunk if isinstance(chunk, bytes) else chunk.encode())
+        return size
+    return run
+
+def measure(label, fn, make_cursor, trace=True):
+    cursor = make_cursor()
+    if trace:
+        tracemalloc.start()
+    started = time.perf_counter()
+    size = fn(cursor)
+    elapsed = time.perf_counter() - started
+    result = {'strategy': label, 'bytes_out': size, 'seconds': round(elapsed, 2)}
+    if trace:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result['peak_mb'] = round(peak / (1024 * 1024), 2)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 50000, 200000])
+    parser.add_argument('--formats', nargs='+', default=['csv', 'ndjson', 'xlsx'], choices=sorted(EXPORT_FORMATS))
+    parser.add_argument('--live', action='store_true', help='run against the configured database')
+    parser.add_argument('--report', default='sales', choices=sorted(EXPORT_REPORTS))
+    parser.add_argument('--timing-only', action='store_true', help='skip tracemalloc')
+    args = parser.parse_args()
+    trace = not args.timing_only
+
+    strategies = [('buffered_json', buffered_json)] + [(f'stream_{f}', streamed(f)) for f in args.formats]
+    results = []
+
+    if args.live:
+        import pymysql
+        from database import get_db
+
+        query, _ = EXPORT_REPORTS[args.report]
+        for label, fn in strategies:
+            conn = get_db()
+            if not conn:
+                sys.exit('Database connection failed')
+            cursor_class = pymysql.cursors.DictCursor if label == 'buffered_json' else pymysql.cursors.SSDictCursor
+            def make_cursor():
+                cursor = conn.cursor(cursor_class)
+                cursor.execute(query.format(where_sql='1=1'))
+                return cursor
+            results.append(dict(measure(label, fn, make_cursor, trace), rows='live'))
+            conn.close()
+    else:
+        for total_rows in args.rows:
+            for label, fn in strategies:
+                results.append(dict(measure(label, fn, lambda: SimulatedServerCursor(total_rows), trace), rows=total_rows))
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""Compare per-sale item queries (N+1) with the batched sale items loader
+
+Usage:
+    python benchmarks/bench_sale_items.py --sales 5000 --items-per-sale 3 --rtt-ms 0.5
+    python benchmarks/bench_sale_items.py --live   # uses DB_* env vars and existing data
+
+The default mode seeds an in-memory dataset and simulates a fixed network
+round trip per query, so the numbers are reproducible without MySQL.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sale_items_loader import attach_sale_items, SALE_ITEMS_CHUNK_SIZE
+
+PER_SALE_QUERY = """
+    SELECT si.*, p.name as product_name
+    FROM sale_items si
+    LEFT JOIN products p ON si.product_id = p.id
+    WHERE si.sale_id = %s
+"""
+
+class SimulatedCursor:
+    """DictCursor stand-in that charges a fixed round trip per execute"""
+
+    def __init__(self, items_by_sale, rtt, per_row_cost):
+        self.items_by_sale = items_by_sale
+        self.rtt = rtt
+        self.per_row_cost = per_row_cost
+        self.round_trips = 0
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        self.round_trips += 1
+        sale_ids = list(params or [])
+        rows = []
+        for sale_id in sale_ids:
+            rows.extend(dict(item) for item in self.items_by_sale.get(sale_id, []))
+        self._rows = rows
+        time.sleep(self.rtt + self.per_row_cost * len(rows))
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+class CountingCursor:
+    """Wraps a real cursor and counts execute calls"""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.round_trips = 0
+
+    def execute(self, sql, params=None):
+        self.round_trips += 1
+        return self.cursor.execute(sql, params)
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+def seed_dataset(num_sales, items_per_sale, seed=42):
+    """Build sales and sale_items rows in memory"""
+    rng = random.Random(seed)
+    sales = [{'id': sale_id} for sale_id in range(1, num_sales + 1)]
+    items_by_sale = {}
+    item_id = 1
+    for sale in sales:
+        items = []
+        for _ in range(rng.randint(1, items_per_sale * 2 - 1)):
+            items.append({
+                'id': item_id,
+                'sale_id': sale['id'],
+                'product_id': rng.randint(1, 500),
+                'quantity': rng.randint(1, 5),
+                'unit_price': 1000.0,
+                'total_price': 1000.0,
+                'product_name': f'Product {rng.randint(1, 500)}'
+            })
+            item_id += 1
+        items_by_sale[sale['id']] = items
+    return sales, items_by_sale
+
+def n_plus_one(cursor, sales):
+    """The original loop: one query per sale"""
+    for sale in sales:
+        cursor.execute(PER_SALE_QUERY, (sale['id'],))
+        sale['items'] = cursor.fetchall()
+    return sales
+
+def run(label, fn, make_cursor, sales):
+    cursor = make_cursor()
+    rows = [dict(sale) for sale in sales]
+    started = time.perf_counter()
+    fn(cursor, rows)
+    elapsed = time.perf_counter() - started
+    items = sum(len(sale['items']) for sale in rows)
+    return {
+        'strategy': label,
+        'sales': len(rows),
+        'items': items,
+        'round_trips': cursor.round_trips,
+        'seconds': round(elapsed, 4)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sales', type=int, default=5000)
+    parser.add_argument('--items-per-sale', type=int, default=3)
+    parser.add_argument('--rtt-ms', type=float, default=0.5, help='simulated round trip per query')
+    parser.add_argument('--per-row-us', type=float, default=2.0, help='simulated transfer cost per row')
+    parser.add_argument('--chunk-size', type=int, default=SALE_ITEMS_CHUNK_SIZE)
+    parser.add_argument('--live', action='store_true', help='run against the configured database')
+    args = parser.parse_args()
+
+    batched = lambda cursor, sales: attach_sale_items(cursor, sales, args.chunk_size)
+
+    if args.live:
+        import pymysql
+        from database import get_db
+
+        conn = get_db()
+        if not conn:
+            sys.exit('Database connection failed')
+        raw_cursor = conn.cursor(pymysql.cursors.DictCursor)
+        raw_cursor.execute("SELECT id FROM sales ORDER BY sale_date DESC LIMIT %s", (args.sales,))
+        sales = raw_cursor.fetchall()
+        make_cursor = lambda: CountingCursor(conn.cursor(pymysql.cursors.DictCursor))
+    else:
+        sales, items_by_sale = seed_dataset(args.sales, args.items_per_sale)
+        make_cursor = lambda: SimulatedCursor(items_by_sale, args.rtt_ms / 1000.0, args.per_row_us / 1e6)
+
+    results = [
+        run('n_plus_one', n_plus_one, make_cursor, sales),
+        run('batched', batched, make_cursor, sales)
+    ]
+    before, after = results
+    results.append({
+        'round_trip_reduction': f"{before['round_trips']} -> {after['round_trips']}",
+        'speedup': round(before['seconds'] / after['seconds'], 1) if after['seconds'] else None
+    })
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""Worker cold start: time and memory to import the app
+
+Usage:
+    export DB_BACKEND=sqlite DB_SQLITE_PATH=/tmp/ostrich.sqlite3
+    python benchmarks/bench_startup.py --out /tmp/startup.json
+    python benchmarks/bench_startup.py --compare /tmp/startup.json --threshold 0.15
+
+gunicorn workers import app.py after the fork (there is no preload), so
+every worker start and every autoscaled instance pays this cost before it
+can answer. Each run starts a fresh interpreter with `python -X importtime`,
+imports app and reports the time spent importing, the wall time of the
+whole process up to that point and its resident memory. The importtime
+output is summed per top-level package (self time, so nothing is counted
+twice) and per module of this repo (cumulative, including what it pulled
+in). Medians over --runs are reported after --warmup runs that refresh the
+bytecode caches. `heavy_modules` lists the optional heavy libraries loaded
+at boot; they should be imported only when first used. bcrypt may still
+appear because PyJWT's cryptography imports it.
+
+--compare reads an earlier --out file and exits 1 when the import time,
+process time or memory grew by more than --threshold. Time changes smaller
+than --min-delta-ms are ignored as noise.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl', 'PIL', 'bcrypt', 'requests')
+
+CHILD_CODE = f"""
+import json, sys, time
+started = time.perf_counter()
+import app
+import_ms = (time.perf_counter() - started) * 1000
+rss_kb = 0
+try:
+    with open('/proc/self/status') as f:
+        rss_kb = next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+except OSError:
+    pass
+print(json.dumps({{'import_ms': import_ms, 'rss_kb': rss_kb,
+                  'routes': len(list(app.app.url_map.iter_rules())),
+                  'heavy_modules': [name for name in {HEAVY_MODULES!r} if name in sys.modules]}}))
+"""
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+# metric -> True when higher is better
+METRICS = {
+    'import_ms': False,
+    'process_ms': False,
+    'rss_mb': False,
+}
+TIME_METRICS = ('import_ms', 'process_ms')
+
+def parse_importtime(stderr):
+    """[(module, self us, cumulative us, depth), ...] from -X importtime output"""
+    entries = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries
+
+def repo_modules():
+    return {name[:-3] for name in os.listdir(ROOT) if name.endswith('.py')}
+
+def run_once():
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD_CODE], cwd=ROOT,
+                          capture_output=True, text=True)
+    process_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"import app failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['process_ms'] = process_ms
+    result['entries'] = parse_importtime(proc.stderr)
+    return result
+
+def summarize(runs, top):
+    local = repo_modules()
+    packages = defaultdict(list)
+    modules = defaultdict(list)
+    for run in runs:
+        package_us = defaultdict(int)
+        for name, self_us, cumulative_us, depth in run['entries']:
+            package_us[name.split('.')[0]] += self_us
+            if name in local:
+                modules[name].append(cumulative_us)
+        for name, total in package_us.items():
+            packages[name].append(total)
+
+    def ranked(totals):
+        medians = {name: statistics.median(values) / 1000 for name, values in totals.items()}
+        return [{'module': name, 'ms': round(ms, 1)}
+                for name, ms in sorted(medians.items(), key=lambda item: -item[1])[:top]]
+
+    last = runs[-1]
+    return {
+        'runs': len(runs),
+        'python': sys.version.split()[0],
+        'backend': os.getenv('DB_BACKEND', 'mysql'),
+        'routes': last['routes'],
+        'import_ms': round(statistics.median(run['import_ms'] for run in runs), 1),
+        'import_ms_min': round(min(run['import_ms'] for run in runs), 1),
+        'process_ms': round(statistics.median(run['process_ms'] for run in runs), 1),
+        'rss_mb': round(statistics.median(run['rss_kb'] for run in runs) / 1024, 1),
+        'modules_imported': len(last['entries']),
+        'heavy_modules': last['heavy_modules'],
+        'packages': ranked(packages),
+        'repo_modules': ranked(modules)
+    }
+
+def compare(baseline, current, threshold, min_delta_ms):
+    """[regression dict, ...] of current against baseline"""
+    regressions = []
+    for metric, higher_is_better in METRICS.items():
+        old, new = baseline.get(metric), current.get(metric)
+        if old is None or new is None:
+            continue
+        change = (old - new if higher_is_better else new - old)
+        if metric in TIME_METRICS and change < min_delta_ms:
+            continue
+        if change > 0 and (old == 0 or change / old > threshold):
+            regressions.append({
+                'metric': metric,
+                'baseline': old,
+                'current': new,
+                'change': f"{(new - old) / old:+.0%}" if old else None
+            })
+    for name in current['heavy_modules']:
+        if name not in baseline.get('heavy_modules', []):
+            regressions.append({'metric': 'heavy_modules', 'baseline': None, 'current': name})
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='measured interpreter starts')
+    parser.add_argument('--warmup', type=int, default=1, help='unmeasured starts (bytecode caches)')
+    parser.add_argument('--top', type=int, default=15, help='packages and repo modules listed')
+    parser.add_argument('--out', help='write the results here (the baseline for --compare)')
+    parser.add_argument('--compare', help='baseline JSON from an earlier --out')
+    parser.add_argument('--threshold', type=float, default=0.10, help='allowed regression, 0.10 = 10%%')
+    parser.add_argument('--min-delta-ms', type=float, default=20.0, help='ignore smaller time changes')
+    args = parser.parse_args()
+
+    for _ in range(args.warmup):
+        run_once()
+    results = summarize([run_once() for _ in range(args.runs)], args.top)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+    if not args.compare:
+        print(json.dumps(results, indent=2))
+        return
+
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    regressions = compare(baseline, results, args.threshold, args.min_delta_ms)
+    warnings = [
+        f"{key} differs: baseline {baseline.get(key)!r}, current {results.get(key)!r}"
+        for key in ('python', 'backend', 'routes')
+        if baseline.get(key) != results.get(key)
+    ]
+    print(json.dumps({'results': results, 'threshold': args.threshold, 'warnings': warnings,
+                      'regressions': regressions}, indent=2))
+    raise SystemExit(1 if regressions else 0)
+
+if __name__ == '__main__':
+    main()
@@ -1,25 +1,328 @@
 from functools import wraps
-from flask import jsonify
+from collections import OrderedDict
+from urllib.parse import urlencode
+from flask import g, request, current_app, Response
+import os
+import sqlite3
+import threading
 import time
+import logging
+import database
+import metrics
 
-cache = {}
+logger = logging.getLogger(__name__)
 
-def cache_response(timeout=60):
+CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+# sqlite is shared by the workers on a host, so a write invalidates every
+# worker's entries; memory is per process and only safe with one worker
+CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'sqlite').lower()
+CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 2000))
+CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+# SQLite file shared by all gunicorn workers when RESPONSE_CACHE_BACKEND=sqlite
+CACHE_SHARED_PATH = os.getenv('RESPONSE_CACHE_PATH', '/tmp/ostrich_response_cache.sqlite3')
+
+_stats_lock = threading.Lock()
+_stats = {
+    'hits': 0,
+    'misses': 0,
+    'stores': 0,
+    'evictions': 0,
+    'expirations': 0,
+    'invalidations': 0
+}
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+    metrics.record_cache_event(name, amount)
+
+class MemoryCacheBackend:
+    """Per-process LRU cache with TTL, entry and byte caps, and tag index"""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, body, tags)
+        self._tags = {}  # tag -> set of keys
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _remove(self, key):
+        expires_at, body, tags = self._entries.pop(key)
+        self._bytes -= len(body)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                self._remove(key)
+                _count('expirations')
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, body, ttl, tags):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time() + ttl, body, tuple(tags))
+            self._bytes += len(body)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+            evicted = 0
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                evicted += 1
+        if evicted:
+            _count('evictions', evicted)
+
+    def invalidate_tags(self, tags):
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    if key in self._entries:
+                        self._remove(key)
+                        removed += 1
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def info(self):
+        with self._lock:
+            return {'backend': 'memory', 'entries': len(self._entries), 'bytes': self._bytes}
+
+class SQLiteCacheBackend:
+    """Cache stored in a local SQLite file so all workers on a host share hits"""
+
+    def __init__(self, path=CACHE_SHARED_PATH, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY, body BLOB, size INTEGER,
+                    expires_at REAL, last_used REAL
+                )
+            """)
+            conn.execute("CREATE TABLE IF NOT EXISTS cache_tags (tag TEXT, key TEXT, PRIMARY KEY (tag, key))")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_tags_key ON cache_tags (key)")
+            self._local.conn = conn
+        return conn
+
+    def _delete_keys(self, conn, keys):
+        for key in keys:
+            conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            conn.execute("DELETE FROM cache_tags WHERE key = ?", (key,))
+
+    def get(self, key):
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute("SELECT body, expires_at, last_used FROM cache_entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        body, expires_at, last_used = row
+        if expires_at <= now:
+            conn.execute("BEGIN IMMEDIATE")
+            self._delete_keys(conn, [key])
+            conn.execute("COMMIT")
+            _count('expirations')
+            return None
+        # Refreshing recency at most once a second keeps hits mostly read-only
+        if now - last_used > 1:
+            conn.execute("UPDATE cache_entries SET last_used = ? WHERE key = ?", (now, key))
+        return body
+
+    def set(self, key, body, ttl, tags):
+        if len(body) > self.max_bytes:
+            return
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._delete_keys(conn, [key])
+            conn.execute(
+                "INSERT INTO cache_entries (key, body, size, expires_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, body, len(body), now + ttl, now)
+            )
+            conn.executemany("INSERT OR IGNORE INTO cache_tags (tag, key) VALUES (?, ?)", [(tag, key) for tag in tags])
+
+            expired = [r[0] for r in conn.execute("SELECT key FROM cache_entries WHERE expires_at <= ?", (now,))]
+            self._delete_keys(conn, expired)
+
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries").fetchone()
+            evicted = 0
+            if count > self.max_entries or total > self.max_bytes:
+                for old_key, size in conn.execute(
+                    "SELECT key, size FROM cache_entries ORDER BY last_used ASC"
+                ).fetchall():
+                    if count <= self.max_entries and total <= self.max_bytes:
+                        break
+                    self._delete_keys(conn, [old_key])
+                    count -= 1
+                    total -= size
+                    evicted += 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if expired:
+            _count('expirations', len(expired))
+        if evicted:
+            _count('evictions', evicted)
+
+    def invalidate_tags(self, tags):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            keys = set()
+            for tag in tags:
+                keys.update(r[0] for r in conn.execute("SELECT key FROM cache_tags WHERE tag = ?", (tag,)))
+            self._delete_keys(conn, keys)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(keys)
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM cache_entries")
+        conn.execute("DELETE FROM cache_tags")
+
+    def info(self):
+        count, total = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries").fetchone()
+        return {'backend': 'sqlite', 'path': self.path, 'entries': count, 'bytes': total}
+
+def _create_backend():
+    if CACHE_BACKEND == 'sqlite':
+        return SQLiteCacheBackend()
+    return MemoryCacheBackend()
+
+# Set by gunicorn.conf.py in each worker; other servers run one process
+WORKER_PROCESSES = int(os.getenv('GUNICORN_WORKERS', 1))
+if CACHE_ENABLED and CACHE_BACKEND == 'memory' and WORKER_PROCESSES > 1:
+    # Invalidations would only reach the worker that handled the write
+    logger.warning("Response cache disabled: the memory backend is per process and %d workers are running; "
+                   "use RESPONSE_CACHE_BACKEND=sqlite", WORKER_PROCESSES)
+    CACHE_ENABLED = False
+
+cache = _create_backend()
+
+def _role_scope(scope):
+    """Cache partition for the caller: 'public', their role, or their user id"""
+    if scope == 'public':
+        return 'public'
+    try:
+        from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+        if identity is None:
+            return 'anon'
+        if scope == 'user':
+            return f"user:{identity}"
+        # Staff tokens carry no role claim; customer tokens carry role=customer
+        return f"role:{get_jwt().get('role', 'staff')}"
+    except Exception:
+        return 'anon'
+
+def make_cache_key(scope='role'):
+    """Key built from route, normalized query args and the caller's scope"""
+    args = sorted((k, v) for k in request.args for v in sorted(request.args.getlist(k)))
+    return f"{request.path}?{urlencode(args)}|{_role_scope(scope)}"
+
+def cache_response(timeout=60, tags=(), scope='role'):
+    """Cache successful JSON GET responses
+
+    scope: 'role' shares entries between callers with the same role,
+    'user' keeps them per user, 'public' shares them with everyone.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            # Callers who just wrote read the primary, so they bypass entries
+            # that may predate the write (and may not store replica reads)
+            if not CACHE_ENABLED or request.method != 'GET' or database.reads_own_writes():
+                return f(*args, **kwargs)
+
+            key = make_cache_key(scope)
+            body = cache.get(key)
+            if body is not None:
+                _count('hits')
+                return Response(body, status=200, mimetype='application/json')
+
+            _count('misses')
+            response = current_app.make_response(f(*args, **kwargs))
+            if g.pop('response_uncacheable', False):
+                return response
+            if response.status_code == 200 and response.is_json and not response.is_streamed:
+                cache.set(key, response.get_data(), timeout, tags)
+                _count('stores')
+            return response
+        wrapper.cache_timeout = timeout
+        wrapper.cache_tags = tuple(tags)
+        return wrapper
+    return decorator
+
+def uncacheable(result):
+    """Return result without @cache_response storing it (fallback bodies on error paths)"""
+    g.response_uncacheable = True
+    return result
+
+def invalidate_tags(*tags):
+    """Drop every cached response tagged with any of these tags"""
+    if not CACHE_ENABLED or not tags:
+        return 0
+    removed = cache.invalidate_tags(tags)
+    _count('invalidations', removed)
+    return removed
+
+def invalidates_cache(*tags):
+    """Invalidate tags after a successful (2xx) non-GET request"""
     def decorator(f):
         @wraps(f)
         def wrapper(*args, **kwargs):
-            key = f.__name__
-            now = time.time()
-            if key in cache and now - cache[key]['time'] < timeout:
-                return jsonify(cache[key]['data'])
             result = f(*args, **kwargs)
-            if result.status_code == 200:
-                cache[key] = {'data': result.get_json(), 'time': now}
+            if request.method != 'GET':
+                response = current_app.make_response(result)
+                if 200 <= response.status_code < 300:
+                    invalidate_tags(*tags)
+                return response
             return result
+        wrapper.invalidates_tags = tuple(tags)
         return wrapper
     return decorator
 
-def clear_cache_pattern(pattern):
-    keys_to_delete = [k for k in cache.keys() if pattern in k]
-    for k in keys_to_delete:
-        del cache[k]
+def cache_stats():
+    """Hit/miss/eviction counters for this process plus backend size"""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+    stats['enabled'] = CACHE_ENABLED
+    stats.update(cache.info())
+    return stats
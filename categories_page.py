@@ -1,7 +1,10 @@
-from flask import jsonify, request
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from datetime import datetime
 import pymysql
+import logging
+
+logger = logging.getLogger(__name__)
 try:
     from database import get_db, sanitize_input
 except ImportError:
@@ -12,7 +15,8 @@ except ImportError:
         return str(text).strip() if text else ''
 
 def register_categories_routes(app):
-    @app.route('/api/v1/categories/', methods=['GET'])
+    bp = Blueprint('categories', __name__)
+    @bp.route('/api/v1/categories/', methods=['GET'])
     @jwt_required()
     def get_categories():
         try:
@@ -26,10 +30,10 @@ def register_categories_routes(app):
             conn.close()
             return jsonify(categories)
         except Exception as e:
-            print(f"Get categories error: {e}")
+            logger.error("Get categories error: %s", e)
             return jsonify([])
     
-    @app.route('/api/v1/categories/', methods=['POST'])
+    @bp.route('/api/v1/categories/', methods=['POST'])
     @jwt_required()
     def create_category():
         try:
@@ -62,19 +66,18 @@ def register_categories_routes(app):
             conn.close()
             return jsonify(category), 201
         except Exception as e:
-            print(f"Create category error: {e}")
+            logger.error("Create category error: %s", e)
             return jsonify({'error': 'Failed to create category'}), 500
     
-    @app.route('/api/v1/categories/<int:category_id>', methods=['PUT'])
+    @bp.route('/api/v1/categories/<int:category_id>', methods=['PUT'])
     @jwt_required()
     def update_category(category_id):
         try:
             data = request.get_json()
-            print(f"Update category {category_id} with data: {data}")
             
             conn = get_db()
             if not conn:
-                print("Database connection failed")
+                logger.warning("Database connection failed")
                 return jsonify({'error': 'Database connection failed'}), 500
             
             cursor = conn.cursor(pymysql.cursors.DictCursor)
@@ -88,7 +91,7 @@ def register_categories_routes(app):
             cursor.execute(query, (name, description, is_active, category_id))
             
             conn.commit()
-            print(f"Category {category_id} updated successfully")
+            logger.debug("Category %s updated successfully", category_id)
             
             # Get updated category
             cursor.execute("SELECT id, name, description, is_active, created_at FROM product_categories WHERE id = %s", (category_id,))
@@ -97,12 +100,10 @@ def register_categories_routes(app):
             conn.close()
             return jsonify(category)
         except Exception as e:
-            print(f"Update category error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Update category error: %s", e)
             return jsonify({'error': str(e)}), 500
     
-    @app.route('/api/v1/categories/<int:category_id>', methods=['DELETE'])
+    @bp.route('/api/v1/categories/<int:category_id>', methods=['DELETE'])
     @jwt_required()
     def delete_category(category_id):
         try:
@@ -117,5 +118,7 @@ def register_categories_routes(app):
             
             return jsonify({'message': 'Category deleted successfully'})
         except Exception as e:
-            print(f"Delete category error: {e}")
-            return jsonify({'error': 'Failed to delete category'}), 500
\ No newline at end of file
+            logger.error("Delete category error: %s", e)
+            return jsonify({'error': 'Failed to delete category'}), 500
+    
+    app.register_blueprint(bp)
\ No newline at end of file
@@ -2,9 +2,11 @@ import os
 from datetime import datetime
 import uuid
 from werkzeug.utils import secure_filename
-import requests
-from PIL import Image
 import io
+import logging
+import metrics
+
+logger = logging.getLogger(__name__)
 
 class HostingerImageService:
     def __init__(self):
@@ -13,6 +15,7 @@ class HostingerImageService:
         self.upload_path = '/public_html/uploads/products/'
         self.max_file_size = 5 * 1024 * 1024  # 5MB
         
+    @metrics.timed_image('cloud', 'validate')
     def validate_image(self, file):
         """Validate image file"""
         try:
@@ -26,6 +29,7 @@ class HostingerImageService:
             
             # Validate image format
             try:
+                from PIL import Image
                 img = Image.open(file)
                 img.verify()
                 file.seek(0)  # Reset after verify
@@ -36,9 +40,11 @@ class HostingerImageService:
         except Exception as e:
             return False, f"Validation error: {str(e)}"
     
+    @metrics.timed_image('cloud', 'resize')
     def resize_image(self, file, max_width=800, max_height=600):
         """Resize image to optimize for web"""
         try:
+            from PIL import Image
             img = Image.open(file)
             
             # Convert RGBA to RGB if necessary
@@ -57,16 +63,17 @@ class HostingerImageService:
             
             return output
         except Exception as e:
-            print(f"Image resize error: {e}")
+            logger.error("Image resize error: %s", e)
             return file
     
+    @metrics.timed_image('cloud', 'upload')
     def upload_image(self, file, folder='products'):
         """Upload image to local storage and return URL"""
         try:
             # Validate image
             is_valid, message = self.validate_image(file)
             if not is_valid:
-                print(f"Image validation failed: {message}")
+                logger.warning("Image validation failed: %s", message)
                 return None
             
             # Generate unique filename
@@ -92,7 +99,7 @@ class HostingerImageService:
             return f"{self.base_url}/static/uploads/{folder}/{new_filename}"
             
         except Exception as e:
-            print(f"Image upload error: {e}")
+            logger.error("Image upload error: %s", e)
             return None
     
     def delete_image(self, image_url):
@@ -108,8 +115,14 @@ class HostingerImageService:
                 return True
             return False
         except Exception as e:
-            print(f"Image delete error: {e}")
+            logger.error("Image delete error: %s", e)
             return False
 
-# Initialize service
-hostinger_image_service = HostingerImageService()
\ No newline at end of file
+_image_service = None
+
+def get_image_service():
+    """Shared HostingerImageService, created on first use"""
+    global _image_service
+    if _image_service is None:
+        _image_service = HostingerImageService()
+    return _image_service
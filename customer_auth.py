@@ -1,29 +1,28 @@
-from flask import request, jsonify
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-import bcrypt
 import secrets
 import string
 from datetime import datetime, timedelta
 from database import get_db, sanitize_input
+from rate_limiter import LoginRateLimiter, client_ip, too_many_attempts
+from password_service import hash_password, verify_password, check_password
 import pymysql
+import logging
+
+logger = logging.getLogger(__name__)
 
 def generate_password(length=8):
     """Generate a random password"""
     characters = string.ascii_letters + string.digits
     return ''.join(secrets.choice(characters) for _ in range(length))
 
-def hash_password(password):
-    """Hash a password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-
-def verify_password(password, hashed):
-    """Verify a password against its hash"""
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+login_limiter = LoginRateLimiter('customer')
 
 def register_customer_auth_routes(app):
     """Register customer authentication routes"""
+    bp = Blueprint('customer_auth', __name__)
     
-    @app.route('/api/v1/customer/login', methods=['POST'])
+    @bp.route('/api/v1/customer/login', methods=['POST'])
     def customer_login():
         """Customer login endpoint"""
         try:
@@ -37,6 +36,11 @@ def register_customer_auth_routes(app):
             if not email_or_phone or not password:
                 return jsonify({'error': 'Email/phone and password are required'}), 400
             
+            ip = client_ip()
+            retry_after = login_limiter.check(email_or_phone, ip)
+            if retry_after:
+                return too_many_attempts(retry_after)
+            
             conn = get_db()
             if not conn:
                 return jsonify({'error': 'Database connection failed'}), 500
@@ -54,8 +58,25 @@ def register_customer_auth_routes(app):
             customer = cursor.fetchone()
             conn.close()
             
-            if not customer or not verify_password(password, customer['password_hash']):
+            password_valid, upgraded_hash = check_password(password, customer['password_hash']) if customer else (False, None)
+            if not password_valid:
+                login_limiter.record_failure(email_or_phone, ip)
                 return jsonify({'error': 'Invalid credentials'}), 401
+            login_limiter.record_success(email_or_phone)
+            
+            if upgraded_hash:
+                conn = get_db()
+                if conn:
+                    try:
+                        conn.cursor().execute(
+                            "UPDATE customers SET password_hash = %s WHERE id = %s",
+                            (upgraded_hash, customer['id'])
+                        )
+                        conn.commit()
+                    except Exception as e:
+                        logger.error("Customer password rehash error: %s", e)
+                    finally:
+                        conn.close()
             
             # Create access token
             access_token = create_access_token(
@@ -81,10 +102,10 @@ def register_customer_auth_routes(app):
             })
             
         except Exception as e:
-            print(f"Customer login error: {e}")
+            logger.error("Customer login error: %s", e)
             return jsonify({'error': 'Login failed'}), 500
     
-    @app.route('/api/v1/customer/change-password', methods=['POST'])
+    @bp.route('/api/v1/customer/change-password', methods=['POST'])
     @jwt_required()
     def change_customer_password():
         """Change customer password"""
@@ -125,10 +146,10 @@ def register_customer_auth_routes(app):
             return jsonify({'message': 'Password changed successfully'})
             
         except Exception as e:
-            print(f"Change password error: {e}")
+            logger.error("Change password error: %s", e)
             return jsonify({'error': 'Failed to change password'}), 500
     
-    @app.route('/api/v1/customer/reset-password', methods=['POST'])
+    @bp.route('/api/v1/customer/reset-password', methods=['POST'])
     def reset_customer_password():
         """Reset customer password via email/phone"""
         try:
@@ -172,5 +193,7 @@ def register_customer_auth_routes(app):
             })
             
         except Exception as e:
-            print(f"Reset password error: {e}")
-            return jsonify({'error': 'Failed to reset password'}), 500
\ No newline at end of file
+            logger.error("Reset password error: %s", e)
+            return jsonify({'error': 'Failed to reset password'}), 500
+    
+    app.register_blueprint(bp)
\ No newline at end of file
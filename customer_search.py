@@ -0,0 +1,506 @@
+"""Customer search backed by an index instead of LOWER(col) LIKE '%term%'
+
+Each customer's names, company, email, phone digits and customer code are
+normalized (lowercased, accents and punctuation stripped) into one
+search_text column of the customer_search side table. The column has a
+FULLTEXT index built with MySQL's ngram parser, so every word of a search
+term is matched as a substring, as the old LIKE filter did, but from the
+index:
+
+    'Sharma 98765'  ->  MATCH(search_text) AGAINST ('+sharma +98765' IN BOOLEAN MODE)
+
+Write handlers call index_customers() after inserting or updating customers
+and remove_customers() after deleting them. rebuild() (re)creates the table
+from the customers table; run it once per database and after bulk changes
+made outside the app:
+
+    python customer_search.py --rebuild
+
+CUSTOMER_SEARCH_BACKEND picks how searches run:
+    fulltext  the customer_search table (default); falls back to like until
+              the table exists
+    trigram   an in-process trigram index per worker, for small deployments
+              without the side table
+    like      the old LIKE scan over customers
+"""
+from collections import defaultdict
+from array import array
+import heapq
+import os
+import re
+import threading
+import time
+import unicodedata
+import pymysql
+from database import borrow_connection
+import logging
+
+logger = logging.getLogger(__name__)
+
+CUSTOMER_SEARCH_BACKEND = os.getenv('CUSTOMER_SEARCH_BACKEND', 'fulltext').lower()
+# Largest number of matches a trigram search passes to the customers list query
+CUSTOMER_SEARCH_MAX_MATCHES = int(os.getenv('CUSTOMER_SEARCH_MAX_MATCHES', 5000))
+# Seconds between a worker's trigram index picking up changed customers
+CUSTOMER_SEARCH_TRIGRAM_REFRESH = float(os.getenv('CUSTOMER_SEARCH_TRIGRAM_REFRESH', 60))
+
+# MySQL's ngram_token_size; shorter words cannot be found in the index
+NGRAM_TOKEN_SIZE = 2
+# How long to use the LIKE fallback after finding the side table missing
+MISSING_TABLE_RETRY_SECONDS = 60
+REBUILD_BATCH_SIZE = 5000
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        customer_id INT NOT NULL PRIMARY KEY,
+        search_text TEXT NOT NULL,
+        customer_code VARCHAR(50),
+        phone_digits VARCHAR(20),
+        KEY idx_customer_search_code (customer_code),
+        KEY idx_customer_search_phone (phone_digits)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+
+# Added after a rebuild has loaded the rows, which is faster than keeping
+# the index up to date row by row. With stopwords enabled the ngram parser
+# drops every token containing one, e.g. 'a' or 'i'.
+ADD_FULLTEXT_SQL = "ALTER TABLE {table} ADD FULLTEXT KEY ft_customer_search (search_text) WITH PARSER ngram"
+
+CUSTOMER_FIELDS_QUERY = """
+    SELECT id, contact_person, individual_name, company_name, email, phone, customer_code
+    FROM customers
+"""
+
+UPSERT_SQL = """
+    INSERT INTO {table} (customer_id, search_text, customer_code, phone_digits)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE search_text = VALUES(search_text),
+                            customer_code = VALUES(customer_code),
+                            phone_digits = VALUES(phone_digits)
+"""
+
+SEARCH_RESULTS_QUERY = """
+    SELECT id,
+           COALESCE(NULLIF(contact_person, ''), NULLIF(individual_name, ''), NULLIF(company_name, ''), 'Unknown') as name,
+           contact_person, individual_name, company_name, phone, email, city, state,
+           customer_code, customer_type, created_at
+    FROM customers
+"""
+
+# The filter the list endpoint used before the side table existed
+LIKE_CONDITION = """
+    (LOWER(contact_person) LIKE LOWER(%s) OR
+     LOWER(individual_name) LIKE LOWER(%s) OR
+     LOWER(company_name) LIKE LOWER(%s) OR
+     LOWER(email) LIKE LOWER(%s) OR
+     phone LIKE %s OR
+     LOWER(customer_code) LIKE LOWER(%s))
+"""
+
+_NON_WORD = re.compile(r'[\W_]+')
+
+_fulltext_retry_at = 0.0
+_trigram = None
+_trigram_lock = threading.Lock()
+
+def normalize(value):
+    """Lowercase, strip accents and turn punctuation into single spaces"""
+    if value is None:
+        return ''
+    value = str(value)
+    if not value.isascii():
+        value = unicodedata.normalize('NFKD', value)
+        value = ''.join(ch for ch in value if not unicodedata.combining(ch))
+    return _NON_WORD.sub(' ', value.lower()).strip()
+
+def search_words(term):
+    """Distinct normalized words of a search term, longest first"""
+    return sorted(set(normalize(term).split()), key=len, reverse=True)
+
+def phone_digits(phone):
+    """Last 10 digits of a phone number (the national number in India)"""
+    digits = re.sub(r'\D', '', phone or '')
+    return digits[-10:] or None
+
+def customer_document(row):
+    """(search_text, customer_code, phone_digits) for a customers row"""
+    digits = re.sub(r'\D', '', row.get('phone') or '')
+    parts = [row.get('contact_person'), row.get('individual_name'), row.get('company_name'),
+             row.get('email'), row.get('customer_code'), digits]
+    # Distinct words in field order
+    words = dict.fromkeys(normalize(' '.join(p for p in parts if p)).split())
+    code = normalize(row.get('customer_code')).replace(' ', '') or None
+    return ' '.join(words), code, digits[-10:] or None
+
+def boolean_query(words):
+    """MATCH ... AGAINST string requiring every word; None if none is indexable"""
+    words = [w for w in words if len(w) >= NGRAM_TOKEN_SIZE]
+    if not words:
+        return None
+    return ' '.join('+' + w for w in words)
+
+def _fulltext_ready():
+    return CUSTOMER_SEARCH_BACKEND == 'fulltext' and time.time() >= _fulltext_retry_at
+
+def missing_index(error):
+    """True (and switch to the LIKE fallback for a while) if error is the side table missing
+
+    Callers retry their query with fresh filters when this returns True.
+    """
+    global _fulltext_retry_at
+    if not isinstance(error, pymysql.err.ProgrammingError) or not error.args:
+        return False
+    if error.args[0] != 1146 or 'customer_search' not in str(error.args[-1]):
+        return False
+    _fulltext_retry_at = time.time() + MISSING_TABLE_RETRY_SECONDS
+    logger.warning("customer_search table missing; run `python customer_search.py --rebuild`. "
+                   "Using LIKE search for %ss", MISSING_TABLE_RETRY_SECONDS)
+    return True
+
+def like_condition(term):
+    search_term = f"%{term}%"
+    return LIKE_CONDITION, [search_term] * 6
+
+def search_condition(term):
+    """(condition, params) restricting a customers query to customers matching term"""
+    words = search_words(term)
+    if CUSTOMER_SEARCH_BACKEND == 'trigram':
+        index = trigram_index()
+        if index is not None:
+            ids = index.search(words, CUSTOMER_SEARCH_MAX_MATCHES)
+            if not ids:
+                return "1 = 0", []
+            return f"id IN ({', '.join(['%s'] * len(ids))})", ids
+    elif _fulltext_ready():
+        query = boolean_query(words)
+        if query:
+            return ("id IN (SELECT customer_id FROM customer_search"
+                    " WHERE MATCH(search_text) AGAINST (%s IN BOOLEAN MODE))"), [query]
+    return like_condition(term)
+
+def _fetch_ranked(cursor, ids):
+    if not ids:
+        return []
+    placeholders = ', '.join(['%s'] * len(ids))
+    cursor.execute(f"{SEARCH_RESULTS_QUERY} WHERE id IN ({placeholders})", list(ids))
+    by_id = {row['id']: row for row in cursor.fetchall()}
+    return [by_id[i] for i in ids if i in by_id]
+
+def _fulltext_ids(cursor, term, words, limit):
+    """Exact customer code / phone matches first, then by FULLTEXT relevance"""
+    ids = []
+    code = normalize(term).replace(' ', '')
+    digits = phone_digits(term)
+    if code:
+        cursor.execute("SELECT customer_id FROM customer_search WHERE customer_code = %s", (code,))
+        ids.extend(row['customer_id'] for row in cursor.fetchall())
+    if digits and len(digits) == 10:
+        cursor.execute("SELECT customer_id FROM customer_search WHERE phone_digits = %s LIMIT %s",
+                       (digits, limit))
+        ids.extend(row['customer_id'] for row in cursor.fetchall() if row['customer_id'] not in ids)
+
+    query = boolean_query(words)
+    if query:
+        # ORDER BY the MATCH alone lets InnoDB return the top rows without sorting every match
+        cursor.execute("""
+            SELECT customer_id FROM customer_search
+            WHERE MATCH(search_text) AGAINST (%s IN BOOLEAN MODE)
+            ORDER BY MATCH(search_text) AGAINST (%s IN BOOLEAN MODE) DESC
+            LIMIT %s
+        """, (query, query, limit))
+        ids.extend(row['customer_id'] for row in cursor.fetchall() if row['customer_id'] not in ids)
+    return ids[:limit]
+
+def search(cursor, term, limit=20):
+    """Customers matching term, best match first
+
+    cursor must be a DictCursor. Falls back to the newest LIKE matches when
+    no index is available or no word of term is long enough for it.
+    """
+    words = search_words(term)
+    if not words:
+        return []
+    if CUSTOMER_SEARCH_BACKEND == 'trigram':
+        index = trigram_index()
+        if index is not None:
+            return _fetch_ranked(cursor, index.search(words, limit))
+    elif _fulltext_ready() and boolean_query(words) is not None:
+        # Words shorter than NGRAM_TOKEN_SIZE are not in the index; LIKE finds them
+        try:
+            return _fetch_ranked(cursor, _fulltext_ids(cursor, term, words, limit))
+        except pymysql.err.ProgrammingError as e:
+            if not missing_index(e):
+                raise
+
+    condition, params = like_condition(term)
+    cursor.execute(f"{SEARCH_RESULTS_QUERY} WHERE {condition} ORDER BY created_at DESC, id DESC LIMIT %s",
+                   params + [limit])
+    return cursor.fetchall()
+
+def _upsert(cursor, rows, table='customer_search'):
+    values = [(row['id'],) + customer_document(row) for row in rows]
+    if values:
+        cursor.executemany(UPSERT_SQL.format(table=table), values)
+    return values
+
+def index_customers(cursor, customer_ids):
+    """Refresh the search entries of customer_ids after an insert or update
+
+    Does nothing until the side table exists; rebuild() picks those
+    customers up.
+    """
+    customer_ids = [i for i in customer_ids if i]
+    if not customer_ids:
+        return
+    placeholders = ', '.join(['%s'] * len(customer_ids))
+    cursor.execute(f"{CUSTOMER_FIELDS_QUERY} WHERE id IN ({placeholders})", customer_ids)
+    rows = cursor.fetchall()
+    if _trigram is not None:
+        for row in rows:
+            _trigram.add(row['id'], customer_document(row)[0])
+    try:
+        _upsert(cursor, rows)
+    except pymysql.err.ProgrammingError as e:
+        if e.args and e.args[0] == 1146:
+            logger.debug("customer_search table missing; %s customers not indexed", len(rows))
+        else:
+            raise
+
+def remove_customers(cursor, customer_ids):
+    """Drop the search entries of deleted customers"""
+    customer_ids = [i for i in customer_ids if i]
+    if not customer_ids:
+        return
+    if _trigram is not None:
+        for customer_id in customer_ids:
+            _trigram.remove(customer_id)
+    placeholders = ', '.join(['%s'] * len(customer_ids))
+    try:
+        cursor.execute(f"DELETE FROM customer_search WHERE customer_id IN ({placeholders})", customer_ids)
+    except pymysql.err.ProgrammingError as e:
+        if not e.args or e.args[0] != 1146:
+            raise
+
+def iter_customer_batches(cursor, batch_size=REBUILD_BATCH_SIZE, after_id=0):
+    """customers rows in id order, batch_size at a time"""
+    while True:
+        cursor.execute(f"{CUSTOMER_FIELDS_QUERY} WHERE id > %s ORDER BY id LIMIT %s", (after_id, batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        yield rows
+        after_id = rows[-1]['id']
+
+def rebuild(conn):
+    """Recreate customer_search from customers; returns the number of rows indexed
+
+    The new table is filled and indexed under another name and swapped in
+    with RENAME TABLE, so searches keep working meanwhile. Customers written
+    during the rebuild are indexed again after the swap.
+    """
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    cursor.execute("SELECT NOW() as started")
+    started = cursor.fetchone()['started']
+
+    cursor.execute("DROP TABLE IF EXISTS customer_search_new")
+    cursor.execute(CREATE_TABLE_SQL.format(table='customer_search_new'))
+    indexed = 0
+    last_id = 0
+    for rows in iter_customer_batches(cursor):
+        indexed += len(_upsert(cursor, rows, 'customer_search_new'))
+        last_id = rows[-1]['id']
+        conn.commit()
+    cursor.execute("SET SESSION innodb_ft_enable_stopword = 0")
+    cursor.execute(ADD_FULLTEXT_SQL.format(table='customer_search_new'))
+
+    cursor.execute("SHOW TABLES LIKE 'customer_search'")
+    if cursor.fetchone():
+        cursor.execute("RENAME TABLE customer_search TO customer_search_old, customer_search_new TO customer_search")
+        cursor.execute("DROP TABLE customer_search_old")
+    else:
+        cursor.execute("RENAME TABLE customer_search_new TO customer_search")
+
+    cursor.execute("SELECT id FROM customers WHERE id > %s OR updated_at >= %s", (last_id, started))
+    changed = [row['id'] for row in cursor.fetchall()]
+    for start in range(0, len(changed), REBUILD_BATCH_SIZE):
+        index_customers(cursor, changed[start:start + REBUILD_BATCH_SIZE])
+    cursor.execute("DELETE FROM customer_search WHERE customer_id NOT IN (SELECT id FROM customers)")
+    conn.commit()
+    return indexed + len([i for i in changed if i > last_id])
+
+class TrigramIndex:
+    """In-memory substring index over customer search documents
+
+    Every word of a document is split into trigrams; each trigram maps to
+    the ids containing it. A search takes the rarest trigram of the query
+    and checks only those candidates. Postings are append-only, so stale
+    entries are possible; candidates are always checked against the
+    current document.
+    """
+
+    def __init__(self):
+        self.documents = {}
+        self.postings = defaultdict(lambda: array('I'))
+        self.max_id = 0
+        self.synced_at = None  # database time of the last sync
+        self.loaded_at = 0.0
+
+    @staticmethod
+    def trigrams(word):
+        return {word[i:i + 3] for i in range(len(word) - 2)}
+
+    @staticmethod
+    def document_trigrams(document):
+        return {word[i:i + 3] for word in document.split() for i in range(len(word) - 2)}
+
+    def add(self, customer_id, document):
+        old = self.documents.get(customer_id)
+        self.documents[customer_id] = document
+        grams = self.document_trigrams(document)
+        if old:
+            grams -= self.document_trigrams(old)
+        postings = self.postings
+        for gram in grams:
+            postings[gram].append(customer_id)
+
+    def remove(self, customer_id):
+        self.documents.pop(customer_id, None)
+
+    def _candidates(self, words):
+        """Ids that may contain every word, roughly newest first"""
+        best = None
+        for word in words:
+            for gram in self.trigrams(word):
+                posting = self.postings.get(gram)
+                if posting is None:
+                    return ()
+                if best is None or len(posting) < len(best):
+                    best = posting
+        # Only words shorter than a trigram: every document is a candidate
+        return reversed(list(self.documents) if best is None else best)
+
+    def search(self, words, limit):
+        """Ids of the documents containing every word, best match first
+
+        Exact words score above word prefixes, which score above substrings;
+        ties go to the newest id. Stops early once limit documents match
+        every word exactly, or after 10 x limit (at least 1000) matches, so
+        very common substrings only rank their newest matches.
+        """
+        if not words:
+            return []
+        padded_words = [(' ' + w, ' ' + w + ' ') for w in words]
+        best_score = 3 * len(words)
+        max_scored = max(limit * 10, 1000)
+        scored = []
+        seen = set()
+        exact_matches = 0
+        for customer_id in self._candidates(words):
+            if customer_id in seen:
+                continue
+            seen.add(customer_id)
+            document = self.documents.get(customer_id)
+            if document is None:
+                continue
+            padded = ' ' + document + ' '
+            score = 0
+            for word, (prefix, exact) in zip(words, padded_words):
+                if exact in padded:
+                    score += 3
+                elif prefix in padded:
+                    score += 2
+                elif word in document:
+                    score += 1
+                else:
+                    break
+            else:
+                scored.append((score, customer_id))
+                if score == best_score:
+                    exact_matches += 1
+                if exact_matches >= limit or len(scored) >= max_scored:
+                    break
+        return [customer_id for _, customer_id in heapq.nlargest(limit, scored)]
+
+def sync_trigram_index(conn, index=None):
+    """Load every customer into a new index, or add those changed since index's last sync
+
+    Deleted customers stay in an index until it is reloaded; list and
+    search queries read customers, so they never show up in results.
+    """
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    cursor.execute("SELECT NOW() as now")
+    now = cursor.fetchone()['now']
+    if index is None:
+        index = TrigramIndex()
+        batches = iter_customer_batches(cursor)
+    else:
+        cursor.execute(f"{CUSTOMER_FIELDS_QUERY} WHERE id > %s OR updated_at >= %s",
+                       (index.max_id, index.synced_at))
+        batches = [cursor.fetchall()]
+    for rows in batches:
+        for row in rows:
+            index.add(row['id'], customer_document(row)[0])
+            index.max_id = max(index.max_id, row['id'])
+    index.synced_at = now
+    index.loaded_at = time.time()
+    return index
+
+def trigram_index():
+    """This worker's trigram index, synced every CUSTOMER_SEARCH_TRIGRAM_REFRESH seconds
+
+    The first call loads every customer; later syncs only read customers
+    created or updated since. Other threads keep searching meanwhile.
+    Returns None if the index cannot be loaded.
+    """
+    global _trigram
+    index = _trigram
+    if index is not None and time.time() - index.loaded_at < CUSTOMER_SEARCH_TRIGRAM_REFRESH:
+        return index
+    if not _trigram_lock.acquire(blocking=index is None):
+        return index
+    try:
+        if _trigram is not index:
+            # Another thread loaded it while this one waited
+            return _trigram
+        conn = borrow_connection(replica=True)
+        if conn is None:
+            return index
+        try:
+            started = time.perf_counter()
+            _trigram = sync_trigram_index(conn, index)
+            if index is None:
+                logger.info("Loaded customer trigram index: %s customers in %.0f ms",
+                            len(_trigram.documents), (time.perf_counter() - started) * 1000)
+        finally:
+            conn.close()
+        return _trigram
+    except Exception as e:
+        logger.error("Customer trigram index sync failed: %s", e)
+        return index
+    finally:
+        _trigram_lock.release()
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='Maintain the customer_search table')
+    parser.add_argument('--rebuild', action='store_true', help='recreate customer_search from customers')
+    parser.add_argument('--search', help='print the ranked matches for a search term')
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+    if not args.rebuild and not args.search:
+        parser.error('give --rebuild and/or --search')
+
+    conn = borrow_connection()
+    if not conn:
+        raise SystemExit('Database connection failed')
+    try:
+        if args.rebuild:
+            started = time.perf_counter()
+            count = rebuild(conn)
+            print(json.dumps({'indexed': count, 'seconds': round(time.perf_counter() - started, 1)}))
+        if args.search:
+            results = search(conn.cursor(pymysql.cursors.DictCursor), args.search, args.limit)
+            print(json.dumps(results, indent=2, default=str))
+    finally:
+        conn.close()
@@ -1,9 +1,62 @@
-from flask import request, jsonify
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 import pymysql
 import re
-from database import get_db, sanitize_input
+from database import get_db, sanitize_input, read_only
+from cache_config import cache_response, invalidates_cache, uncacheable
+from pagination import KeysetQuery, InvalidCursor, fetch_list, list_response
+from dashboard_counters import record_change
+from password_service import hash_password
+from sequence_service import next_number
+import customer_search
+from lookup_index import record_lookup_change
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Row cap applied to unpaginated (legacy) customer list requests
+CUSTOMERS_LEGACY_LIMIT = 200
+
+CUSTOMERS_LIST_QUERY = KeysetQuery("""
+    SELECT id, 
+           COALESCE(NULLIF(contact_person, ''), NULLIF(individual_name, ''), NULLIF(company_name, ''), 'Unknown') as name,
+           contact_person, individual_name, company_name, phone, email, address, city, state, 
+           created_at, customer_code, customer_type,
+           is_verified as verification_status, pin_code, 'India' as country, 
+           CASE 
+             WHEN registration_source = 'mobile_app' THEN 'mobile_app'
+             WHEN registration_source IS NULL OR registration_source = '' THEN 'web'
+             ELSE registration_source
+           END as registration_source, 
+           COALESCE(has_mobile_access, 0) as has_mobile_access
+    FROM customers 
+""", 'created_at', 'id', 'created_at')
+
+def customer_list_filters(args):
+    """(conditions, params) for the ?search= and ?customer_type= list filters"""
+    search = args.get('search', '').strip()
+    customer_type = args.get('customer_type', '').strip() or args.get('type', '').strip()
+    
+    params = []
+    conditions = []
+    
+    # Add search condition (served by the customer_search index)
+    if search:
+        condition, search_params = customer_search.search_condition(search)
+        conditions.append(condition)
+        params.extend(search_params)
+    
+    # Add type filter (handles both customer_type and registration_source)
+    if customer_type and customer_type.lower() != 'all':
+        if customer_type.lower() in ['mobile_app', 'web']:
+            conditions.append("LOWER(registration_source) = LOWER(%s)")
+            params.append(customer_type)
+        else:
+            conditions.append("LOWER(customer_type) = LOWER(%s)")
+            params.append(customer_type)
+    
+    return conditions, params
 
 def validate_customer_data(data):
     """Enhanced customer data validation"""
@@ -78,9 +131,12 @@ def validate_customer_data(data):
 
 def register_customers_routes(app):
     """Register customer routes"""
+    bp = Blueprint('customers', __name__)
     
-    @app.route('/api/v1/customers/', methods=['GET'])
+    @bp.route('/api/v1/customers/', methods=['GET'])
     @jwt_required()
+    @cache_response(timeout=30, tags=('customers',))
+    @read_only
     def get_customers():
         """Get all customers with search and filter"""
         try:
@@ -95,71 +151,64 @@ def register_customers_routes(app):
             
             cursor = conn.cursor(pymysql.cursors.DictCursor)
             
-            # Get query parameters
-            search = request.args.get('search', '').strip()
-            customer_type = request.args.get('customer_type', '').strip() or request.args.get('type', '').strip()
+            conditions, params = customer_list_filters(request.args)
+            
+            # Base query includes mobile registered customers
+            try:
+                customers, next_cursor = fetch_list(
+                    cursor, CUSTOMERS_LIST_QUERY, request.args, conditions, params,
+                    legacy_limit=CUSTOMERS_LEGACY_LIMIT
+                )
+            except pymysql.err.ProgrammingError as e:
+                if not customer_search.missing_index(e):
+                    raise
+                conditions, params = customer_list_filters(request.args)
+                customers, next_cursor = fetch_list(
+                    cursor, CUSTOMERS_LIST_QUERY, request.args, conditions, params,
+                    legacy_limit=CUSTOMERS_LEGACY_LIMIT
+                )
             
-            print(f"Search: '{search}', Type: '{customer_type}'")
+            conn.close()
+            return jsonify(list_response(customers, next_cursor, request.args))
             
-            # Base query - include mobile registered customers
-            query = """
-                SELECT id, 
-                       COALESCE(NULLIF(contact_person, ''), NULLIF(individual_name, ''), NULLIF(company_name, ''), 'Unknown') as name,
-                       contact_person, individual_name, company_name, phone, email, address, city, state, 
-                       created_at, customer_code, customer_type,
-                       is_verified as verification_status, pin_code, 'India' as country, 
-                       CASE 
-                         WHEN registration_source = 'mobile_app' THEN 'mobile_app'
-                         WHEN registration_source IS NULL OR registration_source = '' THEN 'web'
-                         ELSE registration_source
-                       END as registration_source, 
-                       COALESCE(has_mobile_access, 0) as has_mobile_access
-                FROM customers 
-            """
+        except InvalidCursor as e:
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            logger.error("Get customers error: %s", e)
+            return uncacheable(jsonify([]))
+    
+    @bp.route('/api/v1/customers/search', methods=['GET'])
+    @jwt_required()
+    @cache_response(timeout=30, tags=('customers',))
+    @read_only
+    def search_customers():
+        """Customers matching ?q=, best match first (for the search box)"""
+        try:
+            term = request.args.get('q', '').strip() or request.args.get('search', '').strip()
+            if not term:
+                return jsonify([])
+            try:
+                limit = max(1, min(int(request.args.get('limit', 20)), 100))
+            except ValueError:
+                limit = 20
+            
+            conn = get_db()
+            if not conn:
+                return jsonify({'error': 'Database connection failed'}), 500
             
-            params = []
-            conditions = []
-            
-            # Add search condition
-            if search:
-                search_term = f"%{search}%"
-                conditions.append("""
-                    (LOWER(contact_person) LIKE LOWER(%s) OR 
-                     LOWER(individual_name) LIKE LOWER(%s) OR
-                     LOWER(company_name) LIKE LOWER(%s) OR 
-                     LOWER(email) LIKE LOWER(%s) OR 
-                     phone LIKE %s OR 
-                     LOWER(customer_code) LIKE LOWER(%s))
-                """)
-                params.extend([search_term] * 6)
-            
-            # Add type filter (handles both customer_type and registration_source)
-            if customer_type and customer_type.lower() != 'all':
-                if customer_type.lower() in ['mobile_app', 'web']:
-                    conditions.append("LOWER(registration_source) = LOWER(%s)")
-                    params.append(customer_type)
-                else:
-                    conditions.append("LOWER(customer_type) = LOWER(%s)")
-                    params.append(customer_type)
-            
-            # Build final query
-            if conditions:
-                query += " WHERE " + " AND ".join(conditions)
-            
-            query += " ORDER BY created_at DESC LIMIT 200"
-            
-            cursor.execute(query, params)
-            customers = cursor.fetchall()
+            cursor = conn.cursor(pymysql.cursors.DictCursor)
+            customers = customer_search.search(cursor, term, limit)
             
             conn.close()
             return jsonify(customers)
             
         except Exception as e:
-            print(f"Get customers error: {e}")
-            return jsonify([])
+            logger.error("Search customers error: %s", e)
+            return uncacheable(jsonify([]))
     
-    @app.route('/api/v1/customers/', methods=['POST'])
+    @bp.route('/api/v1/customers/', methods=['POST'])
     @jwt_required()
+    @invalidates_cache('customers')
     def create_customer():
         """Create new customer with enhanced validation"""
         try:
@@ -191,16 +240,12 @@ def register_customers_routes(app):
                 return jsonify({'error': 'Email address already exists'}), 400
             
             # Generate customer code
-            cursor.execute("SELECT MAX(CAST(SUBSTRING(customer_code, 5) AS UNSIGNED)) as max_num FROM customers WHERE customer_code LIKE 'CUST%'")
-            result = cursor.fetchone()
-            next_num = (result['max_num'] or 0) + 1 if result else 1
-            customer_code = f"CUST{next_num:08d}"
+            customer_code = next_number(cursor, 'customer')
             
             # Hash password if provided
             password_hash = None
             if data.get('password'):
-                import hashlib
-                password_hash = hashlib.sha256(data['password'].encode()).hexdigest()
+                password_hash = hash_password(data['password'])
             
             # Insert customer
             query = """
@@ -231,6 +276,9 @@ def register_customers_routes(app):
             ))
             
             customer_id = cursor.lastrowid
+            record_change(cursor, 'customers', new={})
+            customer_search.index_customers(cursor, [customer_id])
+            record_lookup_change(cursor, 'customers', customer_id)
             conn.commit()
             
             # Get created customer
@@ -246,13 +294,12 @@ def register_customers_routes(app):
             return jsonify(customer), 201
             
         except Exception as e:
-            print(f"Create customer error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Create customer error: %s", e)
             return jsonify({'error': 'Failed to create customer'}), 500
     
-    @app.route('/api/v1/customers/<int:customer_id>', methods=['PUT'])
+    @bp.route('/api/v1/customers/<int:customer_id>', methods=['PUT'])
     @jwt_required()
+    @invalidates_cache('customers')
     def update_customer(customer_id):
         """Update existing customer"""
         try:
@@ -294,8 +341,7 @@ def register_customers_routes(app):
             # Update customer
             if data.get('password'):
                 # Update with new password
-                import hashlib
-                password_hash = hashlib.sha256(data['password'].encode()).hexdigest()
+                password_hash = hash_password(data['password'])
                 query = """
                     UPDATE customers SET 
                         customer_type = %s, company_name = %s, individual_name = %s, 
@@ -344,6 +390,8 @@ def register_customers_routes(app):
                     customer_id
                 ))
             
+            customer_search.index_customers(cursor, [customer_id])
+            record_lookup_change(cursor, 'customers', customer_id)
             conn.commit()
             
             # Get updated customer
@@ -359,13 +407,12 @@ def register_customers_routes(app):
             return jsonify(customer)
             
         except Exception as e:
-            print(f"Update customer error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Update customer error: %s", e)
             return jsonify({'error': 'Failed to update customer'}), 500
     
-    @app.route('/api/v1/customers/<int:customer_id>', methods=['DELETE'])
+    @bp.route('/api/v1/customers/<int:customer_id>', methods=['DELETE'])
     @jwt_required()
+    @invalidates_cache('customers')
     def delete_customer(customer_id):
         """Delete customer"""
         try:
@@ -396,22 +443,24 @@ def register_customers_routes(app):
             
             # Delete customer
             cursor.execute("DELETE FROM customers WHERE id = %s", (customer_id,))
+            if cursor.rowcount:
+                record_change(cursor, 'customers', old={})
+                customer_search.remove_customers(cursor, [customer_id])
+                record_lookup_change(cursor, 'customers', customer_id)
             conn.commit()
             conn.close()
             
             return jsonify({'message': 'Customer deleted successfully'})
             
         except Exception as e:
-            print(f"Delete customer error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Delete customer error: %s", e)
             return jsonify({'error': 'Failed to delete customer'}), 500
     
-    @app.route('/api/v1/customers/test', methods=['GET'])
+    @bp.route('/api/v1/customers/test', methods=['GET'])
     def test_customers():
         """Test endpoint without JWT"""
         try:
-            print("Testing customers endpoint...")
+            logger.debug("Testing customers endpoint...")
             conn = get_db()
             if not conn:
                 return jsonify({'error': 'Database connection failed'})
@@ -430,7 +479,7 @@ def register_customers_routes(app):
             })
             
         except Exception as e:
-            print(f"Test customers error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Test customers error: %s", e)
             return jsonify({'error': str(e)})
+    
+    app.register_blueprint(bp)
@@ -0,0 +1,275 @@
+"""Dashboard counters kept up to date by the write handlers
+
+Handlers pass the before/after state of the row they touched to
+record_change(); the counter difference is applied as increments.
+reconcile() recounts from the base tables and reports drift:
+
+    python dashboard_counters.py [--apply]
+"""
+from datetime import date, datetime
+from decimal import Decimal
+import pymysql
+import logging
+
+logger = logging.getLogger(__name__)
+
+SEEDED_KEY = 'counters.seeded'
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS dashboard_counters (
+        counter_key VARCHAR(100) NOT NULL PRIMARY KEY,
+        value DECIMAL(20, 2) NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    )
+"""
+
+def _amount(value):
+    if value in (None, ''):
+        return Decimal('0')
+    return Decimal(str(value))
+
+def _month(value):
+    """YYYY-MM for a date, datetime or 'YYYY-MM-DD...' string"""
+    if isinstance(value, (datetime, date)):
+        return value.strftime('%Y-%m')
+    if isinstance(value, str) and len(value) >= 7:
+        return value[:7]
+    return None
+
+def _status(value, upper=False):
+    if value is None:
+        return 'null'
+    value = str(value)
+    return value.upper() if upper else value.lower()
+
+def _customer_counters(row):
+    return {'customers.total': 1}
+
+def _product_counters(row):
+    is_active = row.get('is_active', True)
+    return {'products.active': 1 if is_active in (None, True, 1, '1') else 0}
+
+def _sale_counters(row):
+    amount = _amount(row.get('final_amount'))
+    counters = {
+        'sales.total': 1,
+        'sales.revenue': amount,
+        f"sales.delivery_status.{_status(row.get('delivery_status'))}": 1
+    }
+    month = _month(row.get('sale_date'))
+    if month:
+        counters[f'sales.revenue.{month}'] = amount
+    return counters
+
+def _service_ticket_counters(row):
+    return {'service_tickets.total': 1}
+
+def _enquiry_counters(row):
+    return {
+        'enquiries.total': 1,
+        f"enquiries.status.{_status(row.get('status'), upper=True)}": 1
+    }
+
+def _dispatch_counters(row):
+    return {
+        'dispatches.total': 1,
+        f"dispatches.status.{_status(row.get('status'))}": 1
+    }
+
+ENTITY_COUNTERS = {
+    'customers': _customer_counters,
+    'products': _product_counters,
+    'sales': _sale_counters,
+    'service_tickets': _service_ticket_counters,
+    'enquiries': _enquiry_counters,
+    'dispatches': _dispatch_counters
+}
+
+def counter_delta(entity, old=None, new=None):
+    """Counter increments for a row going from old to new (None = absent)"""
+    contributions = ENTITY_COUNTERS[entity]
+    delta = {}
+    if new is not None:
+        for key, value in contributions(new).items():
+            delta[key] = delta.get(key, 0) + value
+    if old is not None:
+        for key, value in contributions(old).items():
+            delta[key] = delta.get(key, 0) - value
+    return {key: value for key, value in delta.items() if value}
+
+def record_change(cursor, entity, old=None, new=None):
+    """Apply the counter delta for one created, updated or deleted row"""
+    return record_changes(cursor, entity, [(old, new)])
+
+def record_changes(cursor, entity, changes):
+    """Apply counter deltas for many (old, new) row pairs in one statement"""
+    totals = {}
+    for old, new in changes:
+        for key, value in counter_delta(entity, old, new).items():
+            totals[key] = totals.get(key, 0) + value
+    totals = {key: value for key, value in totals.items() if value}
+    if not totals:
+        return True
+    try:
+        cursor.executemany("""
+            INSERT INTO dashboard_counters (counter_key, value) VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE value = value + VALUES(value)
+        """, [(key, value) for key, value in totals.items()])
+        return True
+    except Exception as e:
+        # Reconciliation repairs any drift left by a failed update
+        logger.error("Dashboard counter update error (%s): %s", entity, e)
+        return False
+
+def counters_query(keys=(), prefixes=()):
+    """(sql, params) selecting counters by key and key prefix, plus SEEDED_KEY"""
+    keys = list(keys) + [SEEDED_KEY]
+    conditions = ["counter_key IN ({})".format(', '.join(['%s'] * len(keys)))]
+    params = list(keys)
+    for prefix in prefixes:
+        conditions.append("counter_key LIKE %s")
+        # '_' in a prefix matches any character; callers filter with startswith
+        params.append(prefix + '%')
+
+    return "SELECT counter_key, value FROM dashboard_counters WHERE " + " OR ".join(conditions), params
+
+def read_counters(conn, keys=(), prefixes=()):
+    """Read counters by key and key prefix in one query; seeds on first use
+
+    Returns {counter_key: Decimal}.
+    """
+    sql, params = counters_query(keys, prefixes)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql, params)
+        counters = {key: value for key, value in cursor.fetchall()}
+    except pymysql.err.ProgrammingError:
+        # Table not created yet; reconcile() creates and seeds it
+        counters = {}
+    if SEEDED_KEY not in counters:
+        if getattr(conn, 'is_replica', False):
+            # Seeding writes, so it has to happen on the primary
+            from database import borrow_connection
+            primary = borrow_connection()
+            if primary is None:
+                return counters
+            try:
+                return read_counters(primary, keys, prefixes)
+            finally:
+                primary.close()
+        reconcile(conn, apply=True)
+        cursor.execute(sql, params)
+        counters = {key: value for key, value in cursor.fetchall()}
+    return counters
+
+def counter_breakdown(counters, prefix, label):
+    """[{label: suffix, 'count': n}] for non-zero counters under prefix"""
+    breakdown = []
+    for key, value in sorted(counters.items()):
+        if key.startswith(prefix) and value:
+            suffix = key[len(prefix):]
+            breakdown.append({label: None if suffix == 'null' else suffix, 'count': int(value)})
+    return breakdown
+
+def compute_counters(conn):
+    """Recompute every counter from the base tables"""
+    cursor = conn.cursor()
+    expected = {}
+
+    def add(key, value):
+        expected[key] = expected.get(key, 0) + _amount(value)
+
+    cursor.execute("SELECT COUNT(*) FROM customers")
+    add('customers.total', cursor.fetchone()[0])
+
+    cursor.execute("SELECT COUNT(*) FROM products WHERE COALESCE(is_active, 1) = 1")
+    add('products.active', cursor.fetchone()[0])
+
+    cursor.execute("SELECT COUNT(*), COALESCE(SUM(final_amount), 0) FROM sales")
+    count, revenue = cursor.fetchone()
+    add('sales.total', count)
+    add('sales.revenue', revenue)
+
+    cursor.execute("""
+        SELECT DATE_FORMAT(sale_date, '%Y-%m') as month, COALESCE(SUM(final_amount), 0)
+        FROM sales WHERE sale_date IS NOT NULL
+        GROUP BY month
+    """)
+    for month, revenue in cursor.fetchall():
+        add(f'sales.revenue.{month}', revenue)
+
+    cursor.execute("SELECT LOWER(delivery_status), COUNT(*) FROM sales GROUP BY LOWER(delivery_status)")
+    for status, count in cursor.fetchall():
+        add(f'sales.delivery_status.{_status(status)}', count)
+
+    cursor.execute("SELECT COUNT(*) FROM service_tickets")
+    add('service_tickets.total', cursor.fetchone()[0])
+
+    cursor.execute("SELECT UPPER(status), COUNT(*) FROM enquiries GROUP BY UPPER(status)")
+    for status, count in cursor.fetchall():
+        add('enquiries.total', count)
+        add(f'enquiries.status.{_status(status, upper=True)}', count)
+
+    cursor.execute("SELECT LOWER(status), COUNT(*) FROM dispatches GROUP BY LOWER(status)")
+    for status, count in cursor.fetchall():
+        add('dispatches.total', count)
+        add(f'dispatches.status.{_status(status)}', count)
+
+    return expected
+
+def reconcile(conn, apply=False):
+    """Compare stored counters with a full recount
+
+    Returns a list of {'counter', 'stored', 'expected', 'drift'} for every
+    counter that differs. With apply=True the recount replaces the stored
+    values. Writes that land during the recount can leave a small drift
+    that the next run picks up.
+    """
+    cursor = conn.cursor()
+    cursor.execute(CREATE_TABLE_SQL)
+    expected = compute_counters(conn)
+
+    cursor.execute("SELECT counter_key, value FROM dashboard_counters WHERE counter_key != %s", (SEEDED_KEY,))
+    stored = {key: value for key, value in cursor.fetchall()}
+
+    drift = []
+    for key in sorted(set(expected) | set(stored)):
+        stored_value = stored.get(key, Decimal('0'))
+        expected_value = expected.get(key, Decimal('0'))
+        if stored_value != expected_value:
+            drift.append({
+                'counter': key,
+                'stored': float(stored_value),
+                'expected': float(expected_value),
+                'drift': float(stored_value - expected_value)
+            })
+
+    if apply:
+        rows = [(key, expected.get(key, 0)) for key in set(expected) | set(stored)]
+        rows.append((SEEDED_KEY, 1))
+        cursor.executemany("""
+            INSERT INTO dashboard_counters (counter_key, value) VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE value = VALUES(value)
+        """, rows)
+        conn.commit()
+
+    return drift
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    from database import get_db
+
+    parser = argparse.ArgumentParser(description='Recount dashboard counters and report drift')
+    parser.add_argument('--apply', action='store_true', help='overwrite stored counters with the recount')
+    args = parser.parse_args()
+
+    conn = get_db()
+    if not conn:
+        raise SystemExit('Database connection failed')
+    try:
+        drift = reconcile(conn, apply=args.apply)
+    finally:
+        conn.close()
+    print(json.dumps({'drift': drift, 'applied': args.apply}, indent=2))
+    raise SystemExit(1 if drift and not args.apply else 0)
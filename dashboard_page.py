@@ -1,18 +1,59 @@
-from flask import jsonify
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
-import pymysql
-from database import get_db
+from datetime import datetime
+from database import get_db, read_only
+from cache_config import cache_response, invalidate_tags, uncacheable
+from dashboard_counters import read_counters, reconcile
+import logging
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_COUNTERS = [
+    'customers.total', 'products.active', 'sales.total', 'service_tickets.total',
+    'enquiries.status.PENDING', 'dispatches.status.pending', 'dispatches.status.in_transit'
+]
+STATS_COUNTERS = ['customers.total', 'enquiries.total', 'enquiries.status.NEW', 'service_tickets.total']
+
+def analytics_counter_keys():
+    """ANALYTICS_COUNTERS plus this month's revenue"""
+    return ANALYTICS_COUNTERS + [f"sales.revenue.{datetime.now().strftime('%Y-%m')}"]
+
+def dashboard_analytics(counters):
+    """/dashboard/analytics body from dashboard counters"""
+    month = datetime.now().strftime('%Y-%m')
+    return {
+        'total_customers': int(counters.get('customers.total', 0)),
+        'total_products': int(counters.get('products.active', 0)),
+        'total_sales': int(counters.get('sales.total', 0)),
+        'total_service_tickets': int(counters.get('service_tickets.total', 0)),
+        'pending_enquiries': int(counters.get('enquiries.status.PENDING', 0)),
+        'active_dispatches': int(counters.get('dispatches.status.pending', 0)
+                                 + counters.get('dispatches.status.in_transit', 0)),
+        'monthly_revenue': float(counters.get(f'sales.revenue.{month}', 0))
+    }
+
+def dashboard_stats(counters):
+    """/dashboard/stats body from dashboard counters"""
+    return {
+        "totalCustomers": int(counters.get('customers.total', 0)),
+        "totalEnquiries": int(counters.get('enquiries.total', 0)),
+        "totalServiceTickets": int(counters.get('service_tickets.total', 0)),
+        "pendingEnquiries": int(counters.get('enquiries.status.NEW', 0))
+    }
 
 def register_dashboard_routes(app):
     """Register dashboard page routes"""
+    bp = Blueprint('dashboard', __name__)
     
-    @app.route('/api/v1/dashboard/analytics', methods=['GET'])
+    @bp.route('/api/v1/dashboard/analytics', methods=['GET'])
     @jwt_required()
+    @cache_response(timeout=60, tags=('customers', 'products', 'sales', 'service_tickets', 'enquiries', 'dispatch'))
+    @read_only
     def get_dashboard_analytics():
         try:
             conn = get_db()
             if not conn:
-                return jsonify({
+                return uncacheable(jsonify({
                     'total_customers': 0,
                     'total_products': 0,
                     'total_sales': 0,
@@ -20,80 +61,17 @@ def register_dashboard_routes(app):
                     'pending_enquiries': 0,
                     'active_dispatches': 0,
                     'monthly_revenue': 0
-                })
-            
-            cursor = conn.cursor(pymysql.cursors.DictCursor)
-            analytics = {
-                'total_customers': 0,
-                'total_products': 0,
-                'total_sales': 0,
-                'total_service_tickets': 0,
-                'pending_enquiries': 0,
-                'active_dispatches': 0,
-                'monthly_revenue': 0
-            }
-            
-            # Get counts safely
-            try:
-                cursor.execute("SELECT COUNT(*) as count FROM customers")
-                result = cursor.fetchone()
-                analytics['total_customers'] = result['count'] if result else 0
-            except:
-                pass
-            
-            try:
-                cursor.execute("SELECT COUNT(*) as count FROM products WHERE is_active = 1")
-                result = cursor.fetchone()
-                analytics['total_products'] = result['count'] if result else 0
-            except:
-                pass
-            
-            try:
-                cursor.execute("SELECT COUNT(*) as count FROM sales")
-                result = cursor.fetchone()
-                analytics['total_sales'] = result['count'] if result else 0
-            except:
-                pass
-            
-            try:
-                cursor.execute("SELECT COUNT(*) as count FROM service_tickets")
-                result = cursor.fetchone()
-                analytics['total_service_tickets'] = result['count'] if result else 0
-            except:
-                pass
+                }))
             
-            try:
-                cursor.execute("SELECT COUNT(*) as count FROM enquiries WHERE status = 'PENDING'")
-                result = cursor.fetchone()
-                analytics['pending_enquiries'] = result['count'] if result else 0
-            except:
-                pass
-            
-            try:
-                cursor.execute("SELECT COUNT(*) as count FROM dispatch WHERE status IN ('PENDING', 'IN_TRANSIT')")
-                result = cursor.fetchone()
-                analytics['active_dispatches'] = result['count'] if result else 0
-            except:
-                pass
-            
-            try:
-                cursor.execute("""
-                    SELECT COALESCE(SUM(final_amount), 0) as revenue 
-                    FROM sales 
-                    WHERE MONTH(sale_date) = MONTH(CURDATE()) 
-                    AND YEAR(sale_date) = YEAR(CURDATE())
-                """)
-                result = cursor.fetchone()
-                analytics['monthly_revenue'] = float(result['revenue']) if result else 0.0
-            except:
-                pass
+            counters = read_counters(conn, analytics_counter_keys())
+            analytics = dashboard_analytics(counters)
             
             conn.close()
             return jsonify(analytics)
             
         except Exception as e:
-            print(f"Dashboard error: {e}")
-            return jsonify({
+            logger.error("Dashboard error: %s", e)
+            return uncacheable(jsonify({
                 'total_customers': 0,
                 'total_products': 0,
                 'total_sales': 0,
@@ -101,48 +79,55 @@ def register_dashboard_routes(app):
                 'pending_enquiries': 0,
                 'active_dispatches': 0,
                 'monthly_revenue': 0
-            })
+            }))
     
     # Dashboard-specific endpoints (different from main CRUD endpoints)
-    @app.route('/api/v1/dashboard/stats', methods=['GET'])
+    @bp.route('/api/v1/dashboard/stats', methods=['GET'])
     @jwt_required()
+    @cache_response(timeout=60, tags=('customers', 'products', 'sales', 'service_tickets', 'enquiries', 'dispatch'))
+    @read_only
     def get_dashboard_stats():
         try:
             conn = get_db()
             if not conn:
-                return jsonify({
+                return uncacheable(jsonify({
                     "totalCustomers": 14,
                     "totalEnquiries": 10,
                     "totalServiceTickets": 11,
                     "pendingEnquiries": 3
-                })
-            
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT COUNT(*) FROM customers")
-            total_customers = cursor.fetchone()[0]
+                }))
             
-            cursor.execute("SELECT COUNT(*) FROM enquiries")
-            total_enquiries = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM enquiries WHERE status = 'NEW'")
-            pending_enquiries = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM service_tickets")
-            total_service_tickets = cursor.fetchone()[0]
+            counters = read_counters(conn, STATS_COUNTERS)
             
             conn.close()
-            return jsonify({
-                "totalCustomers": total_customers,
-                "totalEnquiries": total_enquiries,
-                "totalServiceTickets": total_service_tickets,
-                "pendingEnquiries": pending_enquiries
-            })
+            return jsonify(dashboard_stats(counters))
         except Exception as e:
-            print(f"Error: {e}")
-            return jsonify({
+            logger.error("Error: %s", e)
+            return uncacheable(jsonify({
                 "totalCustomers": 14,
                 "totalEnquiries": 10,
                 "totalServiceTickets": 11,
                 "pendingEnquiries": 3
-            })
+            }))
+
+    @bp.route('/api/v1/dashboard/reconcile', methods=['POST'])
+    @jwt_required()
+    def reconcile_dashboard_counters():
+        """Recount dashboard counters; ?apply=true overwrites drifted values"""
+        try:
+            conn = get_db()
+            if not conn:
+                return jsonify({'error': 'Database connection failed'}), 500
+            
+            apply = request.args.get('apply', 'false').lower() in ('1', 'true', 'yes')
+            drift = reconcile(conn, apply=apply)
+            conn.close()
+            
+            if apply and drift:
+                invalidate_tags('customers', 'products', 'sales', 'service_tickets', 'enquiries', 'dispatch')
+            return jsonify({'drift': drift, 'applied': apply})
+        except Exception as e:
+            logger.error("Dashboard reconcile error: %s", e)
+            return jsonify({'error': str(e)}), 500
+    
+    app.register_blueprint(bp)
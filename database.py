@@ -1,7 +1,19 @@
+from collections import Counter
 import pymysql
 from dbutils.pooled_db import PooledDB
+import itertools
 import os
 import re
+import sqlite3
+import sys
+import threading
+import time
+import weakref
+import logging
+import metrics
+import query_profiler
+
+logger = logging.getLogger(__name__)
 
 def sanitize_input(text):
     """Basic input sanitization"""
@@ -9,40 +21,596 @@ def sanitize_input(text):
         return ''
     return re.sub(r'[<>"\';]', '', str(text).strip())
 
-# Connection pool
-_db_pool = None
-
-def _init_pool():
-    """Initialize database connection pool"""
-    global _db_pool
-    if _db_pool is None:
-        required_vars = ['DB_HOST', 'DB_USER', 'DB_PASSWORD', 'DB_NAME', 'DB_PORT']
-        missing_vars = [var for var in required_vars if not os.getenv(var)]
-        
-        if missing_vars:
-            raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
-        
-        _db_pool = PooledDB(
-            creator=pymysql,
-            maxconnections=20,
-            mincached=2,
-            maxcached=10,
-            blocking=True,
-            host=os.getenv('DB_HOST'),
-            user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD'),
-            database=os.getenv('DB_NAME'),
-            port=int(os.getenv('DB_PORT')),
-            charset='utf8mb4',
-            autocommit=True
-        )
-    return _db_pool
+# mysql, or sqlite to run against the local stand-in in local_db.py
+# (benchmarks, CI); DB_SQLITE_PATH is then the database file
+DB_BACKEND = os.getenv('DB_BACKEND', 'mysql').lower()
 
-def get_db():
-    """Get database connection from pool"""
+# Pool sizing per worker process; the total across workers must stay
+# below MySQL max_connections
+DB_POOL_MAX_CONNECTIONS = int(os.getenv('DB_POOL_MAX_CONNECTIONS', 20))
+DB_POOL_MIN_CACHED = int(os.getenv('DB_POOL_MIN_CACHED', 2))
+DB_POOL_MAX_CACHED = int(os.getenv('DB_POOL_MAX_CACHED', 10))
+# Seconds to wait for a free connection before giving up (0 waits forever)
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))
+# never | checkout | always: when PooledDB pings a connection before use
+DB_POOL_PING = os.getenv('DB_POOL_PING', 'checkout').lower()
+DB_CONNECT_TIMEOUT = int(os.getenv('DB_CONNECT_TIMEOUT', 10))
+# Connections held longer than this are reported as possible leaks
+DB_LEAK_WARN_SECONDS = float(os.getenv('DB_LEAK_WARN_SECONDS', 30))
+
+# Read replicas: comma-separated host[:port], same credentials and schema
+DB_REPLICA_HOSTS = [host.strip() for host in os.getenv('DB_REPLICA_HOSTS', '').split(',') if host.strip()]
+DB_REPLICA_POOL_MAX_CONNECTIONS = int(os.getenv('DB_REPLICA_POOL_MAX_CONNECTIONS', DB_POOL_MAX_CONNECTIONS))
+# Replicas further behind than this are skipped until they catch up
+DB_REPLICA_MAX_LAG = float(os.getenv('DB_REPLICA_MAX_LAG', 5))
+DB_REPLICA_LAG_CHECK_INTERVAL = float(os.getenv('DB_REPLICA_LAG_CHECK_INTERVAL', 5))
+# Seconds a replica is skipped after it fails to hand out a connection
+DB_REPLICA_RETRY_SECONDS = float(os.getenv('DB_REPLICA_RETRY_SECONDS', 30))
+# After a write, the same caller reads from the primary for this long
+DB_STICKY_SECONDS = float(os.getenv('DB_STICKY_SECONDS', 5))
+# SQLite file so stickiness holds across gunicorn workers on a host
+DB_STICKY_PATH = os.getenv('DB_STICKY_PATH', '/tmp/ostrich_db_sticky.sqlite3')
+
+PING_POLICIES = {'never': 0, 'checkout': 1, 'always': 7}
+# Upper bounds (ms) of the checkout wait histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_checkout_lock = threading.Lock()
+_checked_out = {}  # id -> (borrowed_at, borrower, thread name)
+_leak_stats = {'borrowed': 0, 'returned': 0, 'unclosed_reclaimed': 0, 'garbage_collected': 0}
+_unclosed_sites = Counter()  # borrower file:line -> connections left for teardown or GC
+
+def _connect(**kwargs):
+    """pymysql.connect that stamps the connection with its creation time"""
+    if DB_BACKEND == 'sqlite':
+        import local_db
+        conn = local_db.connect(**kwargs)
+    else:
+        conn = pymysql.connect(**kwargs)
+    conn.created_at = time.monotonic()
+    return conn
+
+_connect.dbapi = pymysql
+
+def _connection_age(conn):
+    """Seconds since the underlying pymysql connection was opened, or None"""
+    raw = conn
+    # PooledDedicatedDBConnection -> SteadyDBConnection -> pymysql connection
+    while hasattr(raw, '_con'):
+        raw = raw._con
+    created_at = getattr(raw, 'created_at', None)
+    return None if created_at is None else time.monotonic() - created_at
+
+class ConnectionPool:
+    """PooledDB for one MySQL server with a checkout timeout and metrics"""
+
+    def __init__(self, name, host, port, max_connections=DB_POOL_MAX_CONNECTIONS):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.pool = None
+        self.slots = None  # bounds checkouts so waits can time out
+        self._lock = threading.Lock()
+        self.stats = {'checkouts': 0, 'checkout_timeouts': 0, 'checkout_errors': 0,
+                      'connections_opened': 0, 'wait_ms_total': 0.0}
+        self.wait_histogram = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        # Replica health
+        self.lag_seconds = None
+        self.lag_checked_at = 0.0
+        self.down_until = 0.0
+
+    def _init(self):
+        if self.pool is None:
+            with self._lock:
+                if self.pool is not None:
+                    return self.pool
+                required_vars = ['DB_HOST', 'DB_USER', 'DB_PASSWORD', 'DB_NAME', 'DB_PORT']
+                if DB_BACKEND == 'sqlite':
+                    required_vars = []
+                missing_vars = [var for var in required_vars if not os.getenv(var)]
+
+                if missing_vars:
+                    raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
+
+                def connect(**kwargs):
+                    conn = _connect(**kwargs)
+                    with _checkout_lock:
+                        self.stats['connections_opened'] += 1
+                    return conn
+                connect.dbapi = pymysql
+
+                self.slots = threading.BoundedSemaphore(self.max_connections)
+                self.pool = PooledDB(
+                    creator=connect,
+                    maxconnections=self.max_connections,
+                    mincached=min(DB_POOL_MIN_CACHED, self.max_connections),
+                    maxcached=DB_POOL_MAX_CACHED,
+                    blocking=True,
+                    ping=PING_POLICIES.get(DB_POOL_PING, 1),
+                    failures=(pymysql.OperationalError, pymysql.InterfaceError, pymysql.InternalError),
+                    host=self.host or os.getenv('DB_HOST'),
+                    user=os.getenv('DB_USER'),
+                    password=os.getenv('DB_PASSWORD'),
+                    database=os.getenv('DB_NAME'),
+                    port=int(self.port or os.getenv('DB_PORT') or 3306),
+                    charset='utf8mb4',
+                    connect_timeout=DB_CONNECT_TIMEOUT,
+                    autocommit=True
+                )
+                metrics.record_pool_size(self.name, self.max_connections)
+        return self.pool
+
+    def _record_wait(self, wait_ms):
+        bucket = next((i for i, bound in enumerate(WAIT_BUCKETS_MS) if wait_ms <= bound), len(WAIT_BUCKETS_MS))
+        with _checkout_lock:
+            self.stats['checkouts'] += 1
+            self.stats['wait_ms_total'] += wait_ms
+            self.wait_histogram[bucket] += 1
+
+    def checkout(self, timeout=DB_POOL_TIMEOUT):
+        """Pooled connection, waiting at most timeout (DB_POOL_TIMEOUT) for a free slot
+
+        The caller must call release() once the connection is closed.
+        """
+        pool = self._init()
+        started = time.perf_counter()
+        if not self.slots.acquire(timeout=timeout if timeout > 0 else None):
+            with _checkout_lock:
+                self.stats['checkout_timeouts'] += 1
+            metrics.record_checkout_timeout(self.name)
+            raise TimeoutError(f"No free {self.name} connection after {timeout}s "
+                               f"({self.max_connections} in use)")
+        try:
+            conn = pool.connection()
+        except Exception:
+            self.slots.release()
+            with _checkout_lock:
+                self.stats['checkout_errors'] += 1
+            raise
+        wait = time.perf_counter() - started
+        self._record_wait(wait * 1000)
+        metrics.record_checkout(self.name, wait)
+        return conn
+
+    def release(self):
+        self.slots.release()
+        metrics.record_release(self.name)
+
+    def warm(self):
+        conn = self.checkout()
+        conn.close()
+        self.release()
+        return len(self.pool._idle_cache)
+
+    def metrics(self):
+        with _checkout_lock:
+            stats = dict(self.stats)
+            histogram = list(self.wait_histogram)
+        metrics = {
+            'name': self.name,
+            'config': {
+                'max_connections': self.max_connections,
+                'min_cached': DB_POOL_MIN_CACHED,
+                'max_cached': DB_POOL_MAX_CACHED,
+                'checkout_timeout_seconds': DB_POOL_TIMEOUT,
+                'ping': DB_POOL_PING
+            },
+            'initialized': self.pool is not None,
+            'checkouts': stats['checkouts'],
+            'checkout_timeouts': stats['checkout_timeouts'],
+            'checkout_errors': stats['checkout_errors'],
+            'connections_opened': stats['connections_opened'],
+            'wait_ms_avg': round(stats['wait_ms_total'] / stats['checkouts'], 2) if stats['checkouts'] else 0.0,
+            'wait_ms_histogram': [
+                {'le': bound, 'count': count}
+                for bound, count in zip(list(WAIT_BUCKETS_MS) + ['+Inf'], histogram)
+            ]
+        }
+        if self.pool is not None:
+            idle = list(self.pool._idle_cache)
+            ages = [age for age in (_connection_age(conn) for conn in idle) if age is not None]
+            metrics['in_use'] = self.pool._connections
+            metrics['idle'] = len(idle)
+            metrics['idle_age_seconds'] = {
+                'min': round(min(ages), 1), 'max': round(max(ages), 1), 'avg': round(sum(ages) / len(ages), 1)
+            } if ages else None
+        return metrics
+
+def _parse_host(spec):
+    host, _, port = spec.partition(':')
+    return host, port or None
+
+primary_pool = ConnectionPool('primary', None, None)
+replica_pools = [
+    ConnectionPool(f"replica:{spec}", *_parse_host(spec), max_connections=DB_REPLICA_POOL_MAX_CONNECTIONS)
+    for spec in DB_REPLICA_HOSTS
+]
+_replica_cycle = itertools.cycle(replica_pools) if replica_pools else None
+_replica_lock = threading.Lock()
+_lag_warned = set()
+
+def _replica_lag(pool):
+    """Seconds behind the primary, 0 for a standalone server, inf if replication stopped"""
+    conn = pool.checkout()
+    try:
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        try:
+            cursor.execute("SHOW REPLICA STATUS")
+        except pymysql.err.ProgrammingError:
+            cursor.execute("SHOW SLAVE STATUS")  # MySQL < 8.0.22
+        status = cursor.fetchone()
+    finally:
+        conn.close()
+        pool.release()
+    if not status:
+        return 0.0
+    lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+    return float('inf') if lag is None else float(lag)
+
+def _replica_healthy(pool, now):
+    if pool.down_until > now:
+        return False
+    if now - pool.lag_checked_at >= DB_REPLICA_LAG_CHECK_INTERVAL:
+        pool.lag_checked_at = now
+        try:
+            pool.lag_seconds = _replica_lag(pool)
+        except pymysql.err.OperationalError as e:
+            if e.args and e.args[0] in (1227, 1045):
+                # No REPLICATION CLIENT privilege: lag unknown, keep using it
+                if pool.name not in _lag_warned:
+                    _lag_warned.add(pool.name)
+                    logger.warning("Cannot read lag of %s: %s", pool.name, e)
+                pool.lag_seconds = None
+            else:
+                _mark_down(pool, e)
+                return False
+        except Exception as e:
+            _mark_down(pool, e)
+            return False
+    return pool.lag_seconds is None or pool.lag_seconds <= DB_REPLICA_MAX_LAG
+
+def _mark_down(pool, error):
+    pool.down_until = time.monotonic() + DB_REPLICA_RETRY_SECONDS
+    logger.warning("Replica %s unavailable for %ss: %s", pool.name, DB_REPLICA_RETRY_SECONDS, error)
+
+def _pick_replica():
+    """Next healthy replica pool in round-robin order, or None"""
+    if _replica_cycle is None:
+        return None
+    now = time.monotonic()
+    for _ in range(len(replica_pools)):
+        with _replica_lock:
+            pool = next(_replica_cycle)
+        if _replica_healthy(pool, now):
+            return pool
+    return None
+
+class MemoryStickyStore:
+    """Per-process map of caller -> primary-read deadline"""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._until = {}
+        self._lock = threading.Lock()
+
+    def mark(self, key, until):
+        with self._lock:
+            self._until[key] = until
+            if len(self._until) > self.max_keys:
+                now = time.time()
+                self._until = {k: v for k, v in self._until.items() if v > now}
+
+    def active(self, key):
+        return self._until.get(key, 0) > time.time()
+
+class SQLiteStickyStore:
+    """Primary-read deadlines in a local SQLite file shared by all workers"""
+
+    def __init__(self, path=DB_STICKY_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS db_sticky (key TEXT PRIMARY KEY, until REAL)")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def mark(self, key, until):
+        conn = self._conn()
+        conn.execute("INSERT OR REPLACE INTO db_sticky (key, until) VALUES (?, ?)", (key, until))
+        self._writes += 1
+        if self._writes % 1000 == 0:
+            conn.execute("DELETE FROM db_sticky WHERE until < ?", (time.time(),))
+
+    def active(self, key):
+        row = self._conn().execute("SELECT until FROM db_sticky WHERE key = ?", (key,)).fetchone()
+        return bool(row) and row[0] > time.time()
+
+def _create_sticky_store():
+    if not replica_pools:
+        return None
+    try:
+        store = SQLiteStickyStore()
+        store.active('')
+        return store
+    except Exception as e:
+        logger.warning("Sticky read store %s unavailable, using per-process memory: %s", DB_STICKY_PATH, e)
+        return MemoryStickyStore()
+
+sticky_store = _create_sticky_store()
+
+def _caller_key():
+    """JWT identity of the caller, else their client IP"""
     try:
-        pool = _init_pool()
-        return pool.connection()
+        from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+        if identity is not None:
+            return f"user:{identity}"
+    except Exception:
+        pass
+    from rate_limiter import client_ip
+    return f"ip:{client_ip()}"
+
+def reads_own_writes():
+    """True while the caller's reads are pinned to the primary after a write"""
+    return sticky_store is not None and sticky_store.active(_caller_key())
+
+def read_only(f):
+    """Let GET requests to this handler read from a replica
+
+    Falls back to the primary when no replica is configured or healthy, or
+    the caller wrote something in the last DB_STICKY_SECONDS.
+    """
+    from functools import wraps
+    from flask import g, request
+
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        if replica_pools and request.method in ('GET', 'HEAD'):
+            g.db_read_only = True
+        return f(*args, **kwargs)
+    wrapper.read_only = True
+    return wrapper
+
+def _borrower():
+    """file:line of the first caller outside this module"""
+    frame = sys._getframe(2)
+    while frame and frame.f_code.co_filename == __file__:
+        frame = frame.f_back
+    if frame is None:
+        return 'unknown'
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno}"
+
+def _unreturned(key, borrower, pool):
+    # Runs when a TrackedConnection is garbage collected without close()
+    with _checkout_lock:
+        if _checked_out.pop(key, None) is None:
+            return
+        _leak_stats['garbage_collected'] += 1
+        _unclosed_sites[borrower] += 1
+    pool.release()
+    logger.warning("Connection borrowed at %s was never closed", borrower)
+
+class TrackedConnection:
+    """Pooled connection that records who borrowed it until it is closed"""
+
+    def __init__(self, conn, borrower, pool):
+        self._conn = conn
+        self.borrower = borrower
+        self.pool_name = pool.name
+        self.is_replica = pool is not primary_pool
+        self._key = id(self)
+        with _checkout_lock:
+            _checked_out[self._key] = (time.monotonic(), borrower, threading.current_thread().name)
+            _leak_stats['borrowed'] += 1
+        self._finalizer = weakref.finalize(self, _unreturned, self._key, borrower, pool)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        return query_profiler.wrap_cursor(self._conn.cursor(*args, **kwargs))
+
+    def close(self):
+        finalizer_args = self._finalizer.detach()
+        if finalizer_args is None:
+            return
+        with _checkout_lock:
+            _checked_out.pop(self._key, None)
+            _leak_stats['returned'] += 1
+        try:
+            self._conn.close()
+        finally:
+            finalizer_args[2][2].release()
+
+    def discard(self):
+        """close() for a connection in an unknown state, such as one with
+        unread rows on an unbuffered cursor
+
+        The database connection itself is closed rather than reused; the pool
+        opens a new one the next time the slot is checked out.
+        """
+        if not self._finalizer.alive:
+            return
+        # PooledDedicatedDBConnection -> SteadyDBConnection
+        steady = getattr(self._conn, '_con', None)
+        try:
+            if steady is not None:
+                steady._close()
+        finally:
+            self.close()
+
+class RequestConnection:
+    """The request's shared connection; close() is deferred to teardown"""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.closed_by_handler = False
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        self.closed_by_handler = True
+
+def borrow_connection(replica=False):
+    """Dedicated pooled connection that the caller must close()
+
+    Use for work outside a request or that outlives it (streamed responses,
+    background jobs). With replica=True a healthy replica is used when one
+    is configured. Returns None if no connection is available.
+    """
+    pool = _pick_replica() if replica else None
+    if pool is not None:
+        try:
+            return TrackedConnection(pool.checkout(), _borrower(), pool)
+        except Exception as e:
+            _mark_down(pool, e)
+    try:
+        return TrackedConnection(primary_pool.checkout(), _borrower(), primary_pool)
     except Exception as e:
-        print(f"Database connection error: {e}")
+        logger.error("Database connection error: %s", e)
         return None
+
+def borrow_read_connection():
+    """borrow_connection() for reads made on behalf of the current caller
+
+    Uses a replica unless the caller wrote something in the last
+    DB_STICKY_SECONDS, the same decision get_db() makes for @read_only.
+    """
+    return borrow_connection(replica=not reads_own_writes())
+
+def get_db():
+    """Get database connection from pool
+
+    Inside a request every call returns the same lazily borrowed connection,
+    which is returned to the pool at teardown even if the handler never
+    closes it. Handlers marked @read_only get a replica connection for GETs.
+    Outside a request this is borrow_connection().
+    """
+    try:
+        from flask import g, has_request_context
+    except ImportError:
+        return borrow_connection()
+    if not has_request_context():
+        return borrow_connection()
+    conn = g.get('_db_conn')
+    if conn is None:
+        replica = g.get('db_read_only', False) and not reads_own_writes()
+        raw = borrow_connection(replica=replica)
+        if raw is None:
+            return None
+        conn = g._db_conn = RequestConnection(raw)
+    return conn
+
+def release_request_connection(exc=None):
+    """Return the request's connection to the pool (teardown handler)"""
+    from flask import g
+    conn = g.pop('_db_conn', None)
+    if conn is None:
+        return
+    if not conn.closed_by_handler:
+        with _checkout_lock:
+            _leak_stats['unclosed_reclaimed'] += 1
+            _unclosed_sites[conn._conn.borrower] += 1
+    try:
+        if exc is not None:
+            conn._conn.rollback()
+    except Exception as e:
+        logger.warning("Rollback on teardown failed: %s", e)
+    finally:
+        conn._conn.close()
+
+def init_app(app):
+    """Return request-scoped connections at teardown; track writes for sticky reads"""
+    from flask import request
+
+    app.teardown_request(release_request_connection)
+
+    if replica_pools:
+        @app.after_request
+        def remember_write(response):
+            if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+                try:
+                    sticky_store.mark(_caller_key(), time.time() + DB_STICKY_SECONDS)
+                except Exception as e:
+                    logger.warning("Could not record write for sticky reads: %s", e)
+            return response
+
+def warm_pool():
+    """Create the pools and their DB_POOL_MIN_CACHED idle connections now
+
+    Called from gunicorn's post_fork so the first requests of a new worker
+    do not pay for connecting.
+    """
+    ok = True
+    for pool in [primary_pool] + replica_pools:
+        try:
+            idle = pool.warm()
+            logger.info("Database pool %s ready: %s idle, max %s connections per worker",
+                        pool.name, idle, pool.max_connections)
+        except Exception as e:
+            logger.error("Database pool %s warm-up failed: %s", pool.name, e)
+            ok = False
+    return ok
+
+def ping(timeout):
+    """(checkout ms, SELECT 1 ms) against the primary; raises when either fails
+
+    The checkout waits at most timeout seconds for a free connection, so an
+    exhausted pool fails fast instead of after DB_POOL_TIMEOUT.
+    """
+    started = time.perf_counter()
+    conn = primary_pool.checkout(timeout=timeout)
+    checked_out = time.perf_counter()
+    try:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+        finally:
+            cursor.close()
+        finished = time.perf_counter()
+    finally:
+        conn.close()
+        primary_pool.release()
+    return (checked_out - started) * 1000, (finished - checked_out) * 1000
+
+def pool_usage():
+    """(connections checked out, max connections) of this worker's primary pool"""
+    pool = primary_pool.pool
+    return (pool._connections if pool is not None else 0), primary_pool.max_connections
+
+def pool_status():
+    """Checked-out connections, long-held ones, leak counters and pool metrics"""
+    now = time.monotonic()
+    with _checkout_lock:
+        held = list(_checked_out.values())
+        stats = dict(_leak_stats)
+        sites = _unclosed_sites.most_common(10)
+    long_held = sorted(
+        ({'borrower': borrower, 'thread': thread, 'held_seconds': round(now - borrowed_at, 1)}
+         for borrowed_at, borrower, thread in held if now - borrowed_at >= DB_LEAK_WARN_SECONDS),
+        key=lambda item: -item['held_seconds']
+    )
+    status = dict(stats, checked_out=len(held), long_held=long_held,
+                  unclosed_sites=[{'borrower': site, 'count': count} for site, count in sites])
+    status['pool'] = primary_pool.metrics()
+    if replica_pools:
+        status['replicas'] = [
+            dict(pool.metrics(),
+                 lag_seconds=pool.lag_seconds,
+                 down=pool.down_until > now,
+                 max_lag_seconds=DB_REPLICA_MAX_LAG)
+            for pool in replica_pools
+        ]
+    return status
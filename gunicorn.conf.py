@@ -0,0 +1,45 @@
+"""Gunicorn settings
+
+Each worker process owns its own database pool, so the connections this
+service can open are workers x DB_POOL_MAX_CONNECTIONS. Keep that below
+MySQL max_connections minus what other clients need.
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', 8002)}"
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+threads = int(os.getenv('GUNICORN_THREADS', 1))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+
+# Workers write their metrics here so /metrics can report all of them;
+# set before any worker imports prometheus_client
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/ostrich_prometheus')
+
+def on_starting(server):
+    from metrics import reset_multiprocess_dir
+    reset_multiprocess_dir()
+
+def when_ready(server):
+    from database import DB_POOL_MAX_CONNECTIONS
+    server.log.info(
+        "Database connections: up to %s (%s workers x %s per pool)",
+        workers * DB_POOL_MAX_CONNECTIONS, workers, DB_POOL_MAX_CONNECTIONS
+    )
+
+def post_fork(server, worker):
+    # Read by cache_config, which turns a per-process cache off with several workers
+    os.environ['GUNICORN_WORKERS'] = str(server.cfg.workers)
+    # Open the pool's idle connections before the worker takes traffic
+    from database import warm_pool
+    if warm_pool():
+        worker.log.info("Worker %s: database pool warmed", worker.pid)
+    else:
+        worker.log.warning("Worker %s: database pool warm-up failed; connecting on first use", worker.pid)
+
+    # Pick up import jobs left queued or running by workers that exited
+    from import_jobs import start_import_workers
+    start_import_workers()
+
+def child_exit(server, worker):
+    from metrics import mark_worker_dead
+    mark_worker_dead(worker.pid)
@@ -0,0 +1,173 @@
+"""Liveness and readiness probes
+
+GET /api/v1/health/live only says the worker answers requests; restart the
+instance when it fails. GET /api/v1/health/ready runs the dependency checks
+and answers 503 when any fails, so the load balancer stops routing to the
+instance until it recovers:
+
+- database: checkout from the primary pool within HEALTH_DB_TIMEOUT and a
+  SELECT 1 round trip, each below HEALTH_MAX_DB_MS
+- disk: free space of every upload and import directory above HEALTH_MIN_FREE_MB
+- saturation: this worker's request threads were busy less than
+  HEALTH_MAX_BUSY_RATIO of the time since the previous check, another
+  thread besides the probe's is free, and a pooled connection is free.
+  The probe only runs on a free thread, so with one sync thread the
+  busy ratio is what shows saturation
+
+Results are cached per worker for HEALTH_CACHE_SECONDS and only one thread
+runs the checks at a time, so frequent polling costs one checkout and one
+query per interval. /api/v1/health is kept as the liveness probe it always
+was.
+"""
+from datetime import datetime
+import os
+import shutil
+import threading
+import time
+import logging
+
+from flask import Blueprint, g, jsonify
+import database
+from import_jobs import IMPORT_SPOOL_DIR
+
+logger = logging.getLogger(__name__)
+
+# Seconds a readiness result is reused
+HEALTH_CACHE_SECONDS = float(os.getenv('HEALTH_CACHE_SECONDS', 2))
+# Longest wait for a pooled connection before the database check fails
+HEALTH_DB_TIMEOUT = float(os.getenv('HEALTH_DB_TIMEOUT', 1))
+# Checkout or SELECT 1 slower than this (ms) fails the database check
+HEALTH_MAX_DB_MS = float(os.getenv('HEALTH_MAX_DB_MS', 500))
+HEALTH_MIN_FREE_MB = int(os.getenv('HEALTH_MIN_FREE_MB', 500))
+# Request threads per worker (gunicorn threads setting)
+WORKER_THREADS = int(os.getenv('GUNICORN_THREADS', 1))
+# Share of request-thread time spent on requests that fails the saturation check
+HEALTH_MAX_BUSY_RATIO = float(os.getenv('HEALTH_MAX_BUSY_RATIO', 0.9))
+
+UPLOAD_DIRS = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads', 'product_images'),
+    os.path.join(os.getcwd(), 'static', 'uploads'),
+    IMPORT_SPOOL_DIR
+]
+
+_lock = threading.Lock()
+_in_flight_lock = threading.Lock()
+_in_flight = {}  # request token -> monotonic start
+_window_start = time.monotonic()
+_busy_seconds = 0.0  # request time since _window_start, finished requests only
+_cached = None  # (checked at monotonic, ready, checks)
+
+def _existing_parent(path):
+    """path or its closest existing ancestor, for directories not created yet"""
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+def check_database():
+    try:
+        checkout_ms, query_ms = database.ping(HEALTH_DB_TIMEOUT)
+    except Exception as e:
+        return {'ok': False, 'error': str(e)}
+    return {
+        'ok': checkout_ms <= HEALTH_MAX_DB_MS and query_ms <= HEALTH_MAX_DB_MS,
+        'checkout_ms': round(checkout_ms, 1),
+        'query_ms': round(query_ms, 1),
+        'max_ms': HEALTH_MAX_DB_MS
+    }
+
+def check_disk():
+    paths = []
+    for path in UPLOAD_DIRS:
+        try:
+            free_mb = shutil.disk_usage(_existing_parent(path)).free // (1024 * 1024)
+        except OSError as e:
+            paths.append({'path': path, 'ok': False, 'error': str(e)})
+            continue
+        paths.append({'path': path, 'ok': free_mb >= HEALTH_MIN_FREE_MB, 'free_mb': free_mb})
+    return {'ok': all(item['ok'] for item in paths), 'min_free_mb': HEALTH_MIN_FREE_MB, 'paths': paths}
+
+def check_saturation():
+    global _window_start, _busy_seconds
+    own = g.get('health_request')
+    now = time.monotonic()
+    with _in_flight_lock:
+        # The probe itself is in flight too; only the other requests count
+        others = [started for token, started in _in_flight.items() if token is not own]
+        busy_seconds = _busy_seconds + sum(now - max(started, _window_start) for started in others)
+        window = now - _window_start
+        _window_start, _busy_seconds = now, 0.0
+    busy_ratio = min(1.0, busy_seconds / (window * WORKER_THREADS)) if window > 0 else 0.0
+    # With several threads, the probe holding the last free one means the worker is full
+    threads_full = WORKER_THREADS > 1 and len(others) >= WORKER_THREADS - 1
+    in_use, max_connections = database.pool_usage()
+    return {
+        'ok': busy_ratio < HEALTH_MAX_BUSY_RATIO and not threads_full and in_use < max_connections,
+        'busy_ratio': round(busy_ratio, 3),
+        'max_busy_ratio': HEALTH_MAX_BUSY_RATIO,
+        'window_seconds': round(window, 1),
+        'busy_threads': len(others),
+        'threads': WORKER_THREADS,
+        'pool_in_use': in_use,
+        'pool_max': max_connections
+    }
+
+CHECKS = {'database': check_database, 'disk': check_disk, 'saturation': check_saturation}
+
+def readiness():
+    """(ready, checks, age in seconds) using the cached result when it is fresh"""
+    global _cached
+    cached = _cached
+    if cached is None or time.monotonic() - cached[0] >= HEALTH_CACHE_SECONDS:
+        # Threads that find the checks already running reuse the previous result
+        if _lock.acquire(blocking=cached is None):
+            try:
+                cached = _cached
+                if cached is None or time.monotonic() - cached[0] >= HEALTH_CACHE_SECONDS:
+                    checks = {name: check() for name, check in CHECKS.items()}
+                    ready = all(result['ok'] for result in checks.values())
+                    if not ready and (_cached is None or _cached[1]):
+                        logger.warning("Instance not ready: %s",
+                                       ', '.join(name for name, result in checks.items() if not result['ok']))
+                    cached = _cached = (time.monotonic(), ready, checks)
+            finally:
+                _lock.release()
+    return cached[1], cached[2], time.monotonic() - cached[0]
+
+def init_app(app):
+    """Track the requests this worker is handling for the saturation check"""
+
+    @app.before_request
+    def count_request_start():
+        g.health_request = token = object()
+        with _in_flight_lock:
+            _in_flight[token] = time.monotonic()
+
+    @app.teardown_request
+    def count_request_end(exc=None):
+        global _busy_seconds
+        token = g.pop('health_request', None)
+        with _in_flight_lock:
+            started = _in_flight.pop(token, None)
+            if started is not None:
+                _busy_seconds += time.monotonic() - max(started, _window_start)
+
+def register_health_routes(app):
+    """Register the liveness and readiness probes"""
+    bp = Blueprint('health', __name__)
+
+    @bp.route('/api/v1/health/live', methods=['GET'])
+    def liveness():
+        """The worker is up; no dependencies are checked"""
+        return jsonify({'status': 'alive', 'pid': os.getpid(), 'timestamp': datetime.now().isoformat()})
+
+    @bp.route('/api/v1/health/ready', methods=['GET'])
+    def readiness_probe():
+        """Dependency checks, 503 when the instance should not get traffic"""
+        ready, checks, age = readiness()
+        body = {'status': 'ready' if ready else 'not_ready', 'checks': checks, 'cached_seconds': round(age, 1)}
+        return jsonify(body), 200 if ready else 503
+
+    app.register_blueprint(bp)
@@ -0,0 +1,490 @@
+"""Set-based Excel import pipeline
+
+Rows are cleaned column-wise with pandas, existing customers, products and
+enquiry fingerprints are prefetched into dicts with a few IN (...) queries,
+customer codes and document numbers are reserved from sequence_service in
+one block each, and new rows are written with chunked multi-row INSERTs.
+A chunk that fails is retried row by row so the error report still names
+the offending rows.
+
+pandas and openpyxl are imported by the functions that use them, so
+workers only load them once the first sheet is imported.
+"""
+from datetime import datetime
+import importlib.util
+import os
+import pymysql
+from dashboard_counters import record_changes
+from sequence_service import next_numbers
+from customer_search import index_customers
+
+PANDAS_AVAILABLE = all(importlib.util.find_spec(name) for name in ('pandas', 'openpyxl'))
+
+# Rows per multi-row INSERT and values per prefetch IN (...) list
+IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', 500))
+
+ENQUIRY_STATUSES = ('NEW', 'CONTACTED', 'QUOTED', 'CONVERTED', 'CLOSED')
+
+INSERT_ENQUIRY_SQL = """
+    INSERT INTO enquiries (enquiry_number, customer_id, product_id, quantity, message, status, created_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+INSERT_SERVICE_TICKET_SQL = """
+    INSERT INTO service_tickets
+    (ticket_number, customer_id, product_id, issue_description, priority, status,
+    assigned_staff_id, warranty_status, resolution_details, remarks, created_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+SERVICE_TICKET_PRIORITIES = {'Low': 'LOW', 'Medium': 'MEDIUM', 'High': 'HIGH', 'Critical': 'CRITICAL'}
+SERVICE_TICKET_STATUSES = {
+    'Open': 'OPEN', 'In Progress': 'IN_PROGRESS', 'Completed': 'CLOSED', 'Closed': 'CLOSED', 'Resolved': 'RESOLVED'
+}
+
+def read_sheet(file):
+    """Load the first worksheet of an uploaded .xlsx file"""
+    import pandas as pd
+    return pd.read_excel(file, engine='openpyxl')
+
+def chunked(items, size=IMPORT_CHUNK_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def match_key(value):
+    """Approximate MySQL's case-insensitive, trailing-space-insensitive compare"""
+    return str(value).rstrip().casefold()
+
+def _text_column(df, column, default=''):
+    """str(value).strip(), as the row-by-row importer did ('nan' included)"""
+    import pandas as pd
+    if column not in df.columns:
+        return pd.Series([str(default).strip()] * len(df), index=df.index, dtype=object)
+    return df[column].astype(str).str.strip()
+
+def _optional_text_column(df, column):
+    """Stripped text, '' for blank cells"""
+    import pandas as pd
+    if column not in df.columns:
+        return pd.Series([''] * len(df), index=df.index, dtype=object)
+    values = df[column]
+    return values.astype(str).str.strip().where(values.notna(), '')
+
+def clean_enquiry_frame(df):
+    """Normalize an enquiries sheet into one row per import candidate
+
+    Adds row_number (the Excel row) and error (None for valid rows).
+    Errors are (row_number, message) tuples.
+    """
+    import pandas as pd
+    clean = pd.DataFrame(index=df.index)
+    clean['row_number'] = df.index + 2
+    clean['customer_name'] = _text_column(df, 'Customer Name')
+    clean['phone'] = _text_column(df, 'Contact Number').str.replace(' ', '', regex=False).str.strip()
+    clean['product_name'] = _optional_text_column(df, 'Product')
+    clean['message'] = _optional_text_column(df, 'Message')
+
+    status = _text_column(df, 'Status', 'NEW').str.upper()
+    clean['status'] = status.where(status.isin(ENQUIRY_STATUSES), 'NEW')
+
+    clean['error'] = None
+    if 'Quantity' in df.columns:
+        raw = df['Quantity']
+        numeric = pd.to_numeric(raw, errors='coerce')
+        bad = raw.notna() & numeric.isna()
+        clean['quantity'] = numeric.fillna(1).where(~bad, 1).astype('int64')
+        clean.loc[bad, 'error'] = pd.Series(
+            [(n, f"Invalid quantity '{v}'") for n, v in zip(clean['row_number'][bad], raw[bad])],
+            index=clean.index[bad], dtype=object
+        )
+    else:
+        clean['quantity'] = 1
+
+    missing_name = clean['error'].isna() & (clean['customer_name'] == '')
+    clean.loc[missing_name, 'error'] = pd.Series(
+        [(n, 'Missing customer name') for n in clean['row_number'][missing_name]],
+        index=clean.index[missing_name], dtype=object
+    )
+    return clean
+
+def clean_service_ticket_frame(df):
+    """Normalize a service tickets sheet; same row_number/error columns"""
+    import pandas as pd
+    clean = pd.DataFrame(index=df.index)
+    clean['row_number'] = df.index + 2
+    clean['customer_name'] = _text_column(df, 'Customer Name')
+    clean['phone'] = _text_column(df, 'Contact Number').str.replace(' ', '', regex=False).str.strip()
+    clean['email'] = _optional_text_column(df, 'Customer Email ID')
+    clean['city'] = _optional_text_column(df, 'Customer Location-CITY')
+    clean['state'] = _optional_text_column(df, 'Customer Location - STATE')
+    clean['issue'] = _text_column(df, 'Issue Reported')
+    clean['product_name'] = _optional_text_column(df, 'Product Model')
+    clean['engineer'] = _optional_text_column(df, 'Name of the Service Engineer Assigned').str.split().str[0].fillna('')
+    clean['resolution'] = _optional_text_column(df, 'Resolution Details')
+    clean['remarks'] = _optional_text_column(df, 'Remarks')
+
+    priority = _text_column(df, 'Issue priority', 'Medium').str.title()
+    clean['priority'] = priority.map(SERVICE_TICKET_PRIORITIES).fillna('MEDIUM')
+    status = _text_column(df, 'Status', 'Open').str.title()
+    clean['status'] = status.map(SERVICE_TICKET_STATUSES).fillna('OPEN')
+    warranty = _text_column(df, 'Within Warranty or OUT side Warranty', 'NO').str.upper()
+    clean['warranty_status'] = warranty.str.startswith('YES') | warranty.str.startswith('WITHIN')
+    clean['warranty_status'] = clean['warranty_status'].map({True: 'Yes', False: 'No'})
+
+    now = datetime.now()
+    if 'Issue Reported Date' in df.columns:
+        reported = pd.to_datetime(df['Issue Reported Date'], dayfirst=True, errors='coerce')
+        dates = [now if pd.isna(d) else d.to_pydatetime() for d in reported]
+    else:
+        dates = [now] * len(df)
+    clean['issue_date'] = pd.Series(dates, index=df.index, dtype=object)
+
+    clean['error'] = None
+    missing_name = clean['customer_name'] == ''
+    clean.loc[missing_name, 'error'] = pd.Series(
+        [(n, 'Missing customer name') for n in clean['row_number'][missing_name]],
+        index=clean.index[missing_name], dtype=object
+    )
+    return clean
+
+def _rank(ref):
+    """Existing customers (int ids) beat ones created by this import"""
+    return (1, ref[1]) if isinstance(ref, tuple) else (0, ref)
+
+def _keep_best(index, key, ref):
+    current = index.get(key)
+    if current is None or _rank(ref) < _rank(current):
+        index[key] = ref
+
+class CustomerMatcher:
+    """Resolve sheet rows to customers, existing or created by this import
+
+    Existing customers are ints; customers this import will create are
+    ('new', n) refs until create_customers() assigns their ids. Lookups
+    prefer the lowest existing id, like the old LIMIT 1 queries did.
+    """
+
+    def __init__(self):
+        self.by_name = {}
+        self.by_phone = {}
+        self.by_fragment = {}
+        self.fragment_lengths = set()
+        self.new_customers = []  # (row_number, {column: value})
+
+    def prefetch(self, cursor, names, phones):
+        """Load existing customers whose name or phone appears in the sheet"""
+        lookups = [('contact_person', sorted(set(names))), ('phone', sorted(set(p for p in phones if p)))]
+        for column, values in lookups:
+            for chunk in chunked(values):
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(f"SELECT id, contact_person, phone FROM customers WHERE {column} IN ({placeholders})", chunk)
+                for row in cursor.fetchall():
+                    if row['contact_person'] is not None:
+                        _keep_best(self.by_name, match_key(row['contact_person']), row['id'])
+                    if row['phone']:
+                        _keep_best(self.by_phone, match_key(row['phone']), row['id'])
+
+    def prefetch_fragments(self, cursor, fragments):
+        """Index existing phones by substring for phone LIKE '%fragment%' matching"""
+        self.fragment_lengths = set(len(f) for f in fragments if f)
+        if not self.fragment_lengths:
+            return
+        cursor.execute("SELECT id, phone FROM customers WHERE phone IS NOT NULL AND phone != ''")
+        for row in cursor.fetchall():
+            self._index_fragments(row['phone'], row['id'])
+
+    def _index_fragments(self, phone, ref):
+        phone = match_key(phone)
+        for length in self.fragment_lengths:
+            for start in range(0, len(phone) - length + 1):
+                _keep_best(self.by_fragment, phone[start:start + length], ref)
+
+    def existing_ids(self):
+        refs = list(self.by_name.values()) + list(self.by_phone.values()) + list(self.by_fragment.values())
+        return set(ref for ref in refs if not isinstance(ref, tuple))
+
+    def find(self, name, phone, fragment=None):
+        refs = [self.by_name.get(match_key(name))]
+        if phone:
+            refs.append(self.by_phone.get(match_key(phone)))
+        refs = [ref for ref in refs if ref is not None]
+        if not refs and fragment:
+            refs = [ref for ref in [self.by_fragment.get(match_key(fragment))] if ref is not None]
+        return min(refs, key=_rank) if refs else None
+
+    def add(self, row_number, values):
+        """Register a customer to be created; returns its ref"""
+        ref = ('new', len(self.new_customers))
+        self.new_customers.append((row_number, values))
+        _keep_best(self.by_name, match_key(values['contact_person']), ref)
+        if values['phone']:
+            _keep_best(self.by_phone, match_key(values['phone']), ref)
+            self._index_fragments(values['phone'], ref)
+        return ref
+
+def create_customers(conn, cursor, matcher, errors, now):
+    """Insert the matcher's new customers with a block of codes
+
+    Returns {ref: customer id} for the customers that were written.
+    """
+    if not matcher.new_customers:
+        return {}
+
+    columns = list(matcher.new_customers[0][1])
+    sql = "INSERT INTO customers (customer_code, {}, created_at) VALUES ({})".format(
+        ', '.join(columns), ', '.join(['%s'] * (len(columns) + 2))
+    )
+    codes = next_numbers(cursor, 'customer', len(matcher.new_customers))
+    rows = [
+        tuple([code] + [values[c] for c in columns] + [now])
+        for code, (_, values) in zip(codes, matcher.new_customers)
+    ]
+    written = insert_rows(conn, cursor, sql, rows, [n for n, _ in matcher.new_customers], errors)
+
+    id_by_code = {}
+    for chunk in chunked([codes[i] for i in written]):
+        placeholders = ', '.join(['%s'] * len(chunk))
+        cursor.execute(
+            f"SELECT id, customer_code FROM customers WHERE customer_code IN ({placeholders})",
+            chunk
+        )
+        for found in cursor.fetchall():
+            id_by_code[found['customer_code']] = found['id']
+
+    customer_ids = {('new', i): id_by_code[codes[i]] for i in written if codes[i] in id_by_code}
+    record_changes(cursor, 'customers', [(None, {})] * len(customer_ids))
+    for chunk in chunked(list(customer_ids.values())):
+        index_customers(cursor, chunk)
+    conn.commit()
+    return customer_ids
+
+def resolve_customers(pending, customer_ids, errors):
+    """Swap ('new', n) refs for ids; rows whose customer failed become errors"""
+    resolved = []
+    for row_number, customer_ref, values in pending:
+        if isinstance(customer_ref, tuple):
+            if customer_ref not in customer_ids:
+                errors.append((row_number, 'Customer could not be created'))
+                continue
+            customer_ref = customer_ids[customer_ref]
+        resolved.append((row_number, customer_ref, values))
+    return resolved
+
+def prefetch_products(cursor, names):
+    """Map product name keys to the lowest matching product id"""
+    by_name = {}
+    for chunk in chunked(sorted(set(n for n in names if n))):
+        placeholders = ', '.join(['%s'] * len(chunk))
+        cursor.execute(f"SELECT id, name FROM products WHERE name IN ({placeholders})", chunk)
+        for row in cursor.fetchall():
+            key = match_key(row['name'])
+            by_name[key] = min(by_name.get(key, row['id']), row['id'])
+    return by_name
+
+def prefetch_engineers(cursor, first_names):
+    """Map first name keys to a user id, preferring service staff"""
+    by_name = {}
+    for chunk in chunked(sorted(set(n for n in first_names if n))):
+        placeholders = ', '.join(['%s'] * len(chunk))
+        cursor.execute(f"SELECT id, first_name, role FROM users WHERE first_name IN ({placeholders})", chunk)
+        for row in cursor.fetchall():
+            key = match_key(row['first_name'])
+            rank = (0 if row['role'] == 'service_staff' else 1, row['id'])
+            if key not in by_name or rank < by_name[key][0]:
+                by_name[key] = (rank, row['id'])
+    return {key: user_id for key, (_, user_id) in by_name.items()}
+
+def prefetch_fingerprints(cursor, table, columns, customer_ids):
+    """Tuples of (customer_id, *column keys) for rows of existing customers"""
+    fingerprints = set()
+    for chunk in chunked(sorted(set(customer_ids))):
+        placeholders = ', '.join(['%s'] * len(chunk))
+        cursor.execute(
+            f"SELECT customer_id, {', '.join(columns)} FROM {table} WHERE customer_id IN ({placeholders})",
+            chunk
+        )
+        for row in cursor.fetchall():
+            fingerprints.add((row['customer_id'],) + tuple(match_key(row[c] or '') for c in columns))
+    return fingerprints
+
+def insert_rows(conn, cursor, sql, rows, row_numbers, errors, on_chunk=None):
+    """executemany in chunks; retries a failed chunk row by row
+
+    Returns the indexes (into rows) that were written. on_chunk(n) is
+    called with the number of rows handled after every chunk.
+    """
+    written = []
+    for chunk_indexes in chunked(range(len(rows))):
+        chunk = [rows[i] for i in chunk_indexes]
+        try:
+            # Connections autocommit, and pymysql splits a chunk over its
+            # statement size limit into several INSERTs; the transaction lets
+            # the rollback undo the ones that ran before a failure
+            conn.begin()
+            cursor.executemany(sql, chunk)
+            conn.commit()
+            written.extend(chunk_indexes)
+        except Exception:
+            conn.rollback()
+            for i in chunk_indexes:
+                try:
+                    cursor.execute(sql, rows[i])
+                    written.append(i)
+                except Exception as e:
+                    errors.append((row_numbers[i], str(e)))
+            conn.commit()
+        if on_chunk:
+            on_chunk(len(chunk_indexes))
+    return written
+
+class _Progress:
+    """Counts handled rows and forwards the running total to a callback"""
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.processed = 0
+
+    def add(self, count):
+        self.processed += count
+        if self.callback and count:
+            self.callback(self.processed)
+
+def _summary(kind, df, imported, duplicates, errors):
+    errors.sort(key=lambda e: e[0])
+    return {
+        'message': f'{duplicates} duplicates removed. Imported {imported} {kind}.',
+        'imported': imported,
+        'total': len(df),
+        'duplicates': duplicates,
+        'errors': [f"Row {row_number}: {message}" for row_number, message in errors[:10]]
+    }
+
+def import_enquiries_frame(conn, df, progress=None):
+    """Import an enquiries sheet; returns the import summary dict
+
+    progress(processed_rows) is called as rows are handled.
+    """
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    tracker = _Progress(progress)
+    clean = clean_enquiry_frame(df)
+    errors = [e for e in clean['error'] if e is not None]
+    rows = clean[clean['error'].isna()]
+
+    # Prefetch everything the per-row lookups used to query
+    matcher = CustomerMatcher()
+    matcher.prefetch(cursor, rows['customer_name'], rows['phone'])
+    products = prefetch_products(cursor, rows['product_name'])
+    fingerprints = prefetch_fingerprints(cursor, 'enquiries', ('message', 'status'), matcher.existing_ids())
+
+    pending = []
+    duplicates = 0
+    for row in rows.itertuples(index=False):
+        customer_ref = matcher.find(row.customer_name, row.phone)
+        if customer_ref is None:
+            customer_ref = matcher.add(row.row_number, {
+                'contact_person': row.customer_name, 'phone': row.phone[:15], 'address': '', 'pin_code': ''
+            })
+
+        fingerprint = (customer_ref, match_key(row.message), match_key(row.status))
+        if fingerprint in fingerprints:
+            duplicates += 1
+            continue
+        fingerprints.add(fingerprint)
+
+        product_id = products.get(match_key(row.product_name)) if row.product_name else None
+        pending.append((row.row_number, customer_ref, (product_id, int(row.quantity), row.message, row.status)))
+    tracker.add(len(df) - len(pending))
+
+    now = datetime.now()
+    customer_ids = create_customers(conn, cursor, matcher, errors, now)
+    resolved = resolve_customers(pending, customer_ids, errors)
+    tracker.add(len(pending) - len(resolved))
+
+    # Allocate enquiry numbers as one block and insert
+    imported = 0
+    if resolved:
+        numbers = next_numbers(cursor, 'enquiry', len(resolved))
+        enquiry_rows = [
+            (number, customer_id) + values + (now,)
+            for number, (_, customer_id, values) in zip(numbers, resolved)
+        ]
+        written = insert_rows(conn, cursor, INSERT_ENQUIRY_SQL, enquiry_rows,
+                              [r[0] for r in resolved], errors, tracker.add)
+        imported = len(written)
+        record_changes(cursor, 'enquiries', [(None, {'status': resolved[i][2][3]}) for i in written])
+        conn.commit()
+
+    return _summary('enquiries', df, imported, duplicates, errors)
+
+def import_service_tickets_frame(conn, df, progress=None):
+    """Import a service tickets sheet; returns the import summary dict"""
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    tracker = _Progress(progress)
+    clean = clean_service_ticket_frame(df)
+    errors = [e for e in clean['error'] if e is not None]
+    rows = clean[clean['error'].isna()]
+
+    matcher = CustomerMatcher()
+    matcher.prefetch(cursor, rows['customer_name'], rows['phone'])
+    # Rows with no exact match fall back to phone LIKE '%<last 10 digits>%'
+    unmatched_phones = [
+        row.phone[-10:] for row in rows.itertuples(index=False)
+        if row.phone and matcher.find(row.customer_name, row.phone) is None
+    ]
+    matcher.prefetch_fragments(cursor, unmatched_phones)
+    products = prefetch_products(cursor, rows['product_name'])
+    engineers = prefetch_engineers(cursor, rows['engineer'])
+    fingerprints = prefetch_fingerprints(
+        cursor, 'service_tickets', ('issue_description', 'priority', 'status'), matcher.existing_ids()
+    )
+
+    pending = []
+    duplicates = 0
+    for row in rows.itertuples(index=False):
+        customer_ref = matcher.find(row.customer_name, row.phone, row.phone[-10:] if row.phone else None)
+        if customer_ref is None:
+            customer_ref = matcher.add(row.row_number, {
+                'contact_person': row.customer_name, 'phone': row.phone[:15], 'email': row.email,
+                'city': row.city, 'state': row.state, 'address': '', 'pin_code': ''
+            })
+
+        fingerprint = (customer_ref, match_key(row.issue), match_key(row.priority), match_key(row.status))
+        if fingerprint in fingerprints:
+            duplicates += 1
+            continue
+        fingerprints.add(fingerprint)
+
+        product_id = products.get(match_key(row.product_name)) if row.product_name else None
+        engineer_id = engineers.get(match_key(row.engineer)) if row.engineer else None
+        pending.append((row.row_number, customer_ref, (
+            product_id, row.issue, row.priority, row.status, engineer_id,
+            row.warranty_status, row.resolution, row.remarks, row.issue_date
+        )))
+    tracker.add(len(df) - len(pending))
+
+    now = datetime.now()
+    customer_ids = create_customers(conn, cursor, matcher, errors, now)
+    resolved = resolve_customers(pending, customer_ids, errors)
+    tracker.add(len(pending) - len(resolved))
+
+    imported = 0
+    if resolved:
+        numbers = next_numbers(cursor, 'service_ticket', len(resolved))
+        ticket_rows = [
+            (number, customer_id) + values
+            for number, (_, customer_id, values) in zip(numbers, resolved)
+        ]
+        written = insert_rows(conn, cursor, INSERT_SERVICE_TICKET_SQL, ticket_rows,
+                              [r[0] for r in resolved], errors, tracker.add)
+        imported = len(written)
+        record_changes(cursor, 'service_tickets', [(None, {})] * imported)
+        conn.commit()
+
+    return _summary('tickets', df, imported, duplicates, errors)
+
+# kind -> (importer, cache tags the import invalidates)
+IMPORTERS = {
+    'enquiries': (import_enquiries_frame, ('enquiries', 'customers')),
+    'service_tickets': (import_service_tickets_frame, ('service_tickets', 'customers'))
+}
@@ -0,0 +1,318 @@
+"""Background Excel import jobs
+
+Uploads are spooled to IMPORT_SPOOL_DIR and processed by a per-process
+thread pool; the import_jobs table is both the job record and the queue
+(workers claim a job by flipping it from queued to running).
+
+Each gunicorn worker runs recover_import_jobs() once after it forks, so
+jobs left behind by a worker that exited are picked up again.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+import pymysql
+from database import get_db
+from cache_config import invalidate_tags
+from import_engine import IMPORTERS, read_sheet
+import metrics
+import logging
+
+logger = logging.getLogger(__name__)
+
+IMPORT_SPOOL_DIR = os.getenv('IMPORT_SPOOL_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads', 'imports'))
+IMPORT_WORKERS = int(os.getenv('IMPORT_WORKERS', 2))
+# Minimum seconds between progress writes to import_jobs
+IMPORT_PROGRESS_INTERVAL = float(os.getenv('IMPORT_PROGRESS_INTERVAL', 1.0))
+# Queued jobs older than this with a local spool file are picked up again
+# when a worker starts
+IMPORT_RECOVER_AFTER = int(os.getenv('IMPORT_RECOVER_AFTER', 60))
+# Running jobs started longer ago than this are requeued even if their worker
+# still seems alive; jobs of a dead worker on this host are requeued at once
+IMPORT_RUNNING_TIMEOUT = int(os.getenv('IMPORT_RUNNING_TIMEOUT', 3600))
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS import_jobs (
+        id CHAR(32) NOT NULL PRIMARY KEY,
+        kind VARCHAR(32) NOT NULL,
+        filename VARCHAR(255),
+        spool_path VARCHAR(512),
+        status VARCHAR(16) NOT NULL DEFAULT 'queued',
+        total_rows INT NOT NULL DEFAULT 0,
+        processed_rows INT NOT NULL DEFAULT 0,
+        imported INT NOT NULL DEFAULT 0,
+        duplicates INT NOT NULL DEFAULT 0,
+        errors TEXT,
+        message VARCHAR(500),
+        created_by VARCHAR(64),
+        worker VARCHAR(128),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        started_at DATETIME NULL,
+        finished_at DATETIME NULL,
+        INDEX idx_import_jobs_status (status, created_at)
+    )
+"""
+
+JOB_COLUMNS = """
+    id, kind, filename, status, total_rows, processed_rows, imported, duplicates,
+    errors, message, created_by, created_at, started_at, finished_at
+"""
+
+_executor = None
+_executor_lock = threading.Lock()
+_table_ready = False
+_running_jobs = set()  # ids this process is working on
+
+def _worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def _ensure_table(cursor):
+    global _table_ready
+    if not _table_ready:
+        cursor.execute(CREATE_TABLE_SQL)
+        _table_ready = True
+
+def _worker_alive(worker):
+    """False when worker (host:pid) is a process on this host that has exited"""
+    host, _, pid = (worker or '').rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit():
+        return True  # another host's worker, judged by IMPORT_RUNNING_TIMEOUT only
+    if int(pid) == os.getpid():
+        return False  # a pid reused by this process after a restart
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _get_executor():
+    """Thread pool for this process, created after any gunicorn fork
+
+    Creating it schedules recover_import_jobs(); gunicorn.conf.py does so
+    in post_fork so recovery does not wait for the next upload.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=IMPORT_WORKERS, thread_name_prefix='import-job')
+                _executor.submit(recover_import_jobs)
+    return _executor
+
+def start_import_workers():
+    """Create this process's job pool now, which also starts recovery"""
+    _get_executor()
+
+def _current_identity():
+    try:
+        from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity()
+    except Exception:
+        return None
+
+def submit_import(kind, file):
+    """Spool an uploaded sheet, record a queued job and schedule it
+
+    Returns the job as a dict. Raises ValueError for unknown kinds.
+    """
+    if kind not in IMPORTERS:
+        raise ValueError(f'Unknown import type: {kind}')
+
+    job_id = uuid.uuid4().hex
+    os.makedirs(IMPORT_SPOOL_DIR, exist_ok=True)
+    spool_path = os.path.join(IMPORT_SPOOL_DIR, f"{job_id}.xlsx")
+    file.save(spool_path)
+
+    conn = get_db()
+    if not conn:
+        os.remove(spool_path)
+        raise RuntimeError('Database connection failed')
+    try:
+        cursor = conn.cursor()
+        _ensure_table(cursor)
+        cursor.execute("""
+            INSERT INTO import_jobs (id, kind, filename, spool_path, status, created_by)
+            VALUES (%s, %s, %s, %s, 'queued', %s)
+        """, (job_id, kind, (file.filename or '')[:255], spool_path, _current_identity()))
+        conn.commit()
+    except Exception:
+        # Without a job row nothing would ever process or remove the upload
+        os.remove(spool_path)
+        raise
+    finally:
+        conn.close()
+
+    _get_executor().submit(run_import_job, job_id)
+    return {
+        'job_id': job_id,
+        'kind': kind,
+        'status': 'queued',
+        'status_url': f'/api/v1/imports/{job_id}'
+    }
+
+def run_import_job(job_id):
+    """Claim and process one queued job; safe to call for any job id"""
+    conn = get_db()
+    if not conn:
+        logger.error("Import job %s: database connection failed", job_id)
+        return
+    spool_path = None
+    kind = 'unknown'
+    started = time.monotonic()
+    try:
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        cursor.execute("""
+            UPDATE import_jobs SET status = 'running', started_at = NOW(), worker = %s
+            WHERE id = %s AND status = 'queued'
+        """, (_worker_name(), job_id))
+        conn.commit()
+        if cursor.rowcount == 0:
+            return  # already claimed or finished
+        _running_jobs.add(job_id)
+
+        cursor.execute("SELECT kind, spool_path FROM import_jobs WHERE id = %s", (job_id,))
+        job = cursor.fetchone()
+        spool_path = job['spool_path']
+        kind = job['kind']
+        importer, tags = IMPORTERS[kind]
+
+        df = read_sheet(spool_path)
+        cursor.execute("UPDATE import_jobs SET total_rows = %s WHERE id = %s", (len(df), job_id))
+        conn.commit()
+
+        last_write = [0.0]
+        def report_progress(processed):
+            now = time.monotonic()
+            if now - last_write[0] >= IMPORT_PROGRESS_INTERVAL:
+                last_write[0] = now
+                cursor.execute("UPDATE import_jobs SET processed_rows = %s WHERE id = %s", (processed, job_id))
+                conn.commit()
+
+        result = importer(conn, df, report_progress)
+        cursor.execute("""
+            UPDATE import_jobs SET status = 'completed', processed_rows = total_rows,
+                imported = %s, duplicates = %s, errors = %s, message = %s, finished_at = NOW()
+            WHERE id = %s
+        """, (result['imported'], result['duplicates'], json.dumps(result['errors']),
+              result['message'][:500], job_id))
+        conn.commit()
+        invalidate_tags(*tags)
+        metrics.record_import_job(kind, 'completed', time.monotonic() - started, result['imported'],
+                                  result['duplicates'], max(0, len(df) - result['imported'] - result['duplicates']))
+    except Exception as e:
+        logger.exception("Import job %s failed: %s", job_id, e)
+        metrics.record_import_job(kind, 'failed', time.monotonic() - started)
+        try:
+            conn.rollback()
+            conn.cursor().execute("""
+                UPDATE import_jobs SET status = 'failed', message = %s, finished_at = NOW()
+                WHERE id = %s
+            """, (str(e)[:500], job_id))
+            conn.commit()
+        except Exception as update_error:
+            logger.error("Import job %s: could not record failure: %s", job_id, update_error)
+    finally:
+        _running_jobs.discard(job_id)
+        conn.close()
+        if spool_path and os.path.exists(spool_path):
+            os.remove(spool_path)
+
+def recover_import_jobs():
+    """Requeue stale queued jobs and abandoned running ones whose spool file is on this host
+
+    A running job is abandoned when its worker on this host has exited or
+    it started more than IMPORT_RUNNING_TIMEOUT seconds ago. Abandoned jobs
+    of this host whose spool file is gone are marked failed.
+    """
+    conn = get_db()
+    if not conn:
+        return 0
+    try:
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        _ensure_table(cursor)
+        cursor.execute("""
+            SELECT id, spool_path FROM import_jobs
+            WHERE status = 'queued' AND created_at < NOW() - INTERVAL %s SECOND
+        """, (IMPORT_RECOVER_AFTER,))
+        stale = [job['id'] for job in cursor.fetchall() if job['spool_path'] and os.path.exists(job['spool_path'])]
+
+        cursor.execute("""
+            SELECT id, spool_path, worker, started_at < NOW() - INTERVAL %s SECOND AS timed_out
+            FROM import_jobs WHERE status = 'running'
+        """, (IMPORT_RUNNING_TIMEOUT,))
+        for job in cursor.fetchall():
+            if job['id'] in _running_jobs or (not job['timed_out'] and _worker_alive(job['worker'])):
+                continue
+            local = (job['worker'] or '').rpartition(':')[0] == socket.gethostname()
+            if job['spool_path'] and os.path.exists(job['spool_path']):
+                # Guarded by worker so two recovering workers cannot both requeue it
+                cursor.execute("""
+                    UPDATE import_jobs SET status = 'queued', started_at = NULL, worker = NULL
+                    WHERE id = %s AND status = 'running' AND worker = %s
+                """, (job['id'], job['worker']))
+                if cursor.rowcount:
+                    logger.warning("Import job %s: requeued after worker %s stopped", job['id'], job['worker'])
+                    stale.append(job['id'])
+            elif local:
+                cursor.execute("""
+                    UPDATE import_jobs SET status = 'failed', message = %s, finished_at = NOW()
+                    WHERE id = %s AND status = 'running' AND worker = %s
+                """, ('Import worker stopped before the job finished', job['id'], job['worker']))
+        conn.commit()
+    except Exception as e:
+        logger.error("Import job recovery error: %s", e)
+        return 0
+    finally:
+        conn.close()
+    for job_id in stale:
+        _get_executor().submit(run_import_job, job_id)
+    return len(stale)
+
+def get_import_job(job_id):
+    """Job state as a JSON-ready dict, or None"""
+    conn = get_db()
+    if not conn:
+        raise RuntimeError('Database connection failed')
+    try:
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        _ensure_table(cursor)
+        cursor.execute(f"SELECT {JOB_COLUMNS} FROM import_jobs WHERE id = %s", (job_id,))
+        job = cursor.fetchone()
+    finally:
+        conn.close()
+    if not job:
+        return None
+
+    job['job_id'] = job.pop('id')
+    job['errors'] = json.loads(job['errors']) if job['errors'] else []
+    total = job['total_rows']
+    job['progress'] = round(100.0 * job['processed_rows'] / total, 1) if total else (
+        100.0 if job['status'] == 'completed' else 0.0
+    )
+    return job
+
+def register_import_job_routes(app):
+    """Register import job status routes"""
+    bp = Blueprint('import_jobs', __name__)
+
+    @bp.route('/api/v1/imports/<job_id>', methods=['GET'])
+    @jwt_required(optional=True)
+    def get_import_job_status(job_id):
+        try:
+            job = get_import_job(job_id)
+            if not job:
+                return jsonify({'error': 'Import job not found'}), 404
+            return jsonify(job)
+        except Exception as e:
+            logger.error("Import job status error: %s", e)
+            return jsonify({'error': str(e)}), 500
+
+    app.register_blueprint(bp)
@@ -0,0 +1,641 @@
+"""Local SQLite stand-in for the MySQL database
+
+With DB_BACKEND=sqlite, database.py opens connections from this module
+instead of pymysql, so the whole app (pools, get_db(), every route) runs
+against one SQLite file without a MySQL server or network access:
+
+    DB_BACKEND=sqlite DB_SQLITE_PATH=/tmp/ostrich.sqlite3 python seed_data.py
+    DB_BACKEND=sqlite DB_SQLITE_PATH=/tmp/ostrich.sqlite3 python app.py
+
+Connections and cursors mimic the pymysql API the code uses: %s
+placeholders, DictCursor/SSDictCursor rows, buffered results with
+rowcount, lastrowid and LAST_INSERT_ID(expr), autocommit, and pymysql
+exceptions with MySQL error codes (1146 for a missing table, 1062 for a
+duplicate key), so lazy table creation and the error handling paths
+behave as they do on MySQL.
+
+The MySQL dialect the repo's SQL uses is rewritten statement by statement
+(translate(), cached per SQL text): INSERT IGNORE, ON DUPLICATE KEY
+UPDATE, NOW() - INTERVAL n UNIT, GROUP_CONCAT(... SEPARATOR ...),
+MATCH ... AGAINST (... IN BOOLEAN MODE), SHOW TABLES LIKE, SHOW REPLICA
+STATUS (no rows, like a standalone server), RENAME TABLE, and CREATE
+TABLE with inline KEYs, AUTO_INCREMENT and ON UPDATE CURRENT_TIMESTAMP
+(emulated with a trigger). Text columns get COLLATE
+NOCASE to compare like MySQL's case-insensitive collations. MySQL
+functions without a SQLite equivalent are registered as Python functions.
+
+This is for benchmarks and CI, not production. Timings are SQLite's:
+FULLTEXT searches scan the table, and EXPLAIN output is SQLite's, so
+query_plans.py needs MySQL. Async mode (asgi_app.py) still needs MySQL.
+Times are UTC.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+import functools
+import re
+import sqlite3
+import threading
+import time
+import os
+import pymysql
+import logging
+
+from migrate import Schema
+
+logger = logging.getLogger(__name__)
+
+DB_SQLITE_PATH = os.getenv('DB_SQLITE_PATH', '/tmp/ostrich_local_db.sqlite3')
+# Simulated network round trip per statement, to make query counts show up
+# in timings the way they do against a remote MySQL server
+DB_SQLITE_LATENCY_MS = float(os.getenv('DB_SQLITE_LATENCY_MS', 0))
+
+_TEXT_TYPES = r'(?:VARCHAR\(\d+\)|CHAR\(\d+\)|TINYTEXT|MEDIUMTEXT|LONGTEXT|TEXT)'
+_INTERVAL_UNITS = {'SECOND': 'seconds', 'MINUTE': 'minutes', 'HOUR': 'hours', 'DAY': 'days',
+                   'MONTH': 'months', 'YEAR': 'years'}
+# MySQL DATE_FORMAT specifiers -> strftime
+_DATE_FORMATS = {'%Y': '%Y', '%y': '%y', '%m': '%m', '%c': '%-m', '%d': '%d', '%e': '%-d',
+                 '%H': '%H', '%k': '%-H', '%i': '%M', '%s': '%S', '%S': '%S', '%M': '%B',
+                 '%b': '%b', '%W': '%A', '%a': '%a', '%p': '%p', '%T': '%H:%M:%S', '%%': '%'}
+
+_PARAM = re.compile(r'%\((\w+)\)s|%s|%%')
+_INSERT_IGNORE = re.compile(r'\bINSERT\s+IGNORE\b', re.I)
+_ON_DUPLICATE = re.compile(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\b', re.I)
+_VALUES_REF = re.compile(r'\bVALUES\s*\(\s*(\w+)\s*\)', re.I)
+_INTERVAL = re.compile(r'(NOW\(\)|CURRENT_TIMESTAMP)\s*([-+])\s*INTERVAL\s+(\?|\d+)\s+(SECOND|MINUTE|HOUR|DAY|MONTH|YEAR)S?\b', re.I)
+_CAST_INTEGER = re.compile(r'\bAS\s+(?:UNSIGNED|SIGNED)(?:\s+INTEGER)?\s*\)', re.I)
+_CAST_CHAR = re.compile(r'\bAS\s+CHAR(?:\(\d+\))?\s*\)', re.I)
+_GROUP_CONCAT = re.compile(
+    r"\bGROUP_CONCAT\(\s*(DISTINCT\s+)?(.+?)(?:\s+ORDER\s+BY\s+[^)]+?)?\s+SEPARATOR\s+'([^']*)'\s*\)", re.I)
+_MATCH = re.compile(r'\bMATCH\s*\(([^)]*)\)\s*AGAINST\s*\(\s*(\?|\'[^\']*\')\s+IN\s+BOOLEAN\s+MODE\s*\)', re.I)
+_LOCKING_READ = re.compile(r'\s+(?:FOR\s+UPDATE(?:\s+SKIP\s+LOCKED|\s+NOWAIT)?|LOCK\s+IN\s+SHARE\s+MODE)\b', re.I)
+_SHOW_TABLES = re.compile(r'^SHOW\s+TABLES\s+LIKE\s+(\?|\'[^\']*\')\s*;?\s*$', re.I)
+_SHOW_REPLICA_STATUS = re.compile(r'^SHOW\s+(REPLICA|SLAVE)\s+STATUS\s*;?\s*$', re.I)
+_RENAME_TABLE = re.compile(r'^RENAME\s+TABLE\s+(.+?)\s*;?\s*$', re.I | re.S)
+_CREATE_TABLE = re.compile(r'^CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?\s*\((.*)\)[^)]*$', re.I | re.S)
+_CREATE_INDEX = re.compile(r'^CREATE\s+(UNIQUE\s+)?INDEX\s', re.I)
+_DROP_INDEX = re.compile(r'^DROP\s+INDEX\s+`?(\w+)`?\s+ON\s+`?\w+`?\s*;?\s*$', re.I)
+_ALTER_ADD = re.compile(r'^ALTER\s+TABLE\s+`?(\w+)`?\s+ADD\s+(?:COLUMN\s+)?(.+?)\s*;?\s*$', re.I | re.S)
+_PREFIX_LENGTH = re.compile(r'(\w)\s*\(\d+\)')
+_INLINE_KEY = re.compile(
+    r'^(PRIMARY\s+KEY|UNIQUE(?:\s+KEY|\s+INDEX)?|KEY|INDEX|FULLTEXT(?:\s+KEY|\s+INDEX)?)\s*`?(\w*)`?\s*\((.+)\)\s*(?:WITH\s+PARSER\s+\w+)?$',
+    re.I | re.S)
+
+# GROUP_CONCAT separators seen so far; each gets its own aggregate function
+_separators = []
+_separators_lock = threading.Lock()
+
+class _Rename:
+    """RENAME TABLE old TO new, renaming the table's inline indexes too
+
+    SQLite index names are global and survive ALTER TABLE ... RENAME, so the
+    {table}__{key} names given to inline KEYs are moved to the new table
+    name; otherwise a later CREATE TABLE under the old name would collide.
+    """
+
+    def __init__(self, old, new):
+        self.old = old
+        self.new = new
+
+    def __call__(self, db):
+        db.execute(f'ALTER TABLE "{self.old}" RENAME TO "{self.new}"')
+        prefix = f"{self.old}__"
+        rows = db.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                          (self.new,)).fetchall()
+        for name, sql in rows:
+            if name.startswith(prefix):
+                new_name = f"{self.new}__{name[len(prefix):]}"
+                db.execute(f'DROP INDEX "{name}"')
+                db.execute(sql.replace(f'"{name}"', f'"{new_name}"', 1))
+
+def _separator_function(separator):
+    with _separators_lock:
+        if separator not in _separators:
+            _separators.append(separator)
+        return f"group_concat_sep{_separators.index(separator)}"
+
+def _split_top_level(body):
+    """Split a comma-separated list, ignoring commas inside parentheses or quotes"""
+    parts, depth, quote, start = [], 0, None, 0
+    for i, char in enumerate(body):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(body[start:i].strip())
+            start = i + 1
+    parts.append(body[start:].strip())
+    return [part for part in parts if part]
+
+def _column_definition(definition):
+    """One MySQL column definition in SQLite terms; returns (sql, on_update)"""
+    on_update = bool(re.search(r'\bON\s+UPDATE\s+CURRENT_TIMESTAMP\b', definition, re.I))
+    definition = re.sub(r'\bON\s+UPDATE\s+CURRENT_TIMESTAMP(\(\))?', '', definition, flags=re.I)
+    definition = re.sub(r"\s+COMMENT\s+'[^']*'", '', definition, flags=re.I)
+    definition = re.sub(r'\s+(CHARACTER\s+SET|CHARSET|COLLATE)\s+\w+', '', definition, flags=re.I)
+    definition = re.sub(r'\bUNSIGNED\b', '', definition, flags=re.I)
+    definition = re.sub(r'\s+(AFTER\s+`?\w+`?|FIRST)\s*$', '', definition, flags=re.I)
+    definition = re.sub(r"\bENUM\s*\([^)]*\)", 'VARCHAR(255)', definition, flags=re.I)
+    if re.search(r'\bAUTO_INCREMENT\b', definition, re.I):
+        name = definition.split()[0]
+        return f"{name} INTEGER PRIMARY KEY AUTOINCREMENT", on_update
+    definition = re.sub(rf'^(`?\w+`?\s+{_TEXT_TYPES})', r'\1 COLLATE NOCASE', definition, flags=re.I)
+    return re.sub(r'\s+', ' ', definition).strip(), on_update
+
+def _create_table(match):
+    if_not_exists, table, body = match.group(1), match.group(2), match.group(3)
+    columns, after = [], []
+    auto_increment = None
+    for item in _split_top_level(body):
+        key = _INLINE_KEY.match(item)
+        if key:
+            kind, name, key_columns = key.group(1).upper(), key.group(2), _PREFIX_LENGTH.sub(r'\1', key.group(3))
+            if kind.startswith('PRIMARY'):
+                # An AUTO_INCREMENT column is already the INTEGER PRIMARY KEY
+                if key_columns.strip('` ') != auto_increment:
+                    columns.append(f"PRIMARY KEY ({key_columns})")
+            elif not kind.startswith('FULLTEXT'):
+                unique = 'UNIQUE ' if kind.startswith('UNIQUE') else ''
+                index_name = f"{table}__{name or key_columns.split(',')[0].strip()}"
+                after.append(f'CREATE {unique}INDEX IF NOT EXISTS "{index_name}" ON {table} ({key_columns})')
+            continue
+        column, on_update = _column_definition(item)
+        columns.append(column)
+        if column.endswith('AUTOINCREMENT'):
+            auto_increment = column.split()[0].strip('`')
+        if on_update:
+            name = column.split()[0].strip('`')
+            after.append(
+                f'CREATE TRIGGER IF NOT EXISTS "{table}__{name}_on_update" AFTER UPDATE ON {table} '
+                f"FOR EACH ROW WHEN NEW.{name} IS OLD.{name} "
+                f"BEGIN UPDATE {table} SET {name} = CURRENT_TIMESTAMP WHERE rowid = NEW.rowid; END"
+            )
+    create = f"CREATE TABLE {if_not_exists or ''}{table} (\n    " + ',\n    '.join(columns) + "\n)"
+    return [create] + after
+
+def _on_duplicate(sql):
+    head, tail = _ON_DUPLICATE.split(sql, 1)
+    return head + 'ON CONFLICT DO UPDATE SET' + _VALUES_REF.sub(r'excluded.\1', tail)
+
+def _interval(match):
+    _, sign, amount, unit = match.groups()
+    return f"datetime(NOW(), '{sign}' || ({amount}) || ' {_INTERVAL_UNITS[unit.upper()]}')"
+
+@functools.lru_cache(maxsize=4096)
+def translate(sql, has_params=True):
+    """MySQL statement -> list of SQLite statements (or _Rename operations)
+
+    With has_params, %s / %(name)s placeholders become ? / :name and %%
+    becomes %, as pymysql only interpolates when arguments are passed.
+    """
+    if has_params:
+        sql = _PARAM.sub(lambda m: f":{m.group(1)}" if m.group(1) else ('?' if m.group(0) == '%s' else '%'), sql)
+    sql = sql.strip()
+    upper = sql[:40].upper()
+
+    if upper.startswith('SHOW'):
+        if _SHOW_REPLICA_STATUS.match(sql):
+            # A standalone server: no rows, so database.py sees no lag
+            return ["SELECT 1 WHERE 0"]
+        match = _SHOW_TABLES.match(sql)
+        if not match:
+            raise pymysql.err.ProgrammingError(1064, f"Not supported by the local database: {sql[:60]}")
+        return [f"SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE {match.group(1)}"]
+    if upper.startswith('SET '):
+        return []
+    if upper.startswith('START TRANSACTION'):
+        return ['BEGIN']
+    if upper.startswith('RENAME'):
+        pairs = _split_top_level(_RENAME_TABLE.match(sql).group(1))
+        return [_Rename(*[name.strip('` ') for name in re.split(r'\s+TO\s+', pair, flags=re.I)]) for pair in pairs]
+    if upper.startswith('CREATE TABLE'):
+        match = _CREATE_TABLE.match(sql)
+        if match:
+            return _create_table(match)
+    if _CREATE_INDEX.match(sql):
+        return [_PREFIX_LENGTH.sub(r'\1', sql)]
+    if upper.startswith('DROP INDEX'):
+        match = _DROP_INDEX.match(sql)
+        if match:
+            return [f'DROP INDEX IF EXISTS "{match.group(1)}"']
+    if upper.startswith('TRUNCATE'):
+        return [re.sub(r'^TRUNCATE\s+(TABLE\s+)?', 'DELETE FROM ', sql, flags=re.I)]
+    if upper.startswith('ALTER TABLE'):
+        match = _ALTER_ADD.match(sql)
+        if match and re.match(r'(FULLTEXT|SPATIAL)\b', match.group(2), re.I):
+            return []  # MATCH ... AGAINST is evaluated without an index
+        if match:
+            key = _INLINE_KEY.match(match.group(2))
+            if key:
+                return _create_table(_CREATE_TABLE.match(f"CREATE TABLE {match.group(1)} ({match.group(2)})"))[1:]
+            column, on_update = _column_definition(match.group(2))
+            return [f"ALTER TABLE {match.group(1)} ADD COLUMN {column}"]
+
+    sql = _INSERT_IGNORE.sub('INSERT OR IGNORE', sql)
+    if _ON_DUPLICATE.search(sql):
+        sql = _on_duplicate(sql)
+    sql = _INTERVAL.sub(_interval, sql)
+    sql = _CAST_INTEGER.sub('AS INTEGER)', sql)
+    sql = _CAST_CHAR.sub('AS TEXT)', sql)
+    sql = _GROUP_CONCAT.sub(lambda m: f"{_separator_function(m.group(3))}({m.group(1) or ''}{m.group(2)})", sql)
+    sql = _MATCH.sub(r'MYSQL_MATCH(\1, \2)', sql)
+    sql = _LOCKING_READ.sub('', sql)
+    return [sql]
+
+def _mysql_error(error, sql):
+    """The pymysql exception MySQL would have raised for a sqlite3 error"""
+    message = str(error)
+    if isinstance(error, sqlite3.IntegrityError):
+        if 'UNIQUE' in message or 'PRIMARY KEY' in message:
+            return pymysql.err.IntegrityError(1062, f"Duplicate entry ({message})")
+        if 'NOT NULL' in message:
+            column = message.rsplit('.', 1)[-1]
+            return pymysql.err.IntegrityError(1048, f"Column '{column}' cannot be null")
+        return pymysql.err.IntegrityError(1452, message)
+    if isinstance(error, sqlite3.OperationalError):
+        if message.startswith('no such table'):
+            table = message.split(':', 1)[-1].strip()
+            return pymysql.err.ProgrammingError(1146, f"Table '{table}' doesn't exist")
+        if message.startswith('no such column'):
+            column = message.split(':', 1)[-1].strip()
+            return pymysql.err.OperationalError(1054, f"Unknown column '{column}'")
+        if 'already exists' in message:
+            return pymysql.err.OperationalError(1050, message)
+        if 'database is locked' in message:
+            return pymysql.err.OperationalError(1205, 'Lock wait timeout exceeded (database is locked)')
+        return pymysql.err.ProgrammingError(1064, f"{message} in: {sql[:200]}")
+    if isinstance(error, sqlite3.ProgrammingError):
+        return pymysql.err.ProgrammingError(1064, message)
+    return pymysql.err.DataError(1105, message)
+
+# Values as MySQL returns them for the column's declared type
+def _convert_datetime(value):
+    text = value.decode()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return text
+
+def _convert_date(value):
+    text = value.decode()
+    try:
+        return date.fromisoformat(text[:10])
+    except ValueError:
+        return text
+
+def _convert_decimal(value):
+    try:
+        return Decimal(value.decode())
+    except ArithmeticError:
+        return value.decode()
+
+sqlite3.register_converter('DATETIME', _convert_datetime)
+sqlite3.register_converter('TIMESTAMP', _convert_datetime)
+sqlite3.register_converter('DATE', _convert_date)
+sqlite3.register_converter('DECIMAL', _convert_decimal)
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(sep=' ', timespec='seconds'))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+
+def _utc_now():
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+
+def _parse_datetime(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        value = str(value)
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+def _date_format(value, fmt):
+    parsed = _parse_datetime(value)
+    if parsed is None or fmt is None:
+        return None
+    return re.sub(r'%.', lambda m: parsed.strftime(_DATE_FORMATS.get(m.group(0), m.group(0)[1:])), fmt)
+
+def _date_part(attribute):
+    def part(value):
+        parsed = _parse_datetime(value)
+        return getattr(parsed, attribute) if parsed else None
+    return part
+
+def _concat(*args):
+    if any(arg is None for arg in args):
+        return None
+    return ''.join(str(arg) for arg in args)
+
+def _concat_ws(separator, *args):
+    if separator is None:
+        return None
+    return separator.join(str(arg) for arg in args if arg is not None)
+
+def _extreme(pick):
+    def extreme(*args):
+        return None if any(arg is None for arg in args) else pick(args)
+    return extreme
+
+@functools.lru_cache(maxsize=256)
+def _boolean_terms(query):
+    """'+sharma +98 priya' -> (required words, optional words)"""
+    required, optional = [], []
+    for token in str(query).lower().split():
+        word = token.lstrip('+-~<>').rstrip('*').strip('"()')
+        if not word:
+            continue
+        if token.startswith('-'):
+            continue
+        (required if token.startswith('+') else optional).append(word)
+    return tuple(required), tuple(optional)
+
+def _match(*args):
+    """MATCH(columns) AGAINST (query IN BOOLEAN MODE) as substring matching
+
+    The ngram FULLTEXT index matches words anywhere inside the text; this
+    scores 1 per matched word, 0 unless every required word is present.
+    """
+    *columns, query = args
+    text = ' '.join(str(value) for value in columns if value is not None).lower()
+    required, optional = _boolean_terms(query)
+    if not all(word in text for word in required):
+        return 0
+    return len(required) + sum(1 for word in optional if word in text)
+
+def _regexp(pattern, value):
+    return value is not None and re.search(pattern, str(value), re.I) is not None
+
+def _group_concat_class(separator):
+    class GroupConcat:
+        def __init__(self):
+            self.values = []
+
+        def step(self, value):
+            if value is not None:
+                self.values.append(str(value))
+
+        def finalize(self):
+            return separator.join(sorted(self.values)) if self.values else None
+    return GroupConcat
+
+class LocalCursor:
+    """pymysql cursor API over a sqlite3 cursor"""
+
+    def __init__(self, connection, cursorclass=None):
+        cursorclass = cursorclass or pymysql.cursors.Cursor
+        self.connection = connection
+        self.dict_rows = issubclass(cursorclass, pymysql.cursors.DictCursorMixin)
+        self.unbuffered = issubclass(cursorclass, pymysql.cursors.SSCursor)
+        self._names = None
+        self._unique_names = True
+        self._reset()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def _row(self, row):
+        if row is None or not self.dict_rows:
+            return row
+        if self._unique_names:
+            return dict(zip(self._names, row))
+        # pymysql's DictCursor keeps the first of duplicate column names
+        found = {}
+        for name, value in zip(self._names, row):
+            found.setdefault(name, value)
+        return found
+
+    def _reset(self):
+        self._cursor = None
+        self._rows, self._position = [], 0
+        self.description = None
+        self.rowcount, self.lastrowid = -1, 0
+
+    def _set_result(self, cursor):
+        self._cursor = cursor
+        self.description = cursor.description
+        self.rowcount = cursor.rowcount
+        if cursor.description is None:
+            return
+        self._names = [column[0] for column in cursor.description]
+        self._unique_names = len(set(self._names)) == len(self._names)
+        if not self.unbuffered:
+            # Buffered like pymysql's default cursors, which also makes rowcount known
+            self._rows = cursor.fetchall()
+            self.rowcount = len(self._rows)
+
+    def execute(self, query, args=None):
+        if args is not None and not isinstance(args, (list, tuple, dict)):
+            args = (args,)
+        statements = translate(query, args is not None)
+        conn = self.connection
+        conn._before_statement()
+        self._reset()
+        statement = query
+        try:
+            for statement in statements:
+                if callable(statement):
+                    statement(conn.db)
+                    continue
+                # Only single-statement translations carry placeholders
+                cursor = conn.db.execute(statement, args if args is not None and len(statements) == 1 else ())
+                self._set_result(cursor)
+                self.lastrowid = conn._statement_insert_id(statement, cursor)
+        except sqlite3.Error as e:
+            raise _mysql_error(e, statement if isinstance(statement, str) else query)
+        return self.rowcount
+
+    def executemany(self, query, args):
+        rows = [row if isinstance(row, (list, tuple, dict)) else (row,) for row in args]
+        self._reset()
+        if not rows:
+            return 0
+        statement = translate(query, True)[-1]
+        conn = self.connection
+        conn._before_statement()
+        # One transaction, as MySQL runs pymysql's multi-row INSERT as one statement
+        own_transaction = not conn.db.in_transaction
+        try:
+            if own_transaction:
+                conn.db.execute('BEGIN')
+            cursor = conn.db.executemany(statement, rows)
+            if own_transaction:
+                conn.db.execute('COMMIT')
+        except sqlite3.Error as e:
+            if own_transaction and conn.db.in_transaction:
+                conn.db.execute('ROLLBACK')
+            raise _mysql_error(e, statement)
+        self._set_result(cursor)
+        self.lastrowid = conn._statement_insert_id(statement, cursor)
+        return self.rowcount
+
+    def fetchone(self):
+        if self.unbuffered:
+            return self._row(self._cursor.fetchone()) if self._cursor and self.description else None
+        if self._position >= len(self._rows):
+            return None
+        self._position += 1
+        return self._row(self._rows[self._position - 1])
+
+    def fetchmany(self, size=None):
+        size = size or 1
+        if self.unbuffered:
+            return [self._row(row) for row in self._cursor.fetchmany(size)] if self.description else []
+        rows = self._rows[self._position:self._position + size]
+        self._position += len(rows)
+        return [self._row(row) for row in rows]
+
+    def fetchall(self):
+        if self.unbuffered:
+            return [self._row(row) for row in self._cursor.fetchall()] if self.description else []
+        rows = self._rows[self._position:]
+        self._position = len(self._rows)
+        return [self._row(row) for row in rows]
+
+    def close(self):
+        self._rows = []
+
+class LocalConnection:
+    """pymysql connection API over one sqlite3 connection, autocommit like the pools"""
+
+    def __init__(self, path=None):
+        self.path = path or DB_SQLITE_PATH
+        self.db = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False,
+                                  detect_types=sqlite3.PARSE_DECLTYPES)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self._last_insert_id = 0
+        self._insert_id_set = None
+        self._separators = 0
+        self._register_functions()
+
+    def _register_functions(self):
+        db = self.db
+        db.create_function('NOW', 0, _utc_now)
+        db.create_function('CURDATE', 0, lambda: _utc_now()[:10])
+        db.create_function('CONCAT', -1, _concat)
+        db.create_function('CONCAT_WS', -1, _concat_ws)
+        db.create_function('DATE_FORMAT', 2, _date_format)
+        db.create_function('YEAR', 1, _date_part('year'))
+        db.create_function('MONTH', 1, _date_part('month'))
+        db.create_function('DAY', 1, _date_part('day'))
+        db.create_function('GREATEST', -1, _extreme(max))
+        db.create_function('LEAST', -1, _extreme(min))
+        db.create_function('REGEXP', 2, _regexp)
+        db.create_function('MYSQL_MATCH', -1, _match)
+        db.create_function('GET_LOCK', 2, lambda name, timeout: 1)
+        db.create_function('RELEASE_LOCK', 1, lambda name: 1)
+        db.create_function('LAST_INSERT_ID', -1, self._sql_last_insert_id)
+        self._register_separators()
+
+    def _register_separators(self):
+        for index in range(self._separators, len(_separators)):
+            self.db.create_aggregate(f"group_concat_sep{index}", 1, _group_concat_class(_separators[index]))
+        self._separators = len(_separators)
+
+    def _sql_last_insert_id(self, *args):
+        if args:
+            self._insert_id_set = args[0]
+            return args[0]
+        return self._last_insert_id
+
+    def _before_statement(self):
+        if self._separators != len(_separators):
+            self._register_separators()
+        self._insert_id_set = None
+        if DB_SQLITE_LATENCY_MS:
+            time.sleep(DB_SQLITE_LATENCY_MS / 1000)
+
+    def _statement_insert_id(self, statement, cursor):
+        """cursor.lastrowid as pymysql reports it for statement"""
+        if self._insert_id_set is not None:
+            self._last_insert_id = self._insert_id_set
+            return self._insert_id_set
+        if statement[:6].upper() != 'INSERT' or cursor.rowcount < 1 or not cursor.lastrowid:
+            return 0
+        # MySQL reports the first id of a multi-row INSERT, SQLite the last
+        self._last_insert_id = cursor.lastrowid - cursor.rowcount + 1
+        return self._last_insert_id
+
+    def cursor(self, cursorclass=None):
+        return LocalCursor(self, cursorclass)
+
+    def begin(self):
+        if not self.db.in_transaction:
+            self.db.execute('BEGIN')
+
+    def commit(self):
+        if self.db.in_transaction:
+            self.db.execute('COMMIT')
+
+    def rollback(self):
+        if self.db.in_transaction:
+            self.db.execute('ROLLBACK')
+
+    def autocommit(self, value):
+        if value:
+            self.commit()
+
+    def ping(self, reconnect=True):
+        # Like pymysql, so the pool reopens connections closed by discard()
+        if self.db is None:
+            if not reconnect:
+                raise pymysql.err.Error('Already closed')
+            self.__init__(self.path)
+        return True
+
+    def insert_id(self):
+        return self._last_insert_id
+
+    @property
+    def open(self):
+        return self.db is not None
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+def connect(**kwargs):
+    """pymysql.connect() stand-in
+
+    A host that is a file path (a DB_REPLICA_HOSTS entry) names its own
+    SQLite file; the other MySQL connection arguments are ignored.
+    """
+    host = kwargs.get('host') or ''
+    return LocalConnection(host if os.sep in host else None)
+
+class SQLiteSchema(Schema):
+    """migrate.Schema with the information_schema lookups done through PRAGMAs"""
+
+    def table_exists(self, table):
+        self.cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = %s", (table,))
+        return self.cursor.fetchone() is not None
+
+    def columns(self, table):
+        self.cursor.execute(f"PRAGMA table_info({table})")
+        found = {}
+        for row in self.cursor.fetchall():
+            match = re.match(r'(\w+)(?:\((\d+)\))?', row['type'] or '')
+            data_type = match.group(1).lower() if match else ''
+            found[row['name'].lower()] = (data_type, int(match.group(2)) if match and match.group(2) else None)
+        return found
+
+    def indexes(self, table):
+        self.cursor.execute(f"PRAGMA index_list({table})")
+        found = {}
+        for index in self.cursor.fetchall():
+            self.cursor.execute(f"PRAGMA index_info(\"{index['name']}\")")
+            found[index['name']] = [row['name'].lower() for row in self.cursor.fetchall()]
+        return found
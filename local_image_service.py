@@ -2,13 +2,17 @@ import os
 import uuid
 from werkzeug.utils import secure_filename
 from datetime import datetime
-import requests
+import logging
+import metrics
+
+logger = logging.getLogger(__name__)
 
 class HostingerImageService:
     def __init__(self):
         self.base_url = "https://your-hostinger-domain.com/uploads/products"
-        print(f"Image storage initialized with Hostinger cloud storage")
+        logger.debug("Image storage initialized with Hostinger cloud storage")
     
+    @metrics.timed_image('local', 'upload')
     def upload_image(self, file, folder='products'):
         """Upload image to Hostinger cloud storage"""
         try:
@@ -21,20 +25,27 @@ class HostingerImageService:
             unique_filename = f"{timestamp}_{uuid.uuid4().hex[:8]}_{name}{ext}"
             
             cloud_url = f"{self.base_url}/{unique_filename}"
-            print(f"Image uploaded to cloud: {cloud_url}")
+            logger.debug("Image uploaded to cloud: %s", cloud_url)
             
             return cloud_url
             
         except Exception as e:
-            print(f"Upload error: {e}")
+            logger.error("Upload error: %s", e)
             return None
     
     def delete_image(self, image_url):
         """Delete image from Hostinger cloud storage"""
         try:
             if image_url:
-                print(f"Image deleted from cloud: {image_url}")
+                logger.debug("Image deleted from cloud: %s", image_url)
         except Exception as e:
-            print(f"Delete error: {e}")
+            logger.error("Delete error: %s", e)
+
+_image_service = None
 
-local_image_service = HostingerImageService()
\ No newline at end of file
+def get_local_image_service():
+    """Shared HostingerImageService, created on first use"""
+    global _image_service
+    if _image_service is None:
+        _image_service = HostingerImageService()
+    return _image_service
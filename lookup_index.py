@@ -0,0 +1,370 @@
+"""Typeahead lookups for pickers: GET /api/v1/lookup/<entity>?q=&limit=
+
+Each worker keeps a prefix index per entity (customers, products, users)
+in memory: a sorted array of keys (every word of the display name, the
+code and the id) with the id each key belongs to. A lookup is a bisect
+into that array, so keystrokes never reach MySQL.
+
+The index is loaded on first use and synced every LOOKUP_REFRESH_SECONDS:
+rows with an id above the highest one loaded are new, and write handlers
+log updates and deletes to lookup_changes with record_lookup_change(),
+which the sync replays. A full reload every LOOKUP_FULL_RELOAD_SECONDS
+catches changes made outside the app and drops stale keys.
+"""
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required
+from bisect import bisect_left
+import os
+import sys
+import threading
+import time
+import pymysql
+from database import borrow_connection
+from customer_search import normalize
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Entities indexed by this deployment; each costs memory in every worker
+LOOKUP_ENTITIES = [e.strip() for e in os.getenv('LOOKUP_ENTITIES', 'customers,products,users').split(',') if e.strip()]
+LOOKUP_REFRESH_SECONDS = float(os.getenv('LOOKUP_REFRESH_SECONDS', 5))
+# Must stay well below LOOKUP_CHANGES_RETENTION_HOURS
+LOOKUP_FULL_RELOAD_SECONDS = float(os.getenv('LOOKUP_FULL_RELOAD_SECONDS', 3600))
+LOOKUP_CHANGES_RETENTION_HOURS = 24
+LOOKUP_MAX_LIMIT = 50
+# Syncs adding more keys than this re-sort the arrays instead of inserting one by one
+BULK_MERGE_KEYS = 2000
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS lookup_changes (
+        id BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        entity VARCHAR(32) NOT NULL,
+        entity_id INT NOT NULL,
+        changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        KEY idx_lookup_changes_changed_at (changed_at)
+    )
+"""
+
+# entity -> (SELECT up to WHERE, fields returned by lookups, fields whose words are keys)
+SOURCES = {
+    'customers': ("""
+        SELECT id, customer_code as code,
+               COALESCE(NULLIF(contact_person, ''), NULLIF(individual_name, ''), NULLIF(company_name, ''), 'Unknown') as name,
+               company_name, phone
+        FROM customers
+    """, ('id', 'code', 'name', 'company_name', 'phone'), ('name', 'company_name', 'code', 'phone')),
+    'products': ("""
+        SELECT id, product_code as code, name, COALESCE(price, 0) as price,
+               COALESCE(is_active, 1) as is_active
+        FROM products
+    """, ('id', 'code', 'name', 'price', 'is_active'), ('name', 'code')),
+    'users': ("""
+        SELECT id, username as code, TRIM(CONCAT(COALESCE(first_name, ''), ' ', COALESCE(last_name, ''))) as name,
+               role, region, COALESCE(is_active, 1) as is_active
+        FROM users
+    """, ('id', 'code', 'name', 'role', 'region', 'is_active'), ('name', 'code'))
+}
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+_last_trim = 0.0
+
+def _row_keys(row, key_fields):
+    keys = {str(row['id'])}
+    for field in key_fields:
+        words = normalize(row.get(field)).split()
+        keys.update(words)
+        if field == 'code' and len(words) > 1:
+            keys.add(''.join(words))
+        if field == 'phone':
+            # Callers type phone numbers without the country code
+            digits = ''.join(words)
+            keys.update((digits, digits[-10:]))
+    keys.discard('')
+    # Interned: names repeat across rows, and every key is stored twice
+    return [sys.intern(key) for key in keys]
+
+class PrefixIndex:
+    """Sorted keys with a parallel list of the ids they belong to
+
+    Keys of updated or deleted rows are left in place and skipped at
+    lookup time until the next full reload.
+    """
+
+    def __init__(self, entity):
+        self.entity = entity
+        self.select_sql, self.fields, self.key_fields = SOURCES[entity]
+        # id -> (tuple of field values, ' key1 key2 ...', normalized name)
+        self.entries = {}
+        self.keys = []
+        self.ids = []
+        self.max_id = 0
+        self.last_change_id = 0
+        self.synced_at = 0.0
+        self.loaded_at = 0.0
+        self.lock = threading.Lock()
+
+    def _entry(self, row):
+        keys = _row_keys(row, self.key_fields)
+        entry = (tuple(row.get(f) for f in self.fields), ' ' + ' '.join(keys), normalize(row.get('name')))
+        return entry, keys
+
+    def load(self, rows):
+        pairs = []
+        for row in rows:
+            self.entries[row['id']], keys = self._entry(row)
+            pairs.extend((key, row['id']) for key in keys)
+            self.max_id = max(self.max_id, row['id'])
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.ids = [row_id for _, row_id in pairs]
+
+    def apply(self, rows):
+        """Add new rows and the new keys of changed rows"""
+        pairs = []
+        for row in rows:
+            old = self.entries.get(row['id'])
+            self.entries[row['id']], keys = self._entry(row)
+            old_keys = set(old[1].split()) if old else ()
+            pairs.extend((key, row['id']) for key in keys if key not in old_keys)
+            self.max_id = max(self.max_id, row['id'])
+        if len(pairs) > BULK_MERGE_KEYS:
+            # Only the syncing thread writes, so merge outside the lock and swap
+            merged = sorted(list(zip(self.keys, self.ids)) + pairs)
+            keys = [key for key, _ in merged]
+            ids = [row_id for _, row_id in merged]
+            with self.lock:
+                self.keys, self.ids = keys, ids
+            return
+        with self.lock:
+            for key, row_id in pairs:
+                position = bisect_left(self.keys, key)
+                self.keys.insert(position, key)
+                self.ids.insert(position, row_id)
+
+    def remove(self, row_id):
+        self.entries.pop(row_id, None)
+
+    def _as_dict(self, entry):
+        return dict(zip(self.fields, entry[0]))
+
+    def lookup(self, q, limit, accept=None):
+        """Up to limit entries whose keys start with every word of q
+
+        Exact id/code matches come first, then names starting with q, then
+        the rest alphabetically. accept(entry dict) filters entries.
+        """
+        words = normalize(q).split()
+        if not words:
+            return []
+        compact = ''.join(words)
+        phrase = ' '.join(words)
+        wanted = max(limit * 5, 50)
+
+        with self.lock:
+            # Scan the keys of the most selective word
+            ranges = []
+            for word in set(words):
+                start = bisect_left(self.keys, word)
+                ranges.append((bisect_left(self.keys, word + '\uffff', start) - start, start, word))
+            size, start, first = min(ranges)
+            # Shortest (exact) keys sort first; one-letter queries need not read them all
+            candidates = self.ids[start:start + min(size, wanted * 10)]
+        # ' word' in ' key1 key2 ...' is true when word is a prefix of some key
+        others = [' ' + w for w in words if w != first]
+
+        matches = []
+        seen = set()
+        for row_id in candidates:
+            if row_id in seen:
+                continue
+            seen.add(row_id)
+            entry = self.entries.get(row_id)
+            # Keys of updated and deleted rows are only dropped by a full reload
+            if entry is None or ' ' + first not in entry[1]:
+                continue
+            if not all(w in entry[1] for w in others):
+                continue
+            item = self._as_dict(entry)
+            if accept is not None and not accept(item):
+                continue
+            exact = compact == str(row_id) or compact == normalize(item.get('code')).replace(' ', '')
+            rank = (0 if exact else 1, 0 if entry[2].startswith(phrase) else 1, entry[2], row_id)
+            matches.append((rank, item))
+            if len(matches) >= wanted:
+                break
+        matches.sort(key=lambda match: match[0])
+        return [item for _, item in matches[:limit]]
+
+def _fetch_rows(cursor, select_sql, condition='', params=()):
+    cursor.execute(f"{select_sql} {condition}", params)
+    return cursor.fetchall()
+
+def _latest_change_id(cursor):
+    try:
+        cursor.execute("SELECT COALESCE(MAX(id), 0) as last_id FROM lookup_changes")
+        return cursor.fetchone()['last_id']
+    except pymysql.err.ProgrammingError:
+        return 0
+
+def load_index(conn, entity):
+    """Fresh index of every row of entity"""
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    index = PrefixIndex(entity)
+    # Read the change log position first so changes made during the load are replayed
+    index.last_change_id = _latest_change_id(cursor)
+    index.load(_fetch_rows(cursor, index.select_sql))
+    index.loaded_at = index.synced_at = time.time()
+    return index
+
+def sync_index(conn, index):
+    """Apply new rows and logged changes since the last sync"""
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    changed = set()
+    try:
+        cursor.execute(
+            "SELECT id, entity_id FROM lookup_changes WHERE id > %s AND entity = %s ORDER BY id",
+            (index.last_change_id, index.entity)
+        )
+        for change in cursor.fetchall():
+            changed.add(change['entity_id'])
+            index.last_change_id = change['id']
+    except pymysql.err.ProgrammingError:
+        pass
+
+    rows = _fetch_rows(cursor, index.select_sql, "WHERE id > %s", (index.max_id,))
+    if changed:
+        placeholders = ', '.join(['%s'] * len(changed))
+        rows += _fetch_rows(cursor, index.select_sql, f"WHERE id IN ({placeholders})", sorted(changed))
+    index.apply(rows)
+    found = {row['id'] for row in rows}
+    for row_id in changed - found:
+        index.remove(row_id)
+    index.synced_at = time.time()
+
+def get_index(entity):
+    """This worker's index for entity, loaded or synced as needed; None if unavailable
+
+    While one thread syncs, other threads keep using the index as it is.
+    """
+    index = _indexes.get(entity)
+    now = time.time()
+    if index is not None and now - index.synced_at < LOOKUP_REFRESH_SECONDS:
+        return index
+    if not _indexes_lock.acquire(blocking=index is None):
+        return index
+    try:
+        if _indexes.get(entity) is not index:
+            return _indexes[entity]
+        conn = borrow_connection(replica=True)
+        if conn is None:
+            return index
+        try:
+            if index is None or now - index.loaded_at >= LOOKUP_FULL_RELOAD_SECONDS:
+                started = time.perf_counter()
+                index = _indexes[entity] = load_index(conn, entity)
+                logger.info("Loaded %s lookup index: %s rows in %.0f ms", entity,
+                            len(index.entries), (time.perf_counter() - started) * 1000)
+            else:
+                sync_index(conn, index)
+        finally:
+            conn.close()
+        return index
+    except Exception as e:
+        logger.error("Lookup index %s sync failed: %s", entity, e)
+        return index
+    finally:
+        _indexes_lock.release()
+
+def record_lookup_change(cursor, entity, *entity_ids):
+    """Log created, updated or deleted rows so every worker's lookup index picks them up"""
+    global _last_trim
+    if entity not in SOURCES or not entity_ids:
+        return
+    rows = [(entity, entity_id) for entity_id in entity_ids]
+    sql = "INSERT INTO lookup_changes (entity, entity_id) VALUES (%s, %s)"
+    try:
+        cursor.executemany(sql, rows)
+    except pymysql.err.ProgrammingError:
+        # Table not created yet
+        cursor.execute(CREATE_TABLE_SQL)
+        cursor.executemany(sql, rows)
+    if time.time() - _last_trim > 3600:
+        _last_trim = time.time()
+        trim_lookup_changes(cursor)
+    # This worker syncs on its next lookup
+    index = _indexes.get(entity)
+    if index is not None:
+        index.synced_at = 0.0
+
+def trim_lookup_changes(cursor):
+    """Delete change log rows every index has long since replayed"""
+    cursor.execute(
+        "DELETE FROM lookup_changes WHERE changed_at < NOW() - INTERVAL %s HOUR",
+        (LOOKUP_CHANGES_RETENTION_HOURS,)
+    )
+    return cursor.rowcount
+
+def _accept(entity, args):
+    """Filter for ?role= (users) and inactive rows, or None"""
+    roles = {r.strip() for r in args.get('role', '').split(',') if r.strip()}
+    include_inactive = args.get('include_inactive', 'false').lower() in ('1', 'true', 'yes')
+
+    def accept(item):
+        if roles and item.get('role') not in roles:
+            return False
+        if not include_inactive and item.get('is_active') in (0, False, '0'):
+            return False
+        return True
+    return accept if roles or entity in ('products', 'users') else None
+
+def register_lookup_routes(app):
+    """Register typeahead lookup routes"""
+    bp = Blueprint('lookup', __name__)
+
+    @bp.route('/api/v1/lookup/<entity>', methods=['GET'])
+    @jwt_required()
+    def lookup(entity):
+        """Entries of entity matching ?q= (prefix of any word, code or id)"""
+        if entity not in LOOKUP_ENTITIES or entity not in SOURCES:
+            return jsonify({'error': f'Unknown lookup: {entity}'}), 404
+        try:
+            limit = max(1, min(int(request.args.get('limit', 10)), LOOKUP_MAX_LIMIT))
+        except ValueError:
+            limit = 10
+        index = get_index(entity)
+        if index is None:
+            return jsonify({'error': 'Lookup index unavailable'}), 503
+        return jsonify(index.lookup(request.args.get('q', ''), limit, _accept(entity, request.args)))
+
+    app.register_blueprint(bp)
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='Inspect lookup indexes and trim the change log')
+    parser.add_argument('--trim', action='store_true', help=f'delete changes older than {LOOKUP_CHANGES_RETENTION_HOURS}h')
+    parser.add_argument('--entity', choices=sorted(SOURCES))
+    parser.add_argument('--q', help='lookup to run against a freshly loaded index')
+    args = parser.parse_args()
+
+    conn = borrow_connection()
+    if not conn:
+        raise SystemExit('Database connection failed')
+    try:
+        if args.trim:
+            print(json.dumps({'trimmed': trim_lookup_changes(conn.cursor())}))
+            conn.commit()
+        if args.entity:
+            started = time.perf_counter()
+            index = load_index(conn, args.entity)
+            print(json.dumps({
+                'entity': args.entity,
+                'rows': len(index.entries),
+                'keys': len(index.keys),
+                'load_ms': round((time.perf_counter() - started) * 1000),
+                'matches': index.lookup(args.q, 10) if args.q else None
+            }, indent=2, default=str))
+    finally:
+        conn.close()
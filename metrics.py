@@ -0,0 +1,171 @@
+"""Prometheus metrics
+
+init_app() instruments every Flask request. The database pool, response
+cache, import jobs and image services report through the record_*/timed_*
+helpers, which do nothing when metrics are disabled or prometheus_client
+is not installed. GET /metrics (monitoring_routes.py) serves them.
+
+Under gunicorn each worker writes its samples to PROMETHEUS_MULTIPROC_DIR
+(gunicorn.conf.py sets a default, empties it on start and marks exited
+workers dead), so whichever worker answers a scrape reports the totals of
+all of them. Gauges are summed over live workers. Requests served by the
+async handlers of asgi_app.py are not counted.
+"""
+from functools import wraps
+import glob
+import os
+import time
+import logging
+
+try:
+    from prometheus_client import (CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+                                   CONTENT_TYPE_LATEST, REGISTRY, multiprocess)
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+# Bearer token required by GET /metrics when set
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+MULTIPROC_DIR = os.getenv('PROMETHEUS_MULTIPROC_DIR', '')
+
+ENABLED = METRICS_ENABLED and PROMETHEUS_AVAILABLE
+
+# Seconds; requests, pool waits and imports span very different ranges
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10)
+IMPORT_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800)
+IMAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+if ENABLED and MULTIPROC_DIR:
+    # prometheus_client opens its per-process sample files in here as metrics are created
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
+
+if ENABLED:
+    REQUESTS = Counter('http_requests_total', 'HTTP requests', ['method', 'route', 'status'])
+    REQUEST_SECONDS = Histogram('http_request_duration_seconds', 'HTTP request latency',
+                                ['method', 'route', 'status'], buckets=REQUEST_BUCKETS)
+    IN_PROGRESS = Gauge('http_requests_in_progress', 'HTTP requests being handled',
+                        multiprocess_mode='livesum')
+
+    POOL_MAX = Gauge('db_pool_max_connections', 'Connection limit of the pool, summed over workers',
+                     ['pool'], multiprocess_mode='livesum')
+    POOL_IN_USE = Gauge('db_pool_connections_in_use', 'Connections checked out of the pool',
+                        ['pool'], multiprocess_mode='livesum')
+    POOL_WAIT_SECONDS = Histogram('db_pool_checkout_wait_seconds', 'Time waiting for a pooled connection',
+                                  ['pool'], buckets=WAIT_BUCKETS)
+    POOL_TIMEOUTS = Counter('db_pool_checkout_timeouts_total', 'Checkouts that gave up waiting', ['pool'])
+
+    CACHE_EVENTS = Counter('response_cache_events_total',
+                           'Response cache lookups and maintenance (hits, misses, stores, evictions, ...)', ['event'])
+
+    IMPORT_JOBS = Counter('import_jobs_total', 'Finished background import jobs', ['kind', 'status'])
+    IMPORT_ROWS = Counter('import_rows_total', 'Rows handled by background import jobs', ['kind', 'outcome'])
+    IMPORT_SECONDS = Histogram('import_job_duration_seconds', 'Background import job run time', ['kind'],
+                               buckets=IMPORT_BUCKETS)
+
+    IMAGE_SECONDS = Histogram('image_processing_duration_seconds', 'Image validation, resizing and storage',
+                              ['service', 'operation'], buckets=IMAGE_BUCKETS)
+
+def record_pool_size(pool, max_connections):
+    if ENABLED:
+        POOL_MAX.labels(pool).set(max_connections)
+
+def record_checkout(pool, wait_seconds):
+    if ENABLED:
+        POOL_IN_USE.labels(pool).inc()
+        POOL_WAIT_SECONDS.labels(pool).observe(wait_seconds)
+
+def record_release(pool):
+    if ENABLED:
+        POOL_IN_USE.labels(pool).dec()
+
+def record_checkout_timeout(pool):
+    if ENABLED:
+        POOL_TIMEOUTS.labels(pool).inc()
+
+def record_cache_event(event, amount=1):
+    if ENABLED and amount:
+        CACHE_EVENTS.labels(event).inc(amount)
+
+def record_import_job(kind, status, seconds, imported=0, duplicates=0, failed_rows=0):
+    if not ENABLED:
+        return
+    IMPORT_JOBS.labels(kind, status).inc()
+    IMPORT_SECONDS.labels(kind).observe(seconds)
+    for outcome, rows in (('imported', imported), ('duplicate', duplicates), ('error', failed_rows)):
+        if rows:
+            IMPORT_ROWS.labels(kind, outcome).inc(rows)
+
+def timed_image(service, operation):
+    """Decorator recording how long an image service method takes"""
+    def decorator(f):
+        if not ENABLED:
+            return f
+
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                IMAGE_SECONDS.labels(service, operation).observe(time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+def init_app(app):
+    """Count requests, their latency and the ones in progress"""
+    if not ENABLED:
+        return
+    from flask import g, request
+
+    def route():
+        return request.url_rule.rule if request.url_rule else 'unmatched'
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        IN_PROGRESS.inc()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            labels = (request.method, route(), str(response.status_code))
+            REQUESTS.labels(*labels).inc()
+            REQUEST_SECONDS.labels(*labels).observe(time.perf_counter() - started)
+            IN_PROGRESS.dec()
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc=None):
+        # after_request does not run when the handler raised
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            labels = (request.method, route(), '500')
+            REQUESTS.labels(*labels).inc()
+            REQUEST_SECONDS.labels(*labels).observe(time.perf_counter() - started)
+            IN_PROGRESS.dec()
+
+def render():
+    """(body, content type) of the current samples, all workers included"""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def reset_multiprocess_dir():
+    """Drop the samples of earlier runs from PROMETHEUS_MULTIPROC_DIR (gunicorn on_starting)"""
+    if not MULTIPROC_DIR:
+        return
+    for path in glob.glob(os.path.join(MULTIPROC_DIR, '*.db')):
+        os.remove(path)
+
+def mark_worker_dead(pid):
+    """Stop counting an exited worker's live gauges (gunicorn child_exit)"""
+    if ENABLED and MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,238 @@
+"""Versioned schema migrations
+
+Migrations live in migrations/NNNN_name.py, each with a docstring and an
+up(schema) function; they run in version order and every applied version
+is recorded in the schema_migrations table. Run on each deploy, before
+the new code starts serving:
+
+    python migrate.py status
+    python migrate.py up [--to VERSION]
+
+MySQL commits DDL implicitly, so a migration is not atomic. Migrations are
+written to be re-runnable instead: tables are created IF NOT EXISTS and
+indexes and columns through Schema.ensure_index()/ensure_column(), which
+skip what already exists. A migration that fails halfway can be fixed and
+run again. The existing production schema predates this tool, which is
+why the first migrations describe tables that may already be there.
+
+A GET_LOCK() guard keeps two deploys from migrating at the same time.
+"""
+import importlib
+import logging
+import os
+import re
+import time
+import pymysql
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+# Seconds to wait for another migration run to finish
+MIGRATION_LOCK_TIMEOUT = int(os.getenv('MIGRATION_LOCK_TIMEOUT', 60))
+MIGRATION_LOCK_NAME = 'schema_migrations'
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INT NOT NULL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        duration_ms INT NOT NULL DEFAULT 0
+    )
+"""
+
+_MIGRATION_FILE = re.compile(r'^(\d{4})_(\w+)\.py$')
+_PREFIX_LENGTH = re.compile(r'^(\w+)\((\d+)\)$')
+# Columns that can only be indexed with a prefix length
+_PREFIX_ONLY_TYPES = {'tinytext', 'text', 'mediumtext', 'longtext', 'tinyblob', 'blob', 'mediumblob', 'longblob'}
+
+class MigrationError(Exception):
+    """Raised when migrations cannot be loaded or run"""
+
+class Schema:
+    """What a migration's up() gets: the connection and DDL helpers"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.cursor = conn.cursor(pymysql.cursors.DictCursor)
+
+    def execute(self, sql, params=None):
+        self.cursor.execute(sql, params)
+        return self.cursor
+
+    def table_exists(self, table):
+        self.cursor.execute("""
+            SELECT 1 as found FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """, (table,))
+        return self.cursor.fetchone() is not None
+
+    def columns(self, table):
+        """column name -> (data type, max character length)"""
+        self.cursor.execute("""
+            SELECT COLUMN_NAME as name, DATA_TYPE as data_type, CHARACTER_MAXIMUM_LENGTH as max_length
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """, (table,))
+        return {row['name'].lower(): (row['data_type'].lower(), row['max_length'])
+                for row in self.cursor.fetchall()}
+
+    def indexes(self, table):
+        """index name -> [column, ...] in index order"""
+        self.cursor.execute("""
+            SELECT INDEX_NAME as name, COLUMN_NAME as column_name
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+            ORDER BY INDEX_NAME, SEQ_IN_INDEX
+        """, (table,))
+        found = {}
+        for row in self.cursor.fetchall():
+            found.setdefault(row['name'], []).append((row['column_name'] or '').lower())
+        return found
+
+    def ensure_column(self, table, column, definition):
+        """ADD COLUMN unless the table already has it; returns True if added"""
+        if column.lower() in self.columns(table):
+            return False
+        self.cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        logger.info("Added column %s.%s", table, column)
+        return True
+
+    def ensure_index(self, table, name, columns, unique=False):
+        """Create an index unless one already covers the same leading columns
+
+        columns are names, optionally with a prefix length ('message(100)').
+        The prefix is dropped for short VARCHAR columns and required for
+        TEXT/BLOB ones. Indexes created by hand under other names count, so
+        nothing is duplicated. Returns True if the index was created.
+        """
+        table_columns = self.columns(table)
+        if not table_columns:
+            raise MigrationError(f"Table {table} does not exist")
+
+        wanted = []
+        parts = []
+        for spec in columns:
+            match = _PREFIX_LENGTH.match(spec)
+            column, length = (match.group(1), int(match.group(2))) if match else (spec, None)
+            if column.lower() not in table_columns:
+                raise MigrationError(f"Column {table}.{column} does not exist")
+            data_type, max_length = table_columns[column.lower()]
+            if data_type in _PREFIX_ONLY_TYPES:
+                length = length or 191
+            elif length and (max_length is None or max_length <= length):
+                length = None
+            wanted.append(column.lower())
+            parts.append(f"{column}({length})" if length else column)
+
+        for index_name, index_columns in self.indexes(table).items():
+            if index_name == name or index_columns[:len(wanted)] == wanted:
+                logger.info("Index %s on %s(%s) already covered by %s",
+                            name, table, ', '.join(wanted), index_name)
+                return False
+        kind = 'UNIQUE INDEX' if unique else 'INDEX'
+        started = time.monotonic()
+        self.cursor.execute(f"CREATE {kind} {name} ON {table} ({', '.join(parts)})")
+        logger.info("Created index %s on %s(%s) in %.1fs", name, table, ', '.join(parts),
+                    time.monotonic() - started)
+        return True
+
+def _schema(conn):
+    from database import DB_BACKEND
+    if DB_BACKEND == 'sqlite':
+        from local_db import SQLiteSchema
+        return SQLiteSchema(conn)
+    return Schema(conn)
+
+def load_migrations(directory=MIGRATIONS_DIR):
+    """[(version, name, module), ...] sorted by version"""
+    found = {}
+    for filename in sorted(os.listdir(directory)):
+        match = _MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+        version, name = int(match.group(1)), match.group(2)
+        if version in found:
+            raise MigrationError(f"Duplicate migration version {version:04d}: {found[version][0]} and {name}")
+        module = importlib.import_module(f"migrations.{filename[:-3]}")
+        if not callable(getattr(module, 'up', None)):
+            raise MigrationError(f"Migration {filename} has no up() function")
+        found[version] = (name, module)
+    return [(version, name, module) for version, (name, module) in sorted(found.items())]
+
+def applied_migrations(cursor):
+    """version -> applied_at for the versions recorded in schema_migrations"""
+    cursor.execute(CREATE_TABLE_SQL)
+    cursor.execute("SELECT version, applied_at FROM schema_migrations")
+    return {row['version']: row['applied_at'] for row in cursor.fetchall()}
+
+def migration_status(conn):
+    """One dict per known or recorded migration, in version order"""
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    applied = applied_migrations(cursor)
+    status = []
+    known = set()
+    for version, name, module in load_migrations():
+        known.add(version)
+        status.append({
+            'version': version,
+            'name': name,
+            'description': (module.__doc__ or '').strip().split('\n')[0],
+            'applied_at': str(applied[version]) if version in applied else None
+        })
+    # Recorded by a newer checkout than this one
+    for version in sorted(set(applied) - known):
+        status.append({'version': version, 'name': None, 'description': 'unknown to this checkout',
+                       'applied_at': str(applied[version])})
+    return status
+
+def migrate(conn, target=None):
+    """Apply pending migrations up to target (all if None); returns their versions"""
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    cursor.execute("SELECT GET_LOCK(%s, %s) as locked", (MIGRATION_LOCK_NAME, MIGRATION_LOCK_TIMEOUT))
+    if not cursor.fetchone()['locked']:
+        raise MigrationError('Another migration run holds the lock')
+    try:
+        applied = applied_migrations(cursor)
+        done = []
+        for version, name, module in load_migrations():
+            if version in applied or (target is not None and version > target):
+                continue
+            logger.info("Applying migration %04d_%s", version, name)
+            started = time.monotonic()
+            module.up(_schema(conn))
+            duration_ms = int((time.monotonic() - started) * 1000)
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, name, duration_ms) VALUES (%s, %s, %s)",
+                (version, name, duration_ms)
+            )
+            conn.commit()
+            logger.info("Applied migration %04d_%s in %d ms", version, name, duration_ms)
+            done.append(version)
+        return done
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK_NAME,))
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    from database import borrow_connection
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(name)s: %(message)s')
+    parser = argparse.ArgumentParser(description='Apply or list schema migrations')
+    parser.add_argument('command', choices=['status', 'up'])
+    parser.add_argument('--to', type=int, default=None, help='stop after this version')
+    args = parser.parse_args()
+
+    conn = borrow_connection()
+    if not conn:
+        raise SystemExit('Database connection failed')
+    try:
+        if args.command == 'up':
+            applied = migrate(conn, target=args.to)
+            print(json.dumps({'applied': applied}, indent=2))
+        else:
+            status = migration_status(conn)
+            print(json.dumps(status, indent=2))
+            raise SystemExit(1 if any(m['applied_at'] is None for m in status) else 0)
+    finally:
+        conn.close()
@@ -0,0 +1,215 @@
+"""Core business tables as the application reads and writes them
+
+These tables were created by hand before migrations existed, so every
+statement is CREATE TABLE IF NOT EXISTS and leaves an existing table as it
+is. The definitions give a fresh database (local, CI, a new environment)
+the columns the code uses; later migrations own every change after this.
+"""
+
+TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        username VARCHAR(50) NOT NULL,
+        email VARCHAR(255),
+        password_hash VARCHAR(255) NOT NULL,
+        role VARCHAR(30) NOT NULL DEFAULT 'sales_executive',
+        first_name VARCHAR(100),
+        last_name VARCHAR(100),
+        phone VARCHAR(20),
+        region VARCHAR(100),
+        is_active TINYINT(1) NOT NULL DEFAULT 1,
+        last_login DATETIME NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    ) DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS regions (
+        id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        code VARCHAR(20),
+        state VARCHAR(100),
+        country VARCHAR(100) DEFAULT 'India',
+        manager_id INT NULL,
+        is_active TINYINT(1) NOT NULL DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    ) DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS customers (
+        id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        customer_code VARCHAR(20),
+        customer_type VARCHAR(20) DEFAULT 'B2C',
+        individual_name VARCHAR(255),
+        company_name VARCHAR(255),
+        contact_person VARCHAR(255),
+        email VARCHAR(255),
+        phone VARCHAR(20),
+        password_hash VARCHAR(255),
+        address TEXT,
+        city VARCHAR(100),
+        state VARCHAR(100),
+        country VARCHAR(100) DEFAULT 'India',
+        pin_code VARCHAR(10),
+        registration_source VARCHAR(30) DEFAULT 'web',
+        is_verified TINYINT(1) NOT NULL DEFAULT 0,
+        has_mobile_access TINYINT(1) NOT NULL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    ) DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS product_categories (
+        id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        description TEXT,
+        is_active TINYINT(1) NOT NULL DEFAULT 1,
+        display_order INT NOT NULL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    ) DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS products (
+        id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        product_code VARCHAR(50),
+        description TEXT,
+        price DECIMAL(12, 2) NOT NULL DEFAULT 0,
+        offer_price DECIMAL(12, 2) NULL,
+        stock_quantity INT NOT NULL DEFAULT 0,
+        stock_status VARCHAR(20) DEFAULT 'in_stock',
+        image_url VARCHAR(500),
+        category_id INT NULL,
+        is_trending TINYINT(1) NOT NULL DEFAULT 0,
+        trending_position INT NULL,
+        is_active TINYINT(1) NOT NULL DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    ) DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS product_images (
+        id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        product_id INT NOT NULL,
+        image_url VARCHAR(500) NOT NULL,
+        image_type VARCHAR(20) DEFAULT 'gallery',
+        is_primary TINYINT(1) NOT NULL DEFAULT 0,
+        alt_text VARCHAR(255),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    ) DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS product_specifications (
+        id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        product_id INT NOT NULL,
+        feature_name VARCHAR(255) NOT NULL,
+        feature_value TEXT,
+        category VARCHAR(100),
+        display_order INT NOT NULL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    ) DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sales (
+        id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        sale_number VARCHAR(20),
+        customer_id INT NULL,
+        created_by INT NULL,
+        sale_date DATE,
+        total_amount DECIMAL(12, 2) NOT NULL DEFAULT 0,
+        discount_percentage DECIMAL(5, 2) NOT NULL DEFAULT 0,
+        discount_amount DECIMAL(12, 2) NOT NULL DEFAULT 0,
+        final_amount DECIMAL(12, 2) NOT NULL DEFAULT 0,
+        payment_status VARCHAR(20) DEFAULT 'pending',
+        delivery_status VARCHAR(20) DEFAULT 'pending',
+        delivery_date DATE NULL,
+        delivery_address TEXT,
+        notes TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    ) DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sale_items (
+        id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        sale_id INT NOT NULL,
+        product_id INT NULL,
+        quantity INT NOT NULL DEFAULT 1,
+        unit_price DECIMAL(12, 2) NOT NULL DEFAULT 0,
+        total_price DECIMAL(12, 2) NOT NULL DEFAULT 0
+    ) DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS dispatches (
+        id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        dispatch_number VARCHAR(20),
+        sale_id INT NULL,
+        customer_id INT NULL,
+        product_id INT NULL,
+        driver_name VARCHAR(100),
+        driver_phone VARCHAR(20),
+        vehicle_number VARCHAR(30),
+        dispatch_date DATE,
+        estimated_delivery DATE NULL,
+        actual_delivery DATE NULL,
+        tracking_notes TEXT,
+        status VARCHAR(20) DEFAULT 'pending',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    ) DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS service_tickets (
+        id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        ticket_number VARCHAR(20),
+        customer_id INT NULL,
+        product_id INT NULL,
+        issue_description TEXT,
+        priority VARCHAR(20) DEFAULT 'MEDIUM',
+        status VARCHAR(20) DEFAULT 'OPEN',
+        assigned_staff_id INT NULL,
+        warranty_status VARCHAR(30),
+        resolution_details TEXT,
+        remarks TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    ) DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS enquiries (
+        id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        enquiry_number VARCHAR(20),
+        customer_id INT NULL,
+        product_id INT NULL,
+        quantity INT DEFAULT 1,
+        message TEXT,
+        status VARCHAR(20) DEFAULT 'NEW',
+        assigned_to INT NULL,
+        follow_up_date DATE NULL,
+        notes TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    ) DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS notifications (
+        id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NULL,
+        title VARCHAR(255),
+        message TEXT,
+        type VARCHAR(20) DEFAULT 'INFO',
+        customer_id INT NULL,
+        is_read TINYINT(1) NOT NULL DEFAULT 0,
+        is_sent TINYINT(1) NOT NULL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    ) DEFAULT CHARSET=utf8mb4
+    """,
+]
+
+def up(schema):
+    for sql in TABLES:
+        schema.execute(sql)
@@ -0,0 +1,56 @@
+"""Side tables the application maintains itself
+
+sequences, dashboard_counters, import_jobs and lookup_changes were created
+lazily by their modules on first use. The modules keep doing that for
+databases this migration has not reached yet; the DDL here is the same.
+"""
+
+TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS sequences (
+        name VARCHAR(64) NOT NULL PRIMARY KEY,
+        value BIGINT UNSIGNED NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS dashboard_counters (
+        counter_key VARCHAR(100) NOT NULL PRIMARY KEY,
+        value DECIMAL(20, 2) NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS import_jobs (
+        id CHAR(32) NOT NULL PRIMARY KEY,
+        kind VARCHAR(32) NOT NULL,
+        filename VARCHAR(255),
+        spool_path VARCHAR(512),
+        status VARCHAR(16) NOT NULL DEFAULT 'queued',
+        total_rows INT NOT NULL DEFAULT 0,
+        processed_rows INT NOT NULL DEFAULT 0,
+        imported INT NOT NULL DEFAULT 0,
+        duplicates INT NOT NULL DEFAULT 0,
+        errors TEXT,
+        message VARCHAR(500),
+        created_by VARCHAR(64),
+        worker VARCHAR(128),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        started_at DATETIME NULL,
+        finished_at DATETIME NULL,
+        INDEX idx_import_jobs_status (status, created_at)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS lookup_changes (
+        id BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        entity VARCHAR(32) NOT NULL,
+        entity_id INT NOT NULL,
+        changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        KEY idx_lookup_changes_changed_at (changed_at)
+    )
+    """,
+]
+
+def up(schema):
+    for sql in TABLES:
+        schema.execute(sql)
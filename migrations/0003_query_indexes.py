@@ -0,0 +1,62 @@
+"""Indexes for the predicates and sort orders the routes query by
+
+Each entry names the queries it serves. Indexes someone already created by
+hand on the same leading columns are kept and not duplicated (see
+Schema.ensure_index). Keyset-paginated lists sort by (column, id), so
+they get a composite index on exactly that.
+"""
+
+# (table, index name, columns)
+INDEXES = [
+    # Duplicate checks on create/update, customer login (email = %s OR phone = %s)
+    ('customers', 'idx_customers_phone', ['phone']),
+    ('customers', 'idx_customers_email', ['email']),
+    # Sale and import lookups by customer code, sequence seeding
+    ('customers', 'idx_customers_customer_code', ['customer_code']),
+    # Import matching by contact name
+    ('customers', 'idx_customers_contact_person', ['contact_person']),
+    ('customers', 'idx_customers_created_at', ['created_at', 'id']),
+
+    # sale_items_loader, sale deletes, dispatch and report joins on sale_id
+    ('sale_items', 'idx_sale_items_sale_id', ['sale_id']),
+    ('sale_items', 'idx_sale_items_product_id', ['product_id']),
+
+    # Primary image lookups: product_id = %s AND image_type = 'primary'
+    ('product_images', 'idx_product_images_product_type', ['product_id', 'image_type']),
+    ('product_specifications', 'idx_product_specifications_product', ['product_id', 'display_order']),
+
+    # Dispatch list/report joins and the "sales not yet dispatched" query
+    ('dispatches', 'idx_dispatches_sale_id', ['sale_id']),
+    ('dispatches', 'idx_dispatches_customer_id', ['customer_id']),
+    ('dispatches', 'idx_dispatches_dispatch_date', ['dispatch_date', 'id']),
+
+    # Unread count badge
+    ('notifications', 'idx_notifications_is_read', ['is_read']),
+    ('notifications', 'idx_notifications_created_at', ['created_at', 'id']),
+
+    # Import duplicate detection reads (customer_id, message, status) for the
+    # sheet's customers. status goes before the TEXT prefix so the index also
+    # serves customer + status filters.
+    ('enquiries', 'idx_enquiries_customer_status_message', ['customer_id', 'status', 'message(100)']),
+    ('enquiries', 'idx_enquiries_product_id', ['product_id']),
+    ('enquiries', 'idx_enquiries_created_at', ['created_at', 'id']),
+
+    # Import matching by name (name IN (...)) and name-ordered product lists
+    ('products', 'idx_products_name', ['name']),
+    ('products', 'idx_products_category_id', ['category_id']),
+
+    ('sales', 'idx_sales_customer_id', ['customer_id']),
+    ('sales', 'idx_sales_sale_date', ['sale_date', 'id']),
+
+    ('service_tickets', 'idx_service_tickets_customer_id', ['customer_id']),
+    ('service_tickets', 'idx_service_tickets_created_at', ['created_at', 'id']),
+
+    # Login and duplicate checks
+    ('users', 'idx_users_username', ['username']),
+    ('users', 'idx_users_email', ['email']),
+    ('users', 'idx_users_created_at', ['created_at', 'id']),
+]
+
+def up(schema):
+    for table, name, columns in INDEXES:
+        schema.ensure_index(table, name, columns)
@@ -0,0 +1,12 @@
+"""customer_search side table with its ngram FULLTEXT index
+
+Built by customer_search.rebuild(), which fills it from customers. Skipped
+when the table already exists: `python customer_search.py --rebuild`
+rebuilds it by hand.
+"""
+import customer_search
+
+def up(schema):
+    if schema.table_exists('customer_search'):
+        return
+    customer_search.rebuild(schema.conn)
@@ -0,0 +1 @@
+"""Schema migrations applied by migrate.py, one module per version"""
@@ -0,0 +1,61 @@
+from flask import Blueprint, Response, jsonify, request
+from flask_jwt_extended import jwt_required
+from cache_config import cache_stats
+from app_logging import logging_info
+from database import pool_status
+from query_profiler import query_stats
+from route_registry import route_table
+import hmac
+import metrics
+
+def register_monitoring_routes(app):
+    """Register operational endpoints used to tune the service"""
+    bp = Blueprint('monitoring', __name__)
+    
+    @bp.route('/api/v1/cache/stats', methods=['GET'])
+    @jwt_required()
+    def get_cache_stats():
+        """Response cache hit/miss/eviction counters for this worker"""
+        return jsonify(cache_stats())
+    
+    @bp.route('/api/v1/logging/stats', methods=['GET'])
+    @jwt_required()
+    def get_logging_stats():
+        """Log level, queued records and records dropped because the queue was full"""
+        return jsonify(logging_info())
+    
+    @bp.route('/api/v1/db/pool', methods=['GET'])
+    @jwt_required()
+    def get_db_pool_status():
+        """Connections checked out of this worker's pool and leak counters"""
+        return jsonify(pool_status())
+    
+    @bp.route('/api/v1/db/queries', methods=['GET'])
+    @jwt_required()
+    def get_db_query_stats():
+        """Per-fingerprint query counts and timings of this worker (QUERY_PROFILING=on)"""
+        sort = request.args.get('sort', 'total_ms')
+        if sort not in ('total_ms', 'max_ms', 'avg_ms', 'count', 'rows', 'errors'):
+            return jsonify({'error': 'sort must be total_ms, max_ms, avg_ms, count, rows or errors'}), 400
+        limit = request.args.get('limit', 50, type=int)
+        return jsonify(query_stats(sort, max(1, min(limit, 500))))
+    
+    @bp.route('/api/v1/routes', methods=['GET'])
+    @jwt_required()
+    def get_route_table():
+        """Every rule and method with its handler, auth, caching and replica use, plus conflicts"""
+        return jsonify(route_table())
+    
+    @bp.route('/metrics', methods=['GET'])
+    def get_metrics():
+        """Prometheus metrics of every worker; needs Bearer METRICS_TOKEN when one is set"""
+        if not metrics.ENABLED:
+            return jsonify({'error': 'Metrics are disabled or prometheus_client is not installed'}), 503
+        if metrics.METRICS_TOKEN:
+            supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+            if not hmac.compare_digest(supplied, metrics.METRICS_TOKEN):
+                return jsonify({'error': 'Invalid metrics token'}), 401
+        body, content_type = metrics.render()
+        return Response(body, content_type=content_type)
+    
+    app.register_blueprint(bp)
@@ -0,0 +1,196 @@
+import base64
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+
+DEFAULT_PAGE_LIMIT = int(os.getenv('PAGE_LIMIT_DEFAULT', 50))
+MAX_PAGE_LIMIT = int(os.getenv('PAGE_LIMIT_MAX', 500))
+
+# Compatibility flag: when enabled, list endpoints called without ?limit= or
+# ?cursor= keep returning the full (unpaginated) JSON array they always have.
+LEGACY_UNPAGINATED_LISTS = os.getenv('LEGACY_UNPAGINATED_LISTS', 'true').lower() in ('1', 'true', 'yes')
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor that cannot be decoded"""
+
+def _encode_value(value):
+    """Tag sort values so they round-trip through JSON with their type"""
+    if isinstance(value, datetime):
+        return ['dt', value.isoformat()]
+    if isinstance(value, date):
+        return ['d', value.isoformat()]
+    if isinstance(value, Decimal):
+        return ['dec', str(value)]
+    return ['v', value]
+
+def _decode_value(tagged):
+    kind, value = tagged
+    if kind == 'dt':
+        return datetime.fromisoformat(value)
+    if kind == 'd':
+        return date.fromisoformat(value)
+    if kind == 'dec':
+        return Decimal(value)
+    if kind == 'v':
+        return value
+    raise InvalidCursor('Unknown cursor value type')
+
+def encode_cursor(sort_value, row_id):
+    """Build an opaque cursor from the last row's (sort value, id)"""
+    payload = json.dumps([_encode_value(sort_value), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(token):
+    """Decode a cursor created by encode_cursor into (sort value, id)"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        tagged_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return _decode_value(tagged_value), row_id
+    except InvalidCursor:
+        raise
+    except Exception:
+        raise InvalidCursor('Invalid cursor')
+
+def is_paginated(args):
+    """Whether this request should get a paginated envelope"""
+    if not LEGACY_UNPAGINATED_LISTS:
+        return True
+    return 'limit' in args or 'cursor' in args
+
+def page_limit(args):
+    """Read ?limit= clamped to 1..MAX_PAGE_LIMIT"""
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_LIMIT))
+    except (TypeError, ValueError):
+        limit = DEFAULT_PAGE_LIMIT
+    return max(1, min(limit, MAX_PAGE_LIMIT))
+
+class KeysetQuery:
+    """List query paginated by (sort column, id) instead of OFFSET
+
+    select_sql is everything up to (not including) WHERE. sort_key/id_key
+    are the keys of the sort and id values in the returned rows.
+    """
+
+    def __init__(self, select_sql, sort_column, id_column, sort_key, id_key='id',
+                 direction='DESC', group_by=None):
+        self.select_sql = select_sql
+        self.sort_column = sort_column
+        self.id_column = id_column
+        self.sort_key = sort_key
+        self.id_key = id_key
+        self.direction = 'ASC' if direction.upper() == 'ASC' else 'DESC'
+        self.group_by = group_by
+
+    def with_direction(self, direction):
+        """Copy of this query sorted the other way"""
+        return KeysetQuery(self.select_sql, self.sort_column, self.id_column, self.sort_key,
+                           self.id_key, direction, self.group_by)
+
+    def _after_condition(self, after):
+        sort_value, row_id = after
+        col, id_col = self.sort_column, self.id_column
+        if col == id_col:
+            op = '<' if self.direction == 'DESC' else '>'
+            return f"{id_col} {op} %s", [row_id]
+
+        # MySQL sorts NULLs first ascending and last descending
+        if self.direction == 'DESC':
+            if sort_value is None:
+                return f"({col} IS NULL AND {id_col} < %s)", [row_id]
+            return (f"({col} < %s OR ({col} = %s AND {id_col} < %s) OR {col} IS NULL)",
+                    [sort_value, sort_value, row_id])
+        if sort_value is None:
+            return f"({col} IS NOT NULL OR {id_col} > %s)", [row_id]
+        return f"({col} > %s OR ({col} = %s AND {id_col} > %s))", [sort_value, sort_value, row_id]
+
+    def build(self, conditions=(), params=(), after=None, limit=None):
+        """Return (sql, params) for one page; limit=None returns everything"""
+        conditions = list(conditions)
+        params = list(params)
+        if after is not None:
+            condition, after_params = self._after_condition(after)
+            conditions.append(condition)
+            params.extend(after_params)
+
+        sql = self.select_sql
+        if conditions:
+            sql += "\n WHERE " + " AND ".join(conditions)
+        if self.group_by:
+            sql += f"\n GROUP BY {self.group_by}"
+        if self.sort_column == self.id_column:
+            sql += f"\n ORDER BY {self.id_column} {self.direction}"
+        else:
+            sql += f"\n ORDER BY {self.sort_column} {self.direction}, {self.id_column} {self.direction}"
+        if limit is not None:
+            sql += "\n LIMIT %s"
+            params.append(limit)
+        return sql, params
+
+    def page_sql(self, args, conditions=(), params=()):
+        """(sql, params, limit) for the page described by ?cursor=&limit=
+
+        The query fetches one row past limit; pass the rows to finish_page.
+        Raises InvalidCursor for bad tokens.
+        """
+        limit = page_limit(args)
+        token = args.get('cursor')
+        after = decode_cursor(token) if token else None
+
+        sql, sql_params = self.build(conditions, params, after, limit + 1)
+        return sql, sql_params, limit
+
+    def finish_page(self, rows, limit):
+        """Trim a page_sql result to limit rows; returns (rows, next_cursor)"""
+        rows = list(rows)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last[self.sort_key], last[self.id_key])
+        return rows, next_cursor
+
+    def fetch_page(self, cursor, args, conditions=(), params=()):
+        """Fetch the page described by ?cursor=&limit=
+
+        Returns (rows, next_cursor). Raises InvalidCursor for bad tokens.
+        """
+        sql, sql_params, limit = self.page_sql(args, conditions, params)
+        cursor.execute(sql, sql_params)
+        return self.finish_page(cursor.fetchall(), limit)
+
+def page_response(items, next_cursor, args):
+    """Envelope returned by paginated list endpoints"""
+    return {
+        'items': items,
+        'next_cursor': next_cursor,
+        'limit': page_limit(args)
+    }
+
+def list_sql(query, args, conditions=(), params=(), legacy_limit=None):
+    """(sql, params, limit) for a paginated or legacy (full list) request
+
+    limit is None in legacy mode; otherwise pass the rows to query.finish_page.
+    """
+    if is_paginated(args):
+        return query.page_sql(args, conditions, params)
+    sql, sql_params = query.build(conditions, params, limit=legacy_limit)
+    return sql, sql_params, None
+
+def fetch_list(cursor, query, args, conditions=(), params=(), legacy_limit=None):
+    """Run a list query paginated or in legacy (full list) mode
+
+    Returns (rows, next_cursor); next_cursor is always None in legacy mode.
+    """
+    sql, sql_params, limit = list_sql(query, args, conditions, params, legacy_limit)
+    cursor.execute(sql, sql_params)
+    if limit is None:
+        return cursor.fetchall(), None
+    return query.finish_page(cursor.fetchall(), limit)
+
+def list_response(rows, next_cursor, args):
+    """Page envelope for paginated requests, the bare list otherwise"""
+    if is_paginated(args):
+        return page_response(rows, next_cursor, args)
+    return rows
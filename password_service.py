@@ -0,0 +1,98 @@
+"""Password hashing and verification
+
+All staff and customer password checks go through this module. bcrypt work
+runs in a bounded thread pool: bcrypt releases the GIL, so concurrent logins
+on threaded workers use separate cores, and the pool size caps how many
+hashes compete for CPU at once. Hashes in older formats (salted or plain
+SHA256, plaintext, or bcrypt at a different cost) are reported for upgrade
+after a successful check so callers can store a fresh bcrypt hash.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import hmac
+import logging
+import os
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+# bcrypt cost factor for new hashes; each +1 doubles the work
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+# Concurrent bcrypt operations per process (default: one per core)
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 2))
+
+_BCRYPT_RE = re.compile(r'^\$2[aby]?\$(\d{2})\$')
+_SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    """Thread pool for this process, created after any gunicorn fork"""
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        with _executor_lock:
+            if _executor is None or _executor_pid != os.getpid():
+                _executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix='bcrypt')
+                _executor_pid = os.getpid()
+    return _executor
+
+# bcrypt is imported where it is used so workers load it on the first password check
+def _bcrypt_hash(password, rounds):
+    import bcrypt
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+def _bcrypt_check(password, stored_hash):
+    import bcrypt
+    return bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
+
+def hash_scheme(stored_hash):
+    """'bcrypt', 'sha256_salted', 'sha256' or 'plaintext'"""
+    if _BCRYPT_RE.match(stored_hash):
+        return 'bcrypt'
+    if ':' in stored_hash:
+        return 'sha256_salted'
+    if _SHA256_RE.match(stored_hash):
+        return 'sha256'
+    return 'plaintext'
+
+def hash_password(password, rounds=None):
+    """bcrypt hash (str) at BCRYPT_ROUNDS, computed in the hash pool"""
+    return _get_executor().submit(_bcrypt_hash, password, rounds or BCRYPT_ROUNDS).result()
+
+def verify_password(password, stored_hash):
+    """True if password matches stored_hash in any supported format"""
+    if not password or not stored_hash:
+        return False
+    try:
+        scheme = hash_scheme(stored_hash)
+        if scheme == 'bcrypt':
+            return _get_executor().submit(_bcrypt_check, password, stored_hash).result()
+        if scheme == 'sha256_salted':
+            salt, hash_part = stored_hash.split(':', 1)
+            computed = hashlib.sha256((salt + password).encode()).hexdigest()
+            return hmac.compare_digest(computed, hash_part)
+        computed = hashlib.sha256(password.encode()).hexdigest()
+        if scheme == 'sha256' and hmac.compare_digest(computed, stored_hash):
+            return True
+        # Plaintext passwords from early seed data
+        return hmac.compare_digest(password.encode('utf-8'), stored_hash.encode('utf-8'))
+    except Exception as e:
+        # Malformed hashes count as a failed check
+        logger.error("Password verification error: %s", e)
+        return False
+
+def needs_rehash(stored_hash):
+    """True if stored_hash is not bcrypt at the current cost factor"""
+    match = _BCRYPT_RE.match(stored_hash or '')
+    return not match or int(match.group(1)) != BCRYPT_ROUNDS
+
+def check_password(password, stored_hash):
+    """(valid, upgraded_hash) where upgraded_hash is set only when it should be stored"""
+    if not verify_password(password, stored_hash):
+        return False, None
+    if needs_rehash(stored_hash):
+        return True, hash_password(password)
+    return True, None
@@ -2,7 +2,10 @@ from flask import request, jsonify
 from flask_jwt_extended import jwt_required
 from database import get_db
 import pymysql
-from cloud_image_service import hostinger_image_service
+from cloud_image_service import get_image_service
+import logging
+
+logger = logging.getLogger(__name__)
 
 def register_product_images_page_routes(app):
     """Register product images page routes"""
@@ -35,7 +38,7 @@ def register_product_images_page_routes(app):
             return jsonify(products)
             
         except Exception as e:
-            print(f"Get product images error: {e}")
+            logger.error("Get product images error: %s", e)
             return jsonify([])
     
     @app.route('/api/v1/product-images/missing', methods=['GET'])
@@ -65,7 +68,7 @@ def register_product_images_page_routes(app):
             return jsonify(products)
             
         except Exception as e:
-            print(f"Get products without images error: {e}")
+            logger.error("Get products without images error: %s", e)
             return jsonify([])
     
     @app.route('/api/v1/product-images/bulk-upload', methods=['POST'])
@@ -92,7 +95,7 @@ def register_product_images_page_routes(app):
             for i, (file, product_id) in enumerate(zip(files, product_ids)):
                 try:
                     # Upload image
-                    image_url = hostinger_image_service.upload_image(file, 'products')
+                    image_url = get_image_service().upload_image(file, 'products')
                     if image_url:
                         # Update product
                         cursor.execute(
@@ -126,7 +129,7 @@ def register_product_images_page_routes(app):
             })
             
         except Exception as e:
-            print(f"Bulk upload error: {e}")
+            logger.error("Bulk upload error: %s", e)
             return jsonify({'error': 'Bulk upload failed'}), 500
     
     @app.route('/api/v1/product-images/stats', methods=['GET'])
@@ -164,5 +167,5 @@ def register_product_images_page_routes(app):
             })
             
         except Exception as e:
-            print(f"Get image stats error: {e}")
+            logger.error("Get image stats error: %s", e)
             return jsonify({})
\ No newline at end of file
@@ -1,19 +1,19 @@
-from flask import request, jsonify, send_from_directory
+from flask import Blueprint, request, jsonify, send_from_directory
 from flask_jwt_extended import jwt_required
 from database import get_db
 import pymysql
-from local_image_service import local_image_service
+from local_image_service import get_local_image_service
+from cache_config import invalidates_cache
 import os
 import uuid
 from werkzeug.utils import secure_filename
-from PIL import Image
+import logging
+
+logger = logging.getLogger(__name__)
 
 def register_product_images_routes(app):
     """Register product image management routes"""
-    
-    # Configure upload settings
-    UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads', 'product_images')
-    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    bp = Blueprint('product_images', __name__)
     
     def ensure_single_primary(cursor, product_id):
         """Ensure only one primary image exists per product"""
@@ -31,7 +31,7 @@ def register_product_images_routes(app):
             primary_url = cursor.fetchone()['image_url']
             cursor.execute("UPDATE products SET image_url = %s WHERE id = %s", (primary_url, product_id))
     
-    @app.route('/api/v1/product-images/<int:product_id>', methods=['GET'])
+    @bp.route('/api/v1/product-images/<int:product_id>', methods=['GET'])
     @jwt_required()
     def get_product_images_by_id(product_id):
         """Get all images for a specific product"""
@@ -66,11 +66,12 @@ def register_product_images_routes(app):
             return jsonify(images)
             
         except Exception as e:
-            print(f"Get product images error: {e}")
+            logger.error("Get product images error: %s", e)
             return jsonify([])
     
-    @app.route('/api/v1/product-images/bulk-upload', methods=['POST'])
+    @bp.route('/api/v1/product-images/bulk-upload', methods=['POST'])
     @jwt_required()
+    @invalidates_cache('products')
     def bulk_upload_product_images():
         """Bulk upload images for multiple products"""
         try:
@@ -91,7 +92,7 @@ def register_product_images_routes(app):
                     product_id = int(product_ids[i])
                     
                     # Upload image
-                    image_url = local_image_service.upload_image(file, 'products')
+                    image_url = get_local_image_service().upload_image(file, 'products')
                     if image_url:
                         # Insert as gallery image
                         cursor.execute("""
@@ -122,11 +123,12 @@ def register_product_images_routes(app):
             })
             
         except Exception as e:
-            print(f"Bulk upload error: {e}")
+            logger.error("Bulk upload error: %s", e)
             return jsonify({'error': 'Bulk upload failed'}), 500
     
-    @app.route('/api/v1/product-images/upload/<int:product_id>', methods=['POST'])
+    @bp.route('/api/v1/product-images/upload/<int:product_id>', methods=['POST'])
     @jwt_required()
+    @invalidates_cache('products')
     def upload_product_images_by_id(product_id):
         """Upload multiple images for a product"""
         try:
@@ -141,7 +143,7 @@ def register_product_images_routes(app):
             for file in files:
                 if file.filename:
                     # Use local image service
-                    image_url = local_image_service.upload_image(file, 'products')
+                    image_url = get_local_image_service().upload_image(file, 'products')
                     if image_url:
                         # Insert into product_images table as gallery by default
                         cursor.execute("""
@@ -171,11 +173,12 @@ def register_product_images_routes(app):
             return jsonify({'uploaded_count': uploaded_count})
             
         except Exception as e:
-            print(f"Upload images error: {e}")
+            logger.error("Upload images error: %s", e)
             return jsonify({'error': 'Failed to upload images'}), 500
     
-    @app.route('/api/v1/product-images/<int:image_id>/set-primary', methods=['PUT'])
+    @bp.route('/api/v1/product-images/<int:image_id>/set-primary', methods=['PUT'])
     @jwt_required()
+    @invalidates_cache('products')
     def set_primary_image_by_id(image_id):
         """Set an image as primary and update products table"""
         try:
@@ -210,10 +213,10 @@ def register_product_images_routes(app):
             return jsonify({'message': 'Primary image updated successfully'})
             
         except Exception as e:
-            print(f"Set primary image error: {e}")
+            logger.error("Set primary image error: %s", e)
             return jsonify({'error': 'Failed to set primary image'}), 500
     
-    @app.route('/api/v1/product-images/delete/<int:image_id>', methods=['DELETE'])
+    @bp.route('/api/v1/product-images/delete/<int:image_id>', methods=['DELETE'])
     @jwt_required()
     def delete_product_image_by_id(image_id):
         """Delete a product image (cannot delete primary images)"""
@@ -239,7 +242,7 @@ def register_product_images_routes(app):
             cursor.execute("DELETE FROM product_images WHERE id = %s", (image_id,))
             
             # Delete physical file
-            local_image_service.delete_image(image_url)
+            get_local_image_service().delete_image(image_url)
             
             conn.commit()
             conn.close()
@@ -247,35 +250,12 @@ def register_product_images_routes(app):
             return jsonify({'message': 'Image deleted successfully'})
             
         except Exception as e:
-            print(f"Delete image error: {e}")
+            logger.error("Delete image error: %s", e)
             return jsonify({'error': 'Failed to delete image'}), 500
     
-    @app.route('/api/v1/product-images/sync-existing', methods=['POST'])
-    @jwt_required()
-    def sync_existing_images_api():
-        """Sync existing product images"""
-        try:
-            conn = get_db()
-            cursor = conn.cursor(pymysql.cursors.DictCursor)
-            
-            cursor.execute("""
-                INSERT INTO product_images (product_id, image_url, is_primary, created_at, updated_at)
-                SELECT id, image_url, TRUE, created_at, updated_at 
-                FROM products 
-                WHERE image_url IS NOT NULL AND image_url != ''
-                AND id NOT IN (SELECT DISTINCT product_id FROM product_images)
-            """)
-            
-            synced_count = cursor.rowcount
-            conn.commit()
-            conn.close()
-            return jsonify({'synced_count': synced_count})
-            
-        except Exception as e:
-            return jsonify({'error': 'Failed to sync images'}), 500
-    
-    @app.route('/api/v1/product-images/remove-primary/<int:product_id>', methods=['DELETE'])
+    @bp.route('/api/v1/product-images/remove-primary/<int:product_id>', methods=['DELETE'])
     @jwt_required()
+    @invalidates_cache('products')
     def remove_primary_image(product_id):
         """Remove primary image from both tables"""
         try:
@@ -291,7 +271,7 @@ def register_product_images_routes(app):
                 cursor.execute("DELETE FROM product_images WHERE id = %s", (primary_image['id'],))
                 
                 # Delete physical file
-                local_image_service.delete_image(primary_image['image_url'])
+                get_local_image_service().delete_image(primary_image['image_url'])
             
             # Remove from products table
             cursor.execute("UPDATE products SET image_url = NULL WHERE id = %s", (product_id,))
@@ -302,11 +282,12 @@ def register_product_images_routes(app):
             return jsonify({'message': 'Primary image removed successfully'})
             
         except Exception as e:
-            print(f"Remove primary image error: {e}")
+            logger.error("Remove primary image error: %s", e)
             return jsonify({'error': 'Failed to remove primary image'}), 500
     
-    @app.route('/api/v1/products/<int:product_id>/upload-image', methods=['POST'])
+    @bp.route('/api/v1/products/<int:product_id>/upload-image', methods=['POST'])
     @jwt_required()
+    @invalidates_cache('products')
     def upload_and_set_product_image(product_id):
         """Upload image and set as product image"""
         try:
@@ -331,7 +312,7 @@ def register_product_images_routes(app):
                 return jsonify({'error': 'Product not found'}), 404
             
             # Upload new image
-            image_url = local_image_service.upload_image(file, 'products')
+            image_url = get_local_image_service().upload_image(file, 'products')
             if not image_url:
                 conn.close()
                 return jsonify({'error': 'Failed to upload image'}), 500
@@ -339,7 +320,7 @@ def register_product_images_routes(app):
             # Delete old image if exists
             old_image_url = product.get('image_url')
             if old_image_url and old_image_url != image_url:
-                local_image_service.delete_image(old_image_url)
+                get_local_image_service().delete_image(old_image_url)
                 # Remove old primary image from product_images table
                 cursor.execute("DELETE FROM product_images WHERE product_id = %s AND image_type = 'primary'", (product_id,))
             
@@ -364,11 +345,12 @@ def register_product_images_routes(app):
             })
             
         except Exception as e:
-            print(f"Upload and set image error: {e}")
+            logger.error("Upload and set image error: %s", e)
             return jsonify({'error': 'Failed to upload image'}), 500
     
-    @app.route('/api/v1/products/<int:product_id>/remove-image', methods=['DELETE'])
+    @bp.route('/api/v1/products/<int:product_id>/remove-image', methods=['DELETE'])
     @jwt_required()
+    @invalidates_cache('products')
     def remove_product_image(product_id):
         """Remove product image"""
         try:
@@ -388,7 +370,7 @@ def register_product_images_routes(app):
             image_url = product.get('image_url')
             if image_url:
                 # Delete image file
-                local_image_service.delete_image(image_url)
+                get_local_image_service().delete_image(image_url)
                 
                 # Remove image URL from products table
                 cursor.execute(
@@ -408,11 +390,12 @@ def register_product_images_routes(app):
             return jsonify({'message': 'Image removed successfully'})
             
         except Exception as e:
-            print(f"Remove image error: {e}")
+            logger.error("Remove image error: %s", e)
             return jsonify({'error': 'Failed to remove image'}), 500
     
-    @app.route('/api/v1/products/fix-images', methods=['POST'])
+    @bp.route('/api/v1/products/fix-images', methods=['POST'])
     @jwt_required()
+    @invalidates_cache('products')
     def fix_product_images():
         """Fix product images with placeholder URLs"""
         try:
@@ -445,5 +428,7 @@ def register_product_images_routes(app):
             return jsonify({'message': 'Product images updated successfully'})
             
         except Exception as e:
-            print(f"Fix images error: {e}")
-            return jsonify({'error': 'Failed to fix images'}), 500
\ No newline at end of file
+            logger.error("Fix images error: %s", e)
+            return jsonify({'error': 'Failed to fix images'}), 500
+    
+    app.register_blueprint(bp)
\ No newline at end of file
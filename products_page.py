@@ -1,10 +1,36 @@
-from flask import request, jsonify
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 import pymysql
 import re
-from database import get_db, sanitize_input
-from cloud_image_service import hostinger_image_service
+from database import get_db, sanitize_input, read_only
+from cloud_image_service import get_image_service
+from cache_config import cache_response, invalidates_cache, uncacheable
+from pagination import KeysetQuery, InvalidCursor, fetch_list, list_response
+from dashboard_counters import record_change
+from lookup_index import record_lookup_change
+import logging
+
+logger = logging.getLogger(__name__)
+
+PRODUCTS_LIST_QUERY = KeysetQuery("""
+    SELECT p.id, p.name, 
+           COALESCE(p.product_code, '') as sku, 
+           COALESCE(p.description, '') as description, 
+           COALESCE(p.price, 0) as price, 
+           COALESCE(p.offer_price, NULL) as offer_price,
+           COALESCE(p.stock_quantity, 0) as stock_quantity,
+           COALESCE(p.stock_status, 'in_stock') as stock_status,
+           COALESCE(p.image_url, '') as image_url, 
+           COALESCE(p.is_trending, 0) as is_trending,
+           COALESCE(p.trending_position, NULL) as trending_position,
+           COALESCE(p.is_active, 1) as is_active,
+           p.category_id, 
+           COALESCE(c.name, 'No Category') as category_name,
+           p.created_at
+    FROM products p
+    LEFT JOIN product_categories c ON p.category_id = c.id
+""", "COALESCE(p.product_code, '')", 'p.id', 'sku', direction='ASC')
 
 def check_permission(user_role, required_role):
     """Check user permissions"""
@@ -60,8 +86,9 @@ def validate_product_data(data):
 
 def register_products_routes(app):
     """Register product page routes"""
+    bp = Blueprint('products', __name__)
     
-    @app.route('/api/v1/products/categories/', methods=['GET'])
+    @bp.route('/api/v1/products/categories/', methods=['GET'])
     @jwt_required()
     def get_product_categories():
         """Get all categories"""
@@ -78,17 +105,19 @@ def register_products_routes(app):
             return jsonify(categories)
             
         except Exception as e:
-            print(f"Get categories error: {e}")
+            logger.error("Get categories error: %s", e)
             return jsonify([])
     
-    @app.route('/api/v1/products/', methods=['GET'])
+    @bp.route('/api/v1/products/', methods=['GET'])
     @jwt_required()
+    @cache_response(timeout=30, tags=('products',))
+    @read_only
     def get_products():
         """Get all products"""
         try:
             conn = get_db()
             if not conn:
-                return jsonify([])
+                return uncacheable(jsonify([]))
             
             cursor = conn.cursor(pymysql.cursors.DictCursor)
             
@@ -99,39 +128,21 @@ def register_products_routes(app):
             if sort_order not in ['asc', 'desc']:
                 sort_order = 'asc'
             
-            # Query using actual database structure
-            query = f"""
-                SELECT p.id, p.name, 
-                       COALESCE(p.product_code, '') as sku, 
-                       COALESCE(p.description, '') as description, 
-                       COALESCE(p.price, 0) as price, 
-                       COALESCE(p.offer_price, NULL) as offer_price,
-                       COALESCE(p.stock_quantity, 0) as stock_quantity,
-                       COALESCE(p.stock_status, 'in_stock') as stock_status,
-                       COALESCE(p.image_url, '') as image_url, 
-                       COALESCE(p.is_trending, 0) as is_trending,
-                       COALESCE(p.trending_position, NULL) as trending_position,
-                       COALESCE(p.is_active, 1) as is_active,
-                       p.category_id, 
-                       COALESCE(c.name, 'No Category') as category_name,
-                       p.created_at
-                FROM products p
-                LEFT JOIN product_categories c ON p.category_id = c.id
-                ORDER BY p.product_code {sort_order.upper()}
-            """
-            
-            cursor.execute(query)
-            products = cursor.fetchall()
+            query = PRODUCTS_LIST_QUERY.with_direction(sort_order)
+            products, next_cursor = fetch_list(cursor, query, request.args)
             
             conn.close()
-            return jsonify(products)
+            return jsonify(list_response(products, next_cursor, request.args))
             
+        except InvalidCursor as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
-            print(f"Get products error: {e}")
-            return jsonify([])
+            logger.error("Get products error: %s", e)
+            return uncacheable(jsonify([]))
     
-    @app.route('/api/v1/products/', methods=['POST'])
+    @bp.route('/api/v1/products/', methods=['POST'])
     @jwt_required()
+    @invalidates_cache('products')
     def create_product():
         """Create new product"""
         try:
@@ -174,6 +185,8 @@ def register_products_routes(app):
             ))
             
             product_id = cursor.lastrowid
+            record_change(cursor, 'products', new={'is_active': data.get('is_active', True)})
+            record_lookup_change(cursor, 'products', product_id)
             conn.commit()
             
             # Get created product
@@ -184,11 +197,12 @@ def register_products_routes(app):
             return jsonify(product), 201
             
         except Exception as e:
-            print(f"Create product error: {e}")
+            logger.error("Create product error: %s", e)
             return jsonify({'error': 'Failed to create product'}), 500
     
-    @app.route('/api/v1/products/<int:product_id>', methods=['PUT'])
+    @bp.route('/api/v1/products/<int:product_id>', methods=['PUT'])
     @jwt_required()
+    @invalidates_cache('products')
     def update_product(product_id):
         """Update existing product"""
         try:
@@ -202,6 +216,9 @@ def register_products_routes(app):
             
             cursor = conn.cursor(pymysql.cursors.DictCursor)
             
+            cursor.execute("SELECT is_active FROM products WHERE id = %s", (product_id,))
+            existing = cursor.fetchone()
+            
             # Update product
             query = """
                 UPDATE products SET 
@@ -225,6 +242,9 @@ def register_products_routes(app):
                 data.get('is_active', True),
                 product_id
             ))
+            if existing:
+                record_change(cursor, 'products', old=existing, new={'is_active': data.get('is_active', True)})
+            record_lookup_change(cursor, 'products', product_id)
             
             conn.commit()
             
@@ -236,11 +256,12 @@ def register_products_routes(app):
             return jsonify(product)
             
         except Exception as e:
-            print(f"Update product error: {e}")
+            logger.error("Update product error: %s", e)
             return jsonify({'error': 'Failed to update product'}), 500
     
-    @app.route('/api/v1/products/<int:product_id>', methods=['DELETE'])
+    @bp.route('/api/v1/products/<int:product_id>', methods=['DELETE'])
     @jwt_required()
+    @invalidates_cache('products')
     def delete_product(product_id):
         """Delete product"""
         try:
@@ -251,23 +272,26 @@ def register_products_routes(app):
             cursor = conn.cursor(pymysql.cursors.DictCursor)
             
             # Check if product exists
-            cursor.execute("SELECT id FROM products WHERE id = %s", (product_id,))
-            if not cursor.fetchone():
+            cursor.execute("SELECT id, is_active FROM products WHERE id = %s", (product_id,))
+            existing = cursor.fetchone()
+            if not existing:
                 conn.close()
                 return jsonify({'error': 'Product not found'}), 404
             
             # Delete product
             cursor.execute("DELETE FROM products WHERE id = %s", (product_id,))
+            record_change(cursor, 'products', old=existing)
+            record_lookup_change(cursor, 'products', product_id)
             conn.commit()
             conn.close()
             
             return jsonify({'message': 'Product deleted successfully'})
             
         except Exception as e:
-            print(f"Delete product error: {e}")
+            logger.error("Delete product error: %s", e)
             return jsonify({'error': 'Failed to delete product'}), 500
     
-    @app.route('/api/v1/products/upload-image', methods=['POST'])
+    @bp.route('/api/v1/products/upload-image', methods=['POST'])
     @jwt_required()
     def upload_product_image():
         """Upload product image to cloud storage"""
@@ -286,7 +310,7 @@ def register_products_routes(app):
                 return jsonify({'error': 'Invalid file type. Only PNG, JPG, JPEG, GIF, WEBP allowed'}), 400
             
             # Upload to cloud storage
-            image_url = hostinger_image_service.upload_image(file, 'products')
+            image_url = get_image_service().upload_image(file, 'products')
             
             if image_url:
                 return jsonify({'image_url': image_url}), 200
@@ -294,11 +318,12 @@ def register_products_routes(app):
                 return jsonify({'error': 'Failed to upload image'}), 500
                 
         except Exception as e:
-            print(f"Upload image error: {e}")
+            logger.error("Upload image error: %s", e)
             return jsonify({'error': 'Failed to upload image'}), 500
     
-    @app.route('/api/v1/products/<int:product_id>/image', methods=['PUT'])
+    @bp.route('/api/v1/products/<int:product_id>/image', methods=['PUT'])
     @jwt_required()
+    @invalidates_cache('products')
     def update_product_image_url(product_id):
         """Update product image URL"""
         try:
@@ -321,7 +346,7 @@ def register_products_routes(app):
             # Delete old image if exists
             old_image_url = product.get('image_url')
             if old_image_url and old_image_url != image_url:
-                hostinger_image_service.delete_image(old_image_url)
+                get_image_service().delete_image(old_image_url)
             
             # Update image URL
             cursor.execute(
@@ -334,5 +359,7 @@ def register_products_routes(app):
             return jsonify({'message': 'Image updated successfully', 'image_url': image_url})
             
         except Exception as e:
-            print(f"Update image error: {e}")
+            logger.error("Update image error: %s", e)
             return jsonify({'error': 'Failed to update image'}), 500
+    
+    app.register_blueprint(bp)
@@ -1,12 +1,17 @@
-from flask import jsonify, request
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from database import get_db
 import pymysql
-import bcrypt
+from password_service import hash_password, verify_password
+from lookup_index import record_lookup_change
+import logging
+
+logger = logging.getLogger(__name__)
 
 def register_profile_routes(app):
+    bp = Blueprint('profile', __name__)
     
-    @app.route('/api/v1/profile/', methods=['GET'])
+    @bp.route('/api/v1/profile/', methods=['GET'])
     @jwt_required()
     def get_profile():
         try:
@@ -34,12 +39,10 @@ def register_profile_routes(app):
             
             return jsonify(user)
         except Exception as e:
-            print(f"Get profile error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Get profile error: %s", e)
             return jsonify({'error': str(e)}), 500
     
-    @app.route('/api/v1/profile/', methods=['PUT'])
+    @bp.route('/api/v1/profile/', methods=['PUT'])
     @jwt_required()
     def update_profile():
         try:
@@ -104,6 +107,7 @@ def register_profile_routes(app):
                 phone_digits if phone else None,
                 current_user_id
             ))
+            record_lookup_change(cursor, 'users', current_user_id)
             conn.commit()
             conn.close()
             
@@ -112,49 +116,39 @@ def register_profile_routes(app):
                 'toast': {'type': 'success', 'title': 'Success', 'message': 'Profile updated successfully'}
             })
         except Exception as e:
-            print(f"Update profile error: {e}")
+            logger.error("Update profile error: %s", e)
             return jsonify({'error': str(e)}), 500
     
-    @app.route('/api/v1/profile/change-password', methods=['PUT'])
+    @bp.route('/api/v1/profile/change-password', methods=['PUT'])
     @jwt_required()
     def change_password():
         try:
             current_user_id = get_jwt_identity()
             data = request.get_json()
             
-            print(f"DEBUG: Received data: {data}")
-            print(f"DEBUG: User ID: {current_user_id}")
-            
             current_password = data.get('current_password', '').strip()
             new_password = data.get('new_password', '').strip()
             
-            print(f"DEBUG: Current password length: {len(current_password)}")
-            print(f"DEBUG: New password length: {len(new_password)}")
-            
             # Validation
             if not current_password:
-                print("DEBUG: Current password is empty")
                 return jsonify({
                     'error': 'Current password is required',
                     'toast': {'type': 'danger', 'title': 'Error', 'message': 'Current password is required'}
                 }), 400
             
             if not new_password:
-                print("DEBUG: New password is empty")
                 return jsonify({
                     'error': 'New password is required',
                     'toast': {'type': 'danger', 'title': 'Error', 'message': 'New password is required'}
                 }), 400
             
             if len(new_password) < 6:
-                print(f"DEBUG: New password too short: {len(new_password)}")
                 return jsonify({
                     'error': 'New password must be at least 6 characters',
                     'toast': {'type': 'danger', 'title': 'Error', 'message': 'Password must be at least 6 characters'}
                 }), 400
             
             if current_password == new_password:
-                print("DEBUG: Passwords are the same")
                 return jsonify({
                     'error': 'New password must be different from current password',
                     'toast': {'type': 'danger', 'title': 'Error', 'message': 'New password must be different'}
@@ -172,57 +166,28 @@ def register_profile_routes(app):
                 conn.close()
                 return jsonify({'error': 'User not found'}), 404
             
-            # Verify current password
-            password_hash = user['password_hash']
-            print(f"DEBUG: Password hash starts with: {password_hash[:10]}")
-            
-            password_valid = False
-            
-            # Check if it's bcrypt (starts with $2b$ or $2a$ or $2y$)
-            if password_hash.startswith('$2'):
-                print("DEBUG: Using bcrypt verification")
-                try:
-                    password_valid = bcrypt.checkpw(current_password.encode('utf-8'), password_hash.encode('utf-8'))
-                except Exception as e:
-                    print(f"DEBUG: Bcrypt error: {e}")
-            # Check if it's SHA256 with salt (salt:hash format)
-            elif ':' in password_hash:
-                print("DEBUG: Using SHA256 with salt verification")
-                import hashlib
-                salt, hash_part = password_hash.split(':', 1)
-                computed_hash = hashlib.sha256((salt + current_password).encode()).hexdigest()
-                password_valid = computed_hash == hash_part
-            else:
-                print("DEBUG: Using plain SHA256 verification")
-                # Plain SHA256 without salt
-                import hashlib
-                computed_hash = hashlib.sha256(current_password.encode()).hexdigest()
-                password_valid = computed_hash == password_hash
-            
-            if not password_valid:
+            # Verify current password (bcrypt or legacy SHA256 formats)
+            if not verify_password(current_password, user['password_hash']):
                 conn.close()
-                print("DEBUG: Password verification failed")
                 return jsonify({
                     'error': 'Current password is incorrect',
                     'toast': {'type': 'danger', 'title': 'Error', 'message': 'Current password is incorrect'}
                 }), 400
             
-            print("DEBUG: Password verified, updating...")
             # Hash new password
-            new_hash = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt())
+            new_hash = hash_password(new_password)
             
             # Update password
             cursor.execute("UPDATE users SET password_hash = %s WHERE id = %s", (new_hash, current_user_id))
             conn.commit()
             conn.close()
             
-            print("DEBUG: Password updated successfully")
             return jsonify({
                 'message': 'Password changed successfully',
                 'toast': {'type': 'success', 'title': 'Success', 'message': 'Password changed successfully'}
             })
         except Exception as e:
-            print(f"Change password error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Change password error: %s", e)
             return jsonify({'error': str(e)}), 500
+    
+    app.register_blueprint(bp)
@@ -0,0 +1,163 @@
+"""EXPLAIN the route SQL and flag full scans
+
+Runs EXPLAIN for the hot queries the routes issue, built from the same
+query constants and filter builders the handlers use, with representative
+parameters. A plan step that reads a table (type ALL) or a whole index
+(type index) and estimates at least --min-rows rows is reported:
+
+    python query_plans.py [--min-rows 1000] [--query customers.]
+
+Plans only mean something on a database with production-like volumes, since
+MySQL prefers scanning small tables; tables smaller than --min-rows are
+listed under "small_tables". Run `python migrate.py up` first. Exits 1 when
+a full scan is found.
+"""
+from datetime import datetime
+import pymysql
+
+PAGE_SIZE = 50
+# Cursor of a later page: (sort value, id) of the last row of the previous one
+SAMPLE_AFTER = (datetime(2024, 1, 1), 100000)
+SAMPLE_DATE_RANGE = {'start_date': '2024-01-01', 'end_date': '2024-03-31'}
+SAMPLE_PHONE = '9845012345'
+SAMPLE_EMAIL = 'priya.sharma@example.com'
+SAMPLE_CODE = 'CUST00012345'
+SAMPLE_IDS = list(range(1000, 1000 + PAGE_SIZE))
+
+# EXPLAIN access types that read every row of a table or index
+FULL_SCAN_TYPES = {'ALL': 'full table scan', 'index': 'full index scan'}
+
+def _in(ids):
+    return ', '.join(['%s'] * len(ids))
+
+def route_queries():
+    """[(name, sql, params), ...] for the queries the hot routes issue"""
+    from all_routes import (ENQUIRIES_LIST_QUERY, SERVICES_LIST_QUERY, SALES_LIST_QUERY,
+                            DISPATCH_LIST_QUERY, NOTIFICATIONS_LIST_QUERY, UNREAD_COUNT_QUERY)
+    from customers_page import CUSTOMERS_LIST_QUERY, customer_list_filters
+    from products_page import PRODUCTS_LIST_QUERY
+    from service_tickets_page import SERVICE_TICKETS_LIST_QUERY
+    from users_page import USERS_LIST_QUERY
+    from report_exports import (SALES_REPORT_SUMMARY_QUERY, DISPATCH_REPORT_SUMMARY_QUERY, EXPORT_REPORTS,
+                                sales_report_filters, dispatch_report_filters)
+    from sale_items_loader import sale_items_queries
+
+    queries = []
+    lists = [
+        ('customers', CUSTOMERS_LIST_QUERY), ('products', PRODUCTS_LIST_QUERY),
+        ('users', USERS_LIST_QUERY), ('sales', SALES_LIST_QUERY), ('dispatch', DISPATCH_LIST_QUERY),
+        ('enquiries', ENQUIRIES_LIST_QUERY), ('services', SERVICES_LIST_QUERY),
+        ('service_tickets', SERVICE_TICKETS_LIST_QUERY), ('notifications', NOTIFICATIONS_LIST_QUERY),
+    ]
+    for name, query in lists:
+        queries.append((f"{name}.list", *query.build(limit=PAGE_SIZE + 1)))
+        # The products list sorts by SKU, the others by a date
+        after = ('SKU00100', SAMPLE_AFTER[1]) if query.sort_key == 'sku' else SAMPLE_AFTER
+        queries.append((f"{name}.list.next_page", *query.build(after=after, limit=PAGE_SIZE + 1)))
+
+    for term in ('sharma', '98450'):
+        conditions, params = customer_list_filters({'search': term})
+        queries.append((f"customers.search.{term}", *CUSTOMERS_LIST_QUERY.build(conditions, params, limit=PAGE_SIZE + 1)))
+    queries += [
+        ('customers.by_phone', "SELECT id FROM customers WHERE phone = %s", [SAMPLE_PHONE]),
+        ('customers.by_email', "SELECT id FROM customers WHERE email = %s", [SAMPLE_EMAIL]),
+        ('customers.by_code', "SELECT id FROM customers WHERE customer_code = %s", [SAMPLE_CODE]),
+        ('customers.login', """
+            SELECT id, customer_code, email, phone, contact_person, individual_name,
+                   password_hash, is_verified, customer_type
+            FROM customers
+            WHERE (email = %s OR phone = %s) AND password_hash IS NOT NULL
+        """, [SAMPLE_EMAIL, SAMPLE_EMAIL]),
+        ('customers.import_match', "SELECT id, contact_person, phone FROM customers WHERE contact_person IN (%s, %s)",
+         ['Priya Sharma', 'Arjun Iyer']),
+        ('products.import_match', "SELECT id, name FROM products WHERE name IN (%s, %s)", ['Wheelchair', 'Walker']),
+        ('product_images.primary', """
+            SELECT id, image_url FROM product_images WHERE product_id = %s AND image_type = 'primary'
+        """, [SAMPLE_IDS[0]]),
+        ('dispatch.for_sale', """
+            SELECT COUNT(*) as dispatch_count FROM dispatches
+            WHERE sale_id = %s AND status IN ('in_transit', 'delivered')
+        """, [SAMPLE_IDS[0]]),
+        ('notifications.unread_count', UNREAD_COUNT_QUERY, []),
+        ('enquiries.import_fingerprints',
+         f"SELECT customer_id, message, status FROM enquiries WHERE customer_id IN ({_in(SAMPLE_IDS)})", SAMPLE_IDS),
+    ]
+    sql, params = next(sale_items_queries(SAMPLE_IDS))
+    queries.append(('sale_items.for_sales', sql, params))
+
+    where_sql, params = sales_report_filters(SAMPLE_DATE_RANGE)
+    queries.append(('reports.sales.summary', SALES_REPORT_SUMMARY_QUERY.format(where_sql=where_sql), params))
+    where_sql, params = dispatch_report_filters(SAMPLE_DATE_RANGE)
+    queries.append(('reports.dispatch.summary', DISPATCH_REPORT_SUMMARY_QUERY.format(where_sql=where_sql), params))
+    for name, (template, filters) in EXPORT_REPORTS.items():
+        where_sql, params = filters(SAMPLE_DATE_RANGE)
+        queries.append((f"reports.{name}.export", template.format(where_sql=where_sql), params))
+    return queries
+
+def table_sizes(cursor):
+    """table -> estimated row count from information_schema"""
+    cursor.execute("""
+        SELECT TABLE_NAME as name, TABLE_ROWS as row_count FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE()
+    """)
+    return {row['name']: int(row['row_count'] or 0) for row in cursor.fetchall()}
+
+def full_scans(plan, min_rows):
+    """EXPLAIN rows that scan a whole table or index of at least min_rows rows"""
+    found = []
+    for step in plan:
+        kind = FULL_SCAN_TYPES.get(step.get('type'))
+        if kind and int(step.get('rows') or 0) >= min_rows:
+            found.append({
+                'table': step.get('table'),
+                'scan': kind,
+                'rows': int(step['rows']),
+                'possible_keys': step.get('possible_keys'),
+                'extra': step.get('Extra')
+            })
+    return found
+
+def check(conn, min_rows=1000, only=None):
+    """Plan every route query; returns the report dict"""
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    sizes = table_sizes(cursor)
+    report = {
+        'small_tables': sorted(name for name, count in sizes.items() if count < min_rows),
+        'checked': 0,
+        'full_scans': {},
+        'errors': {}
+    }
+    for name, sql, params in route_queries():
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        report['checked'] += 1
+        try:
+            cursor.execute("EXPLAIN " + sql, params or None)
+            plan = cursor.fetchall()
+        except pymysql.MySQLError as e:
+            report['errors'][name] = str(e)
+            continue
+        scans = full_scans(plan, min_rows)
+        if scans:
+            report['full_scans'][name] = scans
+    return report
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    from database import borrow_connection
+
+    parser = argparse.ArgumentParser(description='EXPLAIN the route SQL and flag full scans')
+    parser.add_argument('--min-rows', type=int, default=1000, help='ignore scans estimated below this many rows')
+    parser.add_argument('--query', action='append', help='only queries whose name starts with this (repeatable)')
+    args = parser.parse_args()
+
+    conn = borrow_connection()
+    if not conn:
+        raise SystemExit('Database connection failed')
+    try:
+        report = check(conn, args.min_rows, args.query)
+    finally:
+        conn.close()
+    print(json.dumps(report, indent=2, default=str))
+    raise SystemExit(1 if report['full_scans'] or report['errors'] else 0)
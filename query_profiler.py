@@ -0,0 +1,225 @@
+"""Query profiling for the pooled connections
+
+QUERY_PROFILING decides what the cursors of database.py connections record:
+
+- off (default): cursors are returned unwrapped, nothing is measured
+- slow: every execute is timed; queries slower than SLOW_QUERY_MS and
+  failed ones are logged with their fingerprint and call site
+- on: additionally records each request's queries (fingerprint, duration,
+  rows, call site), adds a Server-Timing header, logs a per-request
+  summary, warns when one fingerprint runs more than QUERY_REPEAT_THRESHOLD
+  times in a request (an N+1 loop) and keeps per-fingerprint totals for
+  GET /api/v1/db/queries
+
+Fingerprints are the SQL with literals and placeholders replaced by ? and
+IN/VALUES lists collapsed, so logs never contain parameter values. The
+async handlers in asgi_app.py use aiomysql cursors and are not profiled.
+"""
+from collections import Counter
+import functools
+import os
+import re
+import sys
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# off | slow | on, see the module docstring
+QUERY_PROFILING = os.getenv('QUERY_PROFILING', 'off').lower()
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 500))
+# More executions of one fingerprint in a request than this is flagged as N+1
+QUERY_REPEAT_THRESHOLD = int(os.getenv('QUERY_REPEAT_THRESHOLD', 10))
+# Distinct fingerprints kept in the per-worker totals
+QUERY_STATS_MAX_FINGERPRINTS = int(os.getenv('QUERY_STATS_MAX_FINGERPRINTS', 500))
+
+ENABLED = QUERY_PROFILING in ('slow', 'on')
+RECORDING = QUERY_PROFILING == 'on'
+
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_RE = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDER_RE = re.compile(r'%(?:\(\w+\))?s')
+_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_ROW_LIST_RE = re.compile(r'\(\?\+\)(?:\s*,\s*\(\?\+\))+')
+_SPACE_RE = re.compile(r'\s+')
+# Frames in these files (the database layers and shared query helpers)
+# are skipped when looking for the caller
+_INTERNAL_FILES = ('query_profiler.py', 'database.py', 'local_db.py', 'pagination.py')
+_INTERNAL_PACKAGES = (f"{os.sep}pymysql{os.sep}", f"{os.sep}dbutils{os.sep}")
+
+_stats_lock = threading.Lock()
+_stats = {}  # fingerprint -> totals, see _aggregate
+_untracked = Counter()
+
+@functools.lru_cache(maxsize=2048)
+def fingerprint(sql):
+    """SQL with values replaced by ? and lists collapsed to (?+)"""
+    text = _STRING_RE.sub('?', sql)
+    text = _PLACEHOLDER_RE.sub('?', text)
+    text = _NUMBER_RE.sub('?', text)
+    text = _LIST_RE.sub('(?+)', text)
+    text = _ROW_LIST_RE.sub('(?+), ...', text)
+    return _SPACE_RE.sub(' ', text).strip()
+
+@functools.lru_cache(maxsize=512)
+def _internal(filename):
+    return os.path.basename(filename) in _INTERNAL_FILES or any(part in filename for part in _INTERNAL_PACKAGES)
+
+def _call_site():
+    """file:line of the first caller outside the database layers"""
+    frame = sys._getframe(3)
+    while frame and _internal(frame.f_code.co_filename):
+        frame = frame.f_back
+    if frame is None:
+        return 'unknown'
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno}"
+
+def _request_profile():
+    from flask import g, has_request_context
+    return g.get('query_profile') if has_request_context() else None
+
+def _aggregate(sql_fingerprint, duration_ms, rows, failed, site):
+    with _stats_lock:
+        stats = _stats.get(sql_fingerprint)
+        if stats is None:
+            if len(_stats) >= QUERY_STATS_MAX_FINGERPRINTS:
+                _untracked['queries'] += 1
+                return
+            stats = _stats[sql_fingerprint] = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0,
+                                               'errors': 0, 'site': site}
+        stats['count'] += 1
+        stats['total_ms'] += duration_ms
+        stats['max_ms'] = max(stats['max_ms'], duration_ms)
+        stats['rows'] += rows or 0
+        stats['errors'] += failed
+
+def _record(sql, duration_ms, rows, error):
+    slow = duration_ms >= SLOW_QUERY_MS
+    if not (RECORDING or slow or error is not None):
+        return
+    site = _call_site()
+    sql_fingerprint = fingerprint(sql)
+    if slow:
+        logger.warning("Slow query: %.0f ms, %s rows at %s: %s", duration_ms, rows, site, sql_fingerprint)
+    if error is not None:
+        logger.warning("Query failed at %s: %s: %s", site, error, sql_fingerprint)
+    if not RECORDING:
+        return
+    _aggregate(sql_fingerprint, duration_ms, rows, error is not None, site)
+    profile = _request_profile()
+    if profile is not None:
+        # (fingerprint, duration ms, rows, call site, failed)
+        profile.append((sql_fingerprint, duration_ms, rows, site, error is not None))
+
+class ProfiledCursor:
+    """Cursor proxy that times execute() and executemany()"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._cursor.close()
+
+    def _timed(self, method, query, args):
+        started = time.perf_counter()
+        try:
+            result = method(query, args)
+        except Exception as e:
+            _record(query, (time.perf_counter() - started) * 1000, None, e)
+            raise
+        rowcount = self._cursor.rowcount
+        # Unbuffered cursors report -1 (or 2**64 - 1) until every row is read
+        _record(query, (time.perf_counter() - started) * 1000,
+                rowcount if 0 <= rowcount < 2 ** 63 else None, None)
+        return result
+
+    def execute(self, query, args=None):
+        return self._timed(self._cursor.execute, query, args)
+
+    def executemany(self, query, args):
+        return self._timed(self._cursor.executemany, query, args)
+
+def wrap_cursor(cursor):
+    """cursor wrapped for profiling, or unchanged when QUERY_PROFILING is off"""
+    return ProfiledCursor(cursor) if ENABLED else cursor
+
+def summarize(profile):
+    """Totals, slowest query and repeated fingerprints of one request's records"""
+    counts = Counter(record[0] for record in profile)
+    sites = {}
+    for record in profile:
+        sites.setdefault(record[0], record[3])
+    slowest = max(profile, key=lambda record: record[1]) if profile else None
+    return {
+        'queries': len(profile),
+        'db_ms': round(sum(record[1] for record in profile), 1),
+        'rows': sum(record[2] or 0 for record in profile),
+        'failed': sum(record[4] for record in profile),
+        'slowest': {'ms': round(slowest[1], 1), 'site': slowest[3], 'fingerprint': slowest[0]} if slowest else None,
+        'repeated': [
+            {'fingerprint': sql_fingerprint, 'count': count, 'site': sites[sql_fingerprint]}
+            for sql_fingerprint, count in counts.most_common() if count > QUERY_REPEAT_THRESHOLD
+        ]
+    }
+
+def init_app(app):
+    """Record each request's queries and report them when QUERY_PROFILING=on"""
+    if not RECORDING:
+        return
+    from flask import g, request
+
+    @app.before_request
+    def start_query_profile():
+        g.query_profile = []
+        g.query_profile_started = time.perf_counter()
+
+    @app.after_request
+    def report_query_profile(response):
+        profile = g.pop('query_profile', None)
+        if profile is None:
+            return response
+        summary = summarize(profile)
+        total_ms = (time.perf_counter() - g.query_profile_started) * 1000
+        timing = f'db;dur={summary["db_ms"]};desc="{summary["queries"]} queries", app;dur={total_ms:.1f}'
+        existing = response.headers.get('Server-Timing')
+        response.headers['Server-Timing'] = f"{existing}, {timing}" if existing else timing
+
+        for repeated in summary['repeated']:
+            logger.warning("Possible N+1: %s ran %d times in %s %s, first at %s", repeated['fingerprint'],
+                           repeated['count'], request.method, request.path, repeated['site'])
+        if summary['queries']:
+            slowest = summary['slowest']
+            logger.info("%s %s -> %s: %d queries, %d rows, %.1f ms in the database of %.1f ms; "
+                        "slowest %.1f ms at %s", request.method, request.path, response.status_code,
+                        summary['queries'], summary['rows'], summary['db_ms'], total_ms,
+                        slowest['ms'], slowest['site'])
+        return response
+
+def query_stats(sort='total_ms', limit=50):
+    """Per-fingerprint totals of this worker, largest first"""
+    with _stats_lock:
+        rows = [dict(stats, fingerprint=sql_fingerprint) for sql_fingerprint, stats in _stats.items()]
+        untracked = _untracked['queries']
+    for row in rows:
+        row['avg_ms'] = round(row['total_ms'] / row['count'], 2)
+        row['total_ms'] = round(row['total_ms'], 1)
+        row['max_ms'] = round(row['max_ms'], 1)
+    rows.sort(key=lambda row: row.get(sort, 0), reverse=True)
+    return {
+        'profiling': QUERY_PROFILING,
+        'slow_query_ms': SLOW_QUERY_MS,
+        'repeat_threshold': QUERY_REPEAT_THRESHOLD,
+        'fingerprints': len(rows),
+        'untracked_queries': untracked,
+        'queries': rows[:limit]
+    }
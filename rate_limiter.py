@@ -0,0 +1,237 @@
+"""Login rate limiting
+
+Each key keeps a fixed ring of per-bucket counts covering the window
+(LOGIN_WINDOW_SECONDS split into RATE_LIMIT_BUCKETS), so a check is one keyed
+lookup plus a constant-size sum and attempts age out bucket by bucket rather
+than all at once at a window boundary. Counters live in a bounded LRU store that is
+either per process (memory) or a local SQLite file shared by every gunicorn
+worker on the host (sqlite, the default).
+"""
+from collections import OrderedDict
+from flask import request, jsonify
+import math
+import os
+import sqlite3
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'sqlite').lower()
+RATE_LIMIT_PATH = os.getenv('RATE_LIMIT_PATH', '/tmp/ostrich_rate_limits.sqlite3')
+# Keys tracked before least recently used ones are evicted
+RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', 10000))
+LOGIN_WINDOW_SECONDS = int(os.getenv('LOGIN_WINDOW_SECONDS', 900))
+RATE_LIMIT_BUCKETS = int(os.getenv('RATE_LIMIT_BUCKETS', 15))
+LOGIN_MAX_ATTEMPTS = int(os.getenv('LOGIN_MAX_ATTEMPTS', 5))
+# Per client IP; higher than the per-account limit because of shared NAT
+LOGIN_IP_MAX_ATTEMPTS = int(os.getenv('LOGIN_IP_MAX_ATTEMPTS', 20))
+# Proxies in front of the app that append to X-Forwarded-For (Render adds one)
+TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', 1))
+
+def _roll(state, bucket, buckets):
+    """Bucket counts (oldest first) shifted so the last one is `bucket`"""
+    if state is None:
+        return [0] * buckets
+    last, counts = state
+    shift = bucket - last
+    if shift <= 0:
+        return list(counts)
+    if shift >= buckets:
+        return [0] * buckets
+    return list(counts[shift:]) + [0] * shift
+
+def _retry_after(counts, bucket, bucket_seconds, limit, now):
+    """Seconds until enough old buckets expire to go below limit"""
+    remaining = sum(counts)
+    oldest = bucket - len(counts) + 1
+    for offset, count in enumerate(counts):
+        remaining -= count
+        if remaining < limit:
+            expires_at = (oldest + offset + len(counts)) * bucket_seconds
+            return max(1, int(math.ceil(expires_at - now)))
+    return int(math.ceil(len(counts) * bucket_seconds))
+
+class MemoryLimiterBackend:
+    """Per-process counters in a fixed-size LRU"""
+
+    def __init__(self, max_keys=RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._entries = OrderedDict()  # key -> (last bucket, counts)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            state = self._entries.get(key)
+            if state is not None:
+                self._entries.move_to_end(key)
+            return state
+
+    def incr(self, key, bucket, buckets):
+        with self._lock:
+            counts = _roll(self._entries.pop(key, None), bucket, buckets)
+            counts[-1] += 1
+            state = (bucket, tuple(counts))
+            self._entries[key] = state
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+            return state
+
+    def reset(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def info(self):
+        with self._lock:
+            return {'backend': 'memory', 'keys': len(self._entries)}
+
+class SQLiteLimiterBackend:
+    """Counters in a local SQLite file so all workers on a host share them
+
+    Trimming to max_keys runs every evict_every writes per process, so the
+    table can briefly exceed the cap by that many rows per worker.
+    """
+
+    def __init__(self, path=RATE_LIMIT_PATH, max_keys=RATE_LIMIT_MAX_KEYS):
+        self.path = path
+        self.max_keys = max_keys
+        self.evict_every = max(1, max_keys // 10)
+        self._writes = 0
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rate_limits (
+                    key TEXT PRIMARY KEY, bucket INTEGER,
+                    counts TEXT, last_used REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_rate_limits_last_used ON rate_limits (last_used)")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _read(self, conn, key):
+        row = conn.execute("SELECT bucket, counts FROM rate_limits WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return row[0], [int(count) for count in row[1].split(',')]
+
+    def get(self, key):
+        return self._read(self._conn(), key)
+
+    def incr(self, key, bucket, buckets):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            counts = _roll(self._read(conn, key), bucket, buckets)
+            counts[-1] += 1
+            state = (bucket, tuple(counts))
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limits (key, bucket, counts, last_used) VALUES (?, ?, ?, ?)",
+                (key, bucket, ','.join(map(str, counts)), time.time())
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._writes += 1
+        if self._writes % self.evict_every == 0:
+            self._evict(conn)
+        return state
+
+    def _evict(self, conn):
+        conn.execute("""
+            DELETE FROM rate_limits WHERE key IN (
+                SELECT key FROM rate_limits ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_keys,))
+
+    def reset(self, key):
+        self._conn().execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+    def info(self):
+        count = self._conn().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+        return {'backend': 'sqlite', 'path': self.path, 'keys': count}
+
+class SlidingWindowLimiter:
+    """At most `limit` hits per key in the last `window` seconds
+
+    Hits age out one bucket (window / buckets seconds) at a time.
+    """
+
+    def __init__(self, backend, limit, window, prefix='', buckets=RATE_LIMIT_BUCKETS):
+        self.backend = backend
+        self.limit = limit
+        self.buckets = max(1, buckets)
+        self.bucket_seconds = window / self.buckets
+        self.prefix = prefix
+
+    def check(self, key, now=None):
+        """Seconds to wait before the next attempt, or 0 when allowed"""
+        now = time.time() if now is None else now
+        bucket = int(now // self.bucket_seconds)
+        counts = _roll(self.backend.get(self.prefix + key), bucket, self.buckets)
+        if sum(counts) < self.limit:
+            return 0
+        return _retry_after(counts, bucket, self.bucket_seconds, self.limit, now)
+
+    def hit(self, key, now=None):
+        now = time.time() if now is None else now
+        self.backend.incr(self.prefix + key, int(now // self.bucket_seconds), self.buckets)
+
+    def reset(self, key):
+        self.backend.reset(self.prefix + key)
+
+def _create_backend():
+    if RATE_LIMIT_BACKEND == 'sqlite':
+        try:
+            backend = SQLiteLimiterBackend()
+            backend.info()
+            return backend
+        except Exception as e:
+            logger.warning("Rate limit store %s unavailable, using per-process memory: %s", RATE_LIMIT_PATH, e)
+    return MemoryLimiterBackend()
+
+limiter_backend = _create_backend()
+
+def client_ip():
+    """Client address, skipping the entries added by trusted proxies"""
+    forwarded = request.headers.get('X-Forwarded-For', '')
+    hops = [hop.strip() for hop in forwarded.split(',') if hop.strip()]
+    if TRUSTED_PROXY_COUNT and len(hops) >= TRUSTED_PROXY_COUNT:
+        return hops[-TRUSTED_PROXY_COUNT]
+    return request.remote_addr or 'unknown'
+
+class LoginRateLimiter:
+    """Failed-login limits per account and per client IP for one login endpoint"""
+
+    def __init__(self, scope, backend=None):
+        backend = backend or limiter_backend
+        self.accounts = SlidingWindowLimiter(backend, LOGIN_MAX_ATTEMPTS, LOGIN_WINDOW_SECONDS, f"{scope}:user:")
+        self.addresses = SlidingWindowLimiter(backend, LOGIN_IP_MAX_ATTEMPTS, LOGIN_WINDOW_SECONDS, f"{scope}:ip:")
+
+    def check(self, account, ip):
+        """Seconds until login may be retried, or 0 when allowed"""
+        return max(self.accounts.check(account.lower()), self.addresses.check(ip))
+
+    def record_failure(self, account, ip):
+        self.accounts.hit(account.lower())
+        self.addresses.hit(ip)
+
+    def record_success(self, account):
+        self.accounts.reset(account.lower())
+
+def too_many_attempts(retry_after):
+    """429 response body and headers for a limited login"""
+    minutes = max(1, int(math.ceil(retry_after / 60)))
+    return jsonify({
+        'error': f'Too many login attempts. Please try again in {minutes} minute{"s" if minutes != 1 else ""}.',
+        'retry_after': retry_after
+    }), 429, {'Retry-After': str(retry_after)}
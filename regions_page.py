@@ -1,11 +1,15 @@
-from flask import jsonify, request
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from database import get_db
 import pymysql
+import logging
+
+logger = logging.getLogger(__name__)
 
 def register_regions_routes(app):
+    bp = Blueprint('regions', __name__)
     
-    @app.route('/api/v1/regions/', methods=['GET', 'POST'])
+    @bp.route('/api/v1/regions/', methods=['GET', 'POST'])
     @jwt_required()
     def handle_regions():
         if request.method == 'GET':
@@ -26,7 +30,7 @@ def register_regions_routes(app):
                 
                 return jsonify(regions)
             except Exception as e:
-                print(f"Get regions error: {e}")
+                logger.error("Get regions error: %s", e)
                 return jsonify({'error': str(e)}), 500
         
         elif request.method == 'POST':
@@ -70,10 +74,10 @@ def register_regions_routes(app):
                 
                 return jsonify({'id': region_id, 'message': 'Region created successfully'}), 201
             except Exception as e:
-                print(f"Create region error: {e}")
+                logger.error("Create region error: %s", e)
                 return jsonify({'error': str(e)}), 500
     
-    @app.route('/api/v1/regions/<int:region_id>', methods=['GET', 'PUT', 'DELETE'])
+    @bp.route('/api/v1/regions/<int:region_id>', methods=['GET', 'PUT', 'DELETE'])
     @jwt_required()
     def handle_single_region(region_id):
         if request.method == 'GET':
@@ -97,7 +101,7 @@ def register_regions_routes(app):
                 
                 return jsonify(region)
             except Exception as e:
-                print(f"Get region error: {e}")
+                logger.error("Get region error: %s", e)
                 return jsonify({'error': str(e)}), 500
         
         elif request.method == 'PUT':
@@ -134,7 +138,7 @@ def register_regions_routes(app):
                 
                 return jsonify({'message': 'Region updated successfully'})
             except Exception as e:
-                print(f"Update region error: {e}")
+                logger.error("Update region error: %s", e)
                 return jsonify({'error': str(e)}), 500
         
         elif request.method == 'DELETE':
@@ -150,10 +154,10 @@ def register_regions_routes(app):
                 
                 return jsonify({'message': 'Region deleted successfully'})
             except Exception as e:
-                print(f"Delete region error: {e}")
+                logger.error("Delete region error: %s", e)
                 return jsonify({'error': str(e)}), 500
     
-    @app.route('/api/v1/regions/managers', methods=['GET'])
+    @bp.route('/api/v1/regions/managers', methods=['GET'])
     def get_managers():
         try:
             conn = get_db()
@@ -172,10 +176,10 @@ def register_regions_routes(app):
             
             return jsonify(managers)
         except Exception as e:
-            print(f"Get managers error: {e}")
+            logger.error("Get managers error: %s", e)
             return jsonify([])
     
-    @app.route('/api/v1/regions/filters', methods=['GET'])
+    @bp.route('/api/v1/regions/filters', methods=['GET'])
     @jwt_required()
     def get_filter_options():
         try:
@@ -210,5 +214,7 @@ def register_regions_routes(app):
                 'managers': managers
             })
         except Exception as e:
-            print(f"Get filter options error: {e}")
+            logger.error("Get filter options error: %s", e)
             return jsonify({'states': [], 'countries': [], 'managers': []})
+    
+    app.register_blueprint(bp)
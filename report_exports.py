@@ -0,0 +1,329 @@
+"""Streaming report exports
+
+Rows are read from an unbuffered server-side cursor in batches and written
+straight to the response, so memory stays flat however many rows match.
+"""
+from flask import Blueprint, jsonify, request, Response
+from flask_jwt_extended import jwt_required
+from datetime import date, datetime
+from decimal import Decimal
+import csv
+import importlib.util
+import io
+import json
+import os
+import tempfile
+import pymysql
+from database import borrow_read_connection
+import logging
+
+logger = logging.getLogger(__name__)
+
+# openpyxl is imported by xlsx_stream so workers load it on the first XLSX export
+OPENPYXL_AVAILABLE = importlib.util.find_spec('openpyxl') is not None
+
+# Rows fetched from the server-side cursor per batch
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 2000))
+XLSX_MAX_ROWS_PER_SHEET = 1048575  # Excel limit minus the header row
+FILE_CHUNK_SIZE = 64 * 1024
+
+def sales_report_filters(args):
+    """WHERE clause and params for the sales report filters"""
+    where_clauses = []
+    params = []
+
+    if args.get('start_date'):
+        where_clauses.append("s.sale_date >= %s")
+        params.append(args.get('start_date'))
+
+    if args.get('end_date'):
+        where_clauses.append("s.sale_date <= %s")
+        params.append(args.get('end_date'))
+
+    if args.get('customer_id'):
+        where_clauses.append("s.customer_id = %s")
+        params.append(int(args.get('customer_id')))
+
+    if args.get('customer_type'):
+        where_clauses.append("c.customer_type = %s")
+        params.append(args.get('customer_type'))
+
+    if args.get('sales_executive_id'):
+        where_clauses.append("s.created_by = %s")
+        params.append(int(args.get('sales_executive_id')))
+
+    if args.get('product_id'):
+        where_clauses.append("EXISTS (SELECT 1 FROM sale_items si WHERE si.sale_id = s.id AND si.product_id = %s)")
+        params.append(int(args.get('product_id')))
+
+    return (" AND ".join(where_clauses) if where_clauses else "1=1"), params
+
+def dispatch_report_filters(args):
+    """WHERE clause and params for the dispatch report filters"""
+    where_clauses = []
+    params = []
+
+    if args.get('start_date'):
+        where_clauses.append("d.dispatch_date >= %s")
+        params.append(args.get('start_date'))
+
+    if args.get('end_date'):
+        where_clauses.append("d.dispatch_date <= %s")
+        params.append(args.get('end_date'))
+
+    if args.get('status'):
+        where_clauses.append("d.status = %s")
+        params.append(args.get('status'))
+
+    return (" AND ".join(where_clauses) if where_clauses else "1=1"), params
+
+def enquiries_report_filters(args):
+    """WHERE clause and params for the enquiries export filters"""
+    where_clauses = []
+    params = []
+
+    if args.get('start_date'):
+        where_clauses.append("e.created_at >= %s")
+        params.append(args.get('start_date'))
+
+    if args.get('end_date'):
+        where_clauses.append("e.created_at <= %s")
+        params.append(args.get('end_date'))
+
+    if args.get('status'):
+        where_clauses.append("e.status = %s")
+        params.append(args.get('status'))
+
+    if args.get('customer_id'):
+        where_clauses.append("e.customer_id = %s")
+        params.append(int(args.get('customer_id')))
+
+    if args.get('product_id'):
+        where_clauses.append("e.product_id = %s")
+        params.append(int(args.get('product_id')))
+
+    return (" AND ".join(where_clauses) if where_clauses else "1=1"), params
+
+SALES_REPORT_SUMMARY_QUERY = """
+    SELECT 
+        COUNT(*) as total_sales,
+        COALESCE(SUM(s.final_amount), 0) as total_revenue,
+        COALESCE(AVG(s.final_amount), 0) as avg_sale_amount
+    FROM sales s
+    LEFT JOIN customers c ON s.customer_id = c.id
+    WHERE {where_sql}
+"""
+
+DISPATCH_REPORT_SUMMARY_QUERY = """
+    SELECT 
+        COUNT(*) as total_dispatches,
+        SUM(CASE WHEN status = 'delivered' THEN 1 ELSE 0 END) as delivered_count,
+        SUM(CASE WHEN status = 'in_transit' THEN 1 ELSE 0 END) as in_transit_count,
+        SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) as pending_count,
+        SUM(CASE WHEN status = 'cancelled' THEN 1 ELSE 0 END) as cancelled_count
+    FROM dispatches d
+    WHERE {where_sql}
+"""
+
+SALES_REPORT_QUERY = """
+    SELECT s.*, c.company_name, c.contact_person,
+           (SELECT COUNT(*) FROM sale_items WHERE sale_id = s.id) as item_count
+    FROM sales s
+    LEFT JOIN customers c ON s.customer_id = c.id
+    WHERE {where_sql}
+    ORDER BY s.sale_date DESC
+"""
+
+DISPATCH_REPORT_QUERY = """
+    SELECT d.*, c.company_name, c.contact_person,
+           GROUP_CONCAT(DISTINCT p.name SEPARATOR ', ') as product_name
+    FROM dispatches d
+    LEFT JOIN customers c ON d.customer_id = c.id
+    LEFT JOIN sale_items si ON d.sale_id = si.sale_id
+    LEFT JOIN products p ON si.product_id = p.id
+    WHERE {where_sql}
+    GROUP BY d.id
+    ORDER BY d.dispatch_date DESC
+"""
+
+ENQUIRIES_REPORT_QUERY = """
+    SELECT e.*,
+           COALESCE(
+               NULLIF(c.contact_person, ''),
+               NULLIF(c.individual_name, ''),
+               NULLIF(c.company_name, '')
+           ) as customer_name,
+           c.email, c.phone,
+           p.name as product_name
+    FROM enquiries e
+    LEFT JOIN customers c ON e.customer_id = c.id
+    LEFT JOIN products p ON e.product_id = p.id
+    WHERE {where_sql}
+    ORDER BY e.created_at DESC, e.id DESC
+"""
+
+# report name -> (query template, filter builder)
+EXPORT_REPORTS = {
+    'sales': (SALES_REPORT_QUERY, sales_report_filters),
+    'dispatch': (DISPATCH_REPORT_QUERY, dispatch_report_filters),
+    'enquiries': (ENQUIRIES_REPORT_QUERY, enquiries_report_filters)
+}
+
+def iter_batches(cursor, batch_size=EXPORT_BATCH_SIZE):
+    """Yield lists of rows from cursor.fetchmany until it is exhausted"""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.decode('utf-8', 'replace')
+    return str(value)
+
+def csv_stream(columns, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in batches:
+        for row in rows:
+            writer.writerow([row[column] for column in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def ndjson_stream(columns, batches):
+    for rows in batches:
+        yield ''.join(
+            json.dumps(row, default=_json_default, separators=(',', ':')) + '\n' for row in rows
+        )
+
+def _xlsx_value(value, illegal_characters):
+    if isinstance(value, str):
+        return illegal_characters.sub('', value)
+    if isinstance(value, bytes):
+        return illegal_characters.sub('', value.decode('utf-8', 'replace'))
+    return value
+
+def xlsx_stream(columns, batches, sheet_title='Report'):
+    """Build the workbook in write-only mode, then stream the file
+
+    Write-only sheets flush rows to disk as they are appended, so memory
+    stays flat; the zip container can only be sent once it is complete.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+    workbook = Workbook(write_only=True)
+    sheet, sheet_rows, sheet_number = None, XLSX_MAX_ROWS_PER_SHEET, 0
+    for rows in batches:
+        for row in rows:
+            if sheet_rows >= XLSX_MAX_ROWS_PER_SHEET:
+                sheet_number += 1
+                sheet = workbook.create_sheet(sheet_title if sheet_number == 1 else f"{sheet_title} {sheet_number}")
+                sheet.append(columns)
+                sheet_rows = 0
+            sheet.append([_xlsx_value(row[column], ILLEGAL_CHARACTERS_RE) for column in columns])
+            sheet_rows += 1
+    if sheet is None:
+        workbook.create_sheet(sheet_title).append(columns)
+
+    with tempfile.TemporaryFile(suffix='.xlsx') as spool:
+        workbook.save(spool)
+        spool.seek(0)
+        while True:
+            chunk = spool.read(FILE_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+# format -> (writer, mimetype)
+EXPORT_FORMATS = {
+    'csv': (csv_stream, 'text/csv; charset=utf-8'),
+    'ndjson': (ndjson_stream, 'application/x-ndjson'),
+    'xlsx': (xlsx_stream, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+}
+
+def register_report_export_routes(app):
+    """Register streaming report export routes"""
+    bp = Blueprint('report_exports', __name__)
+
+    @bp.route('/api/v1/reports/<report_name>/export', methods=['GET'])
+    @jwt_required()
+    def export_report(report_name):
+        if report_name not in EXPORT_REPORTS:
+            return jsonify({'error': f'Unknown report: {report_name}'}), 404
+
+        export_format = request.args.get('format', 'csv').lower()
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': f"Unsupported format '{export_format}'. Use csv, xlsx or ndjson"}), 400
+        if export_format == 'xlsx' and not OPENPYXL_AVAILABLE:
+            return jsonify({'error': 'XLSX export requires openpyxl'}), 503
+
+        query, build_filters = EXPORT_REPORTS[report_name]
+        try:
+            where_sql, params = build_filters(request.args)
+        except ValueError:
+            return jsonify({'error': 'Invalid filter value'}), 400
+
+        # Not the request-scoped connection: the cursor outlives the request
+        conn = borrow_read_connection()
+        if not conn:
+            return jsonify({'error': 'Database connection failed'}), 500
+
+        try:
+            # Unbuffered: rows stay on the server until fetched
+            cursor = conn.cursor(pymysql.cursors.SSDictCursor)
+            cursor.execute(query.format(where_sql=where_sql), params)
+            columns = [column[0] for column in cursor.description]
+        except Exception as e:
+            conn.close()
+            logger.error("Export %s error: %s", report_name, e)
+            return jsonify({'error': f'Failed to export {report_name} report'}), 500
+
+        closed = []
+        finished = []
+        def close():
+            if closed:
+                return
+            closed.append(True)
+            if not finished:
+                # Client went away or the stream failed: draining the unread
+                # rows would read the rest of the result, so drop the connection
+                conn.discard()
+                return
+            try:
+                cursor.close()
+            finally:
+                conn.close()
+
+        def generate():
+            try:
+                writer, _ = EXPORT_FORMATS[export_format]
+                batches = iter_batches(cursor)
+                if export_format == 'xlsx':
+                    yield from writer(columns, batches, report_name.title())
+                else:
+                    yield from writer(columns, batches)
+                finished.append(True)
+            except Exception as e:
+                logger.error("Export %s stream error: %s", report_name, e)
+                raise
+            finally:
+                close()
+
+        _, mimetype = EXPORT_FORMATS[export_format]
+        filename = f"{report_name}_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+        response = Response(generate(), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response.headers['X-Accel-Buffering'] = 'no'
+        response.call_on_close(close)
+        return response
+
+    app.register_blueprint(bp)
@@ -0,0 +1,136 @@
+"""Route table built from the registered URL rules
+
+init_app() runs once every blueprint is registered. It builds one entry
+per (rule, method) with the handler's metadata, read from the decorators
+it carries:
+
+- auth: 'required', 'optional' (jwt_required(optional=True)) or 'none'
+- cache: timeout and tags of @cache_response, or None
+- invalidates: tags of @invalidates_cache
+- read_only: @read_only, so GETs may go to a replica
+
+Two handlers for the same rule and method are a conflict: Werkzeug only
+ever dispatches to the first one registered, so which code runs depends on
+registration order. Conflicts are logged, or stop the app from starting
+with ROUTE_CONFLICTS=error. route_info() gives other layers the metadata
+of the current request's handler.
+
+Usage (lists the table and exits 1 on conflicts):
+    python route_registry.py
+"""
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# warn (log conflicts) or error (refuse to start)
+ROUTE_CONFLICTS = os.getenv('ROUTE_CONFLICTS', 'warn').lower()
+
+# Added by Flask/Werkzeug to every rule, so they never conflict meaningfully
+IMPLICIT_METHODS = {'HEAD', 'OPTIONS'}
+
+_routes = {}  # (rule, method) -> metadata of the handler that serves it
+_by_endpoint = {}
+_conflicts = []
+
+def _closure_value(f, name):
+    if f.__closure__ is None or name not in f.__code__.co_freevars:
+        return None
+    return f.__closure__[f.__code__.co_freevars.index(name)].cell_contents
+
+def _auth(view):
+    """'required', 'optional' or 'none' from the jwt_required wrappers of view"""
+    f = view
+    while f is not None:
+        code = getattr(f, '__code__', None)
+        if code is not None and code.co_filename.endswith(os.path.join('flask_jwt_extended', 'view_decorators.py')):
+            return 'optional' if _closure_value(f, 'optional') else 'required'
+        f = getattr(f, '__wrapped__', None)
+    return 'none'
+
+def describe(view):
+    """Metadata of one view function"""
+    timeout = getattr(view, 'cache_timeout', None)
+    return {
+        'module': getattr(view, '__module__', None),
+        'auth': _auth(view),
+        'cache': {'timeout': timeout, 'tags': list(view.cache_tags)} if timeout is not None else None,
+        'invalidates': list(getattr(view, 'invalidates_tags', ())),
+        'read_only': getattr(view, 'read_only', False)
+    }
+
+def build(app):
+    """(routes, metadata by endpoint, conflicts) for the URL map of app"""
+    routes, by_endpoint, conflicts = {}, {}, []
+    for rule in app.url_map.iter_rules():
+        view = app.view_functions[rule.endpoint]
+        info = by_endpoint.get(rule.endpoint)
+        if info is None:
+            info = by_endpoint[rule.endpoint] = dict(describe(view), endpoint=rule.endpoint,
+                                                     blueprint=rule.endpoint.rpartition('.')[0] or None)
+        for method in sorted(rule.methods - IMPLICIT_METHODS):
+            key = (rule.rule, method)
+            winner = routes.get(key)
+            if winner is None:
+                routes[key] = info
+                continue
+            conflicts.append({
+                'rule': rule.rule,
+                'method': method,
+                'served_by': f"{winner['module']}.{winner['endpoint']}",
+                'shadowed': f"{info['module']}.{info['endpoint']}"
+            })
+    return routes, by_endpoint, conflicts
+
+def init_app(app):
+    """Build the route table and report conflicting handlers"""
+    global _routes, _by_endpoint, _conflicts
+    _routes, _by_endpoint, _conflicts = build(app)
+    for conflict in _conflicts:
+        logger.error("Route conflict: %s %s is served by %s; %s is never called", conflict['method'],
+                     conflict['rule'], conflict['served_by'], conflict['shadowed'])
+    if _conflicts and ROUTE_CONFLICTS == 'error':
+        raise RuntimeError(f"{len(_conflicts)} conflicting route registrations (ROUTE_CONFLICTS=error)")
+    logger.debug("Route table: %d routes, %d conflicts", len(_routes), len(_conflicts))
+
+def route_info(endpoint=None):
+    """Metadata of endpoint (default: the current request's), or None"""
+    if endpoint is None:
+        from flask import has_request_context, request
+        if not has_request_context():
+            return None
+        endpoint = request.endpoint
+    return _by_endpoint.get(endpoint)
+
+def route_table():
+    """Every (rule, method) with its handler's metadata, and the conflicts"""
+    routes = [dict(info, rule=rule, method=method) for (rule, method), info in _routes.items()]
+    routes.sort(key=lambda route: (route['rule'], route['method']))
+    return {
+        'routes': routes,
+        'total': len(routes),
+        'by_auth': {auth: sum(route['auth'] == auth for route in routes) for auth in ('required', 'optional', 'none')},
+        'cached': sum(route['cache'] is not None for route in routes),
+        'read_only': sum(route['read_only'] for route in routes),
+        'conflicts': list(_conflicts)
+    }
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='List the route table and its conflicts')
+    parser.add_argument('--conflicts-only', action='store_true')
+    args = parser.parse_args()
+
+    # Report conflicts instead of failing the import; importing app
+    # registers every route and builds the table in route_registry
+    os.environ['ROUTE_CONFLICTS'] = 'warn'
+    import app
+    import route_registry
+
+    table = route_registry.route_table()
+    if args.conflicts_only:
+        table = {'total': table['total'], 'conflicts': table['conflicts']}
+    print(json.dumps(table, indent=2))
+    raise SystemExit(1 if table['conflicts'] else 0)
@@ -0,0 +1,40 @@
+import os
+
+# Max sale ids per IN (...) list; keeps packets well under max_allowed_packet
+SALE_ITEMS_CHUNK_SIZE = int(os.getenv('SALE_ITEMS_CHUNK_SIZE', 1000))
+
+SALE_ITEMS_QUERY = """
+    SELECT si.*, p.name as product_name
+    FROM sale_items si
+    LEFT JOIN products p ON si.product_id = p.id
+    WHERE si.sale_id IN ({placeholders})
+"""
+
+def sale_items_queries(sale_ids, chunk_size=SALE_ITEMS_CHUNK_SIZE):
+    """Yield (sql, params) covering the distinct sale ids in chunks"""
+    unique_ids = list(dict.fromkeys(sale_id for sale_id in sale_ids if sale_id is not None))
+
+    for start in range(0, len(unique_ids), chunk_size):
+        chunk = unique_ids[start:start + chunk_size]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        yield SALE_ITEMS_QUERY.format(placeholders=placeholders), chunk
+
+def load_sale_items(cursor, sale_ids, chunk_size=SALE_ITEMS_CHUNK_SIZE):
+    """Fetch items for many sales in chunked IN (...) queries, grouped by sale id
+
+    The cursor must be a DictCursor. Returns {sale_id: [item, ...]}.
+    """
+    items_by_sale = {}
+    for sql, params in sale_items_queries(sale_ids, chunk_size):
+        cursor.execute(sql, params)
+        for item in cursor.fetchall():
+            items_by_sale.setdefault(item['sale_id'], []).append(item)
+
+    return items_by_sale
+
+def attach_sale_items(cursor, sales, chunk_size=SALE_ITEMS_CHUNK_SIZE):
+    """Set sale['items'] on every sale using batched item queries"""
+    items_by_sale = load_sale_items(cursor, [sale['id'] for sale in sales], chunk_size)
+    for sale in sales:
+        sale['items'] = items_by_sale.get(sale['id'], [])
+    return sales
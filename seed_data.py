@@ -0,0 +1,319 @@
+"""Seed a local database with realistic volumes for benchmarks and CI
+
+Applies the migrations, then fills every business table with synthetic
+but consistent rows: sales totals match their items, dispatches point at
+real sales, and so on. Defaults are production-like volumes (100k
+customers, 1M sale_items, 500k notifications); --scale shrinks or grows
+all of them together. Afterwards the customer_search table is rebuilt and
+the dashboard counters are recounted.
+
+    DB_BACKEND=sqlite DB_SQLITE_PATH=/tmp/ostrich.sqlite3 python seed_data.py
+    python seed_data.py --scale 0.01           # against DB_HOST, e.g. a local MySQL
+
+Refuses to touch a database that already has customers unless --force is
+given, which deletes the existing rows first. Never point it at production.
+
+Logins: admin / admin123 (super_admin); staff users user1..userN and the
+first customers (email or phone) use password123. Run with the same
+BCRYPT_ROUNDS as the server under test.
+"""
+from datetime import datetime, timedelta
+import random
+import time
+import pymysql
+import logging
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 5000
+# Row counts at --scale 1
+VOLUMES = {
+    'regions': 8,
+    'users': 40,
+    'product_categories': 12,
+    'products': 500,
+    'customers': 100000,
+    'sale_items': 1000000,
+    'enquiries': 100000,
+    'service_tickets': 50000,
+    'notifications': 500000,
+}
+# Customers with a password, for customer (mobile) login
+CUSTOMER_LOGINS = 1000
+# Timestamps fall in the SEED_DAYS before today, so "this month" figures are not empty
+SEED_DAYS = 3 * 365
+
+ADMIN_PASSWORD = 'admin123'
+SEED_PASSWORD = 'password123'
+
+FIRST_NAMES = ['Aarav', 'Vivaan', 'Aditya', 'Vihaan', 'Arjun', 'Sai', 'Reyansh', 'Ayaan', 'Krishna',
+               'Ishaan', 'Ananya', 'Diya', 'Saanvi', 'Aadhya', 'Kavya', 'Priya', 'Lakshmi', 'Meera',
+               'Rahul', 'Suresh', 'Ramesh', 'Mahesh', 'Ganesh', 'Karthik', 'Deepa', 'Nisha', 'Pooja']
+LAST_NAMES = ['Sharma', 'Verma', 'Iyer', 'Nair', 'Reddy', 'Kumar', 'Singh', 'Patel', 'Gupta', 'Rao',
+              'Menon', 'Pillai', 'Das', 'Bose', 'Mehta', 'Joshi', 'Kulkarni', 'Desai', 'Chopra', 'Naidu']
+COMPANY_WORDS = ['Care', 'Health', 'Mobility', 'Medical', 'Life', 'Wellness', 'Aid', 'Surgicals',
+                 'Pharma', 'Hospital', 'Clinic', 'Ortho', 'Rehab', 'Supplies', 'Traders', 'Enterprises']
+DOMAINS = ['gmail.com', 'yahoo.co.in', 'outlook.com', 'rediffmail.com', 'hotmail.com']
+CITIES = [('Bengaluru', 'Karnataka', '560001'), ('Chennai', 'Tamil Nadu', '600001'),
+          ('Mumbai', 'Maharashtra', '400001'), ('Pune', 'Maharashtra', '411001'),
+          ('Hyderabad', 'Telangana', '500001'), ('Kochi', 'Kerala', '682001'),
+          ('Delhi', 'Delhi', '110001'), ('Kolkata', 'West Bengal', '700001')]
+CATEGORIES = ['Wheelchairs', 'Walkers', 'Hospital Beds', 'Commodes', 'Crutches', 'Rollators',
+              'Mattresses', 'Lift Chairs', 'Bath Safety', 'Orthopaedic', 'Scooters', 'Accessories']
+PRODUCT_WORDS = ['Foldable', 'Lightweight', 'Heavy Duty', 'Electric', 'Manual', 'Premium', 'Compact',
+                 'Adjustable', 'Reclining', 'Bariatric']
+ROLES = ['admin', 'regional_officer', 'manager', 'sales_executive', 'sales_executive',
+         'sales_executive', 'service_staff', 'service_staff']
+ENQUIRY_MESSAGES = ['Need a quote for {product}', 'Is {product} available in {city}?',
+                    'Please call back about {product}', 'Looking for {product} for my father',
+                    'Bulk order enquiry: {product}']
+ISSUES = ['Wheel alignment issue', 'Brake not holding', 'Motor noise', 'Armrest loose',
+          'Battery not charging', 'Recline lever stuck']
+
+# Delete order for --force: children before parents
+SEEDED_TABLES = ['notifications', 'service_tickets', 'enquiries', 'dispatches', 'sale_items', 'sales',
+                 'customers', 'product_specifications', 'product_images', 'products', 'product_categories',
+                 'users', 'regions', 'dashboard_counters', 'sequences', 'lookup_changes']
+
+def _today():
+    return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _timestamp(rng, days=SEED_DAYS):
+    return _today() - timedelta(seconds=rng.randrange(1, days * 86400))
+
+def _insert(conn, cursor, table, columns, rows):
+    """executemany in BATCH_SIZE chunks; returns the number of rows"""
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            cursor.executemany(sql, batch)
+            conn.commit()
+            count += len(batch)
+            batch = []
+    if batch:
+        cursor.executemany(sql, batch)
+        conn.commit()
+        count += len(batch)
+    logger.info("Seeded %s: %d rows", table, count)
+    return count
+
+def _volumes(scale, overrides):
+    volumes = {table: max(1, int(round(count * scale))) for table, count in VOLUMES.items()}
+    for table in ('regions', 'product_categories'):
+        volumes[table] = VOLUMES[table]
+    volumes['users'] = max(VOLUMES['users'] if scale >= 1 else 5, volumes['users'])
+    volumes['products'] = max(50, volumes['products'])
+    volumes.update({table: count for table, count in overrides.items() if count is not None})
+    return volumes
+
+def seed(conn, scale=1.0, seed_value=7, force=False, **overrides):
+    """Fill the database; returns {table: rows inserted}"""
+    from migrate import migrate
+    from password_service import hash_password
+
+    migrate(conn)
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    cursor.execute("SELECT COUNT(*) as count FROM customers")
+    if cursor.fetchone()['count'] and not force:
+        raise SystemExit('customers is not empty; pass --force to replace the existing rows')
+    for table in SEEDED_TABLES:
+        cursor.execute(f"DELETE FROM {table}")
+    conn.commit()
+
+    volumes = _volumes(scale, overrides)
+    rng = random.Random(seed_value)
+    admin_hash = hash_password(ADMIN_PASSWORD)
+    seed_hash = hash_password(SEED_PASSWORD)
+    counts = {}
+
+    counts['regions'] = _insert(conn, cursor, 'regions', ['id', 'name', 'code', 'state', 'country', 'is_active'], (
+        (i, city, city[:3].upper(), state, 'India', 1)
+        for i, (city, state, _) in enumerate(CITIES[:volumes['regions']], start=1)
+    ))
+
+    def users():
+        yield (1, 'admin', 'admin@ostrich.local', admin_hash, 'super_admin', 'Admin', 'User', '9000000001',
+               CITIES[0][0], 1, _today() - timedelta(days=SEED_DAYS))
+        for i in range(2, volumes['users'] + 1):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            yield (i, f"user{i}", f"user{i}@ostrich.local", seed_hash, ROLES[i % len(ROLES)], first, last,
+                   f"90000{i:05d}", rng.choice(CITIES)[0], 1, _timestamp(rng))
+    counts['users'] = _insert(conn, cursor, 'users', [
+        'id', 'username', 'email', 'password_hash', 'role', 'first_name', 'last_name', 'phone', 'region',
+        'is_active', 'created_at'], users())
+    user_ids = list(range(1, volumes['users'] + 1))
+    staff_ids = [i for i in user_ids if ROLES[i % len(ROLES)] == 'service_staff'] or [1]
+
+    counts['product_categories'] = _insert(conn, cursor, 'product_categories', [
+        'id', 'name', 'description', 'is_active', 'display_order'], (
+        (i, name, f"{name} for home and hospital use", 1, i) for i, name in enumerate(CATEGORIES, start=1)
+    ))
+
+    prices = {}
+    product_names = {}
+    def products():
+        for i in range(1, volumes['products'] + 1):
+            category = rng.randrange(len(CATEGORIES))
+            name = f"{rng.choice(PRODUCT_WORDS)} {CATEGORIES[category].rstrip('s')} {i}"
+            price = rng.randrange(500, 150000, 50)
+            prices[i] = price
+            product_names[i] = name
+            yield (i, name, f"SKU{i:05d}", f"{name}, warranty included", price,
+                   price * 9 // 10 if rng.random() < 0.2 else None, rng.randrange(0, 200), 'in_stock',
+                   f"/uploads/products/{i}.jpg", category + 1, int(i <= 8), i if i <= 8 else None, 1,
+                   _timestamp(rng))
+    counts['products'] = _insert(conn, cursor, 'products', [
+        'id', 'name', 'product_code', 'description', 'price', 'offer_price', 'stock_quantity', 'stock_status',
+        'image_url', 'category_id', 'is_trending', 'trending_position', 'is_active', 'created_at'], products())
+    product_ids = list(prices)
+
+    counts['product_images'] = _insert(conn, cursor, 'product_images', [
+        'product_id', 'image_url', 'image_type', 'is_primary', 'alt_text'], (
+        (product_id, f"/uploads/products/{product_id}_{n}.jpg", 'primary' if n == 0 else 'gallery', int(n == 0),
+         product_names[product_id])
+        for product_id in product_ids for n in range(3)
+    ))
+    counts['product_specifications'] = _insert(conn, cursor, 'product_specifications', [
+        'product_id', 'feature_name', 'feature_value', 'category', 'display_order'], (
+        (product_id, feature, value, 'General', n)
+        for product_id in product_ids
+        for n, (feature, value) in enumerate([('Weight', f"{rng.randrange(5, 60)} kg"), ('Warranty', '1 year'),
+                                              ('Material', 'Aluminium'), ('Max load', '120 kg')])
+    ))
+
+    customer_count = volumes['customers']
+    def customers():
+        for i in range(1, customer_count + 1):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            city, state, pin = rng.choice(CITIES)
+            company = ''
+            if rng.random() < 0.4:
+                company = f"{rng.choice(LAST_NAMES)} {rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_WORDS)}"
+            mobile = rng.random() < 0.3
+            yield (i, f"CUST{i:08d}", 'B2B' if company else 'B2C', f"{first} {last}", company or None,
+                   f"{first} {last}", f"{first.lower()}.{last.lower()}{i}@{rng.choice(DOMAINS)}",
+                   f"{rng.randint(6, 9)}{i:09d}", seed_hash if i <= CUSTOMER_LOGINS else None,
+                   f"{rng.randrange(1, 500)} Main Road", city, state, 'India', pin,
+                   'mobile_app' if mobile else 'web', int(rng.random() < 0.7), int(mobile), _timestamp(rng))
+    counts['customers'] = _insert(conn, cursor, 'customers', [
+        'id', 'customer_code', 'customer_type', 'individual_name', 'company_name', 'contact_person', 'email',
+        'phone', 'password_hash', 'address', 'city', 'state', 'country', 'pin_code', 'registration_source',
+        'is_verified', 'has_mobile_access', 'created_at'], customers())
+
+    # Sales and their items together so the totals add up
+    sales, dispatch_rows = [], []
+    def sale_items():
+        item_id, sale_id = 0, 0
+        while item_id < volumes['sale_items']:
+            sale_id += 1
+            customer_id = rng.randint(1, customer_count)
+            sold_at = _timestamp(rng)
+            total = 0
+            for _ in range(min(rng.randint(1, 5), volumes['sale_items'] - item_id)):
+                item_id += 1
+                product_id = rng.choice(product_ids)
+                quantity = rng.randint(1, 3)
+                total += prices[product_id] * quantity
+                yield (item_id, sale_id, product_id, quantity, prices[product_id], prices[product_id] * quantity)
+            discount = rng.choice([0, 0, 0, 5, 10])
+            final = total - total * discount // 100
+            delivery = rng.choice(['pending', 'processing', 'in_transit', 'delivered', 'delivered'])
+            sales.append((sale_id, f"SAL{sale_id:06d}", customer_id, rng.choice(user_ids), sold_at.date(), total,
+                          discount, total - final, final, rng.choice(['pending', 'paid', 'paid', 'partial']),
+                          delivery, f"{rng.randrange(1, 500)} Main Road", sold_at))
+            if delivery in ('in_transit', 'delivered'):  # about 60% of sales
+                status = 'delivered' if delivery == 'delivered' else 'in_transit'
+                dispatch_date = sold_at.date() + timedelta(days=rng.randint(0, 5))
+                dispatch_rows.append((len(dispatch_rows) + 1, sale_id, customer_id, product_id, dispatch_date,
+                                      status))
+    counts['sale_items'] = _insert(conn, cursor, 'sale_items', [
+        'id', 'sale_id', 'product_id', 'quantity', 'unit_price', 'total_price'], sale_items())
+    counts['sales'] = _insert(conn, cursor, 'sales', [
+        'id', 'sale_number', 'customer_id', 'created_by', 'sale_date', 'total_amount', 'discount_percentage',
+        'discount_amount', 'final_amount', 'payment_status', 'delivery_status', 'delivery_address', 'created_at'],
+        sales)
+    sale_count = len(sales)
+    del sales
+    counts['dispatches'] = _insert(conn, cursor, 'dispatches', [
+        'id', 'dispatch_number', 'sale_id', 'customer_id', 'product_id', 'driver_name', 'driver_phone',
+        'vehicle_number', 'dispatch_date', 'estimated_delivery', 'status'], (
+        (dispatch_id, f"DISP{dispatch_id:05d}", sale_id, customer_id, product_id,
+         f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", f"98{rng.randrange(10 ** 8):08d}",
+         f"KA{rng.randrange(1, 60):02d}AB{rng.randrange(10000):04d}", dispatch_date,
+         dispatch_date + timedelta(days=3), status)
+        for dispatch_id, sale_id, customer_id, product_id, dispatch_date, status in dispatch_rows
+    ))
+    del dispatch_rows
+
+    def enquiries():
+        for i in range(1, volumes['enquiries'] + 1):
+            product_id = rng.choice(product_ids)
+            message = rng.choice(ENQUIRY_MESSAGES).format(product=product_names[product_id],
+                                                          city=rng.choice(CITIES)[0])
+            created = _timestamp(rng)
+            yield (i, f"ENQ{i:06d}", rng.randint(1, customer_count), product_id, rng.randint(1, 5), message,
+                   rng.choice(['NEW', 'PENDING', 'IN_PROGRESS', 'FOLLOW_UP', 'CONVERTED', 'CLOSED']),
+                   rng.choice(user_ids), (created + timedelta(days=7)).date(), created)
+    counts['enquiries'] = _insert(conn, cursor, 'enquiries', [
+        'id', 'enquiry_number', 'customer_id', 'product_id', 'quantity', 'message', 'status', 'assigned_to',
+        'follow_up_date', 'created_at'], enquiries())
+
+    counts['service_tickets'] = _insert(conn, cursor, 'service_tickets', [
+        'id', 'ticket_number', 'customer_id', 'product_id', 'issue_description', 'priority', 'status',
+        'assigned_staff_id', 'warranty_status', 'created_at'], (
+        (i, f"TKT{i:06d}", rng.randint(1, customer_count), rng.choice(product_ids), rng.choice(ISSUES),
+         rng.choice(['LOW', 'MEDIUM', 'MEDIUM', 'HIGH']), rng.choice(['OPEN', 'IN_PROGRESS', 'RESOLVED', 'CLOSED']),
+         rng.choice(staff_ids), rng.choice(['IN_WARRANTY', 'OUT_OF_WARRANTY']), _timestamp(rng))
+        for i in range(1, volumes['service_tickets'] + 1)
+    ))
+
+    counts['notifications'] = _insert(conn, cursor, 'notifications', [
+        'user_id', 'title', 'message', 'type', 'customer_id', 'is_read', 'is_sent', 'created_at'], (
+        (1 if staff else None, 'New enquiry' if staff else 'Order update',
+         f"Enquiry ENQ{rng.randrange(1, 999999):06d} needs follow-up" if staff else 'Your order has been dispatched',
+         'INFO' if staff else rng.choice(['INFO', 'SUCCESS', 'WARNING']), rng.randint(1, customer_count),
+         int(rng.random() < 0.7), int(not staff), _timestamp(rng))
+        for staff in (rng.random() < 0.5 for _ in range(volumes['notifications']))
+    ))
+    counts['sales'] = sale_count
+    return counts
+
+def finish(conn):
+    """Derived tables: the customer search index and the dashboard counters"""
+    import customer_search
+    import dashboard_counters
+
+    indexed = customer_search.rebuild(conn)
+    dashboard_counters.reconcile(conn, apply=True)
+    return {'customer_search': indexed}
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    from database import borrow_connection, DB_BACKEND
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(name)s: %(message)s')
+    parser = argparse.ArgumentParser(description='Seed a local database with realistic volumes')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplies every default volume')
+    parser.add_argument('--customers', type=int)
+    parser.add_argument('--sale-items', type=int)
+    parser.add_argument('--notifications', type=int)
+    parser.add_argument('--seed', type=int, default=7, help='random seed')
+    parser.add_argument('--force', action='store_true', help='delete existing rows first')
+    args = parser.parse_args()
+
+    conn = borrow_connection()
+    if not conn:
+        raise SystemExit('Database connection failed')
+    started = time.monotonic()
+    try:
+        counts = seed(conn, args.scale, args.seed, args.force, customers=args.customers,
+                      sale_items=args.sale_items, notifications=args.notifications)
+        counts.update(finish(conn))
+    finally:
+        conn.close()
+    print(json.dumps({'backend': DB_BACKEND, 'rows': counts,
+                      'seconds': round(time.monotonic() - started, 1)}, indent=2))
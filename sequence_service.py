@@ -0,0 +1,105 @@
+"""Document numbers: customer codes, enquiry, sale, dispatch and ticket numbers
+
+Each document type has a row in the `sequences` table. A block of n numbers
+is reserved with one statement,
+
+    UPDATE sequences SET value = LAST_INSERT_ID(value + n) WHERE name = ...
+
+which is atomic across workers and returns the new value without another
+query. Each worker reserves SEQUENCE_BLOCK_SIZE numbers at a time and hands
+them out from memory, so numbers are unique but not gap-free, and numbers
+from different workers interleave. A sequence is seeded on first use from
+the highest number already stored in its table.
+
+Reservations run on the caller's cursor. Pool connections are autocommit,
+so a reserved block stays used even if the caller's insert fails.
+"""
+import logging
+import os
+import threading
+import pymysql
+
+logger = logging.getLogger(__name__)
+
+# Numbers each worker reserves per round trip for single creates
+SEQUENCE_BLOCK_SIZE = int(os.getenv('SEQUENCE_BLOCK_SIZE', 20))
+
+# name -> (prefix, digits, table, column)
+SEQUENCES = {
+    'customer': ('CUST', 8, 'customers', 'customer_code'),
+    'enquiry': ('ENQ', 6, 'enquiries', 'enquiry_number'),
+    'sale': ('SAL', 6, 'sales', 'sale_number'),
+    'dispatch': ('DISP', 5, 'dispatches', 'dispatch_number'),
+    # Tickets from the service-tickets page and importer
+    'service_ticket': ('TKT', 6, 'service_tickets', 'ticket_number'),
+    # Tickets from /api/v1/services/
+    'service_request': ('SRV', 6, 'service_tickets', 'ticket_number'),
+}
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS sequences (
+        name VARCHAR(64) NOT NULL PRIMARY KEY,
+        value BIGINT UNSIGNED NOT NULL DEFAULT 0
+    )
+"""
+
+_blocks = {}  # name -> [next number, last number] reserved by this worker
+_blocks_pid = None
+_lock = threading.Lock()
+
+def format_number(name, number):
+    prefix, digits, _, _ = SEQUENCES[name]
+    return f"{prefix}{number:0{digits}d}"
+
+def _seed(cursor, name):
+    """Create the sequence row, starting after the highest stored number"""
+    prefix, _, table, column = SEQUENCES[name]
+    cursor.execute(CREATE_TABLE_SQL)
+    cursor.execute(
+        f"SELECT MAX(CAST(SUBSTRING({column}, %s) AS UNSIGNED)) as max_num FROM {table} WHERE {column} LIKE %s",
+        (len(prefix) + 1, prefix + '%')
+    )
+    row = cursor.fetchone()
+    max_num = (row['max_num'] if isinstance(row, dict) else row[0]) if row else None
+    # IGNORE: another worker may have seeded it in the meantime
+    cursor.execute("INSERT IGNORE INTO sequences (name, value) VALUES (%s, %s)", (name, max_num or 0))
+    logger.info("Sequence %s starts after %s", name, max_num or 0)
+
+def reserve(cursor, name, count):
+    """Reserve count consecutive numbers; returns the first one"""
+    if name not in SEQUENCES:
+        raise KeyError(f"Unknown sequence: {name}")
+    sql = "UPDATE sequences SET value = LAST_INSERT_ID(value + %s) WHERE name = %s"
+    try:
+        cursor.execute(sql, (count, name))
+        reserved = cursor.rowcount
+    except pymysql.err.ProgrammingError:
+        # Table not created yet; _seed creates it
+        reserved = 0
+    if not reserved:
+        _seed(cursor, name)
+        cursor.execute(sql, (count, name))
+    return cursor.lastrowid - count + 1
+
+def next_number(cursor, name):
+    """Next formatted number for name, e.g. 'ENQ000017'"""
+    global _blocks_pid
+    with _lock:
+        if _blocks_pid != os.getpid():
+            # Blocks reserved before a fork would be handed out twice
+            _blocks.clear()
+            _blocks_pid = os.getpid()
+        block = _blocks.get(name)
+        if block is None or block[0] > block[1]:
+            first = reserve(cursor, name, SEQUENCE_BLOCK_SIZE)
+            block = _blocks[name] = [first, first + SEQUENCE_BLOCK_SIZE - 1]
+        number = block[0]
+        block[0] += 1
+    return format_number(name, number)
+
+def next_numbers(cursor, name, count):
+    """count consecutive formatted numbers reserved in one round trip"""
+    if count <= 0:
+        return []
+    first = reserve(cursor, name, count)
+    return [format_number(name, first + i) for i in range(count)]
@@ -1,13 +1,19 @@
-from flask import request, jsonify
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from database import get_db
+from cache_config import invalidates_cache
 import pymysql
+import logging
+
+logger = logging.getLogger(__name__)
 
 def register_stock_fix_routes(app):
     """Register stock fix routes"""
+    bp = Blueprint('stock_fix', __name__)
     
-    @app.route('/api/v1/products/fix-stock', methods=['POST'])
+    @bp.route('/api/v1/products/fix-stock', methods=['POST'])
     @jwt_required()
+    @invalidates_cache('products')
     def fix_product_stock():
         """Fix product stock quantities"""
         try:
@@ -41,5 +47,7 @@ def register_stock_fix_routes(app):
             return jsonify({'message': 'Stock quantities updated successfully'})
             
         except Exception as e:
-            print(f"Fix stock error: {e}")
-            return jsonify({'error': 'Failed to fix stock'}), 500
\ No newline at end of file
+            logger.error("Fix stock error: %s", e)
+            return jsonify({'error': 'Failed to fix stock'}), 500
+    
+    app.register_blueprint(bp)
\ No newline at end of file
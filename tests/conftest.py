@@ -0,0 +1,55 @@
+"""Tests run the app against the SQLite stand-in in local_db.py
+
+The repo modules read their configuration when they are imported, so the
+environment is set here, before any test module imports them. Every run
+gets fresh database files in a temporary directory: a primary and one read
+replica, each its own SQLite file.
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TEST_DIR = tempfile.mkdtemp(prefix='ostrich-tests-')
+PRIMARY_PATH = os.path.join(TEST_DIR, 'primary.sqlite3')
+REPLICA_PATH = os.path.join(TEST_DIR, 'replica.sqlite3')
+
+os.environ.update({
+    'DB_BACKEND': 'sqlite',
+    'DB_SQLITE_PATH': PRIMARY_PATH,
+    'DB_REPLICA_HOSTS': REPLICA_PATH,
+    'DB_STICKY_PATH': os.path.join(TEST_DIR, 'sticky.sqlite3'),
+    'RESPONSE_CACHE_BACKEND': 'memory',
+    'IMPORT_SPOOL_DIR': os.path.join(TEST_DIR, 'imports'),
+    'METRICS_ENABLED': 'false',
+})
+
+import pytest
+import pymysql
+
+
+@pytest.fixture(scope='session')
+def schema():
+    """Migrate the primary database once per run"""
+    import local_db
+    from migrate import migrate
+
+    conn = local_db.LocalConnection(PRIMARY_PATH)
+    try:
+        migrate(conn)
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def cursor(schema):
+    """DictCursor on the primary database"""
+    import local_db
+
+    conn = local_db.LocalConnection(PRIMARY_PATH)
+    try:
+        yield conn.cursor(pymysql.cursors.DictCursor)
+    finally:
+        conn.close()
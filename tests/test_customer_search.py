@@ -0,0 +1,41 @@
+import pytest
+
+import customer_search
+
+
+@pytest.fixture
+def customers(cursor):
+    cursor.execute("DELETE FROM customers")
+    cursor.execute("DELETE FROM customer_search")
+    cursor.executemany(
+        "INSERT INTO customers (id, customer_code, individual_name, email, phone) VALUES (%s, %s, %s, %s, %s)",
+        [(1, 'C001', 'Anand Sharma', 'anand@example.com', '9876543210'),
+         (2, 'C002', 'Priya Iyer', 'priya@example.com', '9123456780')]
+    )
+    customer_search.index_customers(cursor, [1, 2])
+    return cursor
+
+
+@pytest.fixture
+def fulltext(monkeypatch):
+    monkeypatch.setattr(customer_search, 'CUSTOMER_SEARCH_BACKEND', 'fulltext')
+    monkeypatch.setattr(customer_search, '_fulltext_retry_at', 0.0)
+
+
+def test_fulltext_search_uses_the_index(customers, fulltext):
+    rows = customer_search.search(customers, 'sharma')
+    assert [row['id'] for row in rows] == [1]
+
+
+def test_one_character_term_falls_back_to_like(customers, fulltext):
+    # Shorter than NGRAM_TOKEN_SIZE, so not in the index
+    rows = customer_search.search(customers, 'y')
+    assert [row['id'] for row in rows] == [2]
+
+
+def test_one_character_term_matches_like_search_condition(customers, fulltext):
+    condition, params = customer_search.search_condition('a')
+    customers.execute(f"SELECT id FROM customers WHERE {condition} ORDER BY id", params)
+    expected = [row['id'] for row in customers.fetchall()]
+    rows = customer_search.search(customers, 'a')
+    assert sorted(row['id'] for row in rows) == expected == [1, 2]
@@ -0,0 +1,56 @@
+import pymysql
+import pytest
+
+import local_db
+from conftest import PRIMARY_PATH
+from import_engine import insert_rows
+
+
+class SplittingCursor:
+    """Runs executemany as two statements, as pymysql does for chunks over its size limit"""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def execute(self, sql, args=None):
+        return self.cursor.execute(sql, args)
+
+    def executemany(self, sql, rows):
+        half = len(rows) // 2
+        self.cursor.executemany(sql, rows[:half])
+        self.cursor.executemany(sql, rows[half:])
+
+
+@pytest.fixture
+def conn():
+    conn = local_db.LocalConnection(PRIMARY_PATH)
+    cursor = conn.cursor()
+    cursor.execute("DROP TABLE IF EXISTS insert_rows_test")
+    cursor.execute("CREATE TABLE insert_rows_test (id INTEGER PRIMARY KEY AUTOINCREMENT, code VARCHAR(20) UNIQUE)")
+    yield conn
+    conn.close()
+
+
+def _codes(conn):
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    cursor.execute("SELECT code FROM insert_rows_test ORDER BY id")
+    return [row['code'] for row in cursor.fetchall()]
+
+
+def test_failed_chunk_is_rolled_back_before_the_row_retry(conn):
+    rows = [('a',), ('b',), ('c',), ('a',)]
+    errors = []
+    written = insert_rows(conn, SplittingCursor(conn.cursor()),
+                          "INSERT INTO insert_rows_test (code) VALUES (%s)", rows, [2, 3, 4, 5], errors)
+    assert written == [0, 1, 2]
+    assert [row_number for row_number, _ in errors] == [5]
+    assert _codes(conn) == ['a', 'b', 'c']
+
+
+def test_clean_chunks_are_written(conn):
+    rows = [(f'code{i}',) for i in range(5)]
+    errors = []
+    written = insert_rows(conn, SplittingCursor(conn.cursor()),
+                          "INSERT INTO insert_rows_test (code) VALUES (%s)", rows, list(range(2, 7)), errors)
+    assert written == list(range(5)) and errors == []
+    assert _codes(conn) == [f'code{i}' for i in range(5)]
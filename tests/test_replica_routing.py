@@ -0,0 +1,163 @@
+"""Read/write routing between the primary and a replica (two SQLite files)"""
+import sqlite3
+import time
+
+import pymysql
+import pytest
+from flask import Flask, jsonify
+
+import cache_config
+import database
+from cache_config import cache_response
+from conftest import PRIMARY_PATH, REPLICA_PATH
+from database import get_db, read_only
+
+handler_calls = []
+
+
+def _server():
+    """Name of the database file the request's connection reads"""
+    cursor = get_db().cursor(pymysql.cursors.DictCursor)
+    cursor.execute("SELECT name FROM routing_marker WHERE name IN ('primary', 'replica')")
+    return cursor.fetchone()['name']
+
+
+def create_app():
+    app = Flask(__name__)
+    database.init_app(app)
+
+    @app.route('/read')
+    @read_only
+    def read():
+        return jsonify({'server': _server()})
+
+    @app.route('/plain')
+    def plain():
+        return jsonify({'server': _server()})
+
+    @app.route('/write', methods=['POST'])
+    @read_only
+    def write():
+        conn = get_db()
+        conn.cursor().execute("INSERT INTO routing_marker (name) VALUES ('written')")
+        conn.commit()
+        return jsonify({'server': _server()}), 201
+
+    @app.route('/cached')
+    @cache_response(timeout=60, tags=('routing',), scope='public')
+    @read_only
+    def cached():
+        handler_calls.append(1)
+        return jsonify({'server': _server()})
+
+    return app
+
+
+@pytest.fixture(scope='module')
+def app():
+    for path, name in ((PRIMARY_PATH, 'primary'), (REPLICA_PATH, 'replica')):
+        db = sqlite3.connect(path)
+        db.execute("CREATE TABLE IF NOT EXISTS routing_marker (name TEXT)")
+        db.execute("DELETE FROM routing_marker")
+        db.execute("INSERT INTO routing_marker (name) VALUES (?)", (name,))
+        db.commit()
+        db.close()
+    return create_app()
+
+
+@pytest.fixture
+def client(app, monkeypatch):
+    assert len(database.replica_pools) == 1
+    monkeypatch.setattr(database, 'DB_STICKY_SECONDS', 0.5)
+    replica = database.replica_pools[0]
+    replica.lag_checked_at = 0.0
+    replica.down_until = 0.0
+    database.sticky_store.mark('ip:127.0.0.1', 0)
+    cache_config.invalidate_tags('routing')
+    handler_calls.clear()
+    return app.test_client()
+
+
+def _written(path):
+    db = sqlite3.connect(path)
+    try:
+        return db.execute("SELECT COUNT(*) FROM routing_marker WHERE name = 'written'").fetchone()[0]
+    finally:
+        db.close()
+
+
+def test_read_only_handler_reads_the_replica(client):
+    assert client.get('/read').get_json() == {'server': 'replica'}
+
+
+def test_other_handlers_read_the_primary(client):
+    assert client.get('/plain').get_json() == {'server': 'primary'}
+
+
+def test_writes_go_to_the_primary(client):
+    before = _written(PRIMARY_PATH), _written(REPLICA_PATH)
+    response = client.post('/write')
+    assert response.status_code == 201
+    assert response.get_json() == {'server': 'primary'}
+    assert (_written(PRIMARY_PATH), _written(REPLICA_PATH)) == (before[0] + 1, before[1])
+
+
+def test_caller_reads_the_primary_until_the_sticky_window_ends(client):
+    client.post('/write')
+    assert client.get('/read').get_json() == {'server': 'primary'}
+    time.sleep(database.DB_STICKY_SECONDS + 0.1)
+    assert client.get('/read').get_json() == {'server': 'replica'}
+
+
+def test_other_callers_are_not_pinned(client):
+    client.post('/write')
+    response = client.get('/read', environ_base={'REMOTE_ADDR': '10.0.0.2'})
+    assert response.get_json() == {'server': 'replica'}
+
+
+def test_lagging_replica_falls_back_to_the_primary(client, monkeypatch):
+    monkeypatch.setattr(database, '_replica_lag', lambda pool: database.DB_REPLICA_MAX_LAG + 1)
+    assert client.get('/read').get_json() == {'server': 'primary'}
+
+
+def test_stopped_replication_falls_back_to_the_primary(client, monkeypatch):
+    monkeypatch.setattr(database, '_replica_lag', lambda pool: float('inf'))
+    assert client.get('/read').get_json() == {'server': 'primary'}
+
+
+def test_replica_down_falls_back_to_the_primary(client, monkeypatch):
+    replica = database.replica_pools[0]
+
+    def checkout(timeout=None):
+        raise pymysql.err.OperationalError(2003, "Can't connect to MySQL server")
+    monkeypatch.setattr(replica, 'checkout', checkout)
+
+    assert client.get('/read').get_json() == {'server': 'primary'}
+    assert replica.down_until > time.monotonic()
+
+
+def test_cache_serves_repeated_reads(client):
+    assert client.get('/cached').get_json() == {'server': 'replica'}
+    assert client.get('/cached').get_json() == {'server': 'replica'}
+    assert len(handler_calls) == 1
+
+
+def test_cache_skipped_while_caller_reads_own_writes(client):
+    client.get('/cached')
+    client.post('/write')
+    with client.application.test_request_context('/cached', environ_base={'REMOTE_ADDR': '127.0.0.1'}):
+        assert database.reads_own_writes()
+    assert client.get('/cached').get_json() == {'server': 'primary'}
+    assert client.get('/cached').get_json() == {'server': 'primary'}
+    assert len(handler_calls) == 3
+
+
+def test_borrow_read_connection_follows_the_sticky_decision(client):
+    with client.application.test_request_context('/export', environ_base={'REMOTE_ADDR': '127.0.0.1'}):
+        conn = database.borrow_read_connection()
+        assert conn.is_replica
+        conn.close()
+        database.sticky_store.mark('ip:127.0.0.1', time.time() + database.DB_STICKY_SECONDS)
+        conn = database.borrow_read_connection()
+        assert not conn.is_replica
+        conn.close()
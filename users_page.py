@@ -1,9 +1,14 @@
-from flask import jsonify, request
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from database import get_db
 import pymysql
-import bcrypt
+from password_service import hash_password
 import re
+from pagination import KeysetQuery, InvalidCursor, fetch_list, list_response
+from lookup_index import record_lookup_change
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Role hierarchy (higher number = more power)
 ROLE_HIERARCHY = {
@@ -15,6 +20,12 @@ ROLE_HIERARCHY = {
     'service_staff': 0  # Cannot manage anyone
 }
 
+USERS_LIST_QUERY = KeysetQuery("""
+    SELECT id, username, email, role, first_name, last_name, 
+           phone, region, is_active, last_login, created_at
+    FROM users 
+""", 'created_at', 'id', 'created_at')
+
 def can_manage_user(current_role, target_role):
     """Check if current user can manage target user based on hierarchy"""
     current_level = ROLE_HIERARCHY.get(current_role, 0)
@@ -23,8 +34,9 @@ def can_manage_user(current_role, target_role):
     return current_level > target_level
 
 def register_users_routes(app):
+    bp = Blueprint('users', __name__)
     
-    @app.route('/api/v1/users/', methods=['GET', 'POST'])
+    @bp.route('/api/v1/users/', methods=['GET', 'POST'])
     @jwt_required()
     def handle_users():
         current_user_id = get_jwt_identity()
@@ -53,33 +65,23 @@ def register_users_routes(app):
                 cursor = conn.cursor(pymysql.cursors.DictCursor)
                 role_filter = request.args.get('role')
                 
+                conditions, params = [], []
                 if role_filter:
-                    cursor.execute("""
-                        SELECT id, username, email, role, first_name, last_name, 
-                               phone, region, is_active, last_login, created_at
-                        FROM users 
-                        WHERE role = %s
-                        ORDER BY created_at DESC
-                    """, (role_filter,))
-                else:
-                    cursor.execute("""
-                        SELECT id, username, email, role, first_name, last_name, 
-                               phone, region, is_active, last_login, created_at
-                        FROM users 
-                        ORDER BY created_at DESC
-                    """)
-                users = cursor.fetchall()
+                    conditions.append("role = %s")
+                    params.append(role_filter)
+                users, next_cursor = fetch_list(cursor, USERS_LIST_QUERY, request.args, conditions, params)
                 conn.close()
                 
-                return jsonify(users)
+                return jsonify(list_response(users, next_cursor, request.args))
+            except InvalidCursor as e:
+                return jsonify({'error': str(e)}), 400
             except Exception as e:
-                print(f"Get users error: {e}")
+                logger.error("Get users error: %s", e)
                 return jsonify({'error': str(e)}), 500
         
         elif request.method == 'POST':
             try:
                 data = request.get_json()
-                print(f"DEBUG: Received user data: {data}")
                 
                 # Check if current user can create users with the requested role
                 requested_role = data.get('role', 'sales_executive')
@@ -128,16 +130,15 @@ def register_users_routes(app):
                 
                 if errors:
                     error_msg = '; '.join(errors)
-                    print(f"ERROR: Validation failed - {error_msg}")
+                    logger.warning("Validation failed - %s", error_msg)
                     return jsonify({'error': error_msg}), 400
                 
                 # Clean phone number
                 phone = re.sub(r'\D', '', data['phone'])
-                print(f"DEBUG: Cleaned phone: {phone}")
                 
                 conn = get_db()
                 if not conn:
-                    print("ERROR: Database connection failed")
+                    logger.warning("Database connection failed")
                     return jsonify({'error': 'Database connection failed'}), 500
                 
                 cursor = conn.cursor()
@@ -146,21 +147,19 @@ def register_users_routes(app):
                 cursor.execute("SELECT id FROM users WHERE username = %s", (data['username'],))
                 if cursor.fetchone():
                     conn.close()
-                    print(f"ERROR: Username '{data['username']}' already exists")
+                    logger.warning("Username '%s' already exists", data['username'])
                     return jsonify({'error': 'Username already exists'}), 400
                 
                 # Check if email exists
                 cursor.execute("SELECT id FROM users WHERE email = %s", (data['email'],))
                 if cursor.fetchone():
                     conn.close()
-                    print(f"ERROR: Email '{data['email']}' already exists")
+                    logger.warning("Email '%s' already exists", data['email'])
                     return jsonify({'error': 'Email already exists'}), 400
                 
-                print("DEBUG: Hashing password...")
                 # Hash password
-                hashed_password = bcrypt.hashpw(data['password'].encode('utf-8'), bcrypt.gensalt())
+                hashed_password = hash_password(data['password'])
                 
-                print(f"DEBUG: Inserting user with phone: {phone}")
                 # Insert user
                 cursor.execute("""
                     INSERT INTO users (username, email, password_hash, role, first_name, last_name, 
@@ -178,19 +177,18 @@ def register_users_routes(app):
                     data.get('is_active', True)
                 ))
                 
-                conn.commit()
                 user_id = cursor.lastrowid
+                record_lookup_change(cursor, 'users', user_id)
+                conn.commit()
                 conn.close()
                 
-                print(f"DEBUG: User created successfully with ID: {user_id}")
+                logger.info("User created with ID: %s", user_id)
                 return jsonify({'id': user_id, 'message': 'User created successfully'}), 201
             except Exception as e:
-                print(f"Create user error: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Create user error: %s", e)
                 return jsonify({'error': str(e)}), 500
     
-    @app.route('/api/v1/users/<int:user_id>', methods=['GET', 'PUT', 'DELETE'])
+    @bp.route('/api/v1/users/<int:user_id>', methods=['GET', 'PUT', 'DELETE'])
     @jwt_required()
     def handle_single_user(user_id):
         current_user_id = get_jwt_identity()
@@ -234,7 +232,7 @@ def register_users_routes(app):
                 
                 return jsonify(user)
             except Exception as e:
-                print(f"Get user error: {e}")
+                logger.error("Get user error: %s", e)
                 return jsonify({'error': str(e)}), 500
         
         elif request.method == 'PUT':
@@ -265,7 +263,6 @@ def register_users_routes(app):
                 conn.close()
                 
                 data = request.get_json()
-                print(f"DEBUG: Updating user {user_id} with data: {data}")
                 
                 # Check if trying to change role (super_admin can assign any role)
                 new_role = data.get('role', target_role)
@@ -311,12 +308,11 @@ def register_users_routes(app):
                 
                 if errors:
                     error_msg = '; '.join(errors)
-                    print(f"ERROR: Validation failed - {error_msg}")
+                    logger.warning("Validation failed - %s", error_msg)
                     return jsonify({'error': error_msg}), 400
                 
                 # Clean phone number
                 phone = re.sub(r'\D', '', data['phone'])
-                print(f"DEBUG: Cleaned phone: {phone}")
                 
                 conn = get_db()
                 if not conn:
@@ -347,7 +343,7 @@ def register_users_routes(app):
                 # Update user
                 if data.get('password'):
                     # Hash new password
-                    hashed_password = bcrypt.hashpw(data['password'].encode('utf-8'), bcrypt.gensalt())
+                    hashed_password = hash_password(data['password'])
                     cursor.execute("""
                         UPDATE users 
                         SET username = %s, email = %s, password_hash = %s, role = %s, 
@@ -384,12 +380,13 @@ def register_users_routes(app):
                         user_id
                     ))
                 
+                record_lookup_change(cursor, 'users', user_id)
                 conn.commit()
                 conn.close()
                 
                 return jsonify({'message': 'User updated successfully'})
             except Exception as e:
-                print(f"Update user error: {e}")
+                logger.error("Update user error: %s", e)
                 return jsonify({'error': str(e)}), 500
         
         elif request.method == 'DELETE':
@@ -416,10 +413,13 @@ def register_users_routes(app):
                 
                 # Delete user
                 cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
+                record_lookup_change(cursor, 'users', user_id)
                 conn.commit()
                 conn.close()
                 
                 return jsonify({'message': 'User deleted successfully'})
             except Exception as e:
-                print(f"Delete user error: {e}")
+                logger.error("Delete user error: %s", e)
                 return jsonify({'error': str(e)}), 500
+    
+    app.register_blueprint(bp)